@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""Compare torch and ONNX Runtime embedding backends: parity, throughput and latency."""
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+
+from src.data.embeddings import EmbeddingModel
+from src.data.embedding_pool import EmbeddingPool
+from src.data.chunking import DocumentChunker
+from src.data.filing_archive import get_filing_archive
+from src.utils.logging import setup_logging, get_logger
+
+SAMPLE_TEXTS = [
+    "Net sales increased due to higher iPhone and Services revenue.",
+    "The Company is exposed to foreign currency exchange rate risk.",
+    "Gross margin percentage decreased compared to the prior year.",
+    "Risk factors include supply chain disruption and component shortages.",
+    "Operating cash flow funded share repurchases and dividends.",
+]
+
+
+def load_corpus(ticker: str, size: int):
+    """Chunks from archived filings, falling back to synthetic sentences."""
+    texts = []
+    archive = get_filing_archive()
+    chunker = DocumentChunker()
+    for record in archive.list_filings(ticker=ticker):
+        chunks = chunker.chunk_document(archive.read_clean(record.accession_number), record.document_id)
+        texts.extend(c.text for c in chunks)
+        if len(texts) >= size:
+            break
+    while len(texts) < size:
+        texts.append(SAMPLE_TEXTS[len(texts) % len(SAMPLE_TEXTS)] * (1 + len(texts) % 8))
+    return texts[:size]
+
+
+def measure(model: EmbeddingModel, texts, queries):
+    start = time.perf_counter()
+    docs = model.embed_documents(texts)
+    elapsed = time.perf_counter() - start
+    
+    latencies = []
+    for query in queries:
+        t0 = time.perf_counter()
+        model.embed_query(query)
+        latencies.append((time.perf_counter() - t0) * 1000)
+    latencies.sort()
+    
+    return docs, {
+        "docs_per_second": round(len(texts) / elapsed, 1),
+        "query_p50_ms": round(statistics.median(latencies), 2),
+        "query_p95_ms": round(latencies[int(0.95 * (len(latencies) - 1))], 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", help="Embedding model (defaults to EMBEDDING_MODEL)")
+    parser.add_argument("--ticker", help="Use archived filings for this ticker as the corpus")
+    parser.add_argument("--size", type=int, default=512, help="Number of chunks to embed")
+    parser.add_argument("--queries", type=int, default=50, help="Single-query latency samples")
+    parser.add_argument("--workers", type=int, nargs="*", default=[], help="Also measure the process pool at these worker counts")
+    parser.add_argument("--min-cosine", type=float, default=0.99, help="Parity threshold vs torch")
+    args = parser.parse_args()
+    
+    setup_logging()
+    logger = get_logger(__name__)
+    
+    texts = load_corpus(args.ticker, args.size)
+    queries = [SAMPLE_TEXTS[i % len(SAMPLE_TEXTS)] for i in range(args.queries)]
+    
+    baseline, report = None, {}
+    for name, backend, quantize in [("torch", "torch", False), ("onnx-fp32", "onnx", False), ("onnx-int8", "onnx", True)]:
+        model = EmbeddingModel(args.model, backend=backend, quantize=quantize)
+        model.embed_documents(texts[:8])  # warm-up
+        docs, stats = measure(model, texts, queries)
+        if baseline is None:
+            baseline = docs
+        else:
+            cosine = np.sum(docs * baseline, axis=1)
+            stats["min_cosine"] = round(float(cosine.min()), 4)
+            stats["mean_cosine"] = round(float(cosine.mean()), 4)
+        report[name] = stats
+        logger.info(f"{name}: {stats}")
+    
+    for workers in args.workers:
+        with EmbeddingPool(workers=workers, model_name=args.model) as pool:
+            pool.embed(texts[:workers * 8])  # start workers and load models
+            start = time.perf_counter()
+            pool.embed(texts)
+            elapsed = time.perf_counter() - start
+        report[f"pool-{workers}"] = {"docs_per_second": round(len(texts) / elapsed, 1)}
+        logger.info(f"pool-{workers}: {report[f'pool-{workers}']}")
+    
+    print(json.dumps(report, indent=2))
+    failed = [n for n, s in report.items() if s.get("min_cosine", 1.0) < args.min_cosine]
+    if failed:
+        logger.error(f"Parity below {args.min_cosine}: {failed}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
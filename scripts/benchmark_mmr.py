@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""Measure MMR re-ranking overhead at several fetch_k sizes."""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+
+from src.data.mmr import mmr_select
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--fetch-k", type=int, nargs="+", default=[50, 100, 200])
+    parser.add_argument("--top-k", type=int, default=12)
+    parser.add_argument("--dim", type=int, default=768, help="Embedding dimension (bge-base: 768)")
+    parser.add_argument("--lambda-mult", type=float, default=0.7)
+    parser.add_argument("--runs", type=int, default=200)
+    parser.add_argument("--output", help="Write the JSON report here (default: stdout)")
+    args = parser.parse_args()
+    
+    rng = np.random.default_rng(0)
+    report = {"config": {k: v for k, v in vars(args).items() if k != "output"}, "results": []}
+    for fetch_k in args.fetch_k:
+        # Clustered candidates, as when one section dominates the hits
+        centers = rng.normal(size=(5, args.dim)).astype(np.float32)
+        candidates = centers[rng.integers(0, 5, fetch_k)] + 0.2 * rng.normal(size=(fetch_k, args.dim)).astype(np.float32)
+        candidates /= np.linalg.norm(candidates, axis=1, keepdims=True)
+        query = candidates[0] + 0.1 * rng.normal(size=args.dim).astype(np.float32)
+        query /= np.linalg.norm(query)
+        
+        timings = []
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            mmr_select(query, candidates, args.top_k, lambda_mult=args.lambda_mult)
+            timings.append((time.perf_counter() - start) * 1000)
+        
+        report["results"].append({
+            "fetch_k": fetch_k,
+            "p50_ms": round(float(np.percentile(timings, 50)), 4),
+            "p99_ms": round(float(np.percentile(timings, 99)), 4),
+        })
+    
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output)
+    else:
+        print(output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Benchmark VectorStore ingest and search on a synthetic SEC-like corpus.
+
+Measures ingest throughput, filtered/unfiltered search QPS and p50/p99
+latency at several concurrency levels, and recall@k against exact brute
+force. Runs offline on synthetic clustered vectors, or embeds the synthetic
+text with a local model (--model). Writes a JSON report for run-to-run
+comparison.
+"""
+import argparse
+import json
+import platform
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+
+from src.data.chunking import Chunk
+from src.data.docstore import DocStore
+from src.data.local_index import LocalIndexBackend
+from src.data.vector_backend import ChromaBackend
+from src.data.vector_store import VectorStore
+from src.utils.logging import setup_logging, get_logger
+
+SECTIONS = ["Risk Factors", "Management's Discussion and Analysis", "Liquidity and Capital Resources",
+            "Results of Operations", "Legal Proceedings", "Market Risk", "Revenue Recognition"]
+TOPICS = ["supply chain disruption", "foreign exchange exposure", "net sales growth", "gross margin",
+          "share repurchases", "litigation", "interest rate risk", "cloud services revenue",
+          "inventory levels", "operating expenses", "debt maturities", "customer concentration"]
+FORMS = ["10-K", "10-Q", "10-Q", "10-Q"]
+
+
+def make_corpus(size: int, tickers: int, selectivity: float, dim: int, seed: int):
+    """
+    Synthetic chunks with clustered unit vectors.
+    
+    Ticker T000 holds `selectivity` of the corpus (the filtered-search
+    target); the rest is spread evenly over the other tickers.
+    """
+    rng = np.random.default_rng(seed)
+    names = [f"T{i:03d}" for i in range(tickers)]
+    others = rng.integers(1, max(tickers, 2), size) if tickers > 1 else np.zeros(size, dtype=int)
+    ticker_idx = np.where(rng.random(size) < selectivity, 0, others)
+    topic_idx = rng.integers(0, len(TOPICS), size)
+    
+    centers = rng.normal(size=(len(TOPICS) * 8, dim)).astype(np.float32)
+    sub = topic_idx * 8 + rng.integers(0, 8, size)
+    vectors = centers[sub] + 0.6 * rng.normal(size=(size, dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    
+    chunks = []
+    for i in range(size):
+        ticker = names[ticker_idx[i]]
+        form = FORMS[i % len(FORMS)]
+        year = 2015 + (i * 7) % 10
+        document_id = f"{ticker}-{form}-{year}{i % 4}"
+        text = (
+            f"{SECTIONS[i % len(SECTIONS)]}. {ticker} discussed {TOPICS[topic_idx[i]]} in fiscal {year}. "
+            f"Management noted that {TOPICS[(topic_idx[i] + 3) % len(TOPICS)]} could affect results, "
+            f"and the Company continues to monitor {TOPICS[(topic_idx[i] + 5) % len(TOPICS)]}."
+        )
+        chunks.append(Chunk(
+            text=text,
+            chunk_id=f"{document_id}_chunk_{i}",
+            document_id=document_id,
+            metadata={"ticker": ticker, "filing_type": form, "filing_date": year * 10000 + 101},
+        ))
+    return chunks, vectors, topic_idx
+
+
+def make_queries(vectors: np.ndarray, count: int, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed + 1)
+    queries = vectors[rng.integers(0, len(vectors), count)]
+    queries = queries + 0.3 * rng.normal(size=queries.shape).astype(np.float32)
+    return queries / np.linalg.norm(queries, axis=1, keepdims=True)
+
+
+def exact_top_k(vectors: np.ndarray, queries: np.ndarray, mask: np.ndarray, k: int):
+    rows = np.flatnonzero(mask)
+    scores = queries @ vectors[rows].T
+    return [set(rows[np.argsort(-s)[:k]]) for s in scores]
+
+
+def build_backend(name: str, root: Path):
+    if name == "chroma":
+        return ChromaBackend(path=str(root / "chroma"))
+    if name == "local-flat":
+        return LocalIndexBackend(str(root / "local"), index_type="flat")
+    if name == "local-ivf":
+        return LocalIndexBackend(str(root / "local"), index_type="ivf")
+    raise ValueError(f"Unknown backend: {name}")
+
+
+def run_searches(store, queries, filters, top_k, concurrency, hydrate):
+    def one(q):
+        t0 = time.perf_counter()
+        hits = store.search("", top_k=top_k, filters=filters, hydrate=hydrate, query_embedding=q)
+        return (time.perf_counter() - t0) * 1000, hits
+    
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(one, queries))
+    wall = time.perf_counter() - start
+    latencies = np.array([r[0] for r in results])
+    return results, {
+        "qps": round(len(queries) / wall, 1),
+        "p50_ms": round(float(np.percentile(latencies, 50)), 3),
+        "p99_ms": round(float(np.percentile(latencies, 99)), 3),
+    }
+
+
+def benchmark_backend(name, chunks, vectors, queries, args, logger):
+    row_of = {c.chunk_id: i for i, c in enumerate(chunks)}
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        store = VectorStore(docstore=DocStore(str(root / "docstore.db")), backend=build_backend(name, root))
+        
+        start = time.perf_counter()
+        for s in range(0, len(chunks), args.batch_size):
+            store.add_documents(chunks[s:s + args.batch_size], embeddings=vectors[s:s + args.batch_size])
+        ingest_seconds = time.perf_counter() - start
+        
+        report = {
+            "ingest_seconds": round(ingest_seconds, 3),
+            "ingest_chunks_per_second": round(len(chunks) / ingest_seconds, 1),
+            "search": [],
+        }
+        
+        tickers = np.array([c.metadata["ticker"] for c in chunks])
+        for filtered in (False, True):
+            filters = {"ticker": "T000"} if filtered else None
+            mask = tickers == "T000" if filtered else np.ones(len(chunks), dtype=bool)
+            truth = exact_top_k(vectors, queries, mask, args.top_k)
+            
+            for concurrency in args.concurrency:
+                results, stats = run_searches(store, queries, filters, args.top_k, concurrency, not args.no_hydrate)
+                recall = np.mean([
+                    len({row_of[c.chunk_id] for c, _ in hits} & expected) / max(len(expected), 1)
+                    for (_, hits), expected in zip(results, truth)
+                ])
+                stats.update({
+                    "filtered": filtered,
+                    "selectivity": round(float(mask.mean()), 4),
+                    "concurrency": concurrency,
+                    f"recall_at_{args.top_k}": round(float(recall), 4),
+                })
+                report["search"].append(stats)
+                logger.info(f"{name} {stats}")
+        store.docstore.close()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=20000, help="Number of chunks")
+    parser.add_argument("--tickers", type=int, default=50, help="Ticker cardinality")
+    parser.add_argument("--selectivity", type=float, default=0.02, help="Corpus share of the filtered ticker")
+    parser.add_argument("--dim", type=int, default=384, help="Vector dimension for synthetic vectors")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--backends", nargs="+", default=["chroma", "local-flat", "local-ivf"])
+    parser.add_argument("--batch-size", type=int, default=1000, help="Chunks per add_documents call")
+    parser.add_argument("--model", help="Embed the synthetic text with this local embedding model")
+    parser.add_argument("--no-hydrate", action="store_true", help="Return ids and scores only")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the JSON report here (default: stdout)")
+    args = parser.parse_args()
+    
+    setup_logging()
+    logger = get_logger(__name__)
+    
+    chunks, vectors, _ = make_corpus(args.size, args.tickers, args.selectivity, args.dim, args.seed)
+    queries = make_queries(vectors, args.queries, args.seed)
+    embedding = None
+    if args.model:
+        from src.data.embeddings import EmbeddingModel
+        model = EmbeddingModel(args.model)
+        start = time.perf_counter()
+        vectors = np.asarray(model.embed_documents([c.text for c in chunks]), dtype=np.float32)
+        embedding = {"model": args.model, "chunks_per_second": round(len(chunks) / (time.perf_counter() - start), 1)}
+        rng = np.random.default_rng(args.seed + 1)
+        queries = np.vstack([
+            model.embed_query(f"What did {chunks[i].metadata['ticker']} say about {TOPICS[i % len(TOPICS)]}?")
+            for i in rng.integers(0, len(chunks), args.queries)
+        ]).astype(np.float32)
+    
+    report = {
+        "config": {k: v for k, v in vars(args).items() if k != "output"},
+        "environment": {"python": platform.python_version(), "machine": platform.machine()},
+        "embedding": embedding,
+        "results": {},
+    }
+    for name in args.backends:
+        report["results"][name] = benchmark_backend(name, chunks, vectors, queries, args, logger)
+    
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output)
+        logger.info(f"Report written to {args.output}")
+    else:
+        print(output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""Extend the local FRED series catalog with the most popular series for a set of topics."""
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.config.settings import settings
+from src.data.fred_catalog import get_fred_catalog
+from src.data.fred_client import FREDClient
+from src.utils.logging import setup_logging, get_logger
+
+DEFAULT_TOPICS = (
+    "gdp,employment,unemployment,inflation,consumer price,interest rate,treasury yield,"
+    "mortgage,housing,money supply,retail sales,industrial production,consumer sentiment,"
+    "credit spread,exchange rate,oil price,recession,wages,productivity,trade balance"
+)
+
+async def fetch(topics, limit, min_popularity):
+    async with FREDClient(settings.fred_api_key.get_secret_value()) as client:
+        results = await asyncio.gather(*(client.search_series(topic, limit) for topic in topics))
+    found = {}
+    for series in results:
+        for info in series:
+            if info.popularity >= min_popularity:
+                found[info.series_id] = info
+    return list(found.values())
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--topics", default=DEFAULT_TOPICS, help="Comma-separated search topics")
+    parser.add_argument("--limit", type=int, default=50, help="Series per topic")
+    parser.add_argument("--min-popularity", type=int, default=30)
+    args = parser.parse_args()
+    if not settings.fred_api_key:
+        parser.error("FRED_API_KEY is required to build the catalog")
+    
+    setup_logging()
+    logger = get_logger(__name__)
+    
+    topics = [t.strip() for t in args.topics.split(",") if t.strip()]
+    series = asyncio.run(fetch(topics, args.limit, args.min_popularity))
+    logger.info(f"Adding {len(series)} series from {len(topics)} topics")
+    
+    catalog = get_fred_catalog()
+    catalog.load()  # Seeds the core series on first run
+    catalog.add(series)
+    logger.info(f"Catalog now holds {len(catalog)} series")
+
+if __name__ == "__main__":
+    main()
@@ -9,14 +9,30 @@ from src.utils.logging import setup_logging, get_logger
 
 def main():
     parser = argparse.ArgumentParser()
-    parser.add_argument("--tickers", required=True, help="Comma-separated tickers")
+    parser.add_argument("--tickers", help="Comma-separated tickers")
     parser.add_argument("--limit", type=int, default=5)
+    parser.add_argument(
+        "--reindex",
+        action="store_true",
+        help="Rebuild the vector store from the local filing archive (no EDGAR access)"
+    )
     args = parser.parse_args()
+    if not args.tickers and not args.reindex:
+        parser.error("--tickers is required unless --reindex is given")
     
     setup_logging()
     logger = get_logger(__name__)
     
     loader = SECLoader()
+    if args.reindex:
+        tickers = [t.strip().upper() for t in args.tickers.split(",")] if args.tickers else [None]
+        for ticker in tickers:
+            logger.info(f"Re-indexing {ticker or 'all tickers'} from archive")
+            result = loader.reindex(ticker)
+            logger.info(f"Result: {result}")
+        logger.info(f"Archive: {loader.archive.stats()}")
+        return
+    
     for ticker in args.tickers.split(","):
         ticker = ticker.strip().upper()
         logger.info(f"Ingesting {ticker}")
@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""Run the watchlist prefetch scheduler as a sidecar process."""
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.orchestration.prefetch import PrefetchScheduler
+from src.utils.logging import setup_logging, get_logger
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tickers", help="Comma-separated watchlist (defaults to PREFETCH_WATCHLIST)")
+    parser.add_argument("--once", action="store_true", help="Run a single cycle and exit")
+    args = parser.parse_args()
+    
+    setup_logging()
+    logger = get_logger(__name__)
+    
+    watchlist = args.tickers.split(",") if args.tickers else None
+    scheduler = PrefetchScheduler(watchlist=watchlist)
+    logger.info(f"Prefetching {scheduler.targets()}")
+    
+    if args.once:
+        asyncio.run(scheduler.run_cycle())
+        logger.info(f"Stats: {scheduler.get_stats()}")
+    else:
+        asyncio.run(scheduler.run_forever())
+
+if __name__ == "__main__":
+    main()
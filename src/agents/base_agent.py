@@ -1,8 +1,11 @@
+import asyncio
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Union
 import time
 from src.models.base import BaseModelInterface
 from src.models.openai_model import OpenAIModel
+from src.models.router import TaskProfile
+from src.agents.prompt_builder import AssembledPrompt, PromptBuilder
 from src.guardrails.schemas import (
     AgentInput, AgentOutput, Citation, RetrievedContext
 )
@@ -13,8 +16,23 @@ from opentelemetry import trace
 
 logger = get_logger(__name__)
 
+ANSWER_TEMPLATE = """Question: {question}
+
+Sources:
+{sources}
+
+Answer the question using only the sources above. Cite using [Source N]."""
+
 
 class BaseAgent(ABC):
+    # Generation settings; agents override these class attributes
+    temperature = 0.3
+    no_context_response = "No relevant information found."
+    # Prompt ("{question}" and "{sources}" placeholders) and the type of
+    # the sources it cites, for the default `_build_prompt`/`_parse_response`
+    answer_template = ANSWER_TEMPLATE
+    citation_source_type = "sec_filing"
+    
     def __init__(self, name: str, model: Optional[BaseModelInterface] = None):
         self.name = name
         self.model = model or OpenAIModel()
@@ -28,13 +46,50 @@ class BaseAgent(ABC):
     async def _retrieve(self, query: str, filters: Dict) -> List[RetrievedContext]:
         pass
     
-    @abstractmethod
+    async def prefetch(self, inputs: List[AgentInput]):
+        """
+        Load data for several inputs in bulk before each is retrieved;
+        agents whose sources take many keys per call override this.
+        """
+    
+    def _build_prompt(self, query: str, contexts: List[RetrievedContext]) -> AssembledPrompt:
+        return self._assemble_prompt(self.answer_template, query, contexts)
+    
+    def _source_type(self, ctx: RetrievedContext) -> str:
+        return self.citation_source_type
+    
+    def _parse_response(self, content: str, assembled: AssembledPrompt) -> Tuple[str, List[Citation]]:
+        """Cite every source in the prompt, in [Source N] order."""
+        citations = [
+            Citation(
+                source_type=self._source_type(ctx),
+                source_id=ctx.source_id,
+                text_excerpt=ctx.text[:300],
+                relevance_score=ctx.relevance_score
+            )
+            for ctx in assembled.contexts
+        ]
+        return content, citations
+    
     async def _generate(
         self,
         query: str,
         contexts: List[RetrievedContext]
-    ) -> Tuple[str, List[Citation]]:
-        pass
+    ) -> Tuple[str, List[Citation], List[RetrievedContext]]:
+        """Answer from `contexts`; also returns the sources as numbered in the prompt."""
+        if not contexts:
+            return self.no_context_response, [], []
+        
+        assembled = self._build_prompt(query, contexts)
+        
+        response = await self.model.generate(
+            prompt=assembled.prompt,
+            system_prompt=self.system_prompt,
+            temperature=self.temperature
+        )
+        
+        response_text, citations = self._parse_response(response.content, assembled)
+        return response_text, citations, assembled.contexts
     
     async def execute(self, input: AgentInput) -> AgentOutput:
         """Execute agent with full OpenInference tracing."""
@@ -52,44 +107,135 @@ class BaseAgent(ABC):
             
             start = time.time()
             
-            # Retrieval step with tracing
-            with tracer.start_as_current_span(
-                f"retriever.{self.name}",
-                kind=trace.SpanKind.INTERNAL
-            ) as retriever_span:
-                retriever_span.set_attribute(SpanAttributes.OPENINFERENCE_SPAN_KIND, "RETRIEVER")
-                retriever_span.set_attribute(SpanAttributes.INPUT_VALUE, input.query)
-                
-                contexts = await self._retrieve(input.query, input.filters)
-                
-                retriever_span.set_attribute("retriever.document_count", len(contexts))
-                if contexts:
-                    # Add document details
-                    for i, ctx in enumerate(contexts[:5]):  # Limit to first 5
-                        retriever_span.set_attribute(f"retriever.document.{i}.id", ctx.source_id)
-                        retriever_span.set_attribute(f"retriever.document.{i}.score", ctx.relevance_score)
+            contexts = await self._traced_retrieve(input)
             
             # Generation step (already traced in model)
-            response_text, citations = await self._generate(input.query, contexts)
+            response_text, citations, prompt_contexts = await self._generate(input.query, contexts)
             
-            confidence = self._calculate_confidence(contexts, citations)
-            processing_time = int((time.time() - start) * 1000)
+            output = self._output(contexts, response_text, citations, start, prompt_contexts)
             
             # Set output attributes
             span.set_attribute(SpanAttributes.OUTPUT_VALUE, response_text[:2000])
-            span.set_attribute("agent.confidence_score", confidence)
+            span.set_attribute("agent.confidence_score", output.confidence_score)
             span.set_attribute("agent.citation_count", len(citations))
             span.set_attribute("agent.context_count", len(contexts))
-            span.set_attribute("agent.processing_time_ms", processing_time)
+            span.set_attribute("agent.processing_time_ms", output.processing_time_ms)
+            
+            return output
+    
+    @staticmethod
+    async def execute_many(
+        jobs: List[Tuple["BaseAgent", AgentInput]]
+    ) -> List[Union[AgentOutput, Exception]]:
+        """
+        Execute several agents together.
+        
+        Agents with several jobs prefetch their inputs in bulk, retrieval
+        runs concurrently, and the prompts then go out as one
+        `generate_batch` per model and temperature. A job that fails gets
+        its exception in place of an output instead of failing the rest.
+        """
+        tracer = get_tracer()
+        
+        with tracer.start_as_current_span(
+            "agent.batch",
+            kind=trace.SpanKind.INTERNAL
+        ) as span:
+            span.set_attribute(SpanAttributes.OPENINFERENCE_SPAN_KIND, "CHAIN")
+            span.set_attribute("agent.batch_size", len(jobs))
+            span.set_attribute("agent.names", ",".join(agent.name for agent, _ in jobs))
             
-            return AgentOutput(
-                agent_name=self.name,
-                response_text=response_text,
-                citations=citations,
-                retrieved_contexts=contexts,
-                confidence_score=confidence,
-                processing_time_ms=processing_time
+            start = time.time()
+            by_agent: Dict[int, Tuple[BaseAgent, List[AgentInput]]] = {}
+            for agent, input in jobs:
+                by_agent.setdefault(id(agent), (agent, []))[1].append(input)
+            prefetches = [agent.prefetch(inputs) for agent, inputs in by_agent.values() if len(inputs) > 1]
+            if prefetches:
+                # Best-effort: anything a prefetch misses is fetched by retrieval
+                await asyncio.gather(*prefetches, return_exceptions=True)
+            
+            retrieved = await asyncio.gather(
+                *(agent._traced_retrieve(input) for agent, input in jobs),
+                return_exceptions=True
             )
+            
+            results: List[Any] = [None] * len(jobs)
+            groups: Dict[Tuple[int, float], List[Tuple[int, AssembledPrompt]]] = {}
+            for i, ((agent, input), contexts) in enumerate(zip(jobs, retrieved)):
+                if isinstance(contexts, Exception):
+                    results[i] = contexts
+                elif not contexts:
+                    results[i] = agent._output(contexts, agent.no_context_response, [], start)
+                else:
+                    try:
+                        assembled = agent._build_prompt(input.query, contexts)
+                    except Exception as e:
+                        results[i] = e
+                        continue
+                    groups.setdefault((id(agent.model), agent.temperature), []).append((i, assembled))
+            
+            for members in groups.values():
+                agents = [jobs[i][0] for i, _ in members]
+                try:
+                    responses = await agents[0].model.generate_batch(
+                        [assembled.prompt for _, assembled in members],
+                        system_prompt=[agent.system_prompt for agent in agents],
+                        temperature=agents[0].temperature
+                    )
+                except Exception as e:
+                    for i, _ in members:
+                        results[i] = e
+                    continue
+                for agent, (i, assembled), response in zip(agents, members, responses):
+                    try:
+                        response_text, citations = agent._parse_response(response.content, assembled)
+                    except Exception as e:
+                        results[i] = e
+                        continue
+                    results[i] = agent._output(retrieved[i], response_text, citations, start, assembled.contexts)
+            
+            span.set_attribute("agent.batch_groups", len(groups))
+            span.set_attribute("agent.batch_prefetches", len(prefetches))
+            span.set_attribute("agent.batch_failed", sum(isinstance(r, Exception) for r in results))
+            return results
+    
+    async def _traced_retrieve(self, input: AgentInput) -> List[RetrievedContext]:
+        tracer = get_tracer()
+        
+        with tracer.start_as_current_span(
+            f"retriever.{self.name}",
+            kind=trace.SpanKind.INTERNAL
+        ) as retriever_span:
+            retriever_span.set_attribute(SpanAttributes.OPENINFERENCE_SPAN_KIND, "RETRIEVER")
+            retriever_span.set_attribute(SpanAttributes.INPUT_VALUE, input.query)
+            
+            contexts = await self._retrieve(input.query, input.filters)
+            
+            retriever_span.set_attribute("retriever.document_count", len(contexts))
+            if contexts:
+                # Add document details
+                for i, ctx in enumerate(contexts[:5]):  # Limit to first 5
+                    retriever_span.set_attribute(f"retriever.document.{i}.id", ctx.source_id)
+                    retriever_span.set_attribute(f"retriever.document.{i}.score", ctx.relevance_score)
+            return contexts
+    
+    def _output(
+        self,
+        contexts: List[RetrievedContext],
+        response_text: str,
+        citations: List[Citation],
+        start: float,
+        prompt_contexts: Optional[List[RetrievedContext]] = None
+    ) -> AgentOutput:
+        return AgentOutput(
+            agent_name=self.name,
+            response_text=response_text,
+            citations=citations,
+            retrieved_contexts=contexts,
+            prompt_contexts=prompt_contexts or [],
+            confidence_score=self._calculate_confidence(contexts, citations),
+            processing_time_ms=int((time.time() - start) * 1000)
+        )
     
     def _calculate_confidence(
         self,
@@ -102,10 +248,23 @@ class BaseAgent(ABC):
         citation_ratio = min(len(citations) / len(contexts), 1.0)
         return round(avg_relevance * 0.6 + citation_ratio * 0.4, 3)
     
-    def _format_contexts(self, contexts: List[RetrievedContext]) -> str:
-        if not contexts:
-            return "No relevant context found."
-        parts = []
-        for i, ctx in enumerate(contexts, 1):
-            parts.append(f"[Source {i}] ({ctx.source_id}):\n{ctx.text}\n")
-        return "\n".join(parts)
+    def _assemble_prompt(
+        self,
+        template: str,
+        question: str,
+        contexts: List[RetrievedContext],
+        max_tokens: int = 1024,
+        **kwargs
+    ) -> AssembledPrompt:
+        """Fit the system prompt, question and sources into the model's token budget (less the task's output tokens)."""
+        profile = getattr(self.model, "profile", None)
+        if isinstance(profile, TaskProfile):
+            max_tokens = profile.max_tokens
+        return PromptBuilder(self.model).build(
+            template,
+            question,
+            contexts,
+            system_prompt=self.system_prompt,
+            max_tokens=max_tokens,
+            **kwargs
+        )
@@ -1,10 +1,20 @@
-from typing import List, Dict, Tuple
+from typing import List, Dict, Optional, Tuple
 from src.agents.base_agent import BaseAgent
 from src.guardrails.schemas import (
     RetrievedContext, Citation, AgentOutput, CriticOutput
 )
 from src.config.constants import AgentName
 
+VALIDATION_TEMPLATE = """Validate this response against its sources.
+
+RESPONSE:
+{question}
+
+SOURCES:
+{sources}
+
+Analyze faithfulness and citation coverage."""
+
 
 class CriticAgent(BaseAgent):
     """Agent that validates responses for faithfulness and citation coverage."""
@@ -35,8 +45,8 @@ PASSED: [true/false]"""
         self,
         query: str,
         contexts: List[RetrievedContext]
-    ) -> Tuple[str, List[Citation]]:
-        return "", []
+    ) -> Tuple[str, List[Citation], List[RetrievedContext]]:
+        return "", [], []
     
     async def validate(
         self,
@@ -44,40 +54,49 @@ PASSED: [true/false]"""
         contexts: List[RetrievedContext],
         citations: List[Citation]
     ) -> CriticOutput:
-        """Validate a response against its sources."""
-        
-        if not contexts:
-            return CriticOutput(
-                faithfulness_score=0.0,
-                citation_coverage=0.0,
-                unsupported_claims=["No sources provided"],
-                passed=False
+        """Validate a response against its sources, numbered as in the response's prompt."""
+        results = await self.validate_many([(response_text, contexts, citations)])
+        return results[0]
+    
+    async def validate_many(
+        self,
+        items: List[Tuple[str, List[RetrievedContext], List[Citation]]]
+    ) -> List[CriticOutput]:
+        """Validate several (response, contexts, citations) items with one batched model call."""
+        results: List[Optional[CriticOutput]] = [None] * len(items)
+        prompts = []
+        for i, (response_text, contexts, _) in enumerate(items):
+            if not contexts:
+                results[i] = CriticOutput(
+                    faithfulness_score=0.0,
+                    citation_coverage=0.0,
+                    unsupported_claims=["No sources provided"],
+                    passed=False
+                )
+                continue
+            
+            # Sources keep the numbers the response cites them by; any that
+            # do not fit the budget the response leaves are left out
+            assembled = self._assemble_prompt(
+                VALIDATION_TEMPLATE,
+                response_text,
+                contexts,
+                source_format="[Source {index}]: {text}",
+                preserve_order=True
             )
+            prompts.append((i, assembled.prompt))
         
-        # Build context text for validation
-        context_text = "\n".join([
-            f"[Source {i+1}]: {ctx.text[:500]}"
-            for i, ctx in enumerate(contexts)
-        ])
-        
-        prompt = f"""Validate this response against its sources.
-
-RESPONSE:
-{response_text}
-
-SOURCES:
-{context_text}
-
-Analyze faithfulness and citation coverage."""
-
-        result = await self.model.generate(
-            prompt=prompt,
-            system_prompt=self.system_prompt,
-            temperature=0.1
-        )
+        if prompts:
+            responses = await self.model.generate_batch(
+                [prompt for _, prompt in prompts],
+                system_prompt=self.system_prompt,
+                temperature=0.1,
+                cache=True
+            )
+            for (i, _), response in zip(prompts, responses):
+                results[i] = self._parse_critic_response(response.content)
         
-        # Parse response
-        return self._parse_critic_response(result.content)
+        return results
     
     def _parse_critic_response(self, response: str) -> CriticOutput:
         """Parse the critic's structured response."""
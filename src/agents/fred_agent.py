@@ -1,16 +1,43 @@
-from typing import List, Dict, Tuple
-from fredapi import Fred
+from typing import List, Dict, Optional, Tuple
+
+import pandas as pd
+
 from src.agents.base_agent import BaseAgent
-from src.guardrails.schemas import RetrievedContext, Citation
+from src.guardrails.schemas import RetrievedContext
 from src.config.settings import settings
 from src.config.constants import AgentName, FRED_SERIES
+from src.data import analytics
+from src.data.fred_catalog import FREDCatalog, SeriesInfo, get_fred_catalog
+from src.data.fred_client import FREDRefresher, get_fred_refresher
+from src.data.fred_store import FREDStore, get_fred_store
+from src.utils.logging import get_logger
+
+ANSWER_TEMPLATE = """Question: {question}
+
+Economic Data:
+{sources}
+
+Analyze this data to answer the question."""
 
 
 class FREDAgent(BaseAgent):
-    def __init__(self, **kwargs):
+    answer_template = ANSWER_TEMPLATE
+    citation_source_type = "macro_data"
+    no_context_response = "No relevant economic data found. Try asking about GDP, unemployment, inflation, or interest rates."
+    
+    def __init__(
+        self,
+        store: Optional[FREDStore] = None,
+        refresher: Optional[FREDRefresher] = None,
+        catalog: Optional[FREDCatalog] = None,
+        **kwargs
+    ):
         super().__init__(name=AgentName.FRED, **kwargs)
-        api_key = settings.fred_api_key.get_secret_value() if settings.fred_api_key else None
-        self.fred = Fred(api_key=api_key) if api_key else None
+        # Requests read the local store; the refresher (None without an API key) keeps it current
+        self.store = store or get_fred_store()
+        self.refresher = refresher or get_fred_refresher()
+        self.catalog = catalog if catalog is not None else get_fred_catalog()
+        self._logger = get_logger(__name__)
     
     @property
     def system_prompt(self) -> str:
@@ -18,68 +45,69 @@ class FREDAgent(BaseAgent):
 
 Rules:
 1. Report exact values and dates
-2. Explain trends and implications
-3. Compare to historical averages when relevant
+2. Use the computed changes, averages and trends given; do not recompute them
+3. Explain trends and implications
 4. Note data limitations"""
     
     async def _retrieve(self, query: str, filters: Dict) -> List[RetrievedContext]:
-        if not self.fred:
-            return []
+        series = self._match_series(query)
+        series_ids = list(series)
         
-        contexts = []
-        query_lower = query.lower()
+        if self.refresher and series_ids:
+            # Series checked within the interval (failed attempts included) are not due
+            due = [s for s in series_ids if self.store.is_stale(s, settings.fred_refresh_seconds)]
+            missing = [s for s in due if self.store.last_date(s) is None]
+            stale = [s for s in due if s not in missing]
+            if filters.get("refresh"):
+                await self.refresher.refresh(missing + stale)
+            else:
+                # Nothing to answer from yet for missing series; stale ones answer now
+                if missing:
+                    await self.refresher.refresh(missing)
+                if stale:
+                    self.refresher.schedule(stale)
         
-        for keyword, series_id in FRED_SERIES.items():
-            if keyword in query_lower:
-                try:
-                    data = self.fred.get_series(series_id, observation_start="2020-01-01")
-                    latest = data.iloc[-1]
-                    prev = data.iloc[-2] if len(data) > 1 else latest
-                    
-                    text = f"Indicator: {series_id}\nLatest Value: {latest:.2f}\nPrevious: {prev:.2f}\nDate: {data.index[-1].strftime('%Y-%m-%d')}"
-                    
-                    contexts.append(RetrievedContext(
-                        source_id=f"FRED-{series_id}",
-                        text=text,
-                        relevance_score=0.9,
-                        metadata={"series_id": series_id}
-                    ))
-                except Exception:
-                    pass
+        contexts = []
+        for series_id in series_ids:
+            last_date = self.store.last_date(series_id)
+            if last_date is None:
+                continue
+            start = pd.Timestamp(last_date) - pd.DateOffset(years=settings.analytics_lookback_years)
+            history = analytics.to_series(self.store.get_series(series_id, start=f"{start:%Y-%m-%d}"), series_id)
+            summary = analytics.summarize(history, series_id)
+            if summary is None:
+                continue
+            
+            info, relevance = series[series_id]
+            
+            text = f"Indicator: {series_id}\n{summary.to_text()}"
+            if info is not None:
+                text = f"{text}\nTitle: {info.title}\nUnits: {info.units}\nFrequency: {info.frequency}"
+            
+            contexts.append(RetrievedContext(
+                source_id=f"FRED-{series_id}",
+                text=text,
+                relevance_score=relevance,
+                metadata={"series_id": series_id, "series": analytics.compact(history)}
+            ))
         
         return contexts
     
-    async def _generate(
-        self,
-        query: str,
-        contexts: List[RetrievedContext]
-    ) -> Tuple[str, List[Citation]]:
-        if not contexts:
-            return "No relevant economic data found. Try asking about GDP, unemployment, inflation, or interest rates.", []
-        
-        context_text = self._format_contexts(contexts)
-        
-        prompt = f"""Question: {query}
-
-Economic Data:
-{context_text}
-
-Analyze this data to answer the question."""
-
-        response = await self.model.generate(
-            prompt=prompt,
-            system_prompt=self.system_prompt,
-            temperature=0.3
-        )
-        
-        citations = [
-            Citation(
-                source_type="macro_data",
-                source_id=ctx.source_id,
-                text_excerpt=ctx.text[:300],
-                relevance_score=ctx.relevance_score
-            )
-            for ctx in contexts
-        ]
-        
-        return response.content, citations
+    def _match_series(self, query: str) -> Dict[str, Tuple[Optional[SeriesInfo], float]]:
+        """Keyword series first, then the catalog's best matches: series_id -> (info, relevance)."""
+        query_lower = query.lower()
+        series = {
+            series_id: (None, 0.9)
+            for keyword, series_id in FRED_SERIES.items()
+            if keyword in query_lower
+        }
+        try:
+            matches = self.catalog.search(query)
+        except Exception as e:
+            # Discovery is best-effort; keyword series still answer
+            self._logger.warning(f"FRED catalog search failed: {e}")
+            matches = []
+        for info, score in matches:
+            _, relevance = series.get(info.series_id, (None, min(max(score, 0.0), 1.0)))
+            series[info.series_id] = (info, relevance)
+        return series
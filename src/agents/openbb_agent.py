@@ -1,11 +1,47 @@
-from typing import List, Dict, Tuple
+import asyncio
+import time
+from types import SimpleNamespace
+from typing import List, Dict, Optional, Tuple
+import pandas as pd
 from openbb import obb
 from src.agents.base_agent import BaseAgent
-from src.guardrails.schemas import RetrievedContext, Citation
-from src.config.constants import AgentName
+from src.guardrails.schemas import AgentInput, RetrievedContext
+from src.config.constants import AgentName, NON_TICKERS, OPENBB_EARNINGS_ENDPOINTS
+from src.config.settings import settings
+from src.data import analytics, peers
+from src.data.fundamentals_store import FundamentalsStore, get_fundamentals_store
+from src.data.openbb_cache import OpenBBCache, get_openbb_cache
+from src.data.price_store import PriceRefresher, get_price_refresher
 from datetime import datetime, timedelta
 import re
 
+ANSWER_TEMPLATE = """Question: {question}
+
+Financial Data:
+{sources}
+
+Provide a comprehensive analysis answering the question. Include specific numbers and cite the data sources."""
+
+# Seconds the earnings calendar is not asked again after it fails
+CALENDAR_RETRY_SECONDS = 300
+
+LOOKBACK_PATTERN = re.compile(r"\b(\d+)[\s-]*(day|week|month|year)s?\b")
+# Words that make several named symbols a peer comparison
+COMPARISON_PATTERN = re.compile(r"\b(compar\w*|vs\.?|versus|against|relative to|peers?)(?!\w)", re.IGNORECASE)
+
+# Figures kept in the fundamentals table, by endpoint, for peer comparisons
+FUNDAMENTAL_FIELDS = {
+    "income": ["revenue", "gross_profit", "operating_income", "net_income", "ebitda"],
+    "balance": ["total_assets", "total_debt", "total_equity", "cash_and_cash_equivalents"],
+    "cashflow": ["operating_cash_flow", "free_cash_flow", "capital_expenditure"],
+    "metrics": [
+        "pe_ratio", "price_to_sales_ratio", "price_to_book_ratio", "ev_to_ebitda", "peg_ratio",
+        "market_cap", "dividend_yield", "return_on_equity", "beta",
+    ],
+}
+# Prior-year income figures, for growth
+PRIOR_FIELDS = ["revenue", "net_income"]
+
 
 class OpenBBAgent(BaseAgent):
     """
@@ -22,8 +58,22 @@ class OpenBBAgent(BaseAgent):
     - Options data
     """
     
-    def __init__(self, **kwargs):
+    answer_template = ANSWER_TEMPLATE
+    citation_source_type = "financial_data"
+    no_context_response = "Unable to retrieve financial data. Please specify a valid ticker symbol (e.g., AAPL, MSFT, GOOGL)."
+    
+    def __init__(
+        self,
+        cache: Optional[OpenBBCache] = None,
+        prices: Optional[PriceRefresher] = None,
+        fundamentals: Optional[FundamentalsStore] = None,
+        **kwargs
+    ):
         super().__init__(name=AgentName.OPENBB, **kwargs)
+        self.cache = cache or get_openbb_cache()
+        self.prices = prices or get_price_refresher()
+        self.fundamentals = fundamentals or get_fundamentals_store()
+        self._calendar_down_until = 0.0
     
     @property
     def system_prompt(self) -> str:
@@ -48,7 +98,7 @@ Rules:
             intents.append('quote')
         
         # Historical prices
-        if any(w in query_lower for w in ['historical', 'history', 'chart', 'trend', 'performance', '52 week', 'ytd']):
+        if any(w in query_lower for w in ['historical', 'history', 'chart', 'trend', 'performance', '52 week', 'ytd', 'drawdown', 'volatility']):
             intents.append('historical')
         
         # Valuation
@@ -89,25 +139,161 @@ Rules:
         
         return intents
     
-    async def _retrieve(self, query: str, filters: Dict) -> List[RetrievedContext]:
-        ticker = filters.get("ticker", "").upper()
+    async def _fetch(self, endpoint: str, ticker: str, call, **params) -> List[SimpleNamespace]:
+        """Provider records through the response cache; fundamentals expire at the next earnings release."""
+        expires_by = self._earnings_expiry if endpoint in OPENBB_EARNINGS_ENDPOINTS else None
+        return await self.cache.fetch(endpoint, ticker, call, expires_by=expires_by, **params)
+    
+    async def _earnings_expiry(self, ticker: str) -> Optional[float]:
+        """
+        Start of the day after the ticker's next scheduled earnings release,
+        if known. A failing calendar is skipped for CALENDAR_RETRY_SECONDS.
+        """
+        if time.time() < self._calendar_down_until:
+            return None
+        today = datetime.now().date()
+        try:
+            rows = await self.cache.fetch(
+                "earnings_calendar", "", lambda _, **p: obb.equity.calendar.earnings(**p),
+                start_date=today.isoformat(),
+                end_date=(today + timedelta(days=settings.openbb_earnings_horizon_days)).isoformat()
+            )
+        except Exception:
+            self._calendar_down_until = time.time() + CALENDAR_RETRY_SECONDS
+            return None
+        dates = sorted(
+            str(getattr(r, "report_date", ""))[:10]
+            for r in rows
+            if getattr(r, "symbol", None) == ticker
+        )
+        upcoming = [d for d in dates if d >= today.isoformat()]
+        if not upcoming:
+            return None
+        return (datetime.fromisoformat(upcoming[0]) + timedelta(days=1)).timestamp()
+    
+    @staticmethod
+    def _lookback(query: str, last: pd.Timestamp) -> Tuple[pd.Timestamp, str]:
+        """Window start and label for the period a question asks about (default 1 year)."""
+        query_lower = query.lower()
+        if 'ytd' in query_lower or 'year to date' in query_lower:
+            return pd.Timestamp(last.year, 1, 1), "Year-to-Date"
+        match = LOOKBACK_PATTERN.search(query_lower)
+        if match:
+            count, unit = int(match.group(1)), match.group(2)
+            return last - pd.DateOffset(**{f"{unit}s": count}), f"{count} {unit.title()}{'s' if count > 1 else ''}"
+        return last - pd.DateOffset(years=1), "1 Year"
+    
+    @staticmethod
+    def _frame(rows: List[SimpleNamespace]) -> pd.DataFrame:
+        records = [vars(r) for r in rows]
+        if len(records) == 1 and any(isinstance(v, list) for v in records[0].values()):
+            # Columnar result (e.g. options chains)
+            return pd.DataFrame(records[0])
+        return pd.DataFrame(records)
+    
+    @staticmethod
+    def _ticker(query: str, filters: Dict) -> Optional[str]:
+        ticker = (filters.get("ticker") or "").upper()
         if not ticker:
             # Try to extract ticker from query
             ticker_match = re.search(r'\b([A-Z]{1,5})\b', query.upper())
             if ticker_match:
                 ticker = ticker_match.group(1)
-            else:
-                return []
+        return ticker or None
+    
+    async def _tickers(self, query: str, filters: Dict) -> List[str]:
+        """
+        Tickers a question is about. Several only for a comparison: a
+        `tickers` filter (e.g. from the planner), or an explicit cue
+        ("compare", "vs", ...) naming upper-case symbols the quote provider
+        recognizes. Otherwise one ticker: the filter, the first symbol
+        named, or `_ticker`'s guess.
+        """
+        if filters.get("tickers"):
+            return list(dict.fromkeys(t.upper() for t in filters["tickers"]))[:settings.peer_max_tickers]
+        if filters.get("ticker"):
+            return [filters["ticker"].upper()]
+        named = list(dict.fromkeys(
+            t for t in re.findall(r'\b([A-Z]{1,5})\b', query) if t not in NON_TICKERS
+        ))
+        if len(named) > 1 and COMPARISON_PATTERN.search(query):
+            candidates = named
+            if settings.openbb_cache_enabled:
+                # Drops capitalised words that aren't symbols (R&D, USD, CAGR)
+                quotes = await self.cache.fetch_many("quote", named, obb.equity.price.quote)
+                candidates = [t for t in named if t in quotes]
+            if len(candidates) > 1:
+                return candidates[:settings.peer_max_tickers]
+        if named:
+            return named[:1]
+        ticker = self._ticker(query, filters)
+        return [ticker] if ticker else []
+    
+    def _record(self, endpoint: str, ticker: str, rows: List[SimpleNamespace]):
+        """Keep the numeric figures of a fundamentals response in the local table."""
+        values = {field: getattr(rows[0], field, None) for field in FUNDAMENTAL_FIELDS[endpoint]}
+        if endpoint == "income" and len(rows) > 1:
+            values.update({f"{field}_prior": getattr(rows[1], field, None) for field in PRIOR_FIELDS})
+        values = {
+            field: value for field, value in values.items()
+            if isinstance(value, (int, float)) and not isinstance(value, bool) and value == value
+        }
+        if values:
+            self.fundamentals.upsert(ticker, values)
+    
+    async def prefetch(self, inputs: List[AgentInput]):
+        """
+        Load the quotes, metrics and price history several inputs need with
+        one provider call per endpoint for all their tickers; `_retrieve`
+        then answers each input from the cache and price store.
+        """
+        batch_calls = {
+            "quote": obb.equity.price.quote,
+            "metrics": obb.equity.fundamental.metrics,
+        }
+        tickers: Dict[str, List[str]] = {}
+        for input in inputs:
+            ticker = self._ticker(input.query, input.filters)
+            if ticker:
+                for intent in self._detect_query_intent(input.query):
+                    tickers.setdefault(intent, []).append(ticker)
+        
+        jobs = []
+        for endpoint, call in batch_calls.items():
+            symbols = list(dict.fromkeys(tickers.get(endpoint, [])))
+            if len(symbols) < 2:
+                continue
+            expires_by = self._earnings_expiry if endpoint in OPENBB_EARNINGS_ENDPOINTS else None
+            jobs.append(self.cache.fetch_many(endpoint, symbols, call, expires_by=expires_by))
+        if len(set(tickers.get("historical", []))) > 1:
+            jobs.append(self.prices.refresh(tickers["historical"]))
+        await asyncio.gather(*jobs)
+    
+    async def _retrieve(self, query: str, filters: Dict) -> List[RetrievedContext]:
+        tickers = await self._tickers(query, filters)
+        if len(tickers) < 2:
+            return await self._retrieve_ticker(query, tickers[0]) if tickers else []
         
+        # Comparison: one batched provider call per endpoint, then one
+        # pass over the fundamentals table for all tickers
+        await self.prefetch([AgentInput(query=query, filters={"ticker": t}) for t in tickers])
+        per_ticker = await asyncio.gather(*(self._retrieve_ticker(query, t) for t in tickers))
+        contexts = [ctx for contexts in per_ticker for ctx in contexts]
+        comparison = peers.peer_context(self.fundamentals, tickers)
+        if comparison is not None:
+            contexts.insert(0, comparison)
+        return contexts
+    
+    async def _retrieve_ticker(self, query: str, ticker: str) -> List[RetrievedContext]:
         intents = self._detect_query_intent(query)
         contexts = []
         
         # === STOCK QUOTE ===
         if 'quote' in intents:
             try:
-                quote = obb.equity.price.quote(ticker)
-                if quote.results:
-                    q = quote.results[0]
+                rows = await self._fetch("quote", ticker, obb.equity.price.quote)
+                if rows:
+                    q = rows[0]
                     text_parts = [f"=== {ticker} Stock Quote ==="]
                     
                     price = getattr(q, 'last_price', None) or getattr(q, 'price', None) or getattr(q, 'close', None)
@@ -141,43 +327,51 @@ Rules:
         # === HISTORICAL PRICES ===
         if 'historical' in intents:
             try:
-                end_date = datetime.now()
-                start_date = end_date - timedelta(days=365)
-                hist = obb.equity.price.historical(ticker, start_date=start_date.strftime("%Y-%m-%d"))
-                if hist.results and len(hist.results) > 0:
-                    df = hist.to_dataframe()
-                    if not df.empty:
-                        latest = df.iloc[-1]
-                        earliest = df.iloc[0]
-                        ytd_return = ((latest['close'] - earliest['close']) / earliest['close']) * 100
-                        
-                        # Calculate high/low
-                        period_high = df['high'].max()
-                        period_low = df['low'].min()
-                        avg_volume = df['volume'].mean()
-                        
-                        text = f"""=== {ticker} Historical Performance (1 Year) ===
-Current: ${latest['close']:,.2f}
-1-Year Return: {ytd_return:+.2f}%
-Period High: ${period_high:,.2f}
-Period Low: ${period_low:,.2f}
-Avg Daily Volume: {avg_volume:,.0f}"""
-                        
-                        contexts.append(RetrievedContext(
-                            source_id=f"openbb-historical-{ticker}",
-                            text=text,
-                            relevance_score=0.85,
-                            metadata={"type": "historical", "ticker": ticker}
-                        ))
+                # Bars come from the local store; only days it lacks are fetched
+                await self.prices.refresh([ticker])
+                history = self.prices.store.history(ticker)
+                if not history.empty:
+                    start, label = self._lookback(query, history.index[-1])
+                    summary = self.prices.store.summary([ticker], start.date()).loc[ticker]
+                    closes = history['close']
+                    window = closes[closes.index >= start]
+                    latest = summary['close']
+                    
+                    text = f"""=== {ticker} Historical Performance ({label}) ===
+Current: ${latest:,.2f}
+{label} Return: {summary['return_pct']:+.2f}% (since {summary['start']:%Y-%m-%d})
+Period High: ${summary['high']:,.2f}
+Period Low: ${summary['low']:,.2f}
+Avg Daily Volume: {summary['avg_volume']:,.0f}"""
+                    
+                    for days in (50, 200):
+                        average = analytics.rolling_mean(closes, days)
+                        if average is not None:
+                            text += f"\n{days}-Day Average: ${average:,.2f} (price {(latest / average - 1) * 100:+.1f}% vs average)"
+                    vol = analytics.volatility(window, 252)
+                    if vol is not None:
+                        text += f"\nAnnualized Volatility: {vol:.1f}%"
+                    drawdown = analytics.max_drawdown(window)
+                    if drawdown is not None and drawdown[0] < 0:
+                        depth, peak, trough = drawdown
+                        text += f"\nMax Drawdown: {depth:.1f}% ({peak:%Y-%m-%d} to {trough:%Y-%m-%d})"
+                    
+                    recent = closes[closes.index >= history.index[-1] - pd.DateOffset(years=settings.analytics_lookback_years)]
+                    contexts.append(RetrievedContext(
+                        source_id=f"openbb-historical-{ticker}",
+                        text=text,
+                        relevance_score=0.85,
+                        metadata={"type": "historical", "ticker": ticker, "series": analytics.compact(recent)}
+                    ))
             except Exception as e:
                 pass
         
         # === KEY METRICS ===
         if 'metrics' in intents:
             try:
-                metrics = obb.equity.fundamental.metrics(ticker)
-                if metrics.results:
-                    m = metrics.results[0]
+                rows = await self._fetch("metrics", ticker, obb.equity.fundamental.metrics)
+                if rows:
+                    m = rows[0]
                     text_parts = [f"=== {ticker} Valuation Metrics ==="]
                     
                     for attr, label in [
@@ -206,15 +400,16 @@ Avg Daily Volume: {avg_volume:,.0f}"""
                         relevance_score=0.9,
                         metadata={"type": "metrics", "ticker": ticker}
                     ))
+                    self._record("metrics", ticker, rows)
             except Exception as e:
                 pass
         
         # === INCOME STATEMENT ===
         if 'income' in intents:
             try:
-                income = obb.equity.fundamental.income(ticker, period="annual", limit=2)
-                if income.results:
-                    latest = income.results[0]
+                rows = await self._fetch("income", ticker, obb.equity.fundamental.income, period="annual", limit=2)
+                if rows:
+                    latest = rows[0]
                     text_parts = [f"=== {ticker} Income Statement ==="]
                     
                     for attr, label in [
@@ -248,15 +443,16 @@ Avg Daily Volume: {avg_volume:,.0f}"""
                         relevance_score=0.88,
                         metadata={"type": "income", "ticker": ticker}
                     ))
+                    self._record("income", ticker, rows)
             except Exception as e:
                 pass
         
         # === BALANCE SHEET ===
         if 'balance' in intents:
             try:
-                balance = obb.equity.fundamental.balance(ticker, period="annual", limit=1)
-                if balance.results:
-                    b = balance.results[0]
+                rows = await self._fetch("balance", ticker, obb.equity.fundamental.balance, period="annual", limit=1)
+                if rows:
+                    b = rows[0]
                     text_parts = [f"=== {ticker} Balance Sheet ==="]
                     
                     for attr, label in [
@@ -282,15 +478,16 @@ Avg Daily Volume: {avg_volume:,.0f}"""
                         relevance_score=0.85,
                         metadata={"type": "balance", "ticker": ticker}
                     ))
+                    self._record("balance", ticker, rows)
             except Exception as e:
                 pass
         
         # === CASH FLOW ===
         if 'cashflow' in intents:
             try:
-                cashflow = obb.equity.fundamental.cash(ticker, period="annual", limit=1)
-                if cashflow.results:
-                    cf = cashflow.results[0]
+                rows = await self._fetch("cashflow", ticker, obb.equity.fundamental.cash, period="annual", limit=1)
+                if rows:
+                    cf = rows[0]
                     text_parts = [f"=== {ticker} Cash Flow Statement ==="]
                     
                     for attr, label in [
@@ -312,6 +509,7 @@ Avg Daily Volume: {avg_volume:,.0f}"""
                         relevance_score=0.85,
                         metadata={"type": "cashflow", "ticker": ticker}
                     ))
+                    self._record("cashflow", ticker, rows)
             except Exception as e:
                 pass
         
@@ -319,9 +517,9 @@ Avg Daily Volume: {avg_volume:,.0f}"""
         if 'estimates' in intents:
             try:
                 # Price targets
-                targets = obb.equity.estimates.price_target(ticker)
-                if targets.results:
-                    t = targets.results[0]
+                rows = await self._fetch("price_target", ticker, obb.equity.estimates.price_target)
+                if rows:
+                    t = rows[0]
                     text_parts = [f"=== {ticker} Analyst Estimates ==="]
                     
                     for attr, label in [
@@ -347,9 +545,9 @@ Avg Daily Volume: {avg_volume:,.0f}"""
             
             try:
                 # EPS estimates
-                consensus = obb.equity.estimates.consensus(ticker)
-                if consensus.results:
-                    c = consensus.results[0]
+                rows = await self._fetch("consensus", ticker, obb.equity.estimates.consensus)
+                if rows:
+                    c = rows[0]
                     text_parts = [f"=== {ticker} Consensus Estimates ==="]
                     for attr, label in [
                         ('estimated_eps_avg', 'Est. EPS (Avg)'),
@@ -381,10 +579,10 @@ Avg Daily Volume: {avg_volume:,.0f}"""
         if 'ownership' in intents:
             try:
                 # Insider trading
-                insider = obb.equity.ownership.insider_trading(ticker, limit=10)
-                if insider.results:
+                rows = await self._fetch("insider_trading", ticker, obb.equity.ownership.insider_trading, limit=10)
+                if rows:
                     text_parts = [f"=== {ticker} Recent Insider Trading ==="]
-                    for i, trade in enumerate(insider.results[:5]):
+                    for i, trade in enumerate(rows[:5]):
                         name = getattr(trade, 'owner_name', 'Unknown')
                         trans_type = getattr(trade, 'transaction_type', 'N/A')
                         shares = getattr(trade, 'shares', 0)
@@ -402,10 +600,10 @@ Avg Daily Volume: {avg_volume:,.0f}"""
             
             try:
                 # Institutional ownership
-                inst = obb.equity.ownership.institutional(ticker)
-                if inst.results:
+                rows = await self._fetch("institutional", ticker, obb.equity.ownership.institutional)
+                if rows:
                     text_parts = [f"=== {ticker} Top Institutional Holders ==="]
-                    for holder in inst.results[:5]:
+                    for holder in rows[:5]:
                         name = getattr(holder, 'investor_name', 'Unknown')
                         shares = getattr(holder, 'shares', 0)
                         pct = getattr(holder, 'percent_of_total', 0)
@@ -423,10 +621,10 @@ Avg Daily Volume: {avg_volume:,.0f}"""
         # === DIVIDENDS ===
         if 'dividends' in intents:
             try:
-                divs = obb.equity.fundamental.dividends(ticker)
-                if divs.results:
+                rows = await self._fetch("dividends", ticker, obb.equity.fundamental.dividends)
+                if rows:
                     text_parts = [f"=== {ticker} Dividend History ==="]
-                    recent = divs.results[:4]  # Last 4 dividends
+                    recent = rows[:4]  # Last 4 dividends
                     for d in recent:
                         ex_date = getattr(d, 'ex_dividend_date', 'N/A')
                         amount = getattr(d, 'amount', 0)
@@ -444,10 +642,10 @@ Avg Daily Volume: {avg_volume:,.0f}"""
         # === NEWS ===
         if 'news' in intents:
             try:
-                news = obb.news.company(symbol=ticker, limit=5)
-                if news.results:
+                rows = await self._fetch("news", ticker, lambda symbol, **p: obb.news.company(symbol=symbol, **p), limit=5)
+                if rows:
                     text_parts = [f"=== {ticker} Recent News ==="]
-                    for article in news.results[:5]:
+                    for article in rows[:5]:
                         title = getattr(article, 'title', 'N/A')
                         date = getattr(article, 'date', 'N/A')
                         text_parts.append(f"• [{date}] {title}")
@@ -464,10 +662,10 @@ Avg Daily Volume: {avg_volume:,.0f}"""
         # === OPTIONS ===
         if 'options' in intents:
             try:
-                chains = obb.derivatives.options.chains(ticker)
-                if chains.results:
+                rows = await self._fetch("options", ticker, obb.derivatives.options.chains)
+                if rows:
                     # Get summary stats
-                    df = chains.to_dataframe()
+                    df = self._frame(rows)
                     if not df.empty:
                         calls = df[df['option_type'] == 'call'] if 'option_type' in df.columns else df
                         puts = df[df['option_type'] == 'put'] if 'option_type' in df.columns else df
@@ -487,38 +685,3 @@ Expirations: {df['expiration'].nunique() if 'expiration' in df.columns else 'N/A
                 pass
         
         return contexts
-    
-    async def _generate(
-        self,
-        query: str,
-        contexts: List[RetrievedContext]
-    ) -> Tuple[str, List[Citation]]:
-        if not contexts:
-            return "Unable to retrieve financial data. Please specify a valid ticker symbol (e.g., AAPL, MSFT, GOOGL).", []
-        
-        context_text = self._format_contexts(contexts)
-        
-        prompt = f"""Question: {query}
-
-Financial Data:
-{context_text}
-
-Provide a comprehensive analysis answering the question. Include specific numbers and cite the data sources."""
-
-        response = await self.model.generate(
-            prompt=prompt,
-            system_prompt=self.system_prompt,
-            temperature=0.3
-        )
-        
-        citations = [
-            Citation(
-                source_type="financial_data",
-                source_id=ctx.source_id,
-                text_excerpt=ctx.text[:300],
-                relevance_score=ctx.relevance_score
-            )
-            for ctx in contexts
-        ]
-        
-        return response.content, citations
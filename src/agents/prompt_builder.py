@@ -0,0 +1,186 @@
+"""Token-budgeted prompt assembly for agent prompts."""
+
+import re
+from dataclasses import dataclass
+from typing import Any, List, Optional
+
+from src.config.settings import settings
+from src.guardrails.schemas import RetrievedContext
+from src.models.base import BaseModelInterface, estimate_tokens
+from src.utils.logging import get_logger
+from src.utils.telemetry import get_tracer
+from opentelemetry import trace
+
+logger = get_logger(__name__)
+
+SOURCE_FORMAT = "[Source {index}] ({source_id}):\n{text}\n"
+NO_SOURCES = "No relevant context found."
+
+_SENTENCE_END = re.compile(r"[.!?\n]\s")
+
+
+@dataclass
+class AssembledPrompt:
+    """A prompt that fits the model budget and the sources it cites, in [Source N] order."""
+    prompt: str
+    contexts: List[RetrievedContext]
+    prompt_tokens: int
+    budget_tokens: int
+    dropped: int = 0
+    truncated: int = 0
+    duplicates: int = 0
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+class PromptBuilder:
+    """
+    Fits system prompt, question and retrieved sources into the model's window.
+    
+    The budget is min(context window - max output tokens, PROMPT_MAX_TOKENS).
+    Each part is tokenized once with the model's tokenizer; sources are
+    de-duplicated, taken best-first by relevance, and a source that does not
+    fit is cut at a sentence boundary (or dropped when less than
+    PROMPT_MIN_SOURCE_TOKENS would remain).
+    """
+    
+    def __init__(
+        self,
+        model: Any,
+        max_prompt_tokens: Optional[int] = None,
+        min_source_tokens: Optional[int] = None
+    ):
+        self.model = model
+        self.max_prompt_tokens = max_prompt_tokens or settings.prompt_max_tokens
+        self.min_source_tokens = (
+            settings.prompt_min_source_tokens if min_source_tokens is None else min_source_tokens
+        )
+    
+    def count_tokens(self, text: str) -> int:
+        if not text:
+            return 0
+        if isinstance(self.model, BaseModelInterface):
+            return self.model.count_tokens(text)
+        return estimate_tokens(text)
+    
+    def budget(self, max_tokens: int) -> int:
+        window = settings.llm_context_window or getattr(self.model, "context_window", 0)
+        if not isinstance(window, int) or window <= 0:
+            window = BaseModelInterface.context_window
+        return max(0, min(window - max_tokens, self.max_prompt_tokens))
+    
+    def _dedupe(self, contexts: List[RetrievedContext]) -> List[RetrievedContext]:
+        # Best-first so the copy that survives carries the highest score
+        ranked = sorted(contexts, key=lambda c: -c.relevance_score)
+        kept, keys = [], []
+        for ctx in ranked:
+            key = _normalize(ctx.text)
+            if not key or any(key in other for other in keys):
+                continue
+            kept.append(ctx)
+            keys.append(key)
+        return kept
+    
+    def _truncate(self, text: str, tokens: int, limit: int) -> Optional[str]:
+        """Cut `text` (of `tokens` tokens) to at most `limit` tokens, at a sentence end if one is near."""
+        chars = int(len(text) * limit / tokens)
+        while chars > 0:
+            cut = text[:chars]
+            boundary = None
+            for match in _SENTENCE_END.finditer(cut):
+                boundary = match.start() + 1
+            if boundary and boundary > chars * 0.8:
+                cut = cut[:boundary]
+            cut = cut.rstrip() + " ..."
+            if self.count_tokens(cut) <= limit:
+                return cut
+            chars = int(chars * 0.9)
+        return None
+    
+    def build(
+        self,
+        template: str,
+        question: str,
+        contexts: List[RetrievedContext],
+        system_prompt: Optional[str] = None,
+        max_tokens: int = 1024,
+        source_format: str = SOURCE_FORMAT,
+        preserve_order: bool = False
+    ) -> AssembledPrompt:
+        """
+        Render `template` ("{question}" and "{sources}" placeholders) within budget.
+        
+        `source_format` renders one source from index, source_id and text;
+        sources are numbered in the order of `AssembledPrompt.contexts`.
+        With `preserve_order`, `contexts` is taken as an already numbered
+        list: no re-ranking or de-duplication, and each source keeps its
+        position as its number, so one that does not fit leaves a gap
+        instead of renumbering the rest.
+        """
+        tracer = get_tracer()
+        
+        with tracer.start_as_current_span(
+            "prompt.assemble",
+            kind=trace.SpanKind.INTERNAL
+        ) as span:
+            budget = self.budget(max_tokens)
+            system_tokens = self.count_tokens(system_prompt or "")
+            question_tokens = self.count_tokens(question)
+            frame_tokens = self.count_tokens(template.format(question="", sources=""))
+            available = budget - system_tokens - question_tokens - frame_tokens
+            
+            candidates = list(contexts) if preserve_order else self._dedupe(contexts)
+            duplicates = len(contexts) - len(candidates)
+            
+            kept, parts, used, truncated = [], [], 0, 0
+            for position, ctx in enumerate(candidates, 1):
+                index = position if preserve_order else len(kept) + 1
+                header = source_format.format(index=index, source_id=ctx.source_id, text="")
+                header_tokens = self.count_tokens(header)
+                text_tokens = self.count_tokens(ctx.text)
+                remaining = available - used - header_tokens
+                text = ctx.text
+                if text_tokens > remaining:
+                    if remaining < self.min_source_tokens:
+                        continue
+                    text = self._truncate(ctx.text, text_tokens, remaining)
+                    if text is None:
+                        continue
+                    text_tokens = self.count_tokens(text)
+                    truncated += 1
+                    ctx = ctx.model_copy(update={"text": text})
+                kept.append(ctx)
+                parts.append(source_format.format(index=index, source_id=ctx.source_id, text=text))
+                used += header_tokens + text_tokens
+            
+            dropped = len(candidates) - len(kept)
+            if dropped:
+                logger.info(f"Prompt budget {budget} tokens: dropped {dropped} of {len(candidates)} sources")
+            
+            sources = "\n".join(parts) if parts else NO_SOURCES
+            prompt = template.format(question=question, sources=sources)
+            prompt_tokens = system_tokens + question_tokens + frame_tokens + (
+                used if parts else self.count_tokens(NO_SOURCES)
+            )
+            
+            span.set_attribute("prompt.budget_tokens", budget)
+            span.set_attribute("prompt.token_count", prompt_tokens)
+            span.set_attribute("prompt.system_tokens", system_tokens)
+            span.set_attribute("prompt.question_tokens", question_tokens)
+            span.set_attribute("prompt.source_tokens", used)
+            span.set_attribute("prompt.sources_kept", len(kept))
+            span.set_attribute("prompt.sources_dropped", dropped)
+            span.set_attribute("prompt.sources_truncated", truncated)
+            span.set_attribute("prompt.sources_duplicate", duplicates)
+            
+            return AssembledPrompt(
+                prompt=prompt,
+                contexts=kept,
+                prompt_tokens=prompt_tokens,
+                budget_tokens=budget,
+                dropped=dropped,
+                truncated=truncated,
+                duplicates=duplicates
+            )
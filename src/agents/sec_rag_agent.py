@@ -2,14 +2,25 @@ import re
 import asyncio
 from typing import List, Dict, Tuple
 from src.agents.base_agent import BaseAgent
+from src.agents.prompt_builder import AssembledPrompt
 from src.data.sec_loader import SECLoader
 from src.data.vector_store import get_vector_store
 from src.guardrails.schemas import RetrievedContext, Citation
-from src.config.constants import AgentName, RERANK_TOP_K
+from src.config.settings import settings
+from src.config.constants import (
+    AgentName, SMALL_CHUNK_TOP_K, CONTEXT_TOKEN_BUDGET, CONTEXT_WINDOW_RADIUS
+)
 from src.utils.logging import get_logger
 
+NUMBER_WORDS = {
+    "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6,
+    "seven": 7, "eight": 8, "nine": 9, "ten": 10, "eleven": 11, "twelve": 12,
+}
+
 
 class SECRAGAgent(BaseAgent):
+    no_context_response = "No relevant SEC filing information found."
+    
     def __init__(self, **kwargs):
         super().__init__(name=AgentName.SEC_RAG, **kwargs)
         self.vector_store = get_vector_store(use_http=False)
@@ -37,21 +48,50 @@ Rules:
             if extracted:
                 search_filters["ticker"] = extracted
         
+        scope = self._extract_filing_scope(query) if search_filters.get("ticker") else {}
+        mmr = self._mmr_options(filters)
+        if scope.get("filing_type"):
+            search_filters["filing_type"] = scope.pop("filing_type")
+        
         results = self.vector_store.search(
             query=query,
-            top_k=RERANK_TOP_K,
-            filters=search_filters if search_filters else None
+            top_k=SMALL_CHUNK_TOP_K,
+            filters=search_filters if search_filters else None,
+            hydrate=False,
+            **scope,
+            **mmr
         )
-
+        
         if not results and search_filters.get("ticker"):
             ticker = str(search_filters["ticker"]).upper().strip()
             await self._ingest_on_demand(ticker)
             results = self.vector_store.search(
                 query=query,
-                top_k=RERANK_TOP_K,
-                filters=search_filters
+                top_k=SMALL_CHUNK_TOP_K,
+                filters=search_filters,
+                hydrate=False,
+                **scope,
+                **mmr
             )
         
+        if not results and scope:
+            # Filings in scope may predate the filing index; drop the latest-N
+            # limit but keep the requested form (e.g. 10-Q for "last 4 quarters")
+            results = self.vector_store.search(
+                query=query,
+                top_k=SMALL_CHUNK_TOP_K,
+                filters=search_filters,
+                hydrate=False,
+                **mmr
+            )
+        
+        # Small-chunk hits become merged neighbor windows under the prompt budget
+        results = self.vector_store.expand_windows(
+            results,
+            token_budget=CONTEXT_TOKEN_BUDGET,
+            radius=CONTEXT_WINDOW_RADIUS
+        )
+        
         return [
             RetrievedContext(
                 source_id=chunk.document_id,
@@ -61,7 +101,7 @@ Rules:
             )
             for chunk, score in results
         ]
-
+    
     def _extract_ticker_from_query(self, query: str) -> str | None:
         match = re.search(r"\(([A-Z]{1,5})\)", query.upper())
         if match:
@@ -70,7 +110,41 @@ Rules:
         if match:
             return match.group(1)
         return None
-
+    
+    def _mmr_options(self, filters: Dict) -> Dict:
+        """MMR re-ranking keeps one dominant section from filling every slot."""
+        if not filters.get("mmr", settings.retrieval_mmr):
+            return {}
+        return {
+            "mmr": True,
+            "fetch_k": filters.get("mmr_fetch_k", settings.retrieval_mmr_fetch_k),
+            "mmr_lambda": filters.get("mmr_lambda", settings.retrieval_mmr_lambda),
+        }
+    
+    def _extract_filing_scope(self, query: str) -> Dict:
+        """
+        Map recency phrases to a filing scope, e.g. "last 4 quarters" ->
+        latest 4 10-Qs, "latest 10-K" -> latest 1 10-K.
+        """
+        q = query.lower()
+        count = r"(\d+|" + "|".join(NUMBER_WORDS) + r")"
+        
+        match = re.search(rf"\b(?:last|past|previous|latest|recent) {count} (quarters?|years?|10-?qs?|10-?ks?)\b", q)
+        if match:
+            n = match.group(1)
+            n = int(n) if n.isdigit() else NUMBER_WORDS[n]
+            form = "10-Q" if match.group(2).startswith(("quarter", "10q", "10-q")) else "10-K"
+            return {"latest_n": n, "filing_type": form}
+        
+        if re.search(r"\b(latest|most recent|last|current|recent)\b", q):
+            if re.search(r"\b(10-?k|annual)\b", q):
+                return {"latest_n": 1, "filing_type": "10-K"}
+            if re.search(r"\b(10-?q|quarter|quarterly)\b", q):
+                return {"latest_n": 1, "filing_type": "10-Q"}
+            if re.search(r"\b(filing|report)\b", q):
+                return {"latest_n": 1}
+        return {}
+    
     async def _ingest_on_demand(self, ticker: str, limit: int = 3) -> None:
         if not ticker or ticker in self._ingested_tickers:
             return
@@ -81,31 +155,9 @@ Rules:
         except Exception as exc:
             self._logger.error(f"On-demand SEC ingestion failed for {ticker}: {exc}")
     
-    async def _generate(
-        self,
-        query: str,
-        contexts: List[RetrievedContext]
-    ) -> Tuple[str, List[Citation]]:
-        if not contexts:
-            return "No relevant SEC filing information found.", []
-        
-        context_text = self._format_contexts(contexts)
-        
-        prompt = f"""Question: {query}
-
-Sources:
-{context_text}
-
-Answer the question using only the sources above. Cite using [Source N]."""
-
-        response = await self.model.generate(
-            prompt=prompt,
-            system_prompt=self.system_prompt,
-            temperature=0.3
-        )
-        
-        citations = self._extract_citations(response.content, contexts)
-        return response.content, citations
+    def _parse_response(self, content: str, assembled: AssembledPrompt) -> Tuple[str, List[Citation]]:
+        # [Source N] refers to the sources as kept and numbered in the prompt
+        return content, self._extract_citations(content, assembled.contexts)
     
     def _extract_citations(
         self,
@@ -1,14 +1,31 @@
-from typing import List, Dict, Tuple
+from typing import List, Dict, Optional
 from src.agents.base_agent import BaseAgent
-from src.guardrails.schemas import RetrievedContext, Citation, AgentOutput
+from src.guardrails.schemas import RetrievedContext, AgentOutput
 from src.config.constants import AgentName
+from src.data import analytics, peers
+from src.data.fundamentals_store import FundamentalsStore, get_fundamentals_store
+
+SOURCE_TYPES = {"sec_filing", "financial_data", "macro_data"}
+
+SYNTHESIS_TEMPLATE = """Question: {question}
+
+Available Data:
+{sources}
+
+Synthesize this information into a comprehensive analysis. Cite sources."""
 
 
 class SynthesisAgent(BaseAgent):
     """Agent that synthesizes information from multiple sources."""
     
-    def __init__(self, **kwargs):
+    answer_template = SYNTHESIS_TEMPLATE
+    
+    temperature = 0.4
+    no_context_response = "No data available for synthesis."
+    
+    def __init__(self, fundamentals: Optional[FundamentalsStore] = None, **kwargs):
         super().__init__(name=AgentName.SYNTHESIS, **kwargs)
+        self.fundamentals = fundamentals or get_fundamentals_store()
     
     @property
     def system_prompt(self) -> str:
@@ -17,48 +34,56 @@ class SynthesisAgent(BaseAgent):
 Rules:
 1. Integrate SEC filing data, financial metrics, and macro indicators
 2. Identify correlations and connections between data points
-3. Cite all sources using [Source N] format
-4. Highlight areas of uncertainty
-5. Provide actionable insights"""
+3. Use the computed correlations and peer rankings given; do not infer them from the raw figures
+4. Cite all sources using [Source N] format
+5. Highlight areas of uncertainty
+6. Provide actionable insights"""
     
     async def _retrieve(self, query: str, filters: Dict) -> List[RetrievedContext]:
         # Synthesis agent receives contexts from other agents
         return []
     
-    async def _generate(
-        self,
-        query: str,
-        contexts: List[RetrievedContext]
-    ) -> Tuple[str, List[Citation]]:
-        if not contexts:
-            return "No data available for synthesis.", []
-        
-        context_text = self._format_contexts(contexts)
-        
-        prompt = f"""Question: {query}
-
-Available Data:
-{context_text}
-
-Synthesize this information into a comprehensive analysis. Cite sources."""
-
-        response = await self.model.generate(
-            prompt=prompt,
-            system_prompt=self.system_prompt,
-            temperature=0.4
+    @staticmethod
+    def _source_type(ctx: RetrievedContext) -> str:
+        source_type = ctx.metadata.get("type")
+        if source_type in SOURCE_TYPES:
+            return source_type
+        if "series_id" in ctx.metadata:
+            return "macro_data"
+        if "ticker" in ctx.metadata:
+            return "financial_data"
+        return "sec_filing"
+    
+    def _correlation_context(self, contexts: List[RetrievedContext]) -> Optional[RetrievedContext]:
+        """Correlations across the series (FRED indicators, price histories) the agents returned."""
+        series = {}
+        for ctx in contexts:
+            data = ctx.metadata.get("series")
+            if data:
+                name = ctx.metadata.get("series_id") or ctx.metadata.get("ticker") or ctx.source_id
+                series[name] = analytics.from_compact(data, name)
+        if len(series) < 2:
+            return None
+        text = analytics.correlation_text(series)
+        if text is None:
+            return None
+        return RetrievedContext(
+            source_id="computed-correlations",
+            text=text,
+            relevance_score=0.9,
+            metadata={"type": "financial_data", "series_names": list(series)}
         )
-        
-        citations = [
-            Citation(
-                source_type=ctx.metadata.get("type", "sec_filing"),
-                source_id=ctx.source_id,
-                text_excerpt=ctx.text[:300],
-                relevance_score=ctx.relevance_score
-            )
-            for ctx in contexts
-        ]
-        
-        return response.content, citations
+    
+    def _peer_context(self, contexts: List[RetrievedContext]) -> Optional[RetrievedContext]:
+        """Peer table across the companies the agents returned data for (e.g. one subtask per ticker)."""
+        if any(ctx.source_id == peers.PEER_SOURCE_ID for ctx in contexts):
+            return None
+        tickers = list(dict.fromkeys(
+            ctx.metadata["ticker"].upper() for ctx in contexts if ctx.metadata.get("ticker")
+        ))
+        if len(tickers) < 2:
+            return None
+        return peers.peer_context(self.fundamentals, tickers)
     
     async def synthesize(
         self,
@@ -74,7 +99,14 @@ Synthesize this information into a comprehensive analysis. Cite sources."""
         for output in agent_outputs:
             all_contexts.extend(output.retrieved_contexts)
         
-        response_text, citations = await self._generate(query, all_contexts)
+        correlation = self._correlation_context(all_contexts)
+        if correlation is not None:
+            all_contexts.insert(0, correlation)
+        comparison = self._peer_context(all_contexts)
+        if comparison is not None:
+            all_contexts.insert(0, comparison)
+        
+        response_text, citations, prompt_contexts = await self._generate(query, all_contexts)
         
         # Calculate combined confidence
         if agent_outputs:
@@ -87,6 +119,7 @@ Synthesize this information into a comprehensive analysis. Cite sources."""
             response_text=response_text,
             citations=citations,
             retrieved_contexts=all_contexts,
+            prompt_contexts=prompt_contexts,
             confidence_score=avg_confidence,
             processing_time_ms=int((time.time() - start) * 1000)
         )
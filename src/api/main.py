@@ -1,16 +1,36 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
+from contextlib import asynccontextmanager
 from typing import Optional, List
 import uuid
 import time
 
+from src.config.settings import settings
 from src.orchestration.graph import get_graph
+from src.orchestration.prefetch import get_prefetch_scheduler
+from src.models.cache import get_completion_cache
+from src.models.router import get_model_router
+from src.models.openai_model import get_openai_pool
+from src.data.fred_store import get_fred_store
+from src.data.openbb_cache import get_openbb_cache
+from src.data.fundamentals_store import get_fundamentals_store
+from src.data.price_store import get_price_refresher
 from src.guardrails.schemas import FinalResponse, Citation
 from src.utils.telemetry import setup_telemetry, get_tracer
 from openinference.semconv.trace import SpanAttributes, OpenInferenceSpanKindValues
 
-app = FastAPI(title="AlphaEdge API", version="1.0.0")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    scheduler = get_prefetch_scheduler()
+    if settings.prefetch_enabled:
+        scheduler.start()
+    yield
+    await scheduler.stop()
+
+
+app = FastAPI(title="AlphaEdge API", version="1.0.0", lifespan=lifespan)
 
 # Setup OpenTelemetry with Phoenix
 setup_telemetry(app, service_name="alphaedge-api")
@@ -55,7 +75,17 @@ async def health():
 @app.get("/metrics")
 async def metrics():
     """Expose metrics for Prometheus scraping."""
-    return _metrics
+    return {
+        **_metrics,
+        "prefetch": get_prefetch_scheduler().get_stats(),
+        "llm_cache": get_completion_cache().get_stats(),
+        "model_routes": get_model_router().get_stats(),
+        "openai_pool": get_openai_pool().get_stats(),
+        "fred_store": get_fred_store().get_stats(),
+        "openbb_cache": get_openbb_cache().get_stats(),
+        "prices": get_price_refresher().get_stats(),
+        "fundamentals": get_fundamentals_store().get_stats(),
+    }
 
 
 @app.post("/query", response_model=QueryResponse)
@@ -88,6 +118,8 @@ async def query(request: QueryRequest):
             if request.ticker:
                 filters["ticker"] = request.ticker.upper()
             
+            get_prefetch_scheduler().record_query(filters.get("ticker"))
+            
             with tracer.start_as_current_span("api.graph_invoke") as graph_span:
                 graph_span.set_attribute(SpanAttributes.OPENINFERENCE_SPAN_KIND, OpenInferenceSpanKindValues.CHAIN.value)
                 result = await graph.ainvoke({
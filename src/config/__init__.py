@@ -4,6 +4,11 @@ from src.config.constants import (
     CHUNK_OVERLAP,
     TOP_K_RETRIEVAL,
     RERANK_TOP_K,
+    SMALL_CHUNK_SIZE,
+    SMALL_CHUNK_OVERLAP,
+    SMALL_CHUNK_TOP_K,
+    CONTEXT_WINDOW_RADIUS,
+    CONTEXT_TOKEN_BUDGET,
     AgentName,
     Intent,
     FRED_SERIES,
@@ -17,6 +22,11 @@ __all__ = [
     "CHUNK_OVERLAP",
     "TOP_K_RETRIEVAL",
     "RERANK_TOP_K",
+    "SMALL_CHUNK_SIZE",
+    "SMALL_CHUNK_OVERLAP",
+    "SMALL_CHUNK_TOP_K",
+    "CONTEXT_WINDOW_RADIUS",
+    "CONTEXT_TOKEN_BUDGET",
     "AgentName",
     "Intent",
     "FRED_SERIES",
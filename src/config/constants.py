@@ -4,6 +4,13 @@ CHUNK_OVERLAP = 50
 TOP_K_RETRIEVAL = 10
 RERANK_TOP_K = 5
 
+# Small-chunk retrieval: hits are expanded into merged neighbor windows
+SMALL_CHUNK_SIZE = 128
+SMALL_CHUNK_OVERLAP = 16
+SMALL_CHUNK_TOP_K = 12
+CONTEXT_WINDOW_RADIUS = 1
+CONTEXT_TOKEN_BUDGET = 2048
+
 # Agent Names
 class AgentName:
     SEC_RAG = "sec_rag_agent"
@@ -19,6 +26,13 @@ class Intent:
     MACRO = "macro"
     SYNTHESIS = "synthesis"
 
+# Uppercase words in queries that are not tickers
+NON_TICKERS = {
+    "A", "I", "US", "USA", "CEO", "CFO", "CTO", "AI", "ML", "IT", "GDP", "CPI", "PCE",
+    "PE", "EPS", "SEC", "FED", "FRED", "ETF", "IPO", "YOY", "QOQ", "Q", "K", "VS", "AND", "OR",
+    "P", "E", "S", "EV", "ROE", "ROA", "TTM", "FCF", "YTD", "EBIT",
+}
+
 # FRED Series
 FRED_SERIES = {
     "gdp": "GDP",
@@ -26,3 +40,58 @@ FRED_SERIES = {
     "inflation": "CPIAUCSL",
     "interest_rate": "FEDFUNDS",
 }
+
+# FRED catalog seed: (series_id, title, units, frequency, popularity)
+FRED_CORE_SERIES = [
+    ("GDP", "Gross Domestic Product", "Billions of Dollars", "Quarterly", 93),
+    ("GDPC1", "Real Gross Domestic Product", "Billions of Chained 2017 Dollars", "Quarterly", 91),
+    ("A191RL1Q225SBEA", "Real Gross Domestic Product growth rate", "Percent Change from Preceding Period", "Quarterly", 80),
+    ("UNRATE", "Unemployment Rate", "Percent", "Monthly", 96),
+    ("PAYEMS", "All Employees, Total Nonfarm payrolls", "Thousands of Persons", "Monthly", 88),
+    ("ICSA", "Initial Claims for unemployment insurance", "Number", "Weekly", 82),
+    ("CIVPART", "Labor Force Participation Rate", "Percent", "Monthly", 78),
+    ("CPIAUCSL", "Consumer Price Index for All Urban Consumers: All Items (inflation)", "Index 1982-1984=100", "Monthly", 95),
+    ("CPILFESL", "Consumer Price Index: All Items Less Food and Energy (core inflation)", "Index 1982-1984=100", "Monthly", 85),
+    ("PCEPI", "Personal Consumption Expenditures Price Index", "Index 2017=100", "Monthly", 82),
+    ("PCEPILFE", "Personal Consumption Expenditures Excluding Food and Energy (core PCE inflation)", "Index 2017=100", "Monthly", 80),
+    ("T10YIE", "10-Year Breakeven Inflation Rate", "Percent", "Daily", 77),
+    ("FEDFUNDS", "Federal Funds Effective Rate (interest rate)", "Percent", "Monthly", 94),
+    ("DFF", "Federal Funds Effective Rate", "Percent", "Daily", 84),
+    ("DGS10", "Market Yield on U.S. Treasury Securities at 10-Year Constant Maturity", "Percent", "Daily", 90),
+    ("DGS2", "Market Yield on U.S. Treasury Securities at 2-Year Constant Maturity", "Percent", "Daily", 83),
+    ("T10Y2Y", "10-Year Treasury Minus 2-Year Treasury yield curve spread", "Percent", "Daily", 86),
+    ("MORTGAGE30US", "30-Year Fixed Rate Mortgage Average", "Percent", "Weekly", 87),
+    ("BAMLH0A0HYM2", "ICE BofA US High Yield corporate bond option-adjusted spread", "Percent", "Daily", 79),
+    ("M2SL", "M2 money supply", "Billions of Dollars", "Monthly", 86),
+    ("WALCL", "Federal Reserve total assets (balance sheet)", "Millions of U.S. Dollars", "Weekly", 81),
+    ("RSAFS", "Advance Retail Sales: Retail Trade and Food Services", "Millions of Dollars", "Monthly", 79),
+    ("INDPRO", "Industrial Production: Total Index", "Index 2017=100", "Monthly", 80),
+    ("HOUST", "New Privately-Owned Housing Units Started (housing starts)", "Thousands of Units", "Monthly", 80),
+    ("CSUSHPINSA", "S&P CoreLogic Case-Shiller U.S. National Home Price Index", "Index Jan 2000=100", "Monthly", 84),
+    ("UMCSENT", "University of Michigan Consumer Sentiment", "Index 1966:Q1=100", "Monthly", 83),
+    ("PSAVERT", "Personal Saving Rate", "Percent", "Monthly", 78),
+    ("DCOILWTICO", "Crude Oil Prices: West Texas Intermediate (WTI)", "Dollars per Barrel", "Daily", 84),
+    ("DTWEXBGS", "Nominal Broad U.S. Dollar Index (exchange rate)", "Index Jan 2006=100", "Daily", 76),
+    ("VIXCLS", "CBOE Volatility Index: VIX", "Index", "Daily", 82),
+    ("USREC", "NBER based Recession Indicators for the United States", "+1 or 0", "Monthly", 75),
+]
+
+# OpenBB response cache: endpoint -> (fresh seconds, extra seconds stale data may be served)
+OPENBB_CACHE_POLICIES = {
+    "quote": (15, 300),
+    "metrics": (24 * 3600, 3 * 24 * 3600),
+    "income": (24 * 3600, 7 * 24 * 3600),
+    "balance": (24 * 3600, 7 * 24 * 3600),
+    "cashflow": (24 * 3600, 7 * 24 * 3600),
+    "price_target": (6 * 3600, 24 * 3600),
+    "consensus": (6 * 3600, 24 * 3600),
+    "insider_trading": (3600, 24 * 3600),
+    "institutional": (24 * 3600, 7 * 24 * 3600),
+    "dividends": (24 * 3600, 7 * 24 * 3600),
+    "news": (600, 3600),
+    "options": (300, 900),
+    "earnings_calendar": (24 * 3600, 3 * 24 * 3600),
+}
+OPENBB_CACHE_DEFAULT_POLICY = (300, 3600)
+# Endpoints whose entries expire at the ticker's next earnings release
+OPENBB_EARNINGS_ENDPOINTS = {"metrics", "income", "balance", "cashflow", "price_target", "consensus", "dividends"}
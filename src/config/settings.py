@@ -9,19 +9,104 @@ class Settings(BaseSettings):
     
     # LLM
     openai_api_key: Optional[SecretStr] = Field(default=None)
+    openai_base_url: Optional[str] = None  # Any OpenAI-compatible endpoint
     default_model: str = "gpt-4-turbo-preview"
     
+    # Shared OpenAI client pool
+    openai_max_concurrency: int = 16  # In-flight requests across all models
+    openai_timeout_seconds: float = 60.0  # Per-call deadline, retries included
+    openai_attempt_timeout_seconds: float = 30.0
+    openai_max_retries: int = 4  # On 429, 5xx and connection errors
+    openai_hedge: bool = False  # Duplicate requests still running after the p95
+    openai_hedge_min_samples: int = 20
+    
+    # Model routing: "<backend>:<model>" per tier (backend mlx or openai)
+    llm_small_model: str = "mlx:mlx-community/Qwen2.5-1.5B-Instruct-4bit"
+    llm_large_model: str = "mlx:mlx-community/Qwen2.5-3B-Instruct-4bit"
+    llm_routes: str = ""  # Per-task overrides, e.g. "critic=large,synthesis=openai:gpt-4o"
+    
+    # Completion cache
+    llm_cache_enabled: bool = True
+    llm_cache_max_temperature: float = 0.3  # Calls above this are cached only on opt-in
+    llm_cache_memory_size: int = 1024
+    llm_cache_ttl_seconds: int = 24 * 3600
+    llm_cache_path: str = "./data/llm_cache.db"
+    
+    # Prompt assembly
+    llm_context_window: int = 0  # 0 = backend default
+    prompt_max_tokens: int = 6000  # Cap on assembled prompts, below the window
+    prompt_min_source_tokens: int = 64  # Shorter truncated sources are dropped
+    
+    # Local inference worker
+    inference_max_pending: int = 32
+    mlx_batch_size: int = 8  # Sequences decoded together by generate_batch
+    
+    # Batched generation on remote backends
+    llm_batch_concurrency: int = 8
+    
     # Data Sources
     fred_api_key: Optional[SecretStr] = Field(default=None)
+    fred_store_path: str = "./data/fred.db"
+    fred_history_start: str = "2020-01-01"  # First load; later refreshes start at the last stored date
+    fred_refresh_seconds: int = 6 * 3600  # Older series are refreshed in the background
+    fred_requests_per_second: float = 2.0
+    fred_max_connections: int = 4
+    fred_catalog_top_k: int = 3  # Catalog series added to keyword matches per question
+    fred_catalog_min_similarity: float = 0.75  # Title similarity that qualifies a series without a lexical match
+    analytics_lookback_years: int = 3  # History behind computed series summaries and correlations
     sec_user_agent: str = "AlphaEdge research@example.com"
+    sec_requests_per_second: float = 10.0
+    sec_max_connections: int = 8
+    sec_cache_dir: str = "./data/edgar_cache"
+    
+    # OpenBB response cache
+    openbb_cache_enabled: bool = True
+    openbb_cache_memory_size: int = 2048
+    openbb_stale_wait_seconds: float = 0.5  # Revalidation budget before stale data is served
+    openbb_earnings_horizon_days: int = 120  # Earnings calendar window for fundamentals expiry
+    redis_url: Optional[str] = None  # Shared cache tier across processes when set (needs the redis extra)
+    
+    # Local price history
+    price_store_dir: str = "./data/prices"
+    price_history_years: int = 5  # First load per ticker; later refreshes append only new days
+    price_refresh_seconds: int = 3600  # Minimum interval between checks for new bars
+    fundamentals_store_path: str = "./data/fundamentals.db"
+    fundamentals_max_age_days: int = 120  # Older figures are left out of peer comparisons
+    peer_max_tickers: int = 10  # Tickers compared from one query
+    
+    # Filing Archive
+    filing_archive_dir: str = "./data/filings"
+    filing_archive_segment_bytes: int = 256 * 1024 * 1024
+    filing_archive_zstd_level: int = 10
     
     # Vector DB
+    vector_backend: Literal["chroma", "local"] = "chroma"
+    local_index_dir: str = "./data/local_index"
+    local_index_type: Literal["flat", "ivf"] = "flat"
+    local_index_nlist: int = 0  # 0 = 4 * sqrt(rows)
+    local_index_nprobe: int = 8
     chroma_host: str = "localhost"
     chroma_port: int = 8000
+    chroma_persist_dir: str = "./data/vectordb"
     collection_name: str = "alphaedge_sec"
+    docstore_path: str = "./data/docstore.db"
+    docstore_zstd_level: int = 3
     
     # Embeddings
     embedding_model: str = "BAAI/bge-base-en-v1.5"
+    embedding_backend: Literal["torch", "onnx"] = "torch"
+    embedding_onnx_dir: str = "./data/onnx"
+    embedding_onnx_quantize: bool = True
+    embedding_onnx_threads: int = 0  # 0 = ONNX Runtime default
+    embedding_pool_workers: int = 0  # >1 enables multi-process bulk embedding
+    embedding_pool_threads_per_worker: int = 0  # 0 = cores / workers
+    embedding_pool_min_texts: int = 256  # Smaller loads embed in-process
+    embedding_pool_shard_size: int = 128
+    
+    # Retrieval
+    retrieval_mmr: bool = False  # Opt in here, or per call with filters={"mmr": True}
+    retrieval_mmr_lambda: float = 0.7
+    retrieval_mmr_fetch_k: int = 50
     
     # Guardrails
     min_faithfulness_score: float = 0.8
@@ -30,6 +115,16 @@ class Settings(BaseSettings):
     # API
     api_host: str = "0.0.0.0"
     api_port: int = 8000
+    
+    # Prefetch
+    prefetch_enabled: bool = False
+    prefetch_watchlist: str = ""  # Comma-separated tickers
+    prefetch_interval_seconds: int = 900
+    prefetch_requests_per_minute: int = 30
+    prefetch_quiet_hours: Optional[str] = None  # Local hours "start-end", e.g. "22-6"
+    prefetch_history_size: int = 500
+    prefetch_history_top_n: int = 10
+    prefetch_sec_limit: int = 3
 
 
 @lru_cache
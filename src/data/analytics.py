@@ -0,0 +1,213 @@
+"""
+Vectorized time-series analytics for macro and market data.
+
+Agents hand the LLM computed summaries (changes, averages, volatility,
+drawdowns, correlations) instead of raw observations to reason over.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Observations per year by median spacing in days
+_FREQUENCIES = [(2, 252, "daily"), (8, 52, "weekly"), (45, 12, "monthly"), (120, 4, "quarterly")]
+_PERIODS = {"daily": "day", "weekly": "week", "monthly": "month", "quarterly": "quarter", "annual": "year"}
+# Correlations need this many overlapping periods to be reported
+MIN_OVERLAP = 8
+
+
+def to_series(observations: Iterable[Tuple[str, float]], name: str = "") -> pd.Series:
+    """(date, value) pairs as a float Series on a sorted DatetimeIndex."""
+    observations = list(observations)
+    if not observations:
+        return pd.Series(dtype=float, name=name)
+    dates, values = zip(*observations)
+    series = pd.Series(values, index=pd.to_datetime(list(dates)), dtype=float, name=name)
+    return series[~series.index.duplicated(keep="last")].sort_index().dropna()
+
+
+def frequency(series: pd.Series) -> Tuple[int, str]:
+    """(periods per year, label) inferred from the median observation spacing."""
+    if len(series) < 2:
+        return 1, "annual"
+    spacing = float(np.median(np.diff(series.index.values).astype("timedelta64[D]").astype(float)))
+    for max_days, periods, label in _FREQUENCIES:
+        if spacing <= max_days:
+            return periods, label
+    return 1, "annual"
+
+
+def change_over(series: pd.Series, offset: pd.DateOffset) -> Optional[float]:
+    """Percent change from the value as of (latest date - offset) to the latest value."""
+    if len(series) < 2:
+        return None
+    base_date = series.index[-1] - offset
+    if base_date < series.index[0]:
+        return None
+    base = series.asof(base_date)
+    if not base or np.isnan(base):
+        return None
+    return float((series.iloc[-1] / base - 1) * 100)
+
+
+def rolling_mean(series: pd.Series, window: int) -> Optional[float]:
+    """Mean of the last `window` observations."""
+    if len(series) < window:
+        return None
+    return float(series.iloc[-window:].mean())
+
+
+def volatility(series: pd.Series, periods_per_year: Optional[int] = None) -> Optional[float]:
+    """Annualized standard deviation of log returns, in percent."""
+    if len(series) < 3 or (series <= 0).any():
+        return None
+    periods_per_year = periods_per_year or frequency(series)[0]
+    returns = np.diff(np.log(series.to_numpy()))
+    return float(returns.std(ddof=1) * np.sqrt(periods_per_year) * 100)
+
+
+def max_drawdown(series: pd.Series) -> Optional[Tuple[float, pd.Timestamp, pd.Timestamp]]:
+    """(drawdown %, peak date, trough date) of the deepest peak-to-trough fall."""
+    if len(series) < 2:
+        return None
+    values = series.to_numpy()
+    peaks = np.maximum.accumulate(values)
+    drawdowns = np.where(peaks > 0, values / peaks - 1, 0.0)
+    trough = int(np.argmin(drawdowns))
+    peak = int(np.argmax(values[:trough + 1]))
+    return float(drawdowns[trough] * 100), series.index[peak], series.index[trough]
+
+
+def trend(series: pd.Series, window: int) -> Optional[str]:
+    """Direction of the least-squares slope over the last `window` observations."""
+    tail = series.iloc[-window:]
+    if len(tail) < 3:
+        return None
+    x = (tail.index - tail.index[0]).days.to_numpy(dtype=float)
+    slope = np.polyfit(x, tail.to_numpy(), 1)[0] * 365
+    scale = abs(float(tail.mean())) or 1.0
+    if abs(slope) / scale < 0.01:
+        return "flat"
+    return "rising" if slope > 0 else "falling"
+
+
+def align(series: Dict[str, pd.Series], freq: str = "ME") -> pd.DataFrame:
+    """
+    Resample every series to period-end values at `freq` and keep the dates
+    all share. Empty series are left out; with none left the frame is empty.
+    """
+    resampled = {name: s.resample(freq).last() for name, s in series.items() if len(s)}
+    if not resampled:
+        return pd.DataFrame(index=pd.DatetimeIndex([]))
+    return pd.concat(resampled, axis=1).dropna()
+
+
+def correlations(series: Dict[str, pd.Series], freq: str = "ME") -> List[Tuple[str, str, float, int]]:
+    """
+    Pairwise correlations of period-over-period percent changes on an
+    aligned `freq` index (levels of trending series correlate spuriously).
+    Returns (a, b, correlation, overlapping periods), strongest first.
+    """
+    changes = align(series, freq).pct_change().replace([np.inf, -np.inf], np.nan).dropna()
+    if len(changes) < MIN_OVERLAP or changes.shape[1] < 2:
+        return []
+    matrix = np.corrcoef(changes.to_numpy().T)
+    names = list(changes.columns)
+    pairs = [
+        (names[i], names[j], float(matrix[i, j]), len(changes))
+        for i in range(len(names))
+        for j in range(i + 1, len(names))
+        if not np.isnan(matrix[i, j])
+    ]
+    return sorted(pairs, key=lambda pair: -abs(pair[2]))
+
+
+@dataclass
+class SeriesSummary:
+    """Computed figures for one series."""
+    name: str
+    latest: float
+    latest_date: pd.Timestamp
+    previous: Optional[float]
+    frequency: str
+    change_1p: Optional[float]
+    change_yoy: Optional[float]
+    average_1y: Optional[float]
+    volatility: Optional[float]
+    drawdown: Optional[Tuple[float, pd.Timestamp, pd.Timestamp]]
+    trend: Optional[str]
+    
+    def to_text(self) -> str:
+        def pct(value: Optional[float]) -> str:
+            return "n/a" if value is None else f"{value:+.2f}%"
+        
+        lines = [
+            f"Latest Value: {self.latest:,.2f}",
+            f"Previous: {self.previous:,.2f}" if self.previous is not None else "Previous: n/a",
+            f"Date: {self.latest_date:%Y-%m-%d}",
+            f"Change vs previous {_PERIODS.get(self.frequency, 'period')}: {pct(self.change_1p)}",
+            f"Year-over-year: {pct(self.change_yoy)}",
+        ]
+        if self.average_1y is not None:
+            lines.append(f"1-year average: {self.average_1y:,.2f}")
+        if self.trend:
+            lines.append(f"1-year trend: {self.trend}")
+        if self.volatility is not None:
+            lines.append(f"Annualized volatility: {self.volatility:.1f}%")
+        if self.drawdown is not None and self.drawdown[0] < 0:
+            depth, peak, trough = self.drawdown
+            lines.append(f"Max drawdown: {depth:.1f}% ({peak:%Y-%m-%d} to {trough:%Y-%m-%d})")
+        return "\n".join(lines)
+
+
+def summarize(series: pd.Series, name: str = "", risk: bool = False) -> Optional[SeriesSummary]:
+    """
+    Summary of a series' latest value, changes, 1-year average and trend;
+    with `risk`, also volatility and max drawdown (for prices).
+    """
+    if series.empty:
+        return None
+    periods, label = frequency(series)
+    previous = float(series.iloc[-2]) if len(series) > 1 else None
+    change_1p = (float(series.iloc[-1]) / previous - 1) * 100 if previous else None
+    return SeriesSummary(
+        name=name or str(series.name or ""),
+        latest=float(series.iloc[-1]),
+        latest_date=series.index[-1],
+        previous=previous,
+        frequency=label,
+        change_1p=change_1p,
+        change_yoy=change_over(series, pd.DateOffset(years=1)),
+        average_1y=rolling_mean(series, periods),
+        volatility=volatility(series, periods) if risk else None,
+        drawdown=max_drawdown(series.iloc[-periods:]) if risk else None,
+        trend=trend(series, periods),
+    )
+
+
+def compact(series: pd.Series, freq: str = "ME") -> Dict[str, List]:
+    """Period-end values at `freq` as {"dates", "values"} for passing along in context metadata."""
+    resampled = series.resample(freq).last().dropna()
+    return {
+        "dates": [d.strftime("%Y-%m-%d") for d in resampled.index],
+        "values": [round(float(v), 6) for v in resampled.to_numpy()],
+    }
+
+
+def from_compact(data: Dict[str, List], name: str = "") -> pd.Series:
+    return to_series(zip(data.get("dates", []), data.get("values", [])), name)
+
+
+def correlation_text(series: Dict[str, pd.Series], freq: str = "ME") -> Optional[str]:
+    """Compact correlation summary, or None when fewer than two series overlap enough."""
+    pairs = correlations(series, freq)
+    if not pairs:
+        return None
+    lines = ["Correlation of monthly % changes (aligned month-end values):"]
+    for a, b, corr, periods in pairs:
+        strength = "strong" if abs(corr) >= 0.7 else "moderate" if abs(corr) >= 0.4 else "weak"
+        direction = "positive" if corr > 0 else "negative"
+        lines.append(f"{a} vs {b}: {corr:+.2f} ({strength} {direction}, {periods} months)")
+    return "\n".join(lines)
@@ -1,4 +1,4 @@
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from src.config.constants import CHUNK_SIZE, CHUNK_OVERLAP
@@ -17,7 +17,8 @@ class DocumentChunker:
         self.splitter = RecursiveCharacterTextSplitter(
             chunk_size=chunk_size * 4,  # ~4 chars per token
             chunk_overlap=overlap * 4,
-            separators=["\n\n", "\n", ". ", " "]
+            separators=["\n\n", "\n", ". ", " "],
+            add_start_index=True
         )
     
     def chunk_document(
@@ -26,13 +27,46 @@ class DocumentChunker:
         document_id: str,
         metadata: Optional[Dict] = None
     ) -> List[Chunk]:
-        texts = self.splitter.split_text(text)
+        """
+        Split a document into chunks that record their position.
+        
+        chunk_index/chunk_count link each chunk to its neighbors
+        (f"{document_id}_chunk_{i}"); char_start lets overlapping
+        neighbors be merged back without duplicated text.
+        """
+        docs = self.splitter.create_documents([text])
         return [
             Chunk(
-                text=t,
-                chunk_id=f"{document_id}_chunk_{i}",
+                text=doc.page_content,
+                chunk_id=make_chunk_id(document_id, i),
                 document_id=document_id,
-                metadata=metadata or {}
+                metadata={
+                    **(metadata or {}),
+                    "chunk_index": i,
+                    "chunk_count": len(docs),
+                    "char_start": doc.metadata["start_index"],
+                }
             )
-            for i, t in enumerate(texts)
+            for i, doc in enumerate(docs)
         ]
+
+
+def make_chunk_id(document_id: str, index: int) -> str:
+    return f"{document_id}_chunk_{index}"
+
+
+def merge_chunks(parts: List[Tuple[Optional[int], str]]) -> str:
+    """
+    Join consecutive (char_start, text) chunks of one document, dropping
+    the overlap each chunk shares with the previous one.
+    """
+    merged, end = "", None
+    for start, text in parts:
+        if end is None or start is None:
+            merged = f"{merged} {text}" if merged else text
+        elif start >= end:
+            merged = f"{merged} {text}"
+        else:
+            merged += text[end - start:]
+        end = None if start is None else max(end or 0, start + len(text))
+    return merged
@@ -0,0 +1,128 @@
+"""Compressed chunk text store, kept outside the vector index."""
+
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import zstandard
+
+from src.config.settings import settings
+from src.data.chunking import Chunk
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS chunks (
+    chunk_id TEXT PRIMARY KEY,
+    document_id TEXT NOT NULL,
+    text BLOB NOT NULL,
+    chunk_index INTEGER,
+    char_start INTEGER
+);
+"""
+
+# Neighbor index: a chunk's siblings are found by (document_id, chunk_index)
+NEIGHBOR_INDEX = "CREATE INDEX IF NOT EXISTS idx_chunks_position ON chunks(document_id, chunk_index)"
+
+# SQLite caps bound parameters per statement
+_MAX_PARAMS = 900
+
+
+class DocStore:
+    """
+    Chunk texts keyed by chunk_id, zstd-compressed per row in SQLite.
+    
+    The vector index only holds embeddings and filterable metadata; text
+    is fetched here for the final results a caller actually uses.
+    """
+    
+    def __init__(self, path: Optional[str] = None):
+        self.path = Path(path or settings.docstore_path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.executescript(SCHEMA)
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(chunks)")}
+        for column in ("chunk_index", "char_start"):
+            if column not in columns:
+                self._db.execute(f"ALTER TABLE chunks ADD COLUMN {column} INTEGER")
+        self._db.execute("DROP INDEX IF EXISTS idx_chunks_document")
+        self._db.execute(NEIGHBOR_INDEX)
+        # zstd contexts are not thread-safe; searches hydrate from many threads
+        self._local = threading.local()
+    
+    def _codec(self):
+        if not hasattr(self._local, "compressor"):
+            self._local.compressor = zstandard.ZstdCompressor(level=settings.docstore_zstd_level)
+            self._local.decompressor = zstandard.ZstdDecompressor()
+        return self._local.compressor, self._local.decompressor
+    
+    def close(self):
+        self._db.close()
+    
+    def put_many(self, chunks: Iterable[Chunk]):
+        compressor, _ = self._codec()
+        rows = [
+            (
+                c.chunk_id,
+                c.document_id,
+                compressor.compress(c.text.encode("utf-8")),
+                c.metadata.get("chunk_index"),
+                c.metadata.get("char_start"),
+            )
+            for c in chunks
+        ]
+        with self._lock:
+            self._db.executemany(
+                """INSERT OR REPLACE INTO chunks (chunk_id, document_id, text, chunk_index, char_start)
+                VALUES (?, ?, ?, ?, ?)""",
+                rows
+            )
+            self._db.commit()
+    
+    def get_many(self, chunk_ids: List[str]) -> Dict[str, str]:
+        """Fetch texts for the given ids; ids not in the store are omitted."""
+        _, decompressor = self._codec()
+        texts = {}
+        for i in range(0, len(chunk_ids), _MAX_PARAMS):
+            batch = chunk_ids[i:i + _MAX_PARAMS]
+            with self._lock:
+                rows = self._db.execute(
+                    f"SELECT chunk_id, text FROM chunks WHERE chunk_id IN ({','.join('?' * len(batch))})",
+                    batch
+                ).fetchall()
+            for chunk_id, blob in rows:
+                texts[chunk_id] = decompressor.decompress(blob).decode("utf-8")
+        return texts
+    
+    def get_range(self, document_id: str, first: int, last: int) -> List[Tuple[int, Optional[int], str]]:
+        """(chunk_index, char_start, text) for a document's chunks first..last, in order."""
+        with self._lock:
+            rows = self._db.execute(
+                """SELECT chunk_index, char_start, text FROM chunks
+                WHERE document_id = ? AND chunk_index BETWEEN ? AND ? ORDER BY chunk_index""",
+                (document_id, first, last)
+            ).fetchall()
+        _, decompressor = self._codec()
+        return [(i, start, decompressor.decompress(blob).decode("utf-8")) for i, start, blob in rows]
+    
+    def get(self, chunk_id: str) -> Optional[str]:
+        return self.get_many([chunk_id]).get(chunk_id)
+    
+    def delete_document(self, document_id: str):
+        with self._lock:
+            self._db.execute("DELETE FROM chunks WHERE document_id = ?", (document_id,))
+            self._db.commit()
+    
+    def count(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+
+
+_docstore = None
+
+
+def get_docstore() -> DocStore:
+    global _docstore
+    if _docstore is None:
+        _docstore = DocStore()
+    return _docstore
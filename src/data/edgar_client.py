@@ -0,0 +1,229 @@
+"""Async SEC EDGAR client that fetches only primary filing documents."""
+
+import asyncio
+import hashlib
+import json
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+import httpx
+
+from src.config.settings import settings
+from src.utils.http import get_with_retry
+from src.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+TICKERS_URL = "https://www.sec.gov/files/company_tickers.json"
+SUBMISSIONS_URL = "https://data.sec.gov/submissions/CIK{cik}.json"
+ARCHIVES_URL = "https://www.sec.gov/Archives/edgar/data/{cik}/{accession}/{document}"
+
+
+@dataclass
+class EdgarFiling:
+    """A single filing as listed in the EDGAR submissions index."""
+    ticker: str
+    cik: str
+    form: str
+    accession_number: str
+    filing_date: str
+    report_date: str
+    primary_document: str
+    
+    @property
+    def url(self) -> str:
+        return ARCHIVES_URL.format(
+            cik=int(self.cik),
+            accession=self.accession_number.replace("-", ""),
+            document=self.primary_document,
+        )
+
+
+class RateLimiter:
+    """Async limiter spacing requests evenly (SEC allows 10 requests/second)."""
+    
+    def __init__(self, requests_per_second: float):
+        self._interval = 1.0 / requests_per_second if requests_per_second > 0 else 0.0
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+    
+    async def acquire(self):
+        async with self._lock:
+            now = time.monotonic()
+            wait = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self._interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class ConditionalCache:
+    """On-disk ETag/Last-Modified cache so unchanged indexes come back as 304s."""
+    
+    def __init__(self, cache_dir: Path):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+    
+    def _paths(self, url: str):
+        key = hashlib.sha1(url.encode()).hexdigest()
+        return self.cache_dir / f"{key}.json", self.cache_dir / f"{key}.body"
+    
+    def validators(self, url: str) -> Dict[str, str]:
+        meta_path, body_path = self._paths(url)
+        if not meta_path.exists() or not body_path.exists():
+            return {}
+        meta = json.loads(meta_path.read_text())
+        headers = {}
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+        return headers
+    
+    def load(self, url: str) -> bytes:
+        return self._paths(url)[1].read_bytes()
+    
+    def store(self, url: str, response: httpx.Response):
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if not etag and not last_modified:
+            return
+        meta_path, body_path = self._paths(url)
+        body_path.write_bytes(response.content)
+        meta_path.write_text(json.dumps({"etag": etag, "last_modified": last_modified}))
+
+
+class EdgarClient:
+    """
+    Pooled, rate-limited EDGAR client.
+    
+    Uses the submissions index (data.sec.gov) to list filings and downloads
+    only the primary document of each, instead of the full filing bundle.
+    """
+    
+    def __init__(
+        self,
+        user_agent: Optional[str] = None,
+        requests_per_second: Optional[float] = None,
+        max_connections: Optional[int] = None,
+        cache_dir: Optional[str] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.user_agent = user_agent or settings.sec_user_agent
+        self.limiter = RateLimiter(requests_per_second or settings.sec_requests_per_second)
+        self.cache = ConditionalCache(Path(cache_dir or settings.sec_cache_dir))
+        self._client = httpx.AsyncClient(
+            headers={
+                "User-Agent": self.user_agent,
+                "Accept-Encoding": "gzip, deflate",
+            },
+            limits=httpx.Limits(
+                max_connections=max_connections or settings.sec_max_connections,
+                max_keepalive_connections=max_connections or settings.sec_max_connections,
+            ),
+            timeout=httpx.Timeout(30.0),
+            follow_redirects=True,
+            transport=transport,
+        )
+        self._cik_map: Optional[Dict[str, str]] = None
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc):
+        await self.aclose()
+    
+    async def aclose(self):
+        await self._client.aclose()
+    
+    async def _get(self, url: str, conditional: bool = True) -> bytes:
+        """GET with rate limiting, backoff on 429/5xx and 304 revalidation."""
+        headers = self.cache.validators(url) if conditional else {}
+        response = await get_with_retry(self._client, url, self.limiter, "EDGAR", headers=headers)
+        if response.status_code == 304:
+            return self.cache.load(url)
+        response.raise_for_status()
+        if conditional:
+            self.cache.store(url, response)
+        return response.content
+    
+    async def get_cik(self, ticker: str) -> Optional[str]:
+        """Resolve a ticker to its zero-padded 10 digit CIK."""
+        if self._cik_map is None:
+            data = json.loads(await self._get(TICKERS_URL))
+            self._cik_map = {
+                row["ticker"].upper(): str(row["cik_str"]).zfill(10)
+                for row in data.values()
+            }
+        return self._cik_map.get(ticker.upper())
+    
+    async def list_filings(
+        self,
+        ticker: str,
+        forms: Iterable[str] = ("10-K", "10-Q"),
+        limit: int = 5,
+    ) -> List[EdgarFiling]:
+        """List the most recent `limit` filings per form from the submissions index."""
+        forms = list(forms)
+        cik = await self.get_cik(ticker)
+        if cik is None:
+            logger.error(f"Unknown ticker for EDGAR: {ticker}")
+            return []
+        
+        data = json.loads(await self._get(SUBMISSIONS_URL.format(cik=cik)))
+        recent = data.get("filings", {}).get("recent", {})
+        wanted = {form: [] for form in forms}
+        
+        for i, form in enumerate(recent.get("form", [])):
+            if form not in wanted or len(wanted[form]) >= limit:
+                continue
+            primary = recent["primaryDocument"][i]
+            if not primary:
+                continue
+            wanted[form].append(EdgarFiling(
+                ticker=ticker.upper(),
+                cik=cik,
+                form=form,
+                accession_number=recent["accessionNumber"][i],
+                filing_date=recent["filingDate"][i],
+                report_date=recent.get("reportDate", [""] * (i + 1))[i] or "",
+                primary_document=primary,
+            ))
+        
+        return [f for form in forms for f in wanted[form]]
+    
+    async def fetch_document(self, filing: EdgarFiling) -> bytes:
+        """Download the primary document of a filing. Archives are immutable."""
+        return await self._get(filing.url, conditional=False)
+    
+    async def fetch_documents(self, filings: List[EdgarFiling]) -> List[tuple]:
+        """
+        Download primary documents concurrently over the pooled connection.
+        
+        Returns:
+            List of (EdgarFiling, content bytes); failed downloads are skipped
+        """
+        async def fetch(filing: EdgarFiling):
+            try:
+                return filing, await self.fetch_document(filing)
+            except httpx.HTTPError as e:
+                logger.error(f"Failed to fetch {filing.accession_number} for {filing.ticker}: {e}")
+                return None
+        
+        results = await asyncio.gather(*(fetch(f) for f in filings))
+        return [r for r in results if r is not None]
+    
+    async def fetch_new_filings(
+        self,
+        ticker: str,
+        forms: Iterable[str] = ("10-K", "10-Q"),
+        limit: int = 5,
+        known_accessions: Optional[Set[str]] = None,
+    ) -> List[tuple]:
+        """Download primary documents for listed filings not in `known_accessions`."""
+        known = known_accessions or set()
+        filings = await self.list_filings(ticker, forms, limit)
+        return await self.fetch_documents(
+            [f for f in filings if f.accession_number not in known]
+        )
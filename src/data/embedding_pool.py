@@ -0,0 +1,138 @@
+"""Multi-process bulk embedding engine for ingestion."""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from src.config.settings import settings
+from src.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Per-process model, loaded once by the pool initializer
+_worker_model = None
+
+
+def _init_worker(model_name: str, backend: str, threads: int):
+    global _worker_model
+    import torch
+    from src.data.embeddings import EmbeddingModel
+    
+    # Each worker owns a slice of the cores instead of every process using all of them
+    torch.set_num_threads(threads)
+    settings.embedding_onnx_threads = threads
+    _worker_model = EmbeddingModel(model_name, backend=backend)
+
+
+def _embed_shard(texts: List[str]) -> np.ndarray:
+    return _worker_model.embed_documents(texts).astype(np.float32)
+
+
+class EmbeddingPool:
+    """
+    Shards texts across worker processes, each holding its own model copy.
+    
+    Texts are processed in blocks of the input order. Within a block they are
+    sorted by length and split into shards so every encoder batch has little
+    padding; the next block is already queued while the current one is
+    reassembled, and results are yielded in input order.
+    """
+    
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        model_name: Optional[str] = None,
+        backend: Optional[str] = None,
+        shard_size: Optional[int] = None,
+        threads_per_worker: Optional[int] = None,
+    ):
+        self.workers = workers or settings.embedding_pool_workers or os.cpu_count() or 1
+        self.model_name = model_name or settings.embedding_model
+        self.backend = backend or settings.embedding_backend
+        self.shard_size = shard_size or settings.embedding_pool_shard_size
+        self.threads_per_worker = (
+            threads_per_worker
+            or settings.embedding_pool_threads_per_worker
+            or max(1, (os.cpu_count() or 1) // self.workers)
+        )
+        self._executor: Optional[ProcessPoolExecutor] = None
+    
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            logger.info(
+                f"Starting embedding pool: {self.workers} workers x "
+                f"{self.threads_per_worker} threads ({self.model_name})"
+            )
+            # spawn: torch and tokenizer thread pools are not fork-safe
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.model_name, self.backend, self.threads_per_worker),
+            )
+        return self._executor
+    
+    def _submit_block(self, texts: List[str], start: int, stop: int):
+        order = start + np.argsort([-len(t) for t in texts[start:stop]], kind="stable")
+        shards = [order[i:i + self.shard_size] for i in range(0, len(order), self.shard_size)]
+        futures = [self._pool().submit(_embed_shard, [texts[j] for j in shard]) for shard in shards]
+        return start, stop, shards, futures
+    
+    def iter_embed(
+        self,
+        texts: List[str],
+        block_size: Optional[int] = None,
+    ) -> Iterator[Tuple[int, np.ndarray]]:
+        """
+        Embed texts, streaming results in input order.
+        
+        Yields:
+            (start offset, embeddings for texts[start:start + len(embeddings)])
+        """
+        if not texts:
+            return
+        block_size = block_size or self.shard_size * self.workers * 4
+        bounds = [(s, min(s + block_size, len(texts))) for s in range(0, len(texts), block_size)]
+        
+        pending = self._submit_block(texts, *bounds[0])
+        for i in range(len(bounds)):
+            start, stop, shards, futures = pending
+            if i + 1 < len(bounds):
+                pending = self._submit_block(texts, *bounds[i + 1])
+            
+            block = None
+            for shard, future in zip(shards, futures):
+                embeddings = future.result()
+                if block is None:
+                    block = np.empty((stop - start, embeddings.shape[1]), dtype=np.float32)
+                block[shard - start] = embeddings
+            yield start, block
+    
+    def embed(self, texts: List[str]) -> np.ndarray:
+        blocks = [block for _, block in self.iter_embed(texts)]
+        return np.vstack(blocks) if blocks else np.empty((0, 0), dtype=np.float32)
+    
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+
+
+_pool = None
+
+
+def get_embedding_pool() -> EmbeddingPool:
+    """Get or create the process-wide pool (workers start on first use)."""
+    global _pool
+    if _pool is None:
+        _pool = EmbeddingPool()
+    return _pool
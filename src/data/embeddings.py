@@ -5,9 +5,23 @@ from src.config.settings import settings
 
 
 class EmbeddingModel:
-    def __init__(self, model_name: Optional[str] = None):
+    def __init__(
+        self,
+        model_name: Optional[str] = None,
+        backend: Optional[str] = None,
+        quantize: Optional[bool] = None
+    ):
         self.model_name = model_name or settings.embedding_model
-        self.model = SentenceTransformer(self.model_name)
+        self.backend = backend or settings.embedding_backend
+        if self.backend == "onnx":
+            from src.data.onnx_encoder import OnnxEncoder
+            self.model = OnnxEncoder(
+                self.model_name,
+                quantize=settings.embedding_onnx_quantize if quantize is None else quantize,
+                intra_op_threads=settings.embedding_onnx_threads,
+            )
+        else:
+            self.model = SentenceTransformer(self.model_name)
         self.query_prefix = "Represent this sentence for searching relevant passages: "
     
     def embed_documents(self, texts: List[str]) -> np.ndarray:
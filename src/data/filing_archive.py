@@ -0,0 +1,263 @@
+"""Content-addressed, zstd-compressed archive of raw and cleaned SEC filings."""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from typing import Iterable, List, Optional, Set, Union
+
+import zstandard
+
+from src.config.settings import settings
+from src.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    sha256 TEXT PRIMARY KEY,
+    segment INTEGER NOT NULL,
+    offset INTEGER NOT NULL,
+    length INTEGER NOT NULL,
+    raw_length INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS filings (
+    accession_number TEXT PRIMARY KEY,
+    ticker TEXT NOT NULL,
+    form TEXT NOT NULL,
+    filing_date TEXT,
+    period TEXT,
+    primary_document TEXT,
+    raw_sha256 TEXT NOT NULL REFERENCES blobs(sha256),
+    clean_sha256 TEXT NOT NULL REFERENCES blobs(sha256),
+    archived_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_filings_ticker ON filings(ticker, form, filing_date);
+"""
+
+
+def filing_date_int(value: Optional[Union[str, date]]) -> Optional[int]:
+    """"2024-01-31" (or a date) -> 20240131, the numeric form range filters need."""
+    if not value:
+        return None
+    if isinstance(value, date):
+        value = value.isoformat()
+    return int(value.replace("-", "")[:8])
+
+
+@dataclass
+class FilingRecord:
+    """Catalog entry for an archived filing."""
+    accession_number: str
+    ticker: str
+    form: str
+    filing_date: str
+    period: str
+    primary_document: str
+    raw_sha256: str
+    clean_sha256: str
+    
+    @property
+    def document_id(self) -> str:
+        return f"{self.ticker}-{self.form}-{self.accession_number}"
+
+
+class FilingArchive:
+    """
+    Local filing archive.
+    
+    Blobs are stored once per content hash as independent zstd frames appended
+    to size-capped segment files; the SQLite catalog records each blob's
+    segment and byte offset so any filing is read back with a single seek.
+    """
+    
+    def __init__(self, root: Optional[str] = None):
+        self.root = Path(root or settings.filing_archive_dir)
+        self.segments_dir = self.root / "segments"
+        self.segments_dir.mkdir(parents=True, exist_ok=True)
+        self.segment_bytes = settings.filing_archive_segment_bytes
+        
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.root / "catalog.db", check_same_thread=False)
+        self._db.executescript(SCHEMA)
+        self._compressor = zstandard.ZstdCompressor(level=settings.filing_archive_zstd_level)
+        self._decompressor = zstandard.ZstdDecompressor()
+    
+    def close(self):
+        self._db.close()
+    
+    def _segment_path(self, segment: int) -> Path:
+        return self.segments_dir / f"{segment:06d}.zst"
+    
+    def _current_segment(self) -> int:
+        row = self._db.execute("SELECT MAX(segment) FROM blobs").fetchone()
+        segment = row[0] or 0
+        path = self._segment_path(segment)
+        if path.exists() and path.stat().st_size >= self.segment_bytes:
+            segment += 1
+        return segment
+    
+    def _put_blob(self, data: bytes) -> str:
+        sha = hashlib.sha256(data).hexdigest()
+        exists = self._db.execute("SELECT 1 FROM blobs WHERE sha256 = ?", (sha,)).fetchone()
+        if exists:
+            return sha
+        
+        frame = self._compressor.compress(data)
+        segment = self._current_segment()
+        with open(self._segment_path(segment), "ab") as f:
+            offset = f.tell()
+            f.write(frame)
+        
+        self._db.execute(
+            "INSERT INTO blobs (sha256, segment, offset, length, raw_length) VALUES (?, ?, ?, ?, ?)",
+            (sha, segment, offset, len(frame), len(data))
+        )
+        return sha
+    
+    def _read_blob(self, sha: str) -> bytes:
+        row = self._db.execute(
+            "SELECT segment, offset, length, raw_length FROM blobs WHERE sha256 = ?", (sha,)
+        ).fetchone()
+        if row is None:
+            raise KeyError(f"Blob not in archive: {sha}")
+        segment, offset, length, raw_length = row
+        with open(self._segment_path(segment), "rb") as f:
+            f.seek(offset)
+            frame = f.read(length)
+        return self._decompressor.decompress(frame, max_output_size=raw_length)
+    
+    def put(
+        self,
+        ticker: str,
+        form: str,
+        accession_number: str,
+        raw: bytes,
+        clean: str,
+        filing_date: str = "",
+        period: str = "",
+        primary_document: str = "",
+    ) -> FilingRecord:
+        """Archive a filing's raw document and cleaned text."""
+        with self._lock:
+            raw_sha = self._put_blob(raw)
+            clean_sha = self._put_blob(clean.encode("utf-8"))
+            self._db.execute(
+                """INSERT OR REPLACE INTO filings
+                (accession_number, ticker, form, filing_date, period, primary_document,
+                 raw_sha256, clean_sha256, archived_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                (accession_number, ticker.upper(), form, filing_date, period,
+                 primary_document, raw_sha, clean_sha, time.time())
+            )
+            self._db.commit()
+        
+        return FilingRecord(
+            accession_number=accession_number,
+            ticker=ticker.upper(),
+            form=form,
+            filing_date=filing_date,
+            period=period,
+            primary_document=primary_document,
+            raw_sha256=raw_sha,
+            clean_sha256=clean_sha,
+        )
+    
+    def has(self, accession_number: str) -> bool:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT 1 FROM filings WHERE accession_number = ?", (accession_number,)
+            ).fetchone()
+        return row is not None
+    
+    def accessions(self, ticker: str) -> Set[str]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT accession_number FROM filings WHERE ticker = ?", (ticker.upper(),)
+            ).fetchall()
+        return {r[0] for r in rows}
+    
+    def get(self, accession_number: str) -> Optional[FilingRecord]:
+        records = self._select("WHERE accession_number = ?", (accession_number,))
+        return records[0] if records else None
+    
+    def list_filings(
+        self,
+        ticker: Optional[str] = None,
+        forms: Optional[Iterable[str]] = None,
+        limit: Optional[int] = None,
+        start_date: Optional[Union[str, date]] = None,
+        end_date: Optional[Union[str, date]] = None,
+    ) -> List[FilingRecord]:
+        """List archived filings, newest first, optionally within [start_date, end_date]."""
+        clauses, params = [], []
+        if ticker:
+            clauses.append("ticker = ?")
+            params.append(ticker.upper())
+        if forms:
+            forms = list(forms)
+            clauses.append(f"form IN ({','.join('?' * len(forms))})")
+            params.extend(forms)
+        if start_date:
+            clauses.append("filing_date >= ?")
+            params.append(str(start_date))
+        if end_date:
+            clauses.append("filing_date <= ?")
+            params.append(str(end_date))
+        
+        sql = ("WHERE " + " AND ".join(clauses)) if clauses else ""
+        sql += " ORDER BY filing_date DESC, accession_number DESC"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return self._select(sql, tuple(params))
+    
+    def _select(self, where: str, params: tuple) -> List[FilingRecord]:
+        with self._lock:
+            rows = self._db.execute(
+                f"""SELECT accession_number, ticker, form, filing_date, period,
+                primary_document, raw_sha256, clean_sha256 FROM filings {where}""",
+                params
+            ).fetchall()
+        return [FilingRecord(*row) for row in rows]
+    
+    def read_raw(self, accession_number: str) -> bytes:
+        record = self.get(accession_number)
+        if record is None:
+            raise KeyError(f"Filing not in archive: {accession_number}")
+        with self._lock:
+            return self._read_blob(record.raw_sha256)
+    
+    def read_clean(self, accession_number: str) -> str:
+        record = self.get(accession_number)
+        if record is None:
+            raise KeyError(f"Filing not in archive: {accession_number}")
+        with self._lock:
+            return self._read_blob(record.clean_sha256).decode("utf-8")
+    
+    def stats(self) -> dict:
+        with self._lock:
+            filings = self._db.execute("SELECT COUNT(*) FROM filings").fetchone()[0]
+            blobs, stored, raw = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(length), 0), COALESCE(SUM(raw_length), 0) FROM blobs"
+            ).fetchone()
+        return {
+            "filings": filings,
+            "blobs": blobs,
+            "stored_bytes": stored,
+            "raw_bytes": raw,
+            "compression_ratio": round(raw / stored, 2) if stored else 0.0,
+        }
+
+
+_archive = None
+
+
+def get_filing_archive() -> FilingArchive:
+    global _archive
+    if _archive is None:
+        _archive = FilingArchive()
+    return _archive
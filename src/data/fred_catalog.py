@@ -0,0 +1,204 @@
+"""Local FRED series catalog with hybrid (embedding + BM25) series lookup."""
+
+import math
+import re
+import sqlite3
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from src.config.settings import settings
+from src.config.constants import FRED_CORE_SERIES
+from src.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS catalog (
+    series_id TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    units TEXT,
+    frequency TEXT,
+    popularity INTEGER DEFAULT 0,
+    embedding BLOB,
+    embedding_model TEXT
+);
+"""
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "by", "for", "from", "how", "in", "is", "it",
+    "of", "on", "or", "the", "to", "u", "s", "us", "was", "what", "when", "with",
+}
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in re.findall(r"[a-z0-9]+", text.lower()) if t not in STOPWORDS]
+
+
+@dataclass
+class SeriesInfo:
+    """One catalog entry."""
+    series_id: str
+    title: str
+    units: str = ""
+    frequency: str = ""
+    popularity: int = 0
+    
+    @property
+    def document(self) -> str:
+        """Text that is embedded and indexed for the series."""
+        return f"{self.title} ({self.units}, {self.frequency})"
+
+
+class BM25Index:
+    """Okapi BM25 over tokenized documents, scored with NumPy per query term."""
+    
+    def __init__(self, documents: List[List[str]], k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.size = len(documents)
+        lengths = np.array([len(doc) for doc in documents], dtype=np.float32)
+        self._norm = k1 * (1 - b + b * lengths / max(float(lengths.mean()) if len(lengths) else 1.0, 1.0))
+        
+        postings: Dict[str, Tuple[List[int], List[int]]] = {}
+        for row, doc in enumerate(documents):
+            for term, tf in Counter(doc).items():
+                rows, tfs = postings.setdefault(term, ([], []))
+                rows.append(row)
+                tfs.append(tf)
+        self._postings = {
+            term: (np.array(rows), np.array(tfs, dtype=np.float32))
+            for term, (rows, tfs) in postings.items()
+        }
+    
+    def scores(self, tokens: Iterable[str]) -> np.ndarray:
+        scores = np.zeros(self.size, dtype=np.float32)
+        for term in set(tokens):
+            if term not in self._postings:
+                continue
+            rows, tfs = self._postings[term]
+            idf = math.log(1 + (self.size - len(rows) + 0.5) / (len(rows) + 0.5))
+            scores[rows] += idf * tfs * (self.k1 + 1) / (tfs + self._norm[rows])
+        return scores
+
+
+class FREDCatalog:
+    """
+    FRED series metadata with precomputed title embeddings and a BM25 index.
+    
+    Entries live in the FRED SQLite store (seeded from FRED_CORE_SERIES,
+    extended with scripts/build_fred_catalog.py); embeddings are computed
+    when a series is added and re-computed only if the embedding model
+    changes. Lookup is in-process: one query embedding, one matrix-vector
+    product and a BM25 pass, with no FRED API calls.
+    """
+    
+    def __init__(self, path: Optional[str] = None, embedder=None):
+        self.path = Path(path or settings.fred_store_path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._embedder = embedder
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.executescript(SCHEMA)
+        
+        self.series: List[SeriesInfo] = []
+        self._matrix = np.zeros((0, 0), dtype=np.float32)
+        self._bm25 = BM25Index([])
+        self._popularity = np.zeros(0, dtype=np.float32)
+        self._loaded = False
+    
+    @property
+    def embedder(self):
+        # Lazily built so opening the catalog does not load the embedding model
+        if self._embedder is None:
+            from src.data.embeddings import get_embedding_model
+            self._embedder = get_embedding_model()
+        return self._embedder
+    
+    def close(self):
+        self._db.close()
+    
+    def add(self, series: Iterable[SeriesInfo]):
+        """Insert or update entries, embedding their titles."""
+        series = list(series)
+        if not series:
+            return
+        embeddings = np.asarray(self.embedder.embed_documents([s.document for s in series]), dtype=np.float32)
+        with self._lock:
+            self._db.executemany(
+                """INSERT OR REPLACE INTO catalog
+                (series_id, title, units, frequency, popularity, embedding, embedding_model)
+                VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                [
+                    (s.series_id, s.title, s.units, s.frequency, s.popularity, e.tobytes(), self.embedder.model_name)
+                    for s, e in zip(series, embeddings)
+                ]
+            )
+            self._db.commit()
+        self._loaded = False
+    
+    def load(self):
+        """Build the in-memory indexes, seeding an empty catalog and re-embedding stale rows."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT series_id, title, units, frequency, popularity, embedding, embedding_model FROM catalog"
+            ).fetchall()
+        if not rows:
+            self.add(SeriesInfo(*row) for row in FRED_CORE_SERIES)
+            return self.load()
+        
+        model_name = self.embedder.model_name
+        stale = [SeriesInfo(*row[:5]) for row in rows if row[6] != model_name]
+        if stale:
+            logger.info(f"Re-embedding {len(stale)} FRED catalog titles for {model_name}")
+            self.add(stale)
+            return self.load()
+        
+        self.series = [SeriesInfo(*row[:5]) for row in rows]
+        self._matrix = np.stack([np.frombuffer(row[5], dtype=np.float32) for row in rows])
+        self._bm25 = BM25Index([tokenize(s.document) for s in self.series])
+        self._popularity = np.array([s.popularity for s in self.series], dtype=np.float32) / 100.0
+        self._loaded = True
+    
+    def search(self, query: str, top_k: Optional[int] = None) -> List[Tuple[SeriesInfo, float]]:
+        """
+        Top series for a question, best first.
+        
+        A series qualifies on a lexical match or a title similarity of at
+        least FRED_CATALOG_MIN_SIMILARITY; qualifying series rank by
+        similarity, normalized BM25 and a small popularity prior.
+        """
+        if not self._loaded:
+            self.load()
+        top_k = top_k or settings.fred_catalog_top_k
+        
+        similarity = self._matrix @ np.asarray(self.embedder.embed_query(query), dtype=np.float32)
+        lexical = self._bm25.scores(tokenize(query))
+        if lexical.max(initial=0.0) > 0:
+            lexical = lexical / lexical.max()
+        
+        qualifies = (lexical > 0) | (similarity >= settings.fred_catalog_min_similarity)
+        scores = 0.6 * similarity + 0.3 * lexical + 0.1 * self._popularity
+        scores[~qualifies] = -np.inf
+        
+        order = np.argsort(-scores)[:top_k]
+        return [(self.series[i], round(float(scores[i]), 4)) for i in order if qualifies[i]]
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM catalog").fetchone()[0]
+
+
+_fred_catalog = None
+
+
+def get_fred_catalog() -> FREDCatalog:
+    """Get or create the shared FRED catalog."""
+    global _fred_catalog
+    if _fred_catalog is None:
+        _fred_catalog = FREDCatalog()
+    return _fred_catalog
@@ -0,0 +1,160 @@
+"""Async FRED API client and incremental refresher for the local FRED store."""
+
+import asyncio
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import httpx
+
+from src.config.settings import settings
+from src.data.edgar_client import RateLimiter
+from src.data.fred_catalog import SeriesInfo
+from src.data.fred_store import FREDStore, get_fred_store
+from src.utils.http import get_with_retry
+from src.utils.logging import get_logger
+from src.utils.telemetry import get_tracer
+
+logger = get_logger(__name__)
+tracer = get_tracer("data.fred")
+
+OBSERVATIONS_URL = "https://api.stlouisfed.org/fred/series/observations"
+SEARCH_URL = "https://api.stlouisfed.org/fred/series/search"
+
+
+class FREDClient:
+    """Pooled, rate-limited client for the FRED observations endpoint."""
+    
+    def __init__(
+        self,
+        api_key: str,
+        requests_per_second: Optional[float] = None,
+        max_connections: Optional[int] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.api_key = api_key
+        self.limiter = RateLimiter(requests_per_second or settings.fred_requests_per_second)
+        self._client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=max_connections or settings.fred_max_connections,
+                max_keepalive_connections=max_connections or settings.fred_max_connections,
+            ),
+            timeout=httpx.Timeout(30.0),
+            transport=transport,
+        )
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc):
+        await self.aclose()
+    
+    async def aclose(self):
+        await self._client.aclose()
+    
+    async def _get(self, url: str, params: Dict[str, str]) -> Dict:
+        """GET with rate limiting and backoff on 429/5xx."""
+        params = {**params, "api_key": self.api_key, "file_type": "json"}
+        response = await get_with_retry(self._client, url, self.limiter, "FRED", params=params)
+        response.raise_for_status()
+        return response.json()
+    
+    async def observations(self, series_id: str, start: Optional[str] = None) -> List[Tuple[str, float]]:
+        """(date, value) observations from `start` (inclusive) on; missing values are skipped."""
+        params = {"series_id": series_id, "sort_order": "asc"}
+        if start:
+            params["observation_start"] = start
+        data = await self._get(OBSERVATIONS_URL, params)
+        return [
+            (row["date"], float(row["value"]))
+            for row in data.get("observations", [])
+            if row.get("value") not in (None, ".", "")
+        ]
+    
+    async def search_series(self, text: str, limit: int = 100) -> List[SeriesInfo]:
+        """Most popular series matching `text` (catalog building only; queries use the local catalog)."""
+        data = await self._get(SEARCH_URL, {
+            "search_text": text,
+            "order_by": "popularity",
+            "sort_order": "desc",
+            "limit": str(limit),
+        })
+        return [
+            SeriesInfo(
+                series_id=row["id"],
+                title=row["title"],
+                units=row.get("units", ""),
+                frequency=row.get("frequency", ""),
+                popularity=int(row.get("popularity", 0)),
+            )
+            for row in data.get("seriess", [])
+        ]
+
+
+class FREDRefresher:
+    """
+    Keeps the FRED store current.
+    
+    A refresh only requests observations from each series' last stored
+    date on (re-reading that date picks up revisions). Series refresh
+    concurrently over one HTTP client, and concurrent refreshes of the
+    same series share a single request.
+    """
+    
+    def __init__(self, client: FREDClient, store: Optional[FREDStore] = None):
+        self.client = client
+        self.store = store or get_fred_store()
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self._background: Set[asyncio.Task] = set()
+        self.stats = {"refreshes": 0, "observations": 0, "errors": 0}
+    
+    async def _refresh_one(self, series_id: str) -> int:
+        start = self.store.last_date(series_id) or settings.fred_history_start
+        with tracer.start_as_current_span("fred.refresh_series") as span:
+            span.set_attribute("fred.series_id", series_id)
+            span.set_attribute("fred.observation_start", start)
+            try:
+                observations = await self.client.observations(series_id, start=start)
+            except Exception as e:
+                self.stats["errors"] += 1
+                logger.error(f"FRED refresh failed for {series_id}: {e}")
+                # Counts as a check, so a failing FRED is retried at most once per interval
+                await asyncio.to_thread(self.store.mark_checked, series_id)
+                return 0
+            count = await asyncio.to_thread(self.store.upsert, series_id, observations)
+            span.set_attribute("fred.observation_count", count)
+            self.stats["refreshes"] += 1
+            self.stats["observations"] += count
+            return count
+    
+    async def refresh(self, series_ids: Iterable[str]) -> Dict[str, int]:
+        """Refresh series concurrently; returns observations fetched per series."""
+        series_ids = list(dict.fromkeys(series_ids))
+        tasks = []
+        for series_id in series_ids:
+            task = self._in_flight.get(series_id)
+            if task is None:
+                task = asyncio.ensure_future(self._refresh_one(series_id))
+                self._in_flight[series_id] = task
+                task.add_done_callback(lambda _, s=series_id: self._in_flight.pop(s, None))
+            tasks.append(task)
+        counts = await asyncio.gather(*tasks)
+        return dict(zip(series_ids, counts))
+    
+    def schedule(self, series_ids: Iterable[str]):
+        """Refresh in the background (the caller answers from stored data meanwhile)."""
+        task = asyncio.ensure_future(self.refresh(series_ids))
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+    
+    def get_stats(self) -> Dict[str, int]:
+        return {**self.stats, "in_flight": len(self._in_flight)}
+
+
+_fred_refresher = None
+
+
+def get_fred_refresher() -> Optional[FREDRefresher]:
+    """Get or create the shared refresher; None without a FRED API key."""
+    global _fred_refresher
+    if _fred_refresher is None and settings.fred_api_key:
+        _fred_refresher = FREDRefresher(FREDClient(settings.fred_api_key.get_secret_value()))
+    return _fred_refresher
@@ -0,0 +1,125 @@
+"""Local FRED observation store with per-series refresh tracking."""
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src.config.settings import settings
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS observations (
+    series_id TEXT NOT NULL,
+    date TEXT NOT NULL,
+    value REAL NOT NULL,
+    PRIMARY KEY (series_id, date)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS series (
+    series_id TEXT PRIMARY KEY,
+    last_date TEXT,
+    refreshed_at REAL NOT NULL
+);
+"""
+
+
+class FREDStore:
+    """
+    FRED observations keyed by (series_id, date) in SQLite.
+    
+    Each series records its last observation date and when it was last
+    refreshed, so refreshes only ask FRED for what is new and reads never
+    touch the network.
+    """
+    
+    def __init__(self, path: Optional[str] = None):
+        self.path = Path(path or settings.fred_store_path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.executescript(SCHEMA)
+    
+    def close(self):
+        self._db.close()
+    
+    def upsert(self, series_id: str, observations: Iterable[Tuple[str, float]]) -> int:
+        """Insert or revise observations and mark the series refreshed; returns the row count."""
+        rows = [(series_id, date, value) for date, value in observations]
+        with self._lock:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO observations (series_id, date, value) VALUES (?, ?, ?)",
+                rows
+            )
+            last_date = self._db.execute(
+                "SELECT MAX(date) FROM observations WHERE series_id = ?", (series_id,)
+            ).fetchone()[0]
+            self._db.execute(
+                "INSERT OR REPLACE INTO series (series_id, last_date, refreshed_at) VALUES (?, ?, ?)",
+                (series_id, last_date, time.time())
+            )
+            self._db.commit()
+        return len(rows)
+    
+    def mark_checked(self, series_id: str):
+        """Count a refresh that stored nothing (FRED failed) as a check, so the series waits out the refresh interval."""
+        with self._lock:
+            self._db.execute(
+                """INSERT INTO series (series_id, last_date, refreshed_at) VALUES (?, NULL, ?)
+                ON CONFLICT(series_id) DO UPDATE SET refreshed_at = excluded.refreshed_at""",
+                (series_id, time.time())
+            )
+            self._db.commit()
+    
+    def last_date(self, series_id: str) -> Optional[str]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT last_date FROM series WHERE series_id = ?", (series_id,)
+            ).fetchone()
+        return row[0] if row else None
+    
+    def is_stale(self, series_id: str, max_age_seconds: float) -> bool:
+        """True when the series was never refreshed or not within `max_age_seconds`."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT refreshed_at FROM series WHERE series_id = ?", (series_id,)
+            ).fetchone()
+        return row is None or time.time() - row[0] > max_age_seconds
+    
+    def latest(self, series_id: str, n: int = 2) -> List[Tuple[str, float]]:
+        """The `n` most recent observations, newest first."""
+        with self._lock:
+            return self._db.execute(
+                "SELECT date, value FROM observations WHERE series_id = ? ORDER BY date DESC LIMIT ?",
+                (series_id, n)
+            ).fetchall()
+    
+    def get_series(
+        self,
+        series_id: str,
+        start: Optional[str] = None,
+        end: Optional[str] = None
+    ) -> List[Tuple[str, float]]:
+        """Observations between `start` and `end` (inclusive ISO dates), oldest first."""
+        with self._lock:
+            return self._db.execute(
+                """SELECT date, value FROM observations
+                WHERE series_id = ? AND date >= ? AND date <= ? ORDER BY date""",
+                (series_id, start or "", end or "9999-12-31")
+            ).fetchall()
+    
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            series = self._db.execute("SELECT COUNT(*) FROM series WHERE last_date IS NOT NULL").fetchone()[0]
+            observations = self._db.execute("SELECT COUNT(*) FROM observations").fetchone()[0]
+        return {"series": series, "observations": observations}
+
+
+_fred_store = None
+
+
+def get_fred_store() -> FREDStore:
+    """Get or create the shared FRED store."""
+    global _fred_store
+    if _fred_store is None:
+        _fred_store = FREDStore()
+    return _fred_store
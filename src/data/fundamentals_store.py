@@ -0,0 +1,91 @@
+"""Local fundamentals table: latest reported figures per ticker, for peer comparisons."""
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+import pandas as pd
+
+from src.config.settings import settings
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS fundamentals (
+    ticker TEXT NOT NULL,
+    field TEXT NOT NULL,
+    value REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (ticker, field)
+) WITHOUT ROWID;
+"""
+
+
+class FundamentalsStore:
+    """
+    Figures keyed by (ticker, field) in SQLite, written whenever the
+    OpenBB agent fetches income, balance sheet, cash flow or metrics.
+    
+    `frame` reads any set of tickers with one query as a ticker x field
+    matrix, so comparisons never go back to the provider.
+    """
+    
+    def __init__(self, path: Optional[str] = None):
+        self.path = Path(path or settings.fundamentals_store_path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.executescript(SCHEMA)
+    
+    def close(self):
+        self._db.close()
+    
+    def upsert(self, ticker: str, values: Dict[str, float]) -> int:
+        """Insert or replace a ticker's figures; returns the count written."""
+        now = time.time()
+        rows = [(ticker.upper(), field, float(value), now) for field, value in values.items()]
+        with self._lock:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO fundamentals (ticker, field, value, updated_at) VALUES (?, ?, ?, ?)",
+                rows
+            )
+            self._db.commit()
+        return len(rows)
+    
+    def frame(self, tickers: Iterable[str], max_age_seconds: Optional[float] = None) -> pd.DataFrame:
+        """
+        Figures for `tickers` (rows, in the order given) by field (columns);
+        figures older than `max_age_seconds` (default
+        FUNDAMENTALS_MAX_AGE_DAYS) are left out.
+        """
+        tickers = [t.upper() for t in dict.fromkeys(tickers)]
+        if max_age_seconds is None:
+            max_age_seconds = settings.fundamentals_max_age_days * 86400
+        with self._lock:
+            rows = self._db.execute(
+                f"""SELECT ticker, field, value FROM fundamentals
+                WHERE ticker IN ({','.join('?' * len(tickers))}) AND updated_at >= ?""",
+                (*tickers, time.time() - max_age_seconds)
+            ).fetchall()
+        if not rows:
+            return pd.DataFrame(index=pd.Index([], name="ticker"))
+        frame = pd.DataFrame(rows, columns=["ticker", "field", "value"]).pivot(index="ticker", columns="field", values="value")
+        return frame.reindex([t for t in tickers if t in frame.index])
+    
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            tickers, values = self._db.execute(
+                "SELECT COUNT(DISTINCT ticker), COUNT(*) FROM fundamentals"
+            ).fetchone()
+        return {"tickers": tickers, "values": values}
+
+
+_fundamentals_store = None
+
+
+def get_fundamentals_store() -> FundamentalsStore:
+    """Get or create the shared fundamentals store."""
+    global _fundamentals_store
+    if _fundamentals_store is None:
+        _fundamentals_store = FundamentalsStore()
+    return _fundamentals_store
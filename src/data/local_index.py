@@ -0,0 +1,319 @@
+"""In-process vector index on a memory-mapped NumPy matrix (no database underneath)."""
+
+import json
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.config.settings import settings
+from src.data.vector_backend import SearchHit, VectorBackend
+from src.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Below this many rows IVF buys nothing over an exact scan
+IVF_MIN_ROWS = 4096
+_ASSIGN_BATCH = 65536
+
+
+def train_kmeans(vectors: np.ndarray, k: int, iterations: int = 10, seed: int = 0) -> np.ndarray:
+    """Spherical k-means on a sample of unit vectors; returns unit centroids."""
+    rng = np.random.default_rng(seed)
+    sample_size = min(len(vectors), k * 256)
+    sample = np.asarray(vectors[np.sort(rng.choice(len(vectors), sample_size, replace=False))])
+    centroids = sample[rng.choice(len(sample), k, replace=False)].copy()
+    
+    for _ in range(iterations):
+        assign = np.argmax(sample @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, sample)
+        counts = np.bincount(assign, minlength=k)
+        filled = counts > 0  # Empty clusters keep their previous centroid
+        centroids[filled] = sums[filled]
+        centroids /= np.clip(np.linalg.norm(centroids, axis=1, keepdims=True), 1e-12, None)
+    return centroids
+
+
+class LocalIndexBackend(VectorBackend):
+    """
+    Exact flat or IVF index over an append-only float32 matrix.
+    
+    Vectors are appended to `vectors.f32` and memory-mapped for search;
+    metadata is an append-only JSON-lines log replayed on open (a re-added
+    id supersedes its earlier row). Filters are evaluated as boolean
+    bitmaps over rows before scoring: equality/$in via per-field postings,
+    numeric ranges via vectorized column comparisons.
+    
+    IVF partitions rows by spherical k-means and scores only the `nprobe`
+    closest lists; it is retrained when the corpus doubles.
+    """
+    
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        index_type: Optional[str] = None,
+        nlist: Optional[int] = None,
+        nprobe: Optional[int] = None,
+    ):
+        self.root = Path(path or settings.local_index_dir)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.index_type = index_type or settings.local_index_type
+        self.nlist = nlist if nlist is not None else settings.local_index_nlist
+        self.nprobe = nprobe or settings.local_index_nprobe
+        
+        self._vectors_path = self.root / "vectors.f32"
+        self._meta_path = self.root / "metadata.jsonl"
+        self._info_path = self.root / "index.json"
+        self._lock = threading.Lock()
+        
+        self.dim: Optional[int] = None
+        self.ids: List[str] = []
+        self.metadatas: List[Dict[str, Any]] = []
+        self._rows: Dict[str, int] = {}
+        self._alive = np.zeros(0, dtype=bool)
+        self._matrix: Optional[np.ndarray] = None
+        
+        self._postings: Dict[str, Dict[Any, List[int]]] = {}
+        self._bitmaps: Dict[Tuple[str, Any], np.ndarray] = {}
+        self._columns: Dict[str, np.ndarray] = {}
+        
+        self._centroids: Optional[np.ndarray] = None
+        self._assign = np.zeros(0, dtype=np.int32)
+        self._trained_rows = 0
+        self._lists: Optional[Tuple[np.ndarray, np.ndarray]] = None
+        
+        self._load()
+    
+    # --- persistence ---
+    
+    def _load(self):
+        if self._info_path.exists():
+            info = json.loads(self._info_path.read_text())
+            self.dim = info["dim"]
+            self._trained_rows = info.get("trained_rows", 0)
+        
+        alive = []
+        if self._meta_path.exists():
+            with open(self._meta_path) as f:
+                for line in f:
+                    entry = json.loads(line)
+                    self._append_row(entry["id"], entry["metadata"], alive)
+        self._alive = np.array(alive, dtype=bool)
+        self._open_matrix()
+        
+        centroids_path = self.root / "centroids.npy"
+        if centroids_path.exists() and self._info_path.exists():
+            self._centroids = np.load(centroids_path)
+            self._assign = np.load(self.root / "assignments.npy")
+            if len(self._assign) < len(self.ids):
+                self._assign_rows(len(self._assign))
+    
+    def _append_row(self, chunk_id: str, metadata: Dict[str, Any], alive: List[bool]):
+        previous = self._rows.get(chunk_id)
+        if previous is not None:
+            alive[previous] = False
+        self._rows[chunk_id] = len(self.ids)
+        self.ids.append(chunk_id)
+        self.metadatas.append(metadata)
+        alive.append(True)
+    
+    def _open_matrix(self):
+        n = len(self.ids)
+        if n and self.dim:
+            self._matrix = np.memmap(self._vectors_path, dtype=np.float32, mode="r", shape=(n, self.dim))
+        else:
+            self._matrix = None
+    
+    def _save_info(self):
+        self._info_path.write_text(json.dumps({"dim": self.dim, "trained_rows": self._trained_rows}))
+    
+    # --- writes ---
+    
+    def add(self, ids: List[str], embeddings: np.ndarray, metadatas: List[Dict[str, Any]]):
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+        if len(ids) == 0:
+            return
+        with self._lock:
+            if self.dim is None:
+                self.dim = embeddings.shape[1]
+                self._save_info()
+            elif embeddings.shape[1] != self.dim:
+                raise ValueError(f"Embedding dimension {embeddings.shape[1]} != index dimension {self.dim}")
+            
+            with open(self._vectors_path, "ab") as f:
+                f.write(embeddings.tobytes())
+            with open(self._meta_path, "a") as f:
+                for chunk_id, metadata in zip(ids, metadatas):
+                    f.write(json.dumps({"id": chunk_id, "metadata": metadata}) + "\n")
+            
+            start = len(self.ids)
+            alive = self._alive.tolist()
+            for chunk_id, metadata in zip(ids, metadatas):
+                self._append_row(chunk_id, metadata, alive)
+            self._alive = np.array(alive, dtype=bool)
+            self._open_matrix()
+            
+            self._postings.clear()
+            self._bitmaps.clear()
+            self._columns.clear()
+            self._update_ivf(start)
+    
+    # --- IVF ---
+    
+    def _use_ivf(self) -> bool:
+        return self.index_type == "ivf" and self._centroids is not None
+    
+    def _update_ivf(self, new_start: int):
+        if self.index_type != "ivf" or len(self.ids) < IVF_MIN_ROWS:
+            return
+        if self._centroids is None or len(self.ids) >= 2 * self._trained_rows:
+            self.train()
+        else:
+            self._assign_rows(new_start)
+            np.save(self.root / "assignments.npy", self._assign)
+    
+    def train(self):
+        """(Re)build IVF centroids and list assignments over all rows."""
+        n = len(self.ids)
+        nlist = self.nlist or int(4 * np.sqrt(n))
+        nlist = max(1, min(nlist, n))
+        logger.info(f"Training IVF index: {n} rows, {nlist} lists")
+        
+        self._centroids = train_kmeans(self._matrix, nlist)
+        self._assign = np.zeros(0, dtype=np.int32)
+        self._assign_rows(0)
+        self._trained_rows = n
+        np.save(self.root / "centroids.npy", self._centroids)
+        np.save(self.root / "assignments.npy", self._assign)
+        self._save_info()
+    
+    def _assign_rows(self, start: int):
+        parts = [self._assign[:start]]
+        for s in range(start, len(self.ids), _ASSIGN_BATCH):
+            block = np.asarray(self._matrix[s:s + _ASSIGN_BATCH])
+            parts.append(np.argmax(block @ self._centroids.T, axis=1).astype(np.int32))
+        self._assign = np.concatenate(parts)
+        self._lists = None
+    
+    def _inverted_lists(self) -> Tuple[np.ndarray, np.ndarray]:
+        if self._lists is None:
+            order = np.argsort(self._assign, kind="stable")
+            bounds = np.searchsorted(self._assign[order], np.arange(len(self._centroids) + 1))
+            self._lists = (order, bounds)
+        return self._lists
+    
+    def _probe(self, query: np.ndarray) -> np.ndarray:
+        order, bounds = self._inverted_lists()
+        nprobe = min(self.nprobe, len(self._centroids))
+        probes = np.argpartition(-(self._centroids @ query), nprobe - 1)[:nprobe]
+        return np.sort(np.concatenate([order[bounds[c]:bounds[c + 1]] for c in probes]))
+    
+    # --- filtering ---
+    
+    def _bitmap(self, field: str, value: Any) -> np.ndarray:
+        key = (field, value)
+        if key not in self._bitmaps:
+            if field not in self._postings:
+                postings: Dict[Any, List[int]] = {}
+                for row, metadata in enumerate(self.metadatas):
+                    if field in metadata:
+                        postings.setdefault(metadata[field], []).append(row)
+                self._postings[field] = postings
+            bitmap = np.zeros(len(self.ids), dtype=bool)
+            bitmap[self._postings[field].get(value, [])] = True
+            self._bitmaps[key] = bitmap
+        return self._bitmaps[key]
+    
+    def _column(self, field: str) -> np.ndarray:
+        if field not in self._columns:
+            values = [m.get(field) for m in self.metadatas]
+            self._columns[field] = np.array(
+                [v if isinstance(v, (int, float)) and not isinstance(v, bool) else np.nan for v in values],
+                dtype=np.float64
+            )
+        return self._columns[field]
+    
+    def _condition(self, field: str, op: str, value: Any) -> np.ndarray:
+        if op == "$eq":
+            return self._bitmap(field, value)
+        if op == "$ne":
+            return ~self._bitmap(field, value)
+        if op == "$in":
+            return np.logical_or.reduce([self._bitmap(field, v) for v in value] or [np.zeros(len(self.ids), bool)])
+        if op == "$nin":
+            return ~self._condition(field, "$in", value)
+        
+        column = self._column(field)
+        with np.errstate(invalid="ignore"):
+            if op == "$gt":
+                return column > value
+            if op == "$gte":
+                return column >= value
+            if op == "$lt":
+                return column < value
+            if op == "$lte":
+                return column <= value
+        raise ValueError(f"Unsupported filter operator: {op}")
+    
+    def _evaluate(self, where: Dict) -> np.ndarray:
+        masks = []
+        for key, condition in where.items():
+            if key == "$and":
+                masks.append(np.logical_and.reduce([self._evaluate(c) for c in condition]))
+            elif key == "$or":
+                masks.append(np.logical_or.reduce([self._evaluate(c) for c in condition]))
+            elif isinstance(condition, dict):
+                masks.extend(self._condition(key, op, v) for op, v in condition.items())
+            else:
+                masks.append(self._bitmap(key, condition))
+        return np.logical_and.reduce(masks)
+    
+    # --- reads ---
+    
+    def query(
+        self,
+        embedding: np.ndarray,
+        top_k: int,
+        where: Optional[Dict] = None
+    ) -> List[SearchHit]:
+        query = np.asarray(embedding, dtype=np.float32)
+        with self._lock:
+            if self._matrix is None:
+                return []
+            mask = self._alive & self._evaluate(where) if where else self._alive
+            
+            candidates = None
+            if self._use_ivf():
+                probed = self._probe(query)
+                probed = probed[mask[probed]]
+                # Highly selective filters can empty the probed lists; scan the filtered rows instead
+                if len(probed) >= top_k:
+                    candidates = probed
+            if candidates is None:
+                candidates = np.flatnonzero(mask)
+            if len(candidates) == 0:
+                return []
+            
+            if len(candidates) == len(self.ids):
+                scores = self._matrix @ query
+            else:
+                scores = self._matrix[candidates] @ query
+            
+            k = min(top_k, len(candidates))
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            return [
+                (self.ids[candidates[i]], float(scores[i]), self.metadatas[candidates[i]])
+                for i in top
+            ]
+    
+    def count(self) -> int:
+        return int(self._alive.sum())
+    
+    def get_embeddings(self, ids: List[str]) -> np.ndarray:
+        with self._lock:
+            if not ids:
+                return np.zeros((0, self.dim or 0), dtype=np.float32)
+            return np.asarray(self._matrix[[self._rows[i] for i in ids]])
@@ -0,0 +1,55 @@
+"""Maximal marginal relevance selection over embedding matrices."""
+
+from typing import List, Optional
+
+import numpy as np
+
+
+def mmr_select(
+    query: np.ndarray,
+    candidates: np.ndarray,
+    k: int,
+    lambda_mult: float = 0.5,
+    relevance: Optional[np.ndarray] = None,
+) -> List[int]:
+    """
+    Pick k candidate rows balancing relevance against redundancy.
+    
+    Each step takes argmax(lambda * sim(q, d) - (1 - lambda) * max sim(d, selected)).
+    The candidate similarity matrix is computed once and the running
+    max-similarity vector is updated in place, so the cost is one matrix
+    product plus k vector ops.
+    
+    Args:
+        query: (dim,) unit query embedding
+        candidates: (n, dim) unit candidate embeddings
+        k: number of rows to select
+        lambda_mult: 1.0 = pure relevance, 0.0 = pure diversity
+        relevance: precomputed query similarities (defaults to candidates @ query)
+    
+    Returns:
+        Selected row indices in selection order
+    """
+    n = len(candidates)
+    if n == 0 or k <= 0:
+        return []
+    candidates = np.asarray(candidates, dtype=np.float32)
+    if relevance is None:
+        relevance = candidates @ np.asarray(query, dtype=np.float32)
+    relevance = np.asarray(relevance, dtype=np.float32)
+    
+    similarity = candidates @ candidates.T
+    first = int(np.argmax(relevance))
+    selected = [first]
+    available = np.ones(n, dtype=bool)
+    available[first] = False
+    max_similarity = similarity[first].copy()
+    
+    for _ in range(min(k, n) - 1):
+        scores = lambda_mult * relevance - (1 - lambda_mult) * max_similarity
+        scores[~available] = -np.inf
+        best = int(np.argmax(scores))
+        selected.append(best)
+        available[best] = False
+        np.maximum(max_similarity, similarity[best], out=max_similarity)
+    return selected
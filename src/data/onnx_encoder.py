@@ -0,0 +1,161 @@
+"""ONNX Runtime sentence encoder with optional int8 dynamic quantization."""
+
+import json
+from pathlib import Path
+from typing import List, Optional, Union
+
+import numpy as np
+
+from src.config.settings import settings
+from src.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+def export_onnx(model_name: str, output_dir: Path) -> Path:
+    """Export a SentenceTransformer's transformer to ONNX with its tokenizer and pooling mode."""
+    import torch
+    from sentence_transformers import SentenceTransformer
+    
+    output_dir.mkdir(parents=True, exist_ok=True)
+    model = SentenceTransformer(model_name, device="cpu")
+    transformer = model[0].auto_model.eval()
+    # Older sentence-transformers expose one boolean per mode, newer ones a single key
+    pooling = model[1].get_config_dict()
+    cls_pooling = pooling.get("pooling_mode_cls_token") or pooling.get("pooling_mode") == "cls"
+    mode = "cls" if cls_pooling else "mean"
+    
+    dummy = model.tokenizer(["AlphaEdge export"], return_tensors="pt")
+    input_names = [n for n in ("input_ids", "attention_mask", "token_type_ids") if n in dummy]
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+    
+    class _Encoder(torch.nn.Module):
+        # Binds inputs by name; forward() positional order varies across transformers releases
+        def __init__(self, model):
+            super().__init__()
+            self.model = model
+        
+        def forward(self, *inputs):
+            return self.model(**dict(zip(input_names, inputs)), return_dict=True).last_hidden_state
+    
+    path = output_dir / "model.onnx"
+    logger.info(f"Exporting {model_name} to ONNX: {path}")
+    with torch.no_grad():
+        torch.onnx.export(
+            _Encoder(transformer),
+            tuple(dummy[name] for name in input_names),
+            str(path),
+            input_names=input_names,
+            output_names=["last_hidden_state"],
+            dynamic_axes=dynamic_axes,
+            opset_version=17,
+            dynamo=False,
+        )
+    
+    model.tokenizer.save_pretrained(output_dir)
+    (output_dir / "pooling.json").write_text(json.dumps({
+        "mode": mode,
+        "max_seq_length": model.max_seq_length,
+    }))
+    return path
+
+
+def quantize_onnx(fp32_path: Path, int8_path: Path) -> Path:
+    """Dynamically quantize weights to int8 (activations stay fp32)."""
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    
+    logger.info(f"Quantizing {fp32_path} to int8: {int8_path}")
+    quantize_dynamic(str(fp32_path), str(int8_path), weight_type=QuantType.QInt8)
+    return int8_path
+
+
+class OnnxEncoder:
+    """
+    Drop-in replacement for SentenceTransformer.encode on ONNX Runtime.
+    
+    The model is exported once to `settings.embedding_onnx_dir` and reused;
+    pooling mode and max sequence length come from the source model so
+    outputs match the torch path.
+    """
+    
+    def __init__(
+        self,
+        model_name: str,
+        quantize: bool = False,
+        intra_op_threads: int = 0,
+        cache_dir: Optional[str] = None,
+        batch_size: int = 32,
+    ):
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+        
+        self.model_dir = Path(cache_dir or settings.embedding_onnx_dir) / model_name.strip("/").replace("/", "__")
+        self.batch_size = batch_size
+        self.quantized = quantize
+        
+        fp32_path = self.model_dir / "model.onnx"
+        if not fp32_path.exists():
+            export_onnx(model_name, self.model_dir)
+        model_path = fp32_path
+        if quantize:
+            model_path = self.model_dir / "model.int8.onnx"
+            if not model_path.exists():
+                quantize_onnx(fp32_path, model_path)
+        
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if intra_op_threads:
+            options.intra_op_num_threads = intra_op_threads
+        self.session = ort.InferenceSession(
+            str(model_path), options, providers=["CPUExecutionProvider"]
+        )
+        self._input_names = {i.name for i in self.session.get_inputs()}
+        
+        self.tokenizer = AutoTokenizer.from_pretrained(self.model_dir)
+        pooling = json.loads((self.model_dir / "pooling.json").read_text())
+        self.pooling_mode = pooling["mode"]
+        self.max_seq_length = pooling["max_seq_length"]
+    
+    def _pool(self, hidden: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+        if self.pooling_mode == "cls":
+            return hidden[:, 0]
+        mask = attention_mask[..., None].astype(hidden.dtype)
+        return (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+    
+    def encode(
+        self,
+        sentences: Union[str, List[str]],
+        normalize_embeddings: bool = False,
+        batch_size: Optional[int] = None,
+        **kwargs,
+    ) -> np.ndarray:
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+        
+        batch_size = batch_size or self.batch_size
+        # Length-sorted batches keep padding (and wasted FLOPs) low
+        order = np.argsort([-len(t) for t in texts], kind="stable")
+        outputs = [None] * len(texts)
+        
+        for start in range(0, len(texts), batch_size):
+            idx = order[start:start + batch_size]
+            encoded = self.tokenizer(
+                [texts[i] for i in idx],
+                padding=True,
+                truncation=True,
+                max_length=self.max_seq_length,
+                return_tensors="np",
+            )
+            feeds = {k: v.astype(np.int64) for k, v in encoded.items() if k in self._input_names}
+            hidden = self.session.run(["last_hidden_state"], feeds)[0]
+            pooled = self._pool(hidden, encoded["attention_mask"])
+            for i, row in zip(idx, pooled):
+                outputs[i] = row
+        
+        embeddings = np.vstack(outputs).astype(np.float32)
+        if normalize_embeddings:
+            embeddings /= np.clip(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12, None)
+        return embeddings[0] if single else embeddings
@@ -0,0 +1,339 @@
+"""
+Tiered cache for OpenBB provider responses.
+
+Responses are normalized to JSON records, kept in an in-process LRU and
+optionally in a shared Redis tier, and expire per endpoint.
+"""
+
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from src.config.constants import OPENBB_CACHE_DEFAULT_POLICY, OPENBB_CACHE_POLICIES
+from src.config.settings import settings
+from src.utils.logging import get_logger
+from src.utils.telemetry import get_tracer
+
+logger = get_logger(__name__)
+tracer = get_tracer("data.openbb")
+
+# Seconds the shared tier is skipped after it fails
+SHARED_RETRY_SECONDS = 60
+
+# Resolves a ticker's hard expiry (epoch seconds), awaited only when an entry is stored
+ExpiresBy = Callable[[str], Awaitable[Optional[float]]]
+
+
+def to_records(response: Any) -> List[Dict]:
+    """Provider response (OBBject, model or list of models) as JSON-compatible dicts."""
+    results = getattr(response, "results", response)
+    if results is None:
+        return []
+    if not isinstance(results, list):
+        results = [results]
+    rows = [r.model_dump() if hasattr(r, "model_dump") else dict(r) for r in results]
+    return json.loads(json.dumps(rows, default=str))
+
+
+@dataclass
+class CacheEntry:
+    records: List[Dict]
+    expires_at: float
+    stale_until: float
+    
+    def to_json(self) -> str:
+        return json.dumps([self.records, self.expires_at, self.stale_until])
+    
+    @classmethod
+    def from_json(cls, data: str) -> "CacheEntry":
+        return cls(*json.loads(data))
+
+
+class RedisTier:
+    """Shared tier: entries as JSON under hashed keys, evicted when their stale window ends."""
+    
+    def __init__(self, url: str):
+        import redis.asyncio as redis
+        self._client = redis.from_url(url)
+    
+    @staticmethod
+    def _key(key: str) -> str:
+        return "openbb:" + hashlib.sha256(key.encode("utf-8")).hexdigest()
+    
+    async def get(self, key: str) -> Optional[CacheEntry]:
+        data = await self._client.get(self._key(key))
+        return CacheEntry.from_json(data) if data else None
+    
+    async def put(self, key: str, entry: CacheEntry):
+        ttl = max(int(entry.stale_until - time.time()), 1)
+        await self._client.set(self._key(key), entry.to_json(), ex=ttl)
+
+
+class OpenBBCache:
+    """
+    Cache of OpenBB responses keyed by (endpoint, ticker, params).
+    
+    Entries are fresh for their endpoint's TTL, then stale for a further
+    window in which a lookup revalidates them: if the provider answers
+    within OPENBB_STALE_WAIT_SECONDS the new data is returned, otherwise
+    the stale data is and the refresh completes in the background.
+    Entries stored with an `expires_by` (the next earnings release, for
+    fundamentals) expire then and are never served stale past it; it is
+    resolved only when the provider was actually called.
+    Concurrent lookups of the same key share one provider call.
+    """
+    
+    def __init__(self, shared=None, memory_size: Optional[int] = None):
+        self.shared = shared
+        self.memory_size = memory_size or settings.openbb_cache_memory_size
+        self._memory: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self._shared_down_until = 0.0
+        self.stats = {"hits": 0, "stale_served": 0, "revalidated": 0, "misses": 0, "fetches": 0, "batched_fetches": 0, "shared_errors": 0}
+    
+    @staticmethod
+    def key(endpoint: str, ticker: str, params: Dict) -> str:
+        return json.dumps([endpoint, ticker, params], sort_keys=True, default=str)
+    
+    async def fetch(
+        self,
+        endpoint: str,
+        ticker: str,
+        call: Callable,
+        expires_by: Optional[ExpiresBy] = None,
+        **params
+    ) -> List[SimpleNamespace]:
+        """
+        Records for `call(ticker, **params)`, from cache when possible.
+        
+        `call` is a blocking provider function; it runs in a worker thread.
+        Provider errors propagate unless stale data can answer instead.
+        """
+        if not settings.openbb_cache_enabled:
+            return _namespaces(to_records(await asyncio.to_thread(call, ticker, **params)))
+        
+        key = self.key(endpoint, ticker, params)
+        entry = await self._lookup(key)
+        now = time.time()
+        if entry is not None and now < entry.expires_at:
+            self.stats["hits"] += 1
+            return _namespaces(entry.records)
+        
+        refresh = self._refresh(key, endpoint, call, ticker, params, expires_by)
+        if entry is not None and now < entry.stale_until:
+            try:
+                records = await asyncio.wait_for(asyncio.shield(refresh), settings.openbb_stale_wait_seconds)
+            except Exception:
+                # Slow or failing provider: answer now, the refresh lands in the background
+                self.stats["stale_served"] += 1
+                return _namespaces(entry.records)
+            self.stats["revalidated"] += 1
+            return _namespaces(records)
+        
+        self.stats["misses"] += 1
+        return _namespaces(await refresh)
+    
+    async def _lookup(self, key: str) -> Optional[CacheEntry]:
+        entry = self._memory.get(key)
+        if entry is not None:
+            self._memory.move_to_end(key)
+            if time.time() < entry.expires_at:
+                return entry
+        
+        # Another process may hold a fresher copy
+        shared = await self._shared("get", key)
+        if shared is not None and (entry is None or shared.expires_at > entry.expires_at):
+            self._remember(key, shared)
+            return shared
+        return entry
+    
+    def _refresh(self, key, endpoint, call, ticker, params, expires_by) -> asyncio.Task:
+        task = self._in_flight.get(key)
+        if task is None:
+            task = self._track(key, asyncio.ensure_future(self._load(key, endpoint, call, ticker, params, expires_by)))
+        return task
+    
+    def _track(self, key: str, task: asyncio.Future) -> asyncio.Future:
+        """Register `task` as the in-flight load of `key` until it completes."""
+        self._in_flight[key] = task
+        task.add_done_callback(lambda t: self._in_flight.pop(key, None) if self._in_flight.get(key) is t else None)
+        # Background refreshes may fail with no caller left to see it
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        return task
+    
+    async def _load(self, key, endpoint, call, ticker, params, expires_by) -> List[Dict]:
+        with tracer.start_as_current_span("openbb.fetch") as span:
+            span.set_attribute("openbb.endpoint", endpoint)
+            span.set_attribute("openbb.ticker", ticker)
+            records = to_records(await asyncio.to_thread(call, ticker, **params))
+            span.set_attribute("openbb.record_count", len(records))
+        await self._store(key, endpoint, ticker, records, expires_by)
+        self.stats["fetches"] += 1
+        return records
+    
+    async def fetch_many(
+        self,
+        endpoint: str,
+        tickers: List[str],
+        call: Callable,
+        expires_by: Optional[ExpiresBy] = None,
+        **params
+    ) -> Dict[str, List[SimpleNamespace]]:
+        """
+        Records for several tickers from one `call("T1,T2,...", **params)`
+        for those not fresh in cache, split back per ticker by `symbol`
+        and cached under the same keys `fetch` uses.
+        
+        Tickers the provider returns nothing for are left out (and
+        uncached) so a per-ticker `fetch` can still try them; on provider
+        errors, stale entries answer where they exist. Each due key is
+        registered in flight, so a concurrent `fetch` of it waits for the
+        batch instead of calling the provider again (and a key already
+        in flight is awaited rather than batched).
+        """
+        if not settings.openbb_cache_enabled:
+            # Nowhere to keep per-ticker results; callers fetch individually
+            return {}
+        results: Dict[str, List[Dict]] = {}
+        due: Dict[str, Optional[CacheEntry]] = {}
+        pending: Dict[str, Tuple[asyncio.Future, Optional[CacheEntry]]] = {}
+        for ticker in dict.fromkeys(tickers):
+            key = self.key(endpoint, ticker, params)
+            entry = await self._lookup(key)
+            if entry is not None and time.time() < entry.expires_at:
+                self.stats["hits"] += 1
+                results[ticker] = entry.records
+            elif key in self._in_flight:
+                pending[ticker] = (self._in_flight[key], entry)
+            else:
+                due[ticker] = entry
+        
+        if due:
+            batch = asyncio.ensure_future(self._load_many(endpoint, list(due), call, params, expires_by))
+            for ticker, entry in due.items():
+                task = self._track(self.key(endpoint, ticker, params), asyncio.ensure_future(_pick(batch, ticker)))
+                pending[ticker] = (task, entry)
+        
+        for ticker, (task, entry) in pending.items():
+            try:
+                results[ticker] = await task
+            except LookupError:
+                continue
+            except Exception:
+                if entry is not None and time.time() < entry.stale_until:
+                    self.stats["stale_served"] += 1
+                    results[ticker] = entry.records
+        
+        return {ticker: _namespaces(rows) for ticker, rows in results.items()}
+    
+    async def _load_many(self, endpoint, tickers, call, params, expires_by) -> Dict[str, List[Dict]]:
+        """One `call("T1,T2,...")`, split by `symbol` and stored per ticker."""
+        try:
+            with tracer.start_as_current_span("openbb.fetch_many") as span:
+                span.set_attribute("openbb.endpoint", endpoint)
+                span.set_attribute("openbb.tickers", ",".join(tickers))
+                records = to_records(await asyncio.to_thread(call, ",".join(tickers), **params))
+                span.set_attribute("openbb.record_count", len(records))
+        except Exception as e:
+            logger.warning(f"Batched OpenBB {endpoint} fetch failed for {','.join(tickers)}: {e}")
+            raise
+        
+        by_symbol: Dict[str, List[Dict]] = {}
+        for record in records:
+            by_symbol.setdefault(str(record.get("symbol", "")).upper(), []).append(record)
+        found = {ticker: by_symbol[ticker.upper()] for ticker in tickers if ticker.upper() in by_symbol}
+        # Expiry lookups (one shared earnings calendar, for fundamentals) run together
+        await asyncio.gather(*(
+            self._store(self.key(endpoint, ticker, params), endpoint, ticker, rows, expires_by)
+            for ticker, rows in found.items()
+        ))
+        self.stats["fetches"] += 1
+        self.stats["batched_fetches"] += 1
+        return found
+    
+    async def _store(
+        self,
+        key: str,
+        endpoint: str,
+        ticker: str,
+        records: List[Dict],
+        expires_by: Optional[ExpiresBy]
+    ):
+        deadline = None
+        if expires_by is not None:
+            try:
+                deadline = await expires_by(ticker)
+            except Exception as e:
+                logger.warning(f"OpenBB {endpoint} expiry lookup failed for {ticker}: {e}")
+        fresh, stale = OPENBB_CACHE_POLICIES.get(endpoint, OPENBB_CACHE_DEFAULT_POLICY)
+        now = time.time()
+        entry = CacheEntry(records, now + fresh, now + fresh + stale)
+        if deadline is not None and now < deadline < entry.stale_until:
+            entry.expires_at = min(entry.expires_at, deadline)
+            entry.stale_until = deadline
+        
+        self._remember(key, entry)
+        await self._shared("put", key, entry)
+    
+    def _remember(self, key: str, entry: CacheEntry):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+    
+    async def _shared(self, op: str, *args):
+        """Run a shared-tier operation; the cache keeps working in-process if the tier is down."""
+        if self.shared is None or time.time() < self._shared_down_until:
+            return None
+        try:
+            return await getattr(self.shared, op)(*args)
+        except Exception as e:
+            self.stats["shared_errors"] += 1
+            self._shared_down_until = time.time() + SHARED_RETRY_SECONDS
+            logger.warning(f"OpenBB shared cache {op} failed, using memory only for {SHARED_RETRY_SECONDS}s: {e}")
+            return None
+    
+    def clear(self):
+        self._memory.clear()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "memory_entries": len(self._memory),
+            "in_flight": len(self._in_flight),
+            "shared": self.shared is not None,
+        }
+
+
+def _namespaces(records: List[Dict]) -> List[SimpleNamespace]:
+    return [SimpleNamespace(**r) for r in records]
+
+
+async def _pick(batch: asyncio.Future, ticker: str) -> List[Dict]:
+    """One ticker's records from a batched load; LookupError if the provider returned none."""
+    found = await batch
+    if ticker not in found:
+        raise LookupError(f"No records for {ticker} in batched response")
+    return found[ticker]
+
+
+_openbb_cache = None
+
+
+def get_openbb_cache() -> OpenBBCache:
+    """Get or create the shared OpenBB cache (with a Redis tier when REDIS_URL is set)."""
+    global _openbb_cache
+    if _openbb_cache is None:
+        shared = None
+        if settings.redis_url:
+            try:
+                shared = RedisTier(settings.redis_url)
+            except ImportError:
+                logger.warning("REDIS_URL is set but redis is not installed; OpenBB cache is in-process only")
+        _openbb_cache = OpenBBCache(shared=shared)
+    return _openbb_cache
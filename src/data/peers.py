@@ -0,0 +1,146 @@
+"""
+Vectorized peer comparison over the fundamentals table.
+
+Derived ratios, growth, ranks, percentiles and deltas to the peer median
+are computed for every ticker at once, and rendered as one compact table
+so the LLM reads the comparison instead of doing the arithmetic.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.guardrails.schemas import RetrievedContext
+
+PEER_SOURCE_ID = "computed-peer-comparison"
+
+# Ratio metrics: name -> (numerator field, denominator field)
+RATIOS: Dict[str, Tuple[str, str]] = {
+    "gross_margin": ("gross_profit", "revenue"),
+    "operating_margin": ("operating_income", "revenue"),
+    "net_margin": ("net_income", "revenue"),
+    "fcf_margin": ("free_cash_flow", "revenue"),
+    "debt_to_equity": ("total_debt", "total_equity"),
+}
+# Growth metrics: name -> (current field, prior-year field)
+GROWTH: Dict[str, Tuple[str, str]] = {
+    "revenue_growth": ("revenue", "revenue_prior"),
+    "net_income_growth": ("net_income", "net_income_prior"),
+}
+# Compared metrics, in table order: (column, label, format, higher is better)
+# Formats: money, pct (already percent), fraction (shown as percent), ratio
+PEER_METRICS: List[Tuple[str, str, str, bool]] = [
+    ("market_cap", "Market Cap", "money", True),
+    ("revenue", "Revenue", "money", True),
+    ("revenue_growth", "Revenue Growth", "pct", True),
+    ("net_income_growth", "Net Income Growth", "pct", True),
+    ("gross_margin", "Gross Margin", "pct", True),
+    ("operating_margin", "Operating Margin", "pct", True),
+    ("net_margin", "Net Margin", "pct", True),
+    ("fcf_margin", "FCF Margin", "pct", True),
+    ("return_on_equity", "ROE", "fraction", True),
+    ("pe_ratio", "P/E", "ratio", False),
+    ("price_to_sales_ratio", "P/S", "ratio", False),
+    ("ev_to_ebitda", "EV/EBITDA", "ratio", False),
+    ("debt_to_equity", "Debt/Equity", "ratio", False),
+]
+
+
+def _divide(numerator: pd.Series, denominator: pd.Series) -> pd.Series:
+    return numerator / denominator.where(denominator != 0)
+
+
+def derive(frame: pd.DataFrame) -> pd.DataFrame:
+    """The comparable metrics (PEER_METRICS columns that can be computed) per ticker."""
+    frame = frame.copy()
+    for name, (numerator, denominator) in RATIOS.items():
+        if numerator in frame and denominator in frame:
+            ratio = _divide(frame[numerator], frame[denominator])
+            frame[name] = ratio if name == "debt_to_equity" else ratio * 100
+    for name, (current, prior) in GROWTH.items():
+        if current in frame and prior in frame:
+            frame[name] = (_divide(frame[current], frame[prior].abs()) - np.sign(frame[prior])) * 100
+    columns = [column for column, *_ in PEER_METRICS if column in frame and frame[column].notna().any()]
+    return frame[columns]
+
+
+def compare(frame: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    """
+    Comparison of every metric across the tickers in `frame`:
+    "values", "rank" (1 = best), "percentile" (0-100, higher = better)
+    and "delta" (value minus the peer median), each ticker x metric.
+    """
+    values = derive(frame)
+    better = {column: higher for column, _, _, higher in PEER_METRICS if column in values}
+    oriented = values * pd.Series({c: 1.0 if h else -1.0 for c, h in better.items()})
+    return {
+        "values": values,
+        "rank": oriented.rank(ascending=False, method="min"),
+        "percentile": oriented.rank(pct=True) * 100,
+        "delta": values - values.median(),
+    }
+
+
+def _format(value: float, kind: str) -> str:
+    if pd.isna(value):
+        return "n/a"
+    if kind == "money":
+        for threshold, suffix in ((1e12, "T"), (1e9, "B"), (1e6, "M")):
+            if abs(value) >= threshold:
+                return f"${value / threshold:,.1f}{suffix}"
+        return f"${value:,.0f}"
+    if kind == "pct":
+        return f"{value:.1f}%"
+    if kind == "fraction":
+        return f"{value * 100:.1f}%"
+    return f"{value:.2f}"
+
+
+def comparison_text(frame: pd.DataFrame) -> Optional[str]:
+    """Compact peer table, or None when fewer than two tickers have comparable figures."""
+    if len(frame) < 2:
+        return None
+    result = compare(frame)
+    values, rank, delta = result["values"], result["rank"], result["delta"]
+    if values.empty:
+        return None
+    
+    tickers = list(values.index)
+    lines = [
+        f"Peer comparison of {len(tickers)} companies (#rank among peers, 1 = best; "
+        "margins and growth also vs peer median)",
+        " | ".join(["Metric", *tickers, "Median"]),
+    ]
+    for column, label, kind, _ in PEER_METRICS:
+        if column not in values:
+            continue
+        cells = []
+        for ticker in tickers:
+            value = values.at[ticker, column]
+            cell = _format(value, kind)
+            if not pd.isna(value):
+                cell += f" #{int(rank.at[ticker, column])}"
+                if kind == "pct":
+                    cell += f" ({delta.at[ticker, column]:+.1f}pp)"
+            cells.append(cell)
+        lines.append(" | ".join([label, *cells, _format(values[column].median(), kind)]))
+    
+    leaders = result["percentile"].mean(axis=1).sort_values(ascending=False)
+    lines.append("Average percentile across metrics: " + ", ".join(
+        f"{ticker} {score:.0f}" for ticker, score in leaders.items()
+    ))
+    return "\n".join(lines)
+
+
+def peer_context(store, tickers: List[str]) -> Optional[RetrievedContext]:
+    """The peer table for `tickers` from a FundamentalsStore, as a retrieved context."""
+    text = comparison_text(store.frame(tickers))
+    if text is None:
+        return None
+    return RetrievedContext(
+        source_id=PEER_SOURCE_ID,
+        text=text,
+        relevance_score=0.92,
+        metadata={"type": "financial_data", "tickers": list(tickers)}
+    )
@@ -0,0 +1,268 @@
+"""Local daily price history: one memory-mapped Arrow file per ticker, refreshed incrementally."""
+
+import asyncio
+import os
+import threading
+import time
+from datetime import date
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from src.config.settings import settings
+from src.utils.logging import get_logger
+from src.utils.telemetry import get_tracer
+
+logger = get_logger(__name__)
+tracer = get_tracer("data.prices")
+
+COLUMNS = ["open", "high", "low", "close", "volume"]
+SCHEMA = pa.schema([("date", pa.date32())] + [(column, pa.float64()) for column in COLUMNS])
+
+
+def _normalize(bars: pd.DataFrame) -> pd.DataFrame:
+    """Provider bars (date index or column) as date + OHLCV columns, one row per date, oldest first."""
+    if "date" not in bars.columns:
+        bars = bars.rename_axis("date").reset_index()
+    frame = pd.DataFrame({"date": pd.to_datetime(bars["date"]).dt.date})
+    for column in COLUMNS:
+        frame[column] = pd.to_numeric(bars[column], errors="coerce") if column in bars else np.nan
+    return frame.dropna(subset=["close"]).drop_duplicates("date", keep="last").sort_values("date")
+
+
+class PriceStore:
+    """
+    Daily OHLCV bars per ticker as Arrow IPC files under PRICE_STORE_DIR.
+    
+    Reads memory-map the file (no parse, no copy) and slice it by date
+    with a binary search; appends rewrite the file atomically, so readers
+    in other processes always see a complete file.
+    """
+    
+    def __init__(self, root: Optional[str] = None):
+        self.root = Path(root or settings.price_store_dir)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._tables: Dict[str, Tuple[Tuple[int, int], pa.Table]] = {}
+        self._lock = threading.Lock()
+    
+    def _path(self, ticker: str) -> Path:
+        return self.root / f"{ticker.upper()}.arrow"
+    
+    def table(self, ticker: str) -> Optional[pa.Table]:
+        """The ticker's bars, memory-mapped; re-mapped only when the file changes."""
+        path = self._path(ticker)
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+        version = (stat.st_ino, stat.st_mtime_ns)
+        cached = self._tables.get(ticker.upper())
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        with pa.memory_map(str(path)) as source:
+            table = pa.ipc.open_file(source).read_all()
+        self._tables[ticker.upper()] = (version, table)
+        return table
+    
+    def last_date(self, ticker: str) -> Optional[date]:
+        table = self.table(ticker)
+        if table is None or table.num_rows == 0:
+            return None
+        return table.column("date")[-1].as_py()
+    
+    def append(self, ticker: str, bars: pd.DataFrame) -> int:
+        """
+        Add bars, replacing stored ones from the first new date on (so a
+        re-fetched last day picks up revisions); returns the count of
+        dates that were not stored before.
+        """
+        bars = _normalize(bars)
+        if bars.empty:
+            return 0
+        with self._lock:
+            existing = self.table(ticker)
+            last = self.last_date(ticker)
+            new = pa.Table.from_pandas(bars, schema=SCHEMA, preserve_index=False)
+            if existing is not None:
+                keep = int(np.searchsorted(existing.column("date").to_numpy(), np.datetime64(bars["date"].iloc[0])))
+                new = pa.concat_tables([existing.slice(0, keep), new])
+            
+            path = self._path(ticker)
+            tmp = path.with_suffix(".arrow.tmp")
+            with pa.OSFile(str(tmp), "wb") as sink, pa.ipc.new_file(sink, SCHEMA) as writer:
+                writer.write_table(new)
+            os.replace(tmp, path)
+        return int((bars["date"] > last).sum()) if last is not None else len(bars)
+    
+    def history(self, ticker: str, start: Optional[date] = None) -> pd.DataFrame:
+        """OHLCV bars from `start` on, on a DatetimeIndex."""
+        table = self.table(ticker)
+        if table is None:
+            return pd.DataFrame(columns=COLUMNS, index=pd.DatetimeIndex([], name="date"))
+        if start is not None:
+            offset = int(np.searchsorted(table.column("date").to_numpy(), np.datetime64(start)))
+            table = table.slice(offset)
+        frame = table.to_pandas(date_as_object=False)
+        return frame.set_index(pd.DatetimeIndex(frame.pop("date"), name="date"))
+    
+    def panel(self, tickers: Iterable[str], start: Optional[date] = None) -> pd.DataFrame:
+        """Bars for several tickers on one date index; columns are (field, ticker)."""
+        frames = {ticker.upper(): self.history(ticker, start) for ticker in tickers}
+        frames = {ticker: frame for ticker, frame in frames.items() if not frame.empty}
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, axis=1).swaplevel(axis=1).sort_index(axis=1)
+    
+    def summary(self, tickers: Iterable[str], start: date) -> pd.DataFrame:
+        """
+        Per-ticker return, range and volume since `start`, computed across
+        all tickers at once; one row per ticker that has bars.
+        """
+        panel = self.panel(tickers, start)
+        if panel.empty:
+            return pd.DataFrame()
+        close = panel["close"]
+        valid = close.notna()
+        first = close.bfill().iloc[0]
+        last = close.ffill().iloc[-1]
+        return pd.DataFrame({
+            "start": valid.idxmax(),
+            "end": valid.iloc[::-1].idxmax(),
+            "close": last,
+            "return_pct": (last / first - 1) * 100,
+            "high": panel["high"].max(),
+            "low": panel["low"].min(),
+            "avg_volume": panel["volume"].mean(),
+        })
+    
+    def get_stats(self) -> Dict[str, int]:
+        files = list(self.root.glob("*.arrow"))
+        return {"tickers": len(files), "bytes": sum(f.stat().st_size for f in files)}
+
+
+def _openbb_history(ticker: str, start: str) -> pd.DataFrame:
+    from openbb import obb
+    return obb.equity.price.historical(ticker, start_date=start).to_dataframe()
+
+
+class PriceRefresher:
+    """
+    Keeps the price store current.
+    
+    A ticker is refreshed when its last bar is before today, at most once
+    per PRICE_REFRESH_SECONDS (failed fetches included); the fetch starts at the last stored day (or
+    PRICE_HISTORY_YEARS back on first load). Due tickers are fetched
+    together in one multi-symbol call, and concurrent refreshes of one
+    ticker share a single fetch.
+    """
+    
+    def __init__(
+        self,
+        store: Optional[PriceStore] = None,
+        fetch: Optional[Callable[[str, str], pd.DataFrame]] = None
+    ):
+        self.store = store or get_price_store()
+        # Blocking ("T1,T2,...", start ISO date) -> bars with a symbol column
+        # when several tickers are asked for; runs in a worker thread
+        self.fetch = fetch or _openbb_history
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self._checked: Dict[str, float] = {}
+        self.stats = {"refreshes": 0, "bars": 0, "errors": 0}
+    
+    def is_due(self, ticker: str) -> bool:
+        recently_checked = time.time() - self._checked.get(ticker.upper(), 0.0) < settings.price_refresh_seconds
+        if recently_checked:
+            return False
+        last = self.store.last_date(ticker)
+        return last is None or last < date.today()
+    
+    async def _refresh_batch(self, tickers: List[str]) -> Dict[str, int]:
+        """
+        One fetch for all `tickers` ("T1,T2,..." from the earliest start
+        among them), split back per ticker by the `symbol` column.
+        """
+        default_start = (pd.Timestamp.today() - pd.DateOffset(years=settings.price_history_years)).date()
+        starts = {ticker: self.store.last_date(ticker) or default_start for ticker in tickers}
+        start = min(starts.values())
+        with tracer.start_as_current_span("prices.refresh") as span:
+            span.set_attribute("prices.tickers", ",".join(tickers))
+            span.set_attribute("prices.start", start.isoformat())
+            try:
+                bars = await asyncio.to_thread(self.fetch, ",".join(tickers), start.isoformat())
+            except Exception as e:
+                self.stats["errors"] += 1
+                logger.error(f"Price refresh failed for {','.join(tickers)}: {e}")
+                # Counts as a check, so a failing provider is retried at most once per interval
+                now = time.time()
+                for ticker in tickers:
+                    self._checked[ticker] = now
+                return {ticker: 0 for ticker in tickers}
+            
+            if len(tickers) > 1 and "symbol" not in bars.columns:
+                # Provider returned an unlabeled frame; fall back to one fetch per ticker
+                counts = await asyncio.gather(*(self._refresh_batch([ticker]) for ticker in tickers))
+                return {ticker: count[ticker] for ticker, count in zip(tickers, counts)}
+            
+            counts = {}
+            for ticker in tickers:
+                part = bars[bars["symbol"].str.upper() == ticker] if "symbol" in bars.columns else bars
+                part = _normalize(part)
+                counts[ticker] = await asyncio.to_thread(
+                    self.store.append, ticker, part[part["date"] >= starts[ticker]]
+                )
+                self._checked[ticker] = time.time()
+            span.set_attribute("prices.new_bars", sum(counts.values()))
+            self.stats["refreshes"] += 1
+            self.stats["bars"] += sum(counts.values())
+            return counts
+    
+    async def refresh(self, tickers: Iterable[str], force: bool = False) -> Dict[str, int]:
+        """
+        Refresh due tickers (all with `force`) with one fetch for those not
+        already being refreshed; returns new bars per refreshed ticker.
+        """
+        tickers = [t.upper() for t in dict.fromkeys(tickers) if force or self.is_due(t)]
+        new = [ticker for ticker in tickers if ticker not in self._in_flight]
+        if new:
+            task = asyncio.ensure_future(self._refresh_batch(new))
+            for ticker in new:
+                self._in_flight[ticker] = task
+            
+            def release(done: asyncio.Task):
+                for ticker in new:
+                    if self._in_flight.get(ticker) is done:
+                        del self._in_flight[ticker]
+            
+            task.add_done_callback(release)
+        
+        tasks = list({id(task): task for task in (self._in_flight[ticker] for ticker in tickers)}.values())
+        counts: Dict[str, int] = {}
+        for result in await asyncio.gather(*tasks):
+            counts.update(result)
+        return {ticker: counts.get(ticker, 0) for ticker in tickers}
+    
+    def get_stats(self) -> Dict[str, int]:
+        return {**self.stats, **self.store.get_stats(), "in_flight": len(self._in_flight)}
+
+
+_price_store = None
+_price_refresher = None
+
+
+def get_price_store() -> PriceStore:
+    """Get or create the shared price store."""
+    global _price_store
+    if _price_store is None:
+        _price_store = PriceStore()
+    return _price_store
+
+
+def get_price_refresher() -> PriceRefresher:
+    """Get or create the shared price refresher."""
+    global _price_refresher
+    if _price_refresher is None:
+        _price_refresher = PriceRefresher()
+    return _price_refresher
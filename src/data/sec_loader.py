@@ -1,65 +1,122 @@
-from typing import List, Dict, Any
-from pathlib import Path
+from typing import List, Dict, Any, Optional
+import asyncio
 import re
 import html
-from sec_edgar_downloader import Downloader
 from src.data.chunking import DocumentChunker, Chunk
+from src.data.edgar_client import EdgarClient
+from src.data.filing_archive import FilingArchive, FilingRecord, filing_date_int, get_filing_archive
 from src.data.vector_store import get_vector_store
 from src.config.settings import settings
+from src.config.constants import SMALL_CHUNK_SIZE, SMALL_CHUNK_OVERLAP
 from src.utils.logging import get_logger
 
 logger = get_logger(__name__)
 
 
+def clean_filing_html(content: str) -> str:
+    """Strip tags and entities from a filing document."""
+    text = re.sub(r'<[^>]+>', ' ', content)
+    text = html.unescape(text)
+    return re.sub(r'\s+', ' ', text)
+
+
 class SECLoader:
-    def __init__(self):
-        self.downloader = Downloader()
-        self.chunker = DocumentChunker()
+    def __init__(self, archive: Optional[FilingArchive] = None):
+        self.archive = archive or get_filing_archive()
+        self.chunker = DocumentChunker(chunk_size=SMALL_CHUNK_SIZE, overlap=SMALL_CHUNK_OVERLAP)
         self.vector_store = get_vector_store()
     
+    async def adownload_filings(
+        self,
+        ticker: str,
+        filing_types: List[str] = ["10-K", "10-Q"],
+        limit: int = 5
+    ) -> List[FilingRecord]:
+        """Archive primary documents of the latest filings not already archived."""
+        ticker = ticker.upper()
+        try:
+            async with EdgarClient() as client:
+                fetched = await client.fetch_new_filings(
+                    ticker,
+                    filing_types,
+                    limit,
+                    known_accessions=self.archive.accessions(ticker)
+                )
+            
+            records = []
+            for filing, content in fetched:
+                records.append(self.archive.put(
+                    ticker=filing.ticker,
+                    form=filing.form,
+                    accession_number=filing.accession_number,
+                    raw=content,
+                    clean=clean_filing_html(content.decode("utf-8", errors="ignore")),
+                    filing_date=filing.filing_date,
+                    period=filing.report_date,
+                    primary_document=filing.primary_document,
+                ))
+            return records
+        except Exception as e:
+            logger.error(f"Failed to download filings for {ticker}: {e}")
+            return []
+    
     def download_filings(
         self,
         ticker: str,
         filing_types: List[str] = ["10-K", "10-Q"],
         limit: int = 5
-    ) -> List[Path]:
-        files = []
-        for filing_type in filing_types:
-            try:
-                self.downloader.get(filing_type, ticker, amount=limit)
-                # Find downloaded files
-                base = Path(f"sec-edgar-filings/{ticker}/{filing_type}")
-                if base.exists():
-                    for f in base.rglob("*.htm*"):
-                        files.append(f)
-            except Exception as e:
-                logger.error(f"Failed to download {filing_type} for {ticker}: {e}")
-        return files
+    ) -> List[FilingRecord]:
+        """
+        Blocking `adownload_filings`. It runs its own event loop, so call it
+        from scripts or worker threads (asyncio.to_thread); code already on
+        a loop awaits `adownload_filings` instead.
+        """
+        return asyncio.run(self.adownload_filings(ticker, filing_types, limit))
     
-    def process_filing(self, file_path: Path, ticker: str) -> List[Chunk]:
-        content = file_path.read_text(errors="ignore")
-        # Clean HTML
-        text = re.sub(r'<[^>]+>', ' ', content)
-        text = html.unescape(text)
-        text = re.sub(r'\s+', ' ', text)
+    def process_filing(self, record: FilingRecord) -> List[Chunk]:
+        text = self.archive.read_clean(record.accession_number)
         
-        doc_id = f"{ticker}-{file_path.parent.parent.name}-{file_path.parent.name}"
+        metadata = {
+            "ticker": record.ticker,
+            "filing_type": record.form,
+            "accession_number": record.accession_number,
+        }
+        # Dates are stored as YYYYMMDD ints so vector stores can range-filter them
+        for key, value in [("filing_date", record.filing_date), ("period", record.period)]:
+            if value:
+                metadata[key] = filing_date_int(value)
         
         return self.chunker.chunk_document(
             text=text,
-            document_id=doc_id,
-            metadata={"ticker": ticker, "filing_type": file_path.parent.parent.name}
+            document_id=record.document_id,
+            metadata=metadata
         )
     
-    def ingest(self, ticker: str, limit: int = 5) -> Dict[str, Any]:
-        files = self.download_filings(ticker, limit=limit)
+    def _index(self, records: List[FilingRecord]) -> int:
         all_chunks = []
         
-        for f in files:
-            chunks = self.process_filing(f, ticker)
+        for record in records:
+            chunks = self.process_filing(record)
             all_chunks.extend(chunks)
         
         if all_chunks:
             self.vector_store.add_documents(all_chunks)
         
-        return {"ticker": ticker, "files": len(files), "chunks": len(all_chunks)}
+        return len(all_chunks)
+    
+    def ingest(self, ticker: str, limit: int = 5) -> Dict[str, Any]:
+        records = self.download_filings(ticker, limit=limit)
+        chunk_count = self._index(records)
+        
+        return {"ticker": ticker, "files": len(records), "chunks": chunk_count}
+    
+    def reindex(
+        self,
+        ticker: Optional[str] = None,
+        filing_types: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """Rebuild vector store entries from the local archive without EDGAR access."""
+        records = self.archive.list_filings(ticker=ticker, forms=filing_types)
+        chunk_count = self._index(records)
+        
+        return {"ticker": ticker or "*", "files": len(records), "chunks": chunk_count}
@@ -0,0 +1,144 @@
+"""Vector index backends behind VectorStore."""
+
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Tuple
+
+import chromadb
+import numpy as np
+
+from src.config.settings import settings
+
+# (chunk_id, similarity score, metadata)
+SearchHit = Tuple[str, float, Dict[str, Any]]
+
+
+def normalize_where(filters: Optional[Dict]) -> Optional[Dict]:
+    """Turn a flat {field: value} dict into a Chroma-style where clause."""
+    if not filters:
+        return None
+    if len(filters) == 1 or any(k.startswith("$") for k in filters):
+        return dict(filters)
+    return {"$and": [{k: v} for k, v in filters.items()]}
+
+
+class VectorBackend(ABC):
+    """
+    Stores embeddings with filterable metadata and answers top-k queries.
+    
+    Filters use the Chroma where syntax: {"field": value},
+    {"field": {"$in": [...]}} / $eq $ne $nin $gt $gte $lt $lte, and
+    {"$and": [...]} / {"$or": [...]}.
+    """
+    
+    @abstractmethod
+    def add(self, ids: List[str], embeddings: np.ndarray, metadatas: List[Dict[str, Any]]):
+        pass
+    
+    @abstractmethod
+    def query(
+        self,
+        embedding: np.ndarray,
+        top_k: int,
+        where: Optional[Dict] = None
+    ) -> List[SearchHit]:
+        pass
+    
+    @abstractmethod
+    def count(self) -> int:
+        pass
+    
+    @abstractmethod
+    def get_embeddings(self, ids: List[str]) -> np.ndarray:
+        """Stored embeddings for ids, in the given order."""
+        pass
+    
+    def query_with_embeddings(
+        self,
+        embedding: np.ndarray,
+        top_k: int,
+        where: Optional[Dict] = None
+    ) -> Tuple[List[SearchHit], np.ndarray]:
+        """Query and also return the hits' embeddings, row-aligned."""
+        hits = self.query(embedding, top_k, where)
+        return hits, self.get_embeddings([h[0] for h in hits])
+    
+    def get_documents(self, ids: List[str]) -> Dict[str, str]:
+        """Text stored inside the index itself (legacy collections only)."""
+        return {}
+
+
+class ChromaBackend(VectorBackend):
+    def __init__(self, use_http: bool = False, path: Optional[str] = None):
+        if use_http:
+            self.client = chromadb.HttpClient(
+                host=settings.chroma_host,
+                port=settings.chroma_port
+            )
+        else:
+            self.client = chromadb.PersistentClient(path=path or settings.chroma_persist_dir)
+        
+        self.collection = self.client.get_or_create_collection(
+            name=settings.collection_name,
+            metadata={"hnsw:space": "cosine"}
+        )
+    
+    def add(self, ids: List[str], embeddings: np.ndarray, metadatas: List[Dict[str, Any]]):
+        self.collection.add(
+            ids=ids,
+            embeddings=np.asarray(embeddings).tolist(),
+            metadatas=metadatas
+        )
+    
+    def query(
+        self,
+        embedding: np.ndarray,
+        top_k: int,
+        where: Optional[Dict] = None
+    ) -> List[SearchHit]:
+        results = self.collection.query(
+            query_embeddings=[np.asarray(embedding).tolist()],
+            n_results=top_k,
+            where=normalize_where(where),
+            include=["metadatas", "distances"]
+        )
+        return [
+            (chunk_id, 1 - results["distances"][0][i], results["metadatas"][0][i])  # Distance to similarity
+            for i, chunk_id in enumerate(results["ids"][0])
+        ]
+    
+    def query_with_embeddings(
+        self,
+        embedding: np.ndarray,
+        top_k: int,
+        where: Optional[Dict] = None
+    ) -> Tuple[List[SearchHit], np.ndarray]:
+        results = self.collection.query(
+            query_embeddings=[np.asarray(embedding).tolist()],
+            n_results=top_k,
+            where=normalize_where(where),
+            include=["metadatas", "distances", "embeddings"]
+        )
+        hits = [
+            (chunk_id, 1 - results["distances"][0][i], results["metadatas"][0][i])
+            for i, chunk_id in enumerate(results["ids"][0])
+        ]
+        return hits, np.asarray(results["embeddings"][0], dtype=np.float32)
+    
+    def count(self) -> int:
+        return self.collection.count()
+    
+    def get_embeddings(self, ids: List[str]) -> np.ndarray:
+        stored = self.collection.get(ids=ids, include=["embeddings"])
+        by_id = dict(zip(stored["ids"], stored["embeddings"]))
+        return np.asarray([by_id[i] for i in ids], dtype=np.float32)
+    
+    def get_documents(self, ids: List[str]) -> Dict[str, str]:
+        legacy = self.collection.get(ids=ids, include=["documents"])
+        return {i: d for i, d in zip(legacy["ids"], legacy["documents"]) if d}
+
+
+def get_vector_backend(use_http: bool = False) -> VectorBackend:
+    if settings.vector_backend == "local":
+        from src.data.local_index import LocalIndexBackend
+        return LocalIndexBackend()
+    return ChromaBackend(use_http=use_http)
@@ -1,32 +1,115 @@
 from typing import List, Dict, Any, Optional, Tuple
-import chromadb
+import numpy as np
 from src.config.settings import settings
 from src.data.embeddings import get_embedding_model
-from src.data.chunking import Chunk
+from src.data.embedding_pool import get_embedding_pool
+from src.data.chunking import Chunk, merge_chunks
+from src.data.docstore import DocStore, get_docstore
+from src.data.mmr import mmr_select
+from src.data.filing_archive import FilingArchive, filing_date_int, get_filing_archive
+from src.data.vector_backend import VectorBackend, get_vector_backend
+from src.utils.logging import get_logger
 from src.utils.telemetry import get_tracer
 from openinference.semconv.trace import SpanAttributes
 from opentelemetry import trace
 
+logger = get_logger(__name__)
+
 
 class VectorStore:
-    def __init__(self, use_http: bool = False):
-        self.embedding_model = get_embedding_model()
+    """
+    Embeddings and metadata live in the vector backend (Chroma by default,
+    see VECTOR_BACKEND); chunk text lives in the DocStore and is hydrated
+    only for results that are returned.
+    """
+    
+    def __init__(
+        self,
+        use_http: bool = False,
+        docstore: Optional[DocStore] = None,
+        backend: Optional[VectorBackend] = None,
+        filing_index: Optional[FilingArchive] = None
+    ):
+        self._embedding_model = None
+        self.docstore = docstore or get_docstore()
+        self.backend = backend or get_vector_backend(use_http=use_http)
+        self._filing_index = filing_index
+    
+    @property
+    def embedding_model(self):
+        # Loaded on first use so callers with precomputed vectors never load it
+        if self._embedding_model is None:
+            self._embedding_model = get_embedding_model()
+        return self._embedding_model
+    
+    @property
+    def filing_index(self) -> FilingArchive:
+        # The archive catalog doubles as the per-ticker filing index (ticker, form, date)
+        if self._filing_index is None:
+            self._filing_index = get_filing_archive()
+        return self._filing_index
+    
+    def resolve_filings(
+        self,
+        ticker: str,
+        forms: Optional[List[str]] = None,
+        latest_n: Optional[int] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None
+    ) -> List[str]:
+        """Document ids of a ticker's filings in scope, newest first."""
+        records = self.filing_index.list_filings(
+            ticker=ticker,
+            forms=forms,
+            limit=latest_n,
+            start_date=start_date,
+            end_date=end_date
+        )
+        return [r.document_id for r in records]
+    
+    def _scope_filters(
+        self,
+        filters: Optional[Dict],
+        latest_n: Optional[int],
+        start_date: Optional[str],
+        end_date: Optional[str]
+    ) -> Optional[Dict]:
+        """
+        Narrow filters to the filings in scope before the vector query runs.
         
-        if use_http:
-            self.client = chromadb.HttpClient(
-                host=settings.chroma_host,
-                port=settings.chroma_port
+        With a ticker, the filing index resolves the scope to a document_id
+        $in list; without one, dates fall back to a metadata range filter.
+        Returns None when nothing is in scope.
+        """
+        filters = dict(filters or {})
+        ticker = filters.get("ticker")
+        if ticker:
+            form = filters.get("filing_type")
+            document_ids = self.resolve_filings(
+                ticker,
+                forms=[form] if isinstance(form, str) else None,
+                latest_n=latest_n,
+                start_date=start_date,
+                end_date=end_date
             )
-        else:
-            self.client = chromadb.PersistentClient(path="./data/vectordb")
+            if not document_ids:
+                return None
+            filters["document_id"] = {"$in": document_ids}
+            return filters
         
-        self.collection = self.client.get_or_create_collection(
-            name=settings.collection_name,
-            metadata={"hnsw:space": "cosine"}
-        )
+        if latest_n:
+            logger.warning("latest_n filter ignored without a ticker")
+        dates = {}
+        if start_date:
+            dates["$gte"] = filing_date_int(start_date)
+        if end_date:
+            dates["$lte"] = filing_date_int(end_date)
+        if dates:
+            filters["filing_date"] = dates
+        return filters
     
-    def add_documents(self, chunks: List[Chunk]):
-        """Add documents with embedding tracing."""
+    def add_documents(self, chunks: List[Chunk], embeddings: Optional[np.ndarray] = None):
+        """Add documents with embedding tracing; `embeddings` skips encoding."""
         if not chunks:
             return
         
@@ -38,32 +121,66 @@ class VectorStore:
         ) as span:
             span.set_attribute(SpanAttributes.OPENINFERENCE_SPAN_KIND, "EMBEDDING")
             span.set_attribute("embedding.document_count", len(chunks))
-            span.set_attribute("embedding.model", self.embedding_model.model_name)
             
             texts = [c.text for c in chunks]
-            ids = [c.chunk_id for c in chunks]
-            embeddings = self.embedding_model.embed_documents(texts).tolist()
-            metadatas = [
-                {"document_id": c.document_id, **c.metadata}
-                for c in chunks
-            ]
             
-            self.collection.add(
-                ids=ids,
-                embeddings=embeddings,
-                documents=texts,
-                metadatas=metadatas
-            )
+            if embeddings is not None:
+                span.set_attribute("embedding.precomputed", True)
+                blocks = [(0, np.asarray(embeddings, dtype=np.float32))]
+            elif settings.embedding_pool_workers > 1 and len(texts) >= settings.embedding_pool_min_texts:
+                # Bulk load: stream ordered blocks from the worker pool into the index
+                pool = get_embedding_pool()
+                span.set_attribute("embedding.pool_workers", pool.workers)
+                blocks = pool.iter_embed(texts)
+            else:
+                span.set_attribute("embedding.model", self.embedding_model.model_name)
+                blocks = [(0, self.embedding_model.embed_documents(texts))]
+            
+            dimension = 0
+            for start, embeddings in blocks:
+                batch = chunks[start:start + len(embeddings)]
+                self.docstore.put_many(batch)
+                self.backend.add(
+                    ids=[c.chunk_id for c in batch],
+                    embeddings=embeddings,
+                    metadatas=[
+                        {"document_id": c.document_id, **c.metadata}
+                        for c in batch
+                    ]
+                )
+                dimension = embeddings.shape[1]
             
-            span.set_attribute("embedding.dimension", len(embeddings[0]) if embeddings else 0)
+            span.set_attribute("embedding.dimension", dimension)
     
     def search(
         self,
         query: str,
         top_k: int = 10,
-        filters: Optional[Dict] = None
+        filters: Optional[Dict] = None,
+        hydrate: bool = True,
+        query_embedding: Optional[np.ndarray] = None,
+        latest_n: Optional[int] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        mmr: bool = False,
+        fetch_k: Optional[int] = None,
+        mmr_lambda: float = 0.5
     ) -> List[Tuple[Chunk, float]]:
-        """Search with retrieval tracing."""
+        """
+        Search with retrieval tracing.
+        
+        With hydrate=False only ids, metadata and scores are read and chunk
+        text is left empty; call `hydrate` on the results actually kept.
+        A precomputed `query_embedding` skips query encoding.
+        
+        `latest_n` keeps only a ticker's N most recent filings (of
+        `filters["filing_type"]` if given); `start_date`/`end_date`
+        ("YYYY-MM-DD") bound filing dates.
+        
+        With mmr=True, `fetch_k` candidates (default 4 * top_k) are re-ranked
+        by maximal marginal relevance down to top_k; results come back in
+        selection order with their relevance scores.
+        """
         tracer = get_tracer()
         
         with tracer.start_as_current_span(
@@ -73,45 +190,153 @@ class VectorStore:
             span.set_attribute(SpanAttributes.OPENINFERENCE_SPAN_KIND, "RETRIEVER")
             span.set_attribute(SpanAttributes.INPUT_VALUE, query)
             span.set_attribute("retriever.top_k", top_k)
+            if latest_n or start_date or end_date:
+                filters = self._scope_filters(filters, latest_n, start_date, end_date)
+                if filters is None:
+                    span.set_attribute("retriever.document_count", 0)
+                    return []
+                scoped = filters.get("document_id", {}).get("$in", [])
+                span.set_attribute("retriever.scoped_filings", len(scoped))
             if filters:
                 span.set_attribute("retriever.filters", str(filters))
             
             # Embed query with tracing
-            with tracer.start_as_current_span(
-                "embedding.query",
-                kind=trace.SpanKind.INTERNAL
-            ) as embed_span:
-                embed_span.set_attribute(SpanAttributes.OPENINFERENCE_SPAN_KIND, "EMBEDDING")
-                embed_span.set_attribute("embedding.model", self.embedding_model.model_name)
-                query_embedding = self.embedding_model.embed_query(query).tolist()
+            if query_embedding is None:
+                with tracer.start_as_current_span(
+                    "embedding.query",
+                    kind=trace.SpanKind.INTERNAL
+                ) as embed_span:
+                    embed_span.set_attribute(SpanAttributes.OPENINFERENCE_SPAN_KIND, "EMBEDDING")
+                    embed_span.set_attribute("embedding.model", self.embedding_model.model_name)
+                    query_embedding = self.embedding_model.embed_query(query)
             
-            where = None
-            if filters:
-                where = {k: v for k, v in filters.items()}
-            
-            results = self.collection.query(
-                query_embeddings=[query_embedding],
-                n_results=top_k,
-                where=where,
-                include=["documents", "metadatas", "distances"]
-            )
+            if mmr:
+                fetch_k = max(fetch_k or 4 * top_k, top_k)
+                span.set_attribute("retriever.mmr_fetch_k", fetch_k)
+                span.set_attribute("retriever.mmr_lambda", mmr_lambda)
+                hits, embeddings = self.backend.query_with_embeddings(
+                    query_embedding, fetch_k, where=filters or None
+                )
+                selected = mmr_select(
+                    query_embedding,
+                    embeddings,
+                    top_k,
+                    lambda_mult=mmr_lambda,
+                    relevance=np.array([h[1] for h in hits], dtype=np.float32)
+                )
+                hits = [hits[i] for i in selected]
+            else:
+                hits = self.backend.query(query_embedding, top_k, where=filters or None)
             
             chunks = []
-            for i, chunk_id in enumerate(results["ids"][0]):
+            for chunk_id, score, metadata in hits:
                 chunk = Chunk(
-                    text=results["documents"][0][i],
+                    text="",
                     chunk_id=chunk_id,
-                    document_id=results["metadatas"][0][i].get("document_id", ""),
-                    metadata=results["metadatas"][0][i]
+                    document_id=metadata.get("document_id", ""),
+                    metadata=metadata
                 )
-                score = 1 - results["distances"][0][i]  # Convert distance to similarity
                 chunks.append((chunk, score))
             
+            if hydrate:
+                self.hydrate(chunks)
+            
             span.set_attribute("retriever.document_count", len(chunks))
+            span.set_attribute("retriever.hydrated", hydrate)
             if chunks:
                 span.set_attribute("retriever.top_score", chunks[0][1])
             
             return chunks
+    
+    def expand_windows(
+        self,
+        results: List[Tuple[Chunk, float]],
+        token_budget: int,
+        radius: int = 1
+    ) -> List[Tuple[Chunk, float]]:
+        """
+        Expand small-chunk hits into merged, de-overlapped neighbor windows.
+        
+        Each hit grows by `radius` chunks either side; windows that touch
+        within a document merge into one (scored by their best hit). Windows
+        are taken best-first until `token_budget` (~4 chars/token) is spent,
+        shrinking to the bare hits when a full window does not fit. Hits
+        without position metadata (legacy chunks) pass through as is.
+        """
+        spans: Dict[str, List[List]] = {}
+        legacy = []
+        for chunk, score in results:
+            index = chunk.metadata.get("chunk_index")
+            if index is None:
+                legacy.append((chunk, score))
+                continue
+            last = chunk.metadata.get("chunk_count", index + radius + 1) - 1
+            spans.setdefault(chunk.document_id, []).append(
+                [max(0, index - radius), min(last, index + radius), score, chunk, [index]]
+            )
+        
+        windows = []
+        for document_id, items in spans.items():
+            items.sort(key=lambda w: w[0])
+            merged = [items[0]]
+            for lo, hi, score, chunk, hits in items[1:]:
+                current = merged[-1]
+                if lo <= current[1] + 1:
+                    current[1] = max(current[1], hi)
+                    current[4] = current[4] + hits
+                    if score > current[2]:
+                        current[2], current[3] = score, chunk
+                else:
+                    merged.append([lo, hi, score, chunk, hits])
+            windows.extend(merged)
+        windows.sort(key=lambda w: -w[2])
+        
+        expanded, used = [], 0
+        for lo, hi, score, best, hits in windows:
+            parts = self.docstore.get_range(best.document_id, lo, hi)
+            if not parts:
+                legacy.append((best, score))
+                continue
+            text = merge_chunks([(start, t) for _, start, t in parts])
+            if used + len(text) // 4 > token_budget:
+                # Full window does not fit: fall back to the hit chunks alone
+                parts = [p for p in parts if p[0] in hits]
+                text = merge_chunks([(start, t) for _, start, t in parts])
+                if not parts or used + len(text) // 4 > token_budget:
+                    continue
+            used += len(text) // 4
+            expanded.append((Chunk(
+                text=text,
+                chunk_id=best.chunk_id,
+                document_id=best.document_id,
+                metadata={**best.metadata, "window_start": parts[0][0], "window_end": parts[-1][0]}
+            ), score))
+        
+        for chunk, score in self.hydrate(legacy):
+            if used + len(chunk.text) // 4 > token_budget:
+                continue
+            used += len(chunk.text) // 4
+            expanded.append((chunk, score))
+        
+        expanded.sort(key=lambda r: -r[1])
+        return expanded
+    
+    def hydrate(self, results: List[Tuple[Chunk, float]]) -> List[Tuple[Chunk, float]]:
+        """Fill in chunk text from the docstore (in place)."""
+        ids = [chunk.chunk_id for chunk, _ in results if not chunk.text]
+        if not ids:
+            return results
+        
+        texts = self.docstore.get_many(ids)
+        missing = [i for i in ids if i not in texts]
+        if missing:
+            # Collections written before the docstore existed keep text in Chroma
+            texts.update(self.backend.get_documents(missing))
+        
+        for chunk, _ in results:
+            if not chunk.text:
+                chunk.text = texts.get(chunk.chunk_id) or ""
+        return results
 
 
 def get_vector_store(use_http: bool = False) -> VectorStore:
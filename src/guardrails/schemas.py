@@ -28,6 +28,8 @@ class AgentOutput(BaseModel):
     response_text: str
     citations: List[Citation] = []
     retrieved_contexts: List[RetrievedContext] = []
+    # Sources as numbered in the answer's prompt: [Source N] is item N-1
+    prompt_contexts: List[RetrievedContext] = []
     confidence_score: float = Field(..., ge=0, le=1)
     processing_time_ms: int
 
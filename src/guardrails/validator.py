@@ -1,14 +1,15 @@
-from typing import Optional
+from typing import List, Optional
 from src.guardrails.schemas import AgentOutput, CriticOutput, FinalResponse
 from src.agents.critic_agent import CriticAgent
 from src.config.settings import settings
+from src.models.router import CRITIC, get_model_router
 
 
 class ResponseValidator:
     """Validates agent responses through multiple checks."""
     
     def __init__(self):
-        self.critic = CriticAgent()
+        self.critic = CriticAgent(model=get_model_router().for_task(CRITIC))
         self.min_faithfulness = settings.min_faithfulness_score
         self.min_confidence = settings.min_confidence_score
     
@@ -19,32 +20,44 @@ class ResponseValidator:
         Returns:
             (passed, critic_output)
         """
+        results = await self.validate_many([output])
+        return results[0]
+    
+    async def validate_many(self, outputs: List[AgentOutput]) -> List[tuple[bool, CriticOutput]]:
+        """Validate several outputs; their critic checks go to the model as one batch."""
+        results: List[Optional[tuple[bool, CriticOutput]]] = [None] * len(outputs)
+        
         # 1. Schema validation (already done by Pydantic)
         
         # 2. Rule-based checks
-        if not self._rule_checks(output):
-            return False, CriticOutput(
-                faithfulness_score=0.0,
-                citation_coverage=0.0,
-                unsupported_claims=["Failed rule-based checks"],
-                passed=False
-            )
+        checked = []
+        for i, output in enumerate(outputs):
+            if self._rule_checks(output):
+                checked.append(i)
+            else:
+                results[i] = (False, CriticOutput(
+                    faithfulness_score=0.0,
+                    citation_coverage=0.0,
+                    unsupported_claims=["Failed rule-based checks"],
+                    passed=False
+                ))
         
         # 3. Critic agent validation
-        critic_output = await self.critic.validate(
-            response_text=output.response_text,
-            contexts=output.retrieved_contexts,
-            citations=output.citations
-        )
+        critic_outputs = await self.critic.validate_many([
+            (outputs[i].response_text, outputs[i].prompt_contexts or outputs[i].retrieved_contexts, outputs[i].citations)
+            for i in checked
+        ])
         
         # 4. Confidence threshold check
-        passed = (
-            critic_output.faithfulness_score >= self.min_faithfulness and
-            output.confidence_score >= self.min_confidence and
-            critic_output.passed
-        )
+        for i, critic_output in zip(checked, critic_outputs):
+            passed = (
+                critic_output.faithfulness_score >= self.min_faithfulness and
+                outputs[i].confidence_score >= self.min_confidence and
+                critic_output.passed
+            )
+            results[i] = (passed, critic_output)
         
-        return passed, critic_output
+        return results
     
     def _rule_checks(self, output: AgentOutput) -> bool:
         """Apply rule-based validation checks."""
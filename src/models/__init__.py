@@ -1,11 +1,25 @@
 from src.models.base import BaseModelInterface, ModelResponse
-from src.models.openai_model import OpenAIModel
+from src.models.cache import CompletionCache, get_completion_cache
+from src.models.structured import StructuredOutputError, strict_json_schema
+from src.models.openai_model import OpenAIModel, OpenAIClientPool, OpenAIDeadlineExceeded, get_openai_pool
 from src.models.mlx_model import MLXModel, get_mlx_model
+from src.models.router import ModelRouter, RoutedModel, TaskProfile, get_model_router
 
 __all__ = [
     "BaseModelInterface",
     "ModelResponse",
+    "CompletionCache",
+    "get_completion_cache",
+    "StructuredOutputError",
+    "strict_json_schema",
     "OpenAIModel",
+    "OpenAIClientPool",
+    "OpenAIDeadlineExceeded",
+    "get_openai_pool",
     "MLXModel",
     "get_mlx_model",
+    "ModelRouter",
+    "RoutedModel",
+    "TaskProfile",
+    "get_model_router",
 ]
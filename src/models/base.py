@@ -1,19 +1,201 @@
+import asyncio
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import Any, Dict, List, Optional, Type, Union
 from pydantic import BaseModel
+from src.config.settings import settings
+from src.utils.telemetry import get_tracer
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 chars/token) for backends without a tokenizer."""
+    return (len(text) + 3) // 4
+
+
+def apply_stop(text: str, stop: Optional[List[str]]) -> str:
+    """Cut `text` at the first stop sequence (backends may already have stopped there)."""
+    if not stop:
+        return text
+    cut = min((i for i in (text.find(s) for s in stop if s) if i >= 0), default=-1)
+    return text[:cut] if cut >= 0 else text
 
 
 class ModelResponse(BaseModel):
     content: str
     model: str
+    cached: bool = False
 
 
 class BaseModelInterface(ABC):
-    @abstractmethod
+    """
+    Backends implement `_generate`; `generate` adds the completion cache.
+    
+    `cache=None` caches calls at or below LLM_CACHE_MAX_TEMPERATURE;
+    True/False force the cache on or off for a single call.
+    
+    Backends that can constrain decoding to a JSON schema set
+    `supports_json_schema` and accept `json_schema` in `_generate`.
+    """
+    
+    model_name: str
+    context_window: int = 8192
+    supports_json_schema: bool = False
+    
+    def count_tokens(self, text: str) -> int:
+        """Prompt tokens in `text`; backends with a tokenizer override the estimate."""
+        return estimate_tokens(text)
+    
     async def generate(
         self,
         prompt: str,
         system_prompt: Optional[str] = None,
         temperature: float = 0.7,
+        max_tokens: int = 1024,
+        cache: Optional[bool] = None,
+        priority: int = 0,
+        stop: Optional[List[str]] = None,
+        json_schema: Optional[Dict[str, Any]] = None,
+    ) -> ModelResponse:
+        """
+        `priority` orders queued local inference (lower first); remote backends ignore it.
+        Output is cut at the first of the `stop` sequences. `json_schema` is
+        only for backends with `supports_json_schema`.
+        """
+        if cache is None:
+            cache = temperature <= settings.llm_cache_max_temperature
+        if not (cache and settings.llm_cache_enabled):
+            return await self._complete(prompt, system_prompt, temperature, max_tokens, priority, stop, json_schema)
+        
+        from src.models.cache import cache_key, get_completion_cache
+        completion_cache = get_completion_cache()
+        key = cache_key(self.model_name, system_prompt, prompt, temperature, max_tokens, stop, json_schema)
+        
+        hit = completion_cache.get(key)
+        if hit is not None:
+            with get_tracer().start_as_current_span("llm.cache_hit") as span:
+                span.set_attribute("llm.model_name", self.model_name)
+                span.set_attribute("llm.cache_hit", True)
+            return ModelResponse(content=hit[0], model=hit[1], cached=True)
+        
+        response = await self._complete(prompt, system_prompt, temperature, max_tokens, priority, stop, json_schema)
+        if response.content:
+            completion_cache.put(key, self.model_name, response.content, response.model)
+        return response
+    
+    async def _complete(
+        self, prompt, system_prompt, temperature, max_tokens, priority, stop, json_schema=None
+    ) -> ModelResponse:
+        extra = {"json_schema": json_schema} if json_schema else {}
+        response = await self._generate(prompt, system_prompt, temperature, max_tokens, priority, stop, **extra)
+        if stop:
+            response.content = apply_stop(response.content, stop)
+        return response
+    
+    async def generate_batch(
+        self,
+        prompts: List[str],
+        system_prompt: Union[str, List[Optional[str]], None] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 1024,
+        cache: Optional[bool] = None,
+        priority: int = 0,
+        stop: Optional[List[str]] = None,
+    ) -> List[ModelResponse]:
+        """
+        One response per prompt, in order.
+        
+        `system_prompt` is shared or given per prompt; the other arguments
+        are shared. Cached prompts are answered from the cache and the rest
+        go to `_generate_batch` together.
+        """
+        system_prompts = system_prompt if isinstance(system_prompt, list) else [system_prompt] * len(prompts)
+        if cache is None:
+            cache = temperature <= settings.llm_cache_max_temperature
+        completion_cache = None
+        responses: List[Optional[ModelResponse]] = [None] * len(prompts)
+        keys: List[Optional[str]] = [None] * len(prompts)
+        if cache and settings.llm_cache_enabled:
+            from src.models.cache import cache_key, get_completion_cache
+            completion_cache = get_completion_cache()
+            for i, prompt in enumerate(prompts):
+                keys[i] = cache_key(self.model_name, system_prompts[i], prompt, temperature, max_tokens, stop)
+                hit = completion_cache.get(keys[i])
+                if hit is not None:
+                    responses[i] = ModelResponse(content=hit[0], model=hit[1], cached=True)
+        
+        misses = [i for i, response in enumerate(responses) if response is None]
+        if misses:
+            generated = await self._generate_batch(
+                [prompts[i] for i in misses],
+                [system_prompts[i] for i in misses],
+                temperature,
+                max_tokens,
+                priority,
+                stop,
+            )
+            for i, response in zip(misses, generated):
+                if stop:
+                    response.content = apply_stop(response.content, stop)
+                if completion_cache is not None and response.content:
+                    completion_cache.put(keys[i], self.model_name, response.content, response.model)
+                responses[i] = response
+        return responses
+    
+    async def _generate_batch(
+        self,
+        prompts: List[str],
+        system_prompts: List[Optional[str]],
+        temperature: float,
+        max_tokens: int,
+        priority: int,
+        stop: Optional[List[str]],
+    ) -> List[ModelResponse]:
+        """Concurrent `_generate` calls, at most LLM_BATCH_CONCURRENCY in flight; local backends batch decoding."""
+        semaphore = asyncio.Semaphore(settings.llm_batch_concurrency)
+        
+        async def one(prompt: str, system_prompt: Optional[str]) -> ModelResponse:
+            async with semaphore:
+                return await self._generate(prompt, system_prompt, temperature, max_tokens, priority, stop)
+        
+        return list(await asyncio.gather(*(one(p, sp) for p, sp in zip(prompts, system_prompts))))
+    
+    async def generate_structured(
+        self,
+        prompt: str,
+        schema: Type[BaseModel],
+        system_prompt: Optional[str] = None,
+        temperature: float = 0.0,
+        max_tokens: Optional[int] = None,
+        cache: Optional[bool] = None,
+        priority: Optional[int] = None,
+    ) -> BaseModel:
+        """
+        Generate an instance of `schema`.
+        
+        Decoding is constrained to the schema where the backend supports it;
+        otherwise the schema is appended to the prompt. Raises
+        StructuredOutputError when the output does not validate.
+        """
+        from src.models.structured import parse_structured, schema_instruction, strict_json_schema
+        json_schema = strict_json_schema(schema)
+        # Unset limits fall through to the backend's (or routed profile's) defaults
+        options = {k: v for k, v in (("max_tokens", max_tokens), ("priority", priority)) if v is not None}
+        if self.supports_json_schema:
+            options["json_schema"] = json_schema
+        else:
+            prompt = prompt + schema_instruction(json_schema)
+        response = await self.generate(
+            prompt, system_prompt=system_prompt, temperature=temperature, cache=cache, **options
+        )
+        return parse_structured(response.content, schema)
+    
+    @abstractmethod
+    async def _generate(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 1024,
+        priority: int = 0,
+        stop: Optional[List[str]] = None,
     ) -> ModelResponse:
         pass
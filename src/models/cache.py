@@ -0,0 +1,136 @@
+"""Completion cache: in-memory LRU in front of a persistent SQLite tier."""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from src.config.settings import settings
+from src.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS completions (
+    key TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    content TEXT NOT NULL,
+    response_model TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+"""
+
+
+def cache_key(
+    model: str,
+    system_prompt: Optional[str],
+    prompt: str,
+    temperature: float,
+    max_tokens: int,
+    stop: Optional[List[str]] = None,
+    json_schema: Optional[Dict] = None,
+) -> str:
+    fields = [model, system_prompt or "", prompt, round(temperature, 4), max_tokens]
+    if stop:
+        fields.append(list(stop))
+    if json_schema:
+        fields.append(json_schema)
+    payload = json.dumps(fields, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class CompletionCache:
+    """
+    Two-tier cache of model completions keyed by
+    (model, system prompt, prompt, temperature, max_tokens).
+    
+    Disk entries older than `ttl_seconds` are treated as misses.
+    """
+    
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        memory_size: Optional[int] = None,
+        ttl_seconds: Optional[int] = None,
+    ):
+        self.memory_size = memory_size or settings.llm_cache_memory_size
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else settings.llm_cache_ttl_seconds
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        
+        self.path = Path(path or settings.llm_cache_path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.executescript(SCHEMA)
+        
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0}
+    
+    def close(self):
+        self._db.close()
+    
+    def _remember(self, key: str, value: tuple):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+    
+    def get(self, key: str) -> Optional[tuple]:
+        """Return (content, response_model) or None."""
+        with self._lock:
+            value = self._memory.get(key)
+            if value is not None and time.time() - value[2] <= self.ttl_seconds:
+                self._memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return value[:2]
+            
+            row = self._db.execute(
+                "SELECT content, response_model, created_at FROM completions WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and time.time() - row[2] <= self.ttl_seconds:
+                self._remember(key, row)
+                self.stats["disk_hits"] += 1
+                return row[:2]
+            
+            self.stats["misses"] += 1
+            return None
+    
+    def put(self, key: str, model: str, content: str, response_model: str):
+        value = (content, response_model, time.time())
+        with self._lock:
+            self._remember(key, value)
+            self._db.execute(
+                """INSERT OR REPLACE INTO completions (key, model, content, response_model, created_at)
+                VALUES (?, ?, ?, ?, ?)""",
+                (key, model, *value)
+            )
+            self._db.commit()
+            self.stats["stores"] += 1
+    
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._db.execute("DELETE FROM completions")
+            self._db.commit()
+    
+    def get_stats(self) -> Dict[str, float]:
+        lookups = self.stats["memory_hits"] + self.stats["disk_hits"] + self.stats["misses"]
+        hits = lookups - self.stats["misses"]
+        return {
+            **self.stats,
+            "memory_entries": len(self._memory),
+            "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+_cache = None
+
+
+def get_completion_cache() -> CompletionCache:
+    global _cache
+    if _cache is None:
+        _cache = CompletionCache()
+    return _cache
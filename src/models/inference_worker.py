@@ -0,0 +1,147 @@
+"""Single-owner inference worker for local models."""
+
+import asyncio
+import itertools
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional
+
+from src.config.settings import settings
+from src.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class Priority:
+    """Lower runs first; equal priorities run in arrival order."""
+    INTERACTIVE = 0
+    BATCH = 5
+    BACKGROUND = 10
+
+
+class InferenceQueueFull(RuntimeError):
+    """Raised when a worker is at its admission limit."""
+
+
+@dataclass
+class _Job:
+    fn: Callable[[threading.Event], Any]
+    future: asyncio.Future
+    loop: asyncio.AbstractEventLoop
+    submitted_at: float
+    cancel_event: threading.Event = field(default_factory=threading.Event)
+
+
+def _deliver(future: asyncio.Future, result: Any = None, error: Optional[BaseException] = None):
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+
+class InferenceWorker:
+    """
+    One thread owns a local model and runs jobs from a priority queue.
+    
+    Jobs are callables taking a threading.Event that is set when the caller
+    is cancelled; long generations should poll it between tokens. Queued
+    jobs whose caller went away are skipped. Callers await results on their
+    own event loop, so generation never blocks it.
+    """
+    
+    def __init__(self, name: str, max_pending: Optional[int] = None):
+        self.name = name
+        self.max_pending = max_pending or settings.inference_max_pending
+        self._queue: "queue.PriorityQueue" = queue.PriorityQueue()
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._thread: Optional[threading.Thread] = None
+        self.stats = {
+            "completed": 0,
+            "failed": 0,
+            "cancelled": 0,
+            "rejected": 0,
+            "total_wait_ms": 0.0,
+        }
+    
+    def _ensure_thread(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name=f"inference-{self.name}", daemon=True
+                )
+                self._thread.start()
+    
+    def _run(self):
+        while True:
+            _, _, job = self._queue.get()
+            if job is None:
+                return
+            try:
+                if job.cancel_event.is_set():
+                    self.stats["cancelled"] += 1
+                    continue
+                self.stats["total_wait_ms"] += (time.monotonic() - job.submitted_at) * 1000
+                try:
+                    result = job.fn(job.cancel_event)
+                except BaseException as e:
+                    self.stats["failed"] += 1
+                    self._call(job, _deliver, job.future, None, e)
+                else:
+                    self.stats["completed"] += 1
+                    self._call(job, _deliver, job.future, result)
+            finally:
+                with self._lock:
+                    self._pending -= 1
+    
+    @staticmethod
+    def _call(job: _Job, fn, *args):
+        try:
+            job.loop.call_soon_threadsafe(fn, *args)
+        except RuntimeError:
+            pass  # Caller's loop already closed
+    
+    async def submit(
+        self,
+        fn: Callable[[threading.Event], Any],
+        priority: int = Priority.INTERACTIVE,
+    ) -> Any:
+        """Run fn(cancel_event) on the worker thread and await its result."""
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.stats["rejected"] += 1
+                raise InferenceQueueFull(
+                    f"{self.name}: {self._pending} requests pending (limit {self.max_pending})"
+                )
+            self._pending += 1
+        
+        loop = asyncio.get_running_loop()
+        job = _Job(fn=fn, future=loop.create_future(), loop=loop, submitted_at=time.monotonic())
+        self._queue.put((priority, next(self._seq), job))
+        self._ensure_thread()
+        
+        try:
+            return await job.future
+        except asyncio.CancelledError:
+            job.cancel_event.set()
+            raise
+    
+    def shutdown(self, wait: bool = True):
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put((float("inf"), next(self._seq), None))
+            if wait:
+                self._thread.join()
+        self._thread = None
+    
+    def get_stats(self) -> Dict[str, float]:
+        started = self.stats["completed"] + self.stats["failed"]
+        return {
+            **{k: v for k, v in self.stats.items() if k != "total_wait_ms"},
+            "pending": self._pending,
+            "avg_wait_ms": round(self.stats["total_wait_ms"] / started, 2) if started else 0.0,
+        }
@@ -1,8 +1,11 @@
 """MLX-LM model interface for local inference on Apple Silicon."""
 
-from typing import Optional
+from typing import Any, Dict, List, Optional, Tuple
 import time
-from src.models.base import BaseModelInterface, ModelResponse
+from src.config.settings import settings
+from src.models.base import BaseModelInterface, ModelResponse, apply_stop
+from src.models.inference_worker import InferenceWorker, Priority
+from src.models.structured import schema_instruction
 from src.utils.logging import get_logger
 from src.utils.telemetry import get_tracer
 from openinference.semconv.trace import SpanAttributes
@@ -14,6 +17,9 @@ logger = get_logger(__name__)
 class MLXModel(BaseModelInterface):
     """Local LLM using MLX for Apple Silicon Macs."""
     
+    context_window = 32768
+    supports_json_schema = True
+    
     def __init__(self, model_name: str = "mlx-community/Qwen2.5-3B-Instruct-4bit"):
         """
         Initialize MLX model.
@@ -26,21 +32,215 @@ class MLXModel(BaseModelInterface):
         self.model_name = model_name
         self._model = None
         self._tokenizer = None
+        self._enforcer_data = None
+        # MLX is not safe to drive from several threads; one worker serves every model
+        self.worker = get_mlx_worker()
     
-    def _load_model(self):
-        """Lazy load the model."""
+    def _load_model(self, cancel_event=None):
+        """Lazy load the model (runs on the inference worker thread)."""
         if self._model is None:
             from mlx_lm import load
             logger.info(f"Loading MLX model: {self.model_name}")
             self._model, self._tokenizer = load(self.model_name)
             logger.info("Model loaded successfully")
     
-    async def generate(
+    def count_tokens(self, text: str) -> int:
+        # Exact once the weights (and tokenizer) are loaded, estimated before
+        if self._tokenizer is None:
+            return super().count_tokens(text)
+        return len(self._tokenizer.encode(text))
+    
+    def _json_logits_processor(self, json_schema: Dict[str, Any]):
+        """Logits processor that masks tokens leaving `json_schema` (needs lm-format-enforcer)."""
+        try:
+            from lmformatenforcer import JsonSchemaParser, TokenEnforcer
+            from lmformatenforcer.integrations.transformers import build_token_enforcer_tokenizer_data
+        except ImportError:
+            return None
+        import mlx.core as mx
+        import numpy as np
+        
+        if self._enforcer_data is None:
+            # Vocabulary prefix tables are built once per model; mlx-lm wraps the HF tokenizer
+            self._enforcer_data = build_token_enforcer_tokenizer_data(self._tokenizer._tokenizer)
+        enforcer = TokenEnforcer(self._enforcer_data, JsonSchemaParser(json_schema))
+        
+        def processor(tokens, logits):
+            allowed = enforcer.get_allowed_tokens(tokens.tolist())
+            allowed = getattr(allowed, "allowed_tokens", allowed)
+            bias = np.full(logits.shape[-1], -np.inf, dtype=np.float32)
+            bias[list(allowed)] = 0.0
+            return logits + mx.array(bias)
+        
+        return processor
+    
+    async def load(self, priority: int = Priority.BACKGROUND):
+        """Load weights on the worker without blocking the event loop."""
+        await self.worker.submit(self._load_model, priority=priority)
+    
+    def _run_generation(
+        self,
+        cancel_event,
+        prompt: str,
+        system_prompt: Optional[str],
+        temperature: float,
+        max_tokens: int,
+        stop: Optional[List[str]] = None,
+        json_schema: Optional[Dict[str, Any]] = None,
+    ) -> Tuple[str, int, int]:
+        """
+        Blocking generation; stops early on a stop sequence or once the caller is cancelled.
+        With `json_schema`, decoding is grammar-constrained when lm-format-enforcer is
+        installed and prompt-guided otherwise.
+        """
+        self._load_model()
+        
+        from mlx_lm import stream_generate
+        from mlx_lm.sample_utils import make_sampler
+        
+        logits_processors = None
+        if json_schema:
+            processor = self._json_logits_processor(json_schema)
+            if processor is None:
+                prompt = prompt + schema_instruction(json_schema)
+            else:
+                logits_processors = [processor]
+        
+        # Format with chat template
+        messages = []
+        if system_prompt:
+            messages.append({"role": "system", "content": system_prompt})
+        messages.append({"role": "user", "content": prompt})
+        
+        # Apply chat template
+        formatted_prompt = self._tokenizer.apply_chat_template(
+            messages,
+            tokenize=False,
+            add_generation_prompt=True
+        )
+        input_tokens = len(self._tokenizer.encode(formatted_prompt))
+        
+        # Create sampler with temperature
+        sampler = make_sampler(temp=temperature)
+        
+        pieces = []
+        for chunk in stream_generate(
+            self._model,
+            self._tokenizer,
+            prompt=formatted_prompt,
+            max_tokens=max_tokens,
+            sampler=sampler,
+            logits_processors=logits_processors
+        ):
+            pieces.append(chunk.text)
+            if cancel_event.is_set():
+                break
+            if stop and any(s in "".join(pieces[-8:]) for s in stop):
+                break
+        response = apply_stop("".join(pieces), stop)
+        
+        return response, input_tokens, len(self._tokenizer.encode(response))
+    
+    def _run_batch(
+        self,
+        cancel_event,
+        prompts: List[str],
+        system_prompts: List[Optional[str]],
+        temperature: float,
+        max_tokens: int,
+        stop: Optional[List[str]] = None,
+    ) -> List[Tuple[str, int, int]]:
+        """
+        Blocking batched generation: all prompts decode together, MLX_BATCH_SIZE
+        sequences at a time. mlx-lm releases without batch_generate decode the
+        prompts one after another in this same job.
+        """
+        self._load_model()
+        
+        try:
+            from mlx_lm import batch_generate
+        except ImportError:
+            return [
+                self._run_generation(cancel_event, prompt, system_prompt, temperature, max_tokens, stop)
+                for prompt, system_prompt in zip(prompts, system_prompts)
+                if not cancel_event.is_set()
+            ]
+        from mlx_lm.sample_utils import make_sampler
+        
+        token_prompts = []
+        for prompt, system_prompt in zip(prompts, system_prompts):
+            messages = []
+            if system_prompt:
+                messages.append({"role": "system", "content": system_prompt})
+            messages.append({"role": "user", "content": prompt})
+            token_prompts.append(self._tokenizer.apply_chat_template(messages, add_generation_prompt=True))
+        
+        result = batch_generate(
+            self._model,
+            self._tokenizer,
+            token_prompts,
+            max_tokens=max_tokens,
+            sampler=make_sampler(temp=temperature),
+            completion_batch_size=settings.mlx_batch_size,
+        )
+        outputs = []
+        for tokens, text in zip(token_prompts, result.texts):
+            text = apply_stop(text, stop)
+            outputs.append((text, len(tokens), len(self._tokenizer.encode(text))))
+        return outputs
+    
+    async def _generate_batch(
+        self,
+        prompts: List[str],
+        system_prompts: List[Optional[str]],
+        temperature: float,
+        max_tokens: int,
+        priority: int,
+        stop: Optional[List[str]],
+    ) -> List[ModelResponse]:
+        """Decode all prompts in one worker job instead of queueing one job per prompt."""
+        tracer = get_tracer()
+        
+        with tracer.start_as_current_span(
+            "llm.mlx.generate_batch",
+            kind=trace.SpanKind.CLIENT
+        ) as span:
+            span.set_attribute(SpanAttributes.OPENINFERENCE_SPAN_KIND, "LLM")
+            span.set_attribute(SpanAttributes.LLM_MODEL_NAME, self.model_name)
+            span.set_attribute(SpanAttributes.LLM_INVOCATION_PARAMETERS, 
+                f'{{"temperature": {temperature}, "max_tokens": {max_tokens}}}')
+            span.set_attribute("llm.priority", priority)
+            span.set_attribute("llm.batch_size", len(prompts))
+            
+            start_time = time.time()
+            
+            outputs = await self.worker.submit(
+                lambda cancel_event: self._run_batch(
+                    cancel_event, prompts, system_prompts, temperature, max_tokens, stop
+                ),
+                priority=priority
+            )
+            if len(outputs) < len(prompts):
+                raise RuntimeError("Batch generation was cancelled")
+            
+            input_tokens = sum(output[1] for output in outputs)
+            output_tokens = sum(output[2] for output in outputs)
+            span.set_attribute(SpanAttributes.LLM_TOKEN_COUNT_PROMPT, input_tokens)
+            span.set_attribute(SpanAttributes.LLM_TOKEN_COUNT_COMPLETION, output_tokens)
+            span.set_attribute(SpanAttributes.LLM_TOKEN_COUNT_TOTAL, input_tokens + output_tokens)
+            span.set_attribute("llm.latency_ms", (time.time() - start_time) * 1000)
+            
+            return [ModelResponse(content=output[0], model=self.model_name) for output in outputs]
+    
+    async def _generate(
         self,
         prompt: str,
         system_prompt: Optional[str] = None,
         temperature: float = 0.7,
         max_tokens: int = 1024,
+        priority: int = Priority.INTERACTIVE,
+        stop: Optional[List[str]] = None,
+        json_schema: Optional[Dict[str, Any]] = None,
     ) -> ModelResponse:
         """Generate response using MLX model with OpenInference tracing."""
         tracer = get_tracer()
@@ -54,6 +254,8 @@ class MLXModel(BaseModelInterface):
             span.set_attribute(SpanAttributes.LLM_MODEL_NAME, self.model_name)
             span.set_attribute(SpanAttributes.LLM_INVOCATION_PARAMETERS, 
                 f'{{"temperature": {temperature}, "max_tokens": {max_tokens}}}')
+            span.set_attribute("llm.priority", priority)
+            span.set_attribute("llm.json_schema", json_schema is not None)
             
             # Capture input
             span.set_attribute(SpanAttributes.INPUT_VALUE, prompt[:2000])
@@ -62,47 +264,20 @@ class MLXModel(BaseModelInterface):
             
             start_time = time.time()
             
-            self._load_model()
-            
-            from mlx_lm import generate
-            from mlx_lm.sample_utils import make_sampler
-            
-            # Format with chat template
-            messages = []
-            if system_prompt:
-                messages.append({"role": "system", "content": system_prompt})
-            messages.append({"role": "user", "content": prompt})
-            
-            # Apply chat template
-            formatted_prompt = self._tokenizer.apply_chat_template(
-                messages,
-                tokenize=False,
-                add_generation_prompt=True
-            )
-            
-            # Track token counts
-            input_tokens = len(self._tokenizer.encode(formatted_prompt))
-            span.set_attribute(SpanAttributes.LLM_TOKEN_COUNT_PROMPT, input_tokens)
-            
-            # Create sampler with temperature
-            sampler = make_sampler(temp=temperature)
-            
-            # Generate response
-            response = generate(
-                self._model,
-                self._tokenizer,
-                prompt=formatted_prompt,
-                max_tokens=max_tokens,
-                sampler=sampler,
-                verbose=False
+            # Generation runs on the worker thread; this coroutine just waits its turn
+            response, input_tokens, output_tokens = await self.worker.submit(
+                lambda cancel_event: self._run_generation(
+                    cancel_event, prompt, system_prompt, temperature, max_tokens, stop, json_schema
+                ),
+                priority=priority
             )
             
             # Calculate metrics
             latency_ms = (time.time() - start_time) * 1000
-            output_tokens = len(self._tokenizer.encode(response))
             
             # Set output attributes
             span.set_attribute(SpanAttributes.OUTPUT_VALUE, response[:2000])
+            span.set_attribute(SpanAttributes.LLM_TOKEN_COUNT_PROMPT, input_tokens)
             span.set_attribute(SpanAttributes.LLM_TOKEN_COUNT_COMPLETION, output_tokens)
             span.set_attribute(SpanAttributes.LLM_TOKEN_COUNT_TOTAL, input_tokens + output_tokens)
             span.set_attribute("llm.latency_ms", latency_ms)
@@ -113,13 +288,21 @@ class MLXModel(BaseModelInterface):
             )
 
 
-# Global model instance for reuse
-_mlx_model = None
+# Global worker and model instances for reuse
+_mlx_worker = None
+_mlx_models = {}
+
+
+def get_mlx_worker() -> InferenceWorker:
+    """Get or create the inference worker shared by all MLX models."""
+    global _mlx_worker
+    if _mlx_worker is None:
+        _mlx_worker = InferenceWorker("mlx")
+    return _mlx_worker
 
 
 def get_mlx_model(model_name: str = "mlx-community/Qwen2.5-3B-Instruct-4bit") -> MLXModel:
-    """Get or create MLX model singleton."""
-    global _mlx_model
-    if _mlx_model is None:
-        _mlx_model = MLXModel(model_name)
-    return _mlx_model
+    """Get or create the MLX model instance for `model_name`."""
+    if model_name not in _mlx_models:
+        _mlx_models[model_name] = MLXModel(model_name)
+    return _mlx_models[model_name]
@@ -1,33 +1,249 @@
-from typing import Optional
+import asyncio
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+import openai
 from openai import AsyncOpenAI
-from src.models.base import BaseModelInterface, ModelResponse
+from tenacity import AsyncRetrying, retry_if_exception, stop_after_attempt, wait_random_exponential
+from src.models.base import BaseModelInterface, ModelResponse, estimate_tokens
 from src.config.settings import settings
+from src.utils.http import retry_after
+from src.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class OpenAIDeadlineExceeded(TimeoutError):
+    """Raised when a call (retries and hedges included) outlives its deadline."""
+
+
+def _retryable(exc: BaseException) -> bool:
+    # APITimeoutError is an APIConnectionError
+    if isinstance(exc, (openai.RateLimitError, openai.APIConnectionError)):
+        return True
+    return isinstance(exc, openai.APIStatusError) and exc.status_code >= 500
+
+
+def _retry_after(exc: BaseException) -> float:
+    response = getattr(exc, "response", None)
+    delay = retry_after(response) if response is not None else None
+    return delay or 0.0
+
+
+class OpenAIClientPool:
+    """
+    One AsyncOpenAI client shared by every OpenAIModel.
+    
+    A semaphore caps in-flight requests across the process; 429/5xx and
+    connection errors retry with jittered exponential backoff (honoring
+    Retry-After); each call has a deadline covering all of its attempts.
+    With hedging on, an attempt still running after the observed p95
+    latency gets a duplicate and the first success wins.
+    """
+    
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        max_concurrency: int = 16,
+        timeout: float = 60.0,
+        attempt_timeout: float = 30.0,
+        max_retries: int = 4,
+        hedge: bool = False,
+        hedge_min_samples: int = 20,
+        backoff_base: float = 0.5,
+        backoff_max: float = 8.0,
+    ):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.attempt_timeout = attempt_timeout
+        self.max_retries = max_retries
+        self.hedge = hedge
+        self.hedge_min_samples = hedge_min_samples
+        self._wait = wait_random_exponential(multiplier=backoff_base, max=backoff_max)
+        self._client = None
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._latencies = deque(maxlen=512)
+        self._stats = {"requests": 0, "retries": 0, "hedges": 0, "hedge_wins": 0, "deadline_exceeded": 0}
+    
+    @property
+    def client(self) -> AsyncOpenAI:
+        # Built on first request so constructing models needs no credentials
+        if self._client is None:
+            self._client = AsyncOpenAI(
+                api_key=self.api_key,
+                base_url=self.base_url,
+                timeout=self.attempt_timeout,
+                max_retries=0,  # Retries are ours, so they count against the deadline
+            )
+        return self._client
+    
+    def hedge_delay(self) -> Optional[float]:
+        """p95 of recent attempt latencies (seconds), once enough have been seen."""
+        if len(self._latencies) < self.hedge_min_samples:
+            return None
+        ordered = sorted(self._latencies)
+        return ordered[int(0.95 * (len(ordered) - 1))]
+    
+    async def _request(self, kwargs: Dict[str, Any]):
+        async with self._semaphore:
+            start = time.monotonic()
+            response = await self.client.chat.completions.create(**kwargs)
+            self._latencies.append(time.monotonic() - start)
+            return response
+    
+    async def _attempt(self, kwargs: Dict[str, Any]):
+        delay = self.hedge_delay() if self.hedge else None
+        if delay is None:
+            return await self._request(kwargs)
+        
+        primary = asyncio.ensure_future(self._request(kwargs))
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+        # No hedge once the primary is back, or when the pool has no spare slot
+        if done or self._semaphore.locked():
+            return await primary
+        
+        self._stats["hedges"] += 1
+        hedge = asyncio.ensure_future(self._request(kwargs))
+        pending = {primary, hedge}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self._stats["hedge_wins"] += 1
+                        return task.result()
+            raise primary.exception()
+        finally:
+            for task in (primary, hedge):
+                if not task.done():
+                    task.cancel()
+    
+    def _backoff(self, retry_state) -> float:
+        return max(self._wait(retry_state), _retry_after(retry_state.outcome.exception()))
+    
+    def _before_sleep(self, retry_state):
+        self._stats["retries"] += 1
+        logger.warning(
+            f"OpenAI request failed ({retry_state.outcome.exception()!r}); "
+            f"retry {retry_state.attempt_number}/{self.max_retries}"
+        )
+    
+    async def create(self, deadline: Optional[float] = None, **kwargs):
+        """chat.completions.create with pooling, retries, hedging and a deadline (seconds)."""
+        self._stats["requests"] += 1
+        retrying = AsyncRetrying(
+            stop=stop_after_attempt(self.max_retries + 1),
+            wait=self._backoff,
+            retry=retry_if_exception(_retryable),
+            before_sleep=self._before_sleep,
+            reraise=True,
+        )
+        try:
+            async with asyncio.timeout(deadline or self.timeout):
+                async for attempt in retrying:
+                    with attempt:
+                        return await self._attempt(kwargs)
+        except TimeoutError as exc:
+            self._stats["deadline_exceeded"] += 1
+            raise OpenAIDeadlineExceeded(
+                f"OpenAI call exceeded its {deadline or self.timeout:.1f}s deadline"
+            ) from exc
+    
+    def get_stats(self) -> Dict[str, Any]:
+        ordered = sorted(self._latencies)
+        
+        def percentile(q: float) -> Optional[float]:
+            return round(ordered[int(q * (len(ordered) - 1))] * 1000, 1) if ordered else None
+        
+        return {
+            **self._stats,
+            "in_flight": self.max_concurrency - self._semaphore._value,
+            "p50_ms": percentile(0.5),
+            "p95_ms": percentile(0.95),
+        }
 
 
 class OpenAIModel(BaseModelInterface):
-    def __init__(self, model_name: Optional[str] = None):
+    context_window = 128000
+    supports_json_schema = True
+    
+    def __init__(self, model_name: Optional[str] = None, pool: Optional[OpenAIClientPool] = None):
         self.model_name = model_name or settings.default_model
-        api_key = settings.openai_api_key.get_secret_value() if settings.openai_api_key else None
-        self.client = AsyncOpenAI(api_key=api_key)
+        self.pool = pool or get_openai_pool()
+        self._encoding = None
+    
+    def count_tokens(self, text: str) -> int:
+        # tiktoken is optional; fall back to the character estimate without it
+        if self._encoding is None:
+            try:
+                import tiktoken
+                try:
+                    self._encoding = tiktoken.encoding_for_model(self.model_name)
+                except KeyError:
+                    self._encoding = tiktoken.get_encoding("cl100k_base")
+            except Exception:
+                self._encoding = False
+        if not self._encoding:
+            return estimate_tokens(text)
+        return len(self._encoding.encode(text, disallowed_special=()))
     
-    async def generate(
+    async def _generate(
         self,
         prompt: str,
         system_prompt: Optional[str] = None,
         temperature: float = 0.7,
+        max_tokens: int = 1024,
+        priority: int = 0,
+        stop: Optional[List[str]] = None,
+        json_schema: Optional[Dict[str, Any]] = None,
     ) -> ModelResponse:
         messages = []
         if system_prompt:
             messages.append({"role": "system", "content": system_prompt})
         messages.append({"role": "user", "content": prompt})
         
-        response = await self.client.chat.completions.create(
+        options = {}
+        if json_schema:
+            options["response_format"] = {
+                "type": "json_schema",
+                "json_schema": {"name": "response", "schema": json_schema, "strict": True},
+            }
+        
+        response = await self.pool.create(
             model=self.model_name,
             messages=messages,
             temperature=temperature,
+            max_tokens=max_tokens,
+            stop=stop[:4] if stop else None,  # API accepts up to four
+            **options,
         )
         
         return ModelResponse(
             content=response.choices[0].message.content or "",
             model=response.model
         )
+
+
+_openai_pool = None
+
+
+def get_openai_pool() -> OpenAIClientPool:
+    """Get or create the process-wide OpenAI client pool."""
+    global _openai_pool
+    if _openai_pool is None:
+        _openai_pool = OpenAIClientPool(
+            api_key=settings.openai_api_key.get_secret_value() if settings.openai_api_key else None,
+            base_url=settings.openai_base_url,
+            max_concurrency=settings.openai_max_concurrency,
+            timeout=settings.openai_timeout_seconds,
+            attempt_timeout=settings.openai_attempt_timeout_seconds,
+            max_retries=settings.openai_max_retries,
+            hedge=settings.openai_hedge,
+            hedge_min_samples=settings.openai_hedge_min_samples,
+        )
+    return _openai_pool
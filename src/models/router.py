@@ -0,0 +1,318 @@
+"""Task-aware routing of LLM calls to small and large model backends."""
+
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+
+from src.config.settings import settings
+from src.models.base import BaseModelInterface, ModelResponse
+from src.models.inference_worker import Priority
+from src.utils.logging import get_logger
+from src.utils.telemetry import get_tracer
+from openinference.semconv.trace import SpanAttributes
+from opentelemetry import trace
+
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class TaskProfile:
+    """What a call site needs from a model: output size, stop sequences, latency target, tier."""
+    name: str
+    max_tokens: int
+    stop: Tuple[str, ...] = ()
+    latency_target_ms: int = 0
+    tier: str = "large"
+    priority: int = Priority.INTERACTIVE
+
+
+CLASSIFY = TaskProfile("classify", max_tokens=8, stop=("\n",), latency_target_ms=1000, tier="small")
+DECOMPOSE = TaskProfile("decompose", max_tokens=768, latency_target_ms=4000, tier="small")
+AGENT_ANSWER = TaskProfile("agent_answer", max_tokens=768, latency_target_ms=10000)
+SYNTHESIS = TaskProfile("synthesis", max_tokens=1024, latency_target_ms=15000)
+CRITIC = TaskProfile("critic", max_tokens=256, latency_target_ms=3000, tier="small")
+TASK_PROFILES = (CLASSIFY, DECOMPOSE, AGENT_ANSWER, SYNTHESIS, CRITIC)
+
+
+def parse_routes(routes: str) -> Dict[str, str]:
+    """Parse "task=tier|backend:model,..." overrides."""
+    parsed = {}
+    for item in routes.split(","):
+        if "=" not in item:
+            continue
+        task, target = item.split("=", 1)
+        parsed[task.strip()] = target.strip()
+    return parsed
+
+
+def create_backend(spec: str) -> BaseModelInterface:
+    """Build a backend from "<backend>:<model>", e.g. "mlx:mlx-community/Qwen2.5-3B-Instruct-4bit"."""
+    backend, _, model_name = spec.partition(":")
+    if backend == "mlx":
+        from src.models.mlx_model import get_mlx_model
+        return get_mlx_model(model_name) if model_name else get_mlx_model()
+    if backend == "openai":
+        from src.models.openai_model import OpenAIModel
+        return OpenAIModel(model_name or None)
+    raise ValueError(f"Unknown model backend in {spec!r}; expected mlx:<model> or openai:<model>")
+
+
+class RoutedModel(BaseModelInterface):
+    """
+    A model bound to one task profile.
+    
+    Agents and call sites hold this like any other model; each call picks up
+    the profile's max_tokens and stop sequences and is routed to the backend
+    configured for the task.
+    """
+    
+    def __init__(self, router: "ModelRouter", profile: TaskProfile):
+        self.router = router
+        self.profile = profile
+    
+    @property
+    def backend(self) -> BaseModelInterface:
+        return self.router.resolve(self.profile)
+    
+    @property
+    def model_name(self) -> str:
+        return self.backend.model_name
+    
+    @property
+    def context_window(self) -> int:
+        return self.backend.context_window
+    
+    @property
+    def supports_json_schema(self) -> bool:
+        return self.backend.supports_json_schema
+    
+    def count_tokens(self, text: str) -> int:
+        return self.backend.count_tokens(text)
+    
+    async def generate(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        cache: Optional[bool] = None,
+        priority: Optional[int] = None,
+        stop: Optional[List[str]] = None,
+        json_schema: Optional[Dict[str, Any]] = None,
+    ) -> ModelResponse:
+        return await self.router.generate(
+            self.profile,
+            prompt,
+            system_prompt=system_prompt,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            cache=cache,
+            priority=priority,
+            stop=stop,
+            json_schema=json_schema,
+        )
+    
+    async def generate_batch(
+        self,
+        prompts: List[str],
+        system_prompt: Union[str, List[Optional[str]], None] = None,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        cache: Optional[bool] = None,
+        priority: Optional[int] = None,
+        stop: Optional[List[str]] = None,
+    ) -> List[ModelResponse]:
+        return await self.router.generate_batch(
+            self.profile,
+            prompts,
+            system_prompt=system_prompt,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            cache=cache,
+            priority=priority,
+            stop=stop,
+        )
+    
+    async def _generate(self, prompt, system_prompt=None, temperature=0.7, max_tokens=1024, priority=0, stop=None, **kwargs):
+        return await self.backend._generate(prompt, system_prompt, temperature, max_tokens, priority, stop, **kwargs)
+
+
+class ModelRouter:
+    """
+    Maps task profiles to configured backends.
+    
+    Each profile names a tier (LLM_SMALL_MODEL / LLM_LARGE_MODEL); LLM_ROUTES
+    can send a task to another tier or straight to a "<backend>:<model>".
+    Backends are created once and shared across tasks that route to them.
+    """
+    
+    def __init__(
+        self,
+        tiers: Optional[Dict[str, str]] = None,
+        routes: Optional[Dict[str, str]] = None
+    ):
+        self.tiers = tiers or {
+            "small": settings.llm_small_model,
+            "large": settings.llm_large_model,
+        }
+        self.routes = parse_routes(settings.llm_routes) if routes is None else routes
+        self._backends: Dict[str, BaseModelInterface] = {}
+        self._stats: Dict[str, Dict[str, float]] = {}
+    
+    def for_task(self, profile: TaskProfile) -> RoutedModel:
+        return RoutedModel(self, profile)
+    
+    def route(self, profile: TaskProfile) -> Tuple[str, str]:
+        """(tier, backend spec) for a profile."""
+        target = self.routes.get(profile.name, profile.tier)
+        if target in self.tiers:
+            return target, self.tiers[target]
+        return "custom", target
+    
+    def resolve(self, profile: TaskProfile) -> BaseModelInterface:
+        _, spec = self.route(profile)
+        if spec not in self._backends:
+            self._backends[spec] = create_backend(spec)
+        return self._backends[spec]
+    
+    async def load(self, profiles=TASK_PROFILES, priority: int = Priority.BACKGROUND):
+        """Load weights for every local backend the profiles route to."""
+        loaded = set()
+        for profile in profiles:
+            backend = self.resolve(profile)
+            if id(backend) in loaded or not hasattr(backend, "load"):
+                continue
+            loaded.add(id(backend))
+            await backend.load(priority=priority)
+    
+    async def generate(
+        self,
+        profile: TaskProfile,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        cache: Optional[bool] = None,
+        priority: Optional[int] = None,
+        stop: Optional[List[str]] = None,
+        json_schema: Optional[Dict[str, Any]] = None,
+    ) -> ModelResponse:
+        """Generate with the profile's defaults on the backend routed for it."""
+        # Profile stop sequences are for free text; schema output ends with the object
+        stop = list(stop or ([] if json_schema else profile.stop)) or None
+        responses = await self._routed(
+            profile,
+            max_tokens,
+            structured=json_schema is not None,
+            call=lambda backend, max_tokens: backend.generate(
+                prompt,
+                system_prompt=system_prompt,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                cache=cache,
+                priority=profile.priority if priority is None else priority,
+                stop=stop,
+                json_schema=json_schema,
+            ),
+        )
+        return responses[0]
+    
+    async def generate_batch(
+        self,
+        profile: TaskProfile,
+        prompts: List[str],
+        system_prompt: Union[str, List[Optional[str]], None] = None,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        cache: Optional[bool] = None,
+        priority: Optional[int] = None,
+        stop: Optional[List[str]] = None,
+    ) -> List[ModelResponse]:
+        """Batched `generate`: one routed call for all of `prompts`."""
+        return await self._routed(
+            profile,
+            max_tokens,
+            batch_size=len(prompts),
+            call=lambda backend, max_tokens: backend.generate_batch(
+                prompts,
+                system_prompt=system_prompt,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                cache=cache,
+                priority=profile.priority if priority is None else priority,
+                stop=list(stop or profile.stop) or None,
+            ),
+        )
+    
+    async def _routed(
+        self,
+        profile: TaskProfile,
+        max_tokens: Optional[int],
+        call: Callable[[BaseModelInterface, int], Awaitable],
+        structured: bool = False,
+        batch_size: int = 0,
+    ) -> List[ModelResponse]:
+        tracer = get_tracer()
+        
+        with tracer.start_as_current_span(
+            f"llm.route.{profile.name}",
+            kind=trace.SpanKind.INTERNAL
+        ) as span:
+            tier, spec = self.route(profile)
+            backend = self.resolve(profile)
+            max_tokens = max_tokens or profile.max_tokens
+            
+            span.set_attribute(SpanAttributes.OPENINFERENCE_SPAN_KIND, "CHAIN")
+            span.set_attribute("route.task", profile.name)
+            span.set_attribute("route.tier", tier)
+            span.set_attribute("route.backend", spec.partition(":")[0])
+            span.set_attribute("route.model", backend.model_name)
+            span.set_attribute("route.max_tokens", max_tokens)
+            span.set_attribute("route.latency_target_ms", profile.latency_target_ms)
+            span.set_attribute("route.structured", structured)
+            if batch_size:
+                span.set_attribute("route.batch_size", batch_size)
+            
+            start = time.time()
+            result = await call(backend, max_tokens)
+            responses = result if batch_size else [result]
+            latency_ms = (time.time() - start) * 1000
+            over_target = bool(profile.latency_target_ms) and latency_ms > profile.latency_target_ms
+            
+            span.set_attribute("route.latency_ms", latency_ms)
+            span.set_attribute("route.over_target", over_target)
+            span.set_attribute("route.cached", all(response.cached for response in responses))
+            if over_target:
+                logger.warning(
+                    f"{profile.name} on {backend.model_name} took {latency_ms:.0f}ms "
+                    f"(target {profile.latency_target_ms}ms)"
+                )
+            
+            stats = self._stats.setdefault(profile.name, {"calls": 0, "total_ms": 0.0, "over_target": 0})
+            stats["model"] = spec
+            stats["calls"] += 1
+            stats["total_ms"] += latency_ms
+            stats["over_target"] += int(over_target)
+            return responses
+    
+    def get_stats(self) -> Dict[str, Dict]:
+        return {
+            task: {
+                "model": stats["model"],
+                "calls": stats["calls"],
+                "avg_latency_ms": round(stats["total_ms"] / stats["calls"], 1),
+                "over_target": stats["over_target"],
+            }
+            for task, stats in self._stats.items()
+        }
+
+
+_router = None
+
+
+def get_model_router() -> ModelRouter:
+    """Get or create the shared model router."""
+    global _router
+    if _router is None:
+        _router = ModelRouter()
+    return _router
@@ -0,0 +1,71 @@
+"""JSON-schema helpers for structured (schema-constrained) generation."""
+
+import copy
+import json
+from typing import Any, Dict, Type
+
+from pydantic import BaseModel
+
+
+class StructuredOutputError(ValueError):
+    """Raised when a model's output does not parse into the requested schema."""
+
+
+def strict_json_schema(model: Type[BaseModel]) -> Dict[str, Any]:
+    """
+    JSON schema for `model` in the strict subset constrained decoders accept.
+    
+    Every object closes with additionalProperties: false and lists all of
+    its properties as required (optional fields stay nullable); defaults
+    and titles are dropped.
+    """
+    schema = copy.deepcopy(model.model_json_schema())
+    
+    def visit(node: Any):
+        if isinstance(node, list):
+            for value in node:
+                visit(value)
+            return
+        if not isinstance(node, dict):
+            return
+        node.pop("title", None)
+        node.pop("default", None)
+        if node.get("type") == "object" and "properties" in node:
+            node["additionalProperties"] = False
+            node["required"] = list(node["properties"])
+        for key, value in node.items():
+            if key in ("properties", "$defs"):
+                # Name -> schema maps: the names are not schema keywords
+                for child in value.values():
+                    visit(child)
+            else:
+                visit(value)
+    
+    visit(schema)
+    return schema
+
+
+def schema_instruction(schema: Dict[str, Any]) -> str:
+    """Prompt suffix for backends that cannot constrain decoding."""
+    return (
+        "\n\nRespond with a single JSON object matching this schema, and nothing else:\n"
+        + json.dumps(schema, separators=(",", ":"))
+    )
+
+
+def extract_json(content: str) -> str:
+    """The outermost JSON object in `content` (tolerates code fences and chatter)."""
+    start = content.find("{")
+    end = content.rfind("}")
+    if start < 0 or end < start:
+        raise StructuredOutputError("No JSON object found in response")
+    return content[start:end + 1]
+
+
+def parse_structured(content: str, model: Type[BaseModel]) -> BaseModel:
+    try:
+        return model.model_validate_json(extract_json(content))
+    except StructuredOutputError:
+        raise
+    except ValueError as e:
+        raise StructuredOutputError(f"Response does not match {model.__name__}: {e}") from e
@@ -2,15 +2,23 @@
 Query decomposition module.
 Breaks complex queries into executable subtasks using LLM.
 """
-import json
 import re
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Literal, Optional
 from pydantic import BaseModel, Field
-from src.models.mlx_model import MLXModel
+from src.config.constants import NON_TICKERS
+from src.models.base import BaseModelInterface
+from src.models.structured import StructuredOutputError
 from src.utils.logging import get_logger
+from opentelemetry import trace
 
 logger = get_logger(__name__)
 
+MACRO_TERMS = (
+    "gdp", "inflation", "cpi", "unemployment", "jobs", "payroll", "interest rate",
+    "fed funds", "federal reserve", "economy", "economic", "recession", "yield curve", "macro",
+)
+SEC_TERMS = ("10-k", "10-q", "8-k", "filing", "risk factor", "annual report", "md&a", "sec ", "disclosure")
+
 
 class Task(BaseModel):
     """Represents a single executable task."""
@@ -28,46 +36,61 @@ class TaskPlan(BaseModel):
     can_parallelize: bool = Field(default=True, description="Whether tasks can run in parallel")
 
 
-class QueryDecomposer:
-    """Decomposes complex queries into executable task plans."""
-    
-    DECOMPOSITION_PROMPT = """You are a financial query analyzer. Break this complex query into executable subtasks.
+class CompactTask(BaseModel):
+    """A task in the compact plan encoding; ids are positional (t1, t2, ...)."""
+    a: Literal["openbb", "sec", "fred", "synthesis"] = Field(description="Agent")
+    q: str = Field(description="Task query")
+    k: Optional[str] = Field(default=None, description="Ticker, or null")
+    d: List[int] = Field(default_factory=list, description="1-based indexes of tasks this one depends on")
 
-Available agents:
-- openbb: Stock prices, P/E ratios, financial metrics, market data (requires ticker symbol)
-- sec: SEC filings, risk factors, 10-K/10-Q data, regulatory documents (requires ticker symbol)
-- fred: GDP, inflation, unemployment, interest rates, macroeconomic indicators (no ticker needed)
-- synthesis: Combine and analyze results from multiple agents (depends on other tasks)
 
-Rules for task decomposition:
-1. Create tasks that can run INDEPENDENTLY in parallel when possible
-2. Only add dependencies (depends_on) when task truly needs results from another task
-3. Always add a synthesis task if query needs multiple data sources combined
-4. Keep task queries specific and actionable
-5. Extract ticker symbols from original query
-6. Avoid unnecessary sequential dependencies
+class CompactTaskPlan(BaseModel):
+    """
+    Short-key encoding of a TaskPlan.
+    
+    Generated instead of the full TaskPlan JSON: one-letter keys and
+    positional ids keep the output a fraction of the tokens.
+    """
+    t: List[CompactTask] = Field(description="Tasks")
+    r: str = Field(description="One-line reasoning")
+    
+    def to_task_plan(self) -> TaskPlan:
+        tasks = [
+            Task(
+                id=f"t{i}",
+                type=task.a,
+                query=task.q,
+                ticker=task.k.upper() if task.k else None,
+                depends_on=[f"t{d}" for d in task.d if 1 <= d <= len(self.t)],
+            )
+            for i, task in enumerate(self.t, 1)
+        ]
+        independent = sum(1 for task in tasks if not task.depends_on)
+        return TaskPlan(tasks=tasks, reasoning=self.r, can_parallelize=independent > 1)
+
 
-Query: {query}
+class QueryDecomposer:
+    """Decomposes complex queries into executable task plans."""
+    
+    DECOMPOSITION_PROMPT = """Break this financial query into subtasks for these agents:
+- openbb: prices, P/E, financial metrics, market data (needs ticker)
+- sec: SEC filings, risk factors, 10-K/10-Q data (needs ticker)
+- fred: GDP, inflation, unemployment, interest rates (no ticker)
+- synthesis: combines results of other tasks
 
-Output valid JSON in this exact format:
-{{
-  "tasks": [
-    {{"id": "t1", "type": "openbb", "query": "Get AAPL P/E ratio", "ticker": "AAPL", "depends_on": []}},
-    {{"id": "t2", "type": "fred", "query": "Get current GDP growth rate", "depends_on": []}},
-    {{"id": "t3", "type": "synthesis", "query": "Compare AAPL P/E ratio to GDP growth", "depends_on": ["t1", "t2"]}}
-  ],
-  "reasoning": "Need both financial metric (P/E) and macro data (GDP), then compare",
-  "can_parallelize": true
-}}
+Rules: prefer independent tasks that run in parallel; add a dependency only when a task needs another's result; end with a synthesis task when several sources must be combined; keep task queries specific; take tickers from the query.
 
-Generate task plan:"""
+Plan JSON: {{"t": [{{"a": agent, "q": task query, "k": ticker or null, "d": [1-based indexes of tasks it depends on]}}], "r": one-line reasoning}}
+Example: {{"t":[{{"a":"openbb","q":"Get AAPL P/E ratio","k":"AAPL","d":[]}},{{"a":"fred","q":"Get current GDP growth rate","k":null,"d":[]}},{{"a":"synthesis","q":"Compare AAPL P/E ratio to GDP growth","k":null,"d":[1,2]}}],"r":"P/E and GDP, then compare"}}
 
-    def __init__(self, model: MLXModel):
+Query: {query}"""
+    
+    def __init__(self, model: BaseModelInterface):
         """
         Initialize decomposer.
         
         Args:
-            model: MLX model for task generation
+            model: Model for task generation (routed with the decompose profile)
         """
         self.model = model
         self.logger = logger
@@ -76,75 +99,79 @@ Generate task plan:"""
         """
         Decompose query into task plan.
         
+        The model generates a schema-constrained CompactTaskPlan; if that
+        fails or comes back empty, a keyword-based plan is used instead, so
+        decomposition itself never fails the request.
+        
         Args:
             query: Complex user query
         
         Returns:
             TaskPlan with executable tasks
-        
-        Raises:
-            ValueError: If decomposition fails
         """
         self.logger.info(f"Decomposing query: {query}")
         
         prompt = self.DECOMPOSITION_PROMPT.format(query=query)
+        span = trace.get_current_span()
         
         try:
-            response = await self.model.generate(prompt, temperature=0.3)
-            task_plan = self._parse_response(response.content)
-            
-            # Validate and optimize task plan
-            task_plan = self._optimize_task_plan(task_plan)
-            
-            self.logger.info(
-                f"Decomposed into {len(task_plan.tasks)} tasks, "
-                f"parallel={task_plan.can_parallelize}"
+            compact = await self.model.generate_structured(
+                prompt, CompactTaskPlan, temperature=0.3, cache=True
             )
-            
-            return task_plan
-            
+            task_plan = compact.to_task_plan()
+            if not task_plan.tasks:
+                raise StructuredOutputError("Empty task plan")
+            span.set_attribute("task_plan.fallback", False)
         except Exception as e:
-            self.logger.error(f"Decomposition failed: {e}")
-            raise ValueError(f"Failed to decompose query: {e}")
-    
-    def _parse_response(self, content: str) -> TaskPlan:
-        """
-        Parse LLM response into TaskPlan.
+            self.logger.warning(f"Decomposition failed, using keyword plan: {e}")
+            task_plan = self.fallback_plan(query)
+            span.set_attribute("task_plan.fallback", True)
         
-        Args:
-            content: LLM response content
+        # Validate and optimize task plan
+        task_plan = self._optimize_task_plan(task_plan)
         
-        Returns:
-            Parsed TaskPlan
+        self.logger.info(
+            f"Decomposed into {len(task_plan.tasks)} tasks, "
+            f"parallel={task_plan.can_parallelize}"
+        )
         
-        Raises:
-            ValueError: If parsing fails
+        return task_plan
+    
+    def fallback_plan(self, query: str) -> TaskPlan:
         """
-        try:
-            # Extract JSON from response
-            if "```json" in content:
-                json_start = content.find("```json") + 7
-                json_end = content.find("```", json_start)
-                json_str = content[json_start:json_end].strip()
-            elif "{" in content:
-                json_start = content.find("{")
-                json_end = content.rfind("}") + 1
-                json_str = content[json_start:json_end]
-            else:
-                raise ValueError("No JSON found in response")
-            
-            # Parse JSON
-            data = json.loads(json_str)
-            
-            # Validate and create TaskPlan
-            return TaskPlan.model_validate(data)
-            
-        except json.JSONDecodeError as e:
-            self.logger.error(f"JSON parse error: {e}\nContent: {content}")
-            raise ValueError(f"Failed to parse JSON: {e}")
-        except Exception as e:
-            self.logger.error(f"TaskPlan validation error: {e}")
-            raise ValueError(f"Failed to validate task plan: {e}")
+        Keyword-based plan: market data (and filings, if asked for) per ticker,
+        FRED for macro terms, and a synthesis task over several sources.
+        """
+        query_lower = query.lower()
+        tickers = []
+        for word in re.findall(r"\b[A-Z]{1,5}\b", query):
+            if word not in NON_TICKERS and word not in tickers:
+                tickers.append(word)
+        tickers = tickers[:4]
+        wants_macro = any(term in query_lower for term in MACRO_TERMS)
+        wants_filings = any(term in query_lower for term in SEC_TERMS)
+        
+        tasks = []
+        for ticker in tickers:
+            if wants_filings:
+                tasks.append(Task(id=f"t{len(tasks) + 1}", type="sec", query=query, ticker=ticker))
+            if not wants_filings or wants_macro:
+                tasks.append(Task(id=f"t{len(tasks) + 1}", type="openbb", query=query, ticker=ticker))
+        if wants_macro or not tasks:
+            tasks.append(Task(id=f"t{len(tasks) + 1}", type="fred", query=query))
+        if len(tasks) > 1:
+            tasks.append(Task(
+                id=f"t{len(tasks) + 1}",
+                type="synthesis",
+                query=query,
+                depends_on=[task.id for task in tasks]
+            ))
+        
+        return TaskPlan(
+            tasks=tasks,
+            reasoning="Keyword-based plan (model decomposition unavailable)",
+            can_parallelize=len(tasks) > 2
+        )
     
     def _optimize_task_plan(self, plan: TaskPlan) -> TaskPlan:
         """
@@ -3,7 +3,7 @@ from src.agents.sec_rag_agent import SECRAGAgent
 from src.agents.openbb_agent import OpenBBAgent
 from src.agents.fred_agent import FREDAgent
 from src.guardrails.schemas import AgentInput
-from src.models.mlx_model import get_mlx_model
+from src.models.router import TaskProfile, AGENT_ANSWER, CLASSIFY, DECOMPOSE, get_model_router
 from src.config.constants import Intent
 from src.orchestration.complexity import ComplexityDetector
 from src.utils.telemetry import get_tracer
@@ -12,19 +12,15 @@ from openinference.semconv.trace import SpanAttributes, OpenInferenceSpanKindVal
 import json
 
 
-# Shared MLX model instance
-_model = None
+# Shared instances
 _decomposer = None
 _task_executor = None
 _tracer = get_tracer("orchestration.nodes")
 
 
-def get_model():
-    """Get or create shared MLX model."""
-    global _model
-    if _model is None:
-        _model = get_mlx_model()
-    return _model
+def get_model(profile: TaskProfile = AGENT_ANSWER):
+    """Get the shared router's model for a task profile."""
+    return get_model_router().for_task(profile)
 
 
 def get_decomposer():
@@ -32,7 +28,7 @@ def get_decomposer():
     global _decomposer
     if _decomposer is None:
         from src.orchestration.decomposer import QueryDecomposer
-        _decomposer = QueryDecomposer(model=get_model())
+        _decomposer = QueryDecomposer(model=get_model(DECOMPOSE))
     return _decomposer
 
 
@@ -51,7 +47,7 @@ async def classify_intent(state: AlphaEdgeState) -> AlphaEdgeState:
         span.set_attribute(SpanAttributes.OPENINFERENCE_SPAN_KIND, OpenInferenceSpanKindValues.CHAIN.value)
         span.set_attribute(SpanAttributes.INPUT_VALUE, state['query'])
         
-        model = get_model()
+        model = get_model(CLASSIFY)
         
         prompt = f"""Classify this query into one category:
 - SEC_FILING: Questions about company filings, 10-K, 10-Q, risk factors
@@ -62,8 +58,8 @@ async def classify_intent(state: AlphaEdgeState) -> AlphaEdgeState:
 Query: {state['query']}
 
 Respond with just the category name."""
-
-        response = await model.generate(prompt, temperature=0.1)
+        
+        response = await model.generate(prompt, temperature=0.1, cache=True)
         intent = response.content.strip().upper()
         
         # Map to constants
@@ -0,0 +1,235 @@
+"""
+Watchlist prefetch scheduler.
+Keeps hot tickers warm so first queries skip SEC ingestion and cold data fetches.
+"""
+import asyncio
+import time
+from collections import Counter, deque
+from datetime import datetime
+from typing import Deque, Dict, List, Optional, Set, Tuple
+
+from src.config.settings import settings
+from src.config.constants import FRED_SERIES
+from src.utils.logging import get_logger
+from src.utils.telemetry import get_tracer
+
+logger = get_logger(__name__)
+tracer = get_tracer("orchestration.prefetch")
+
+# Retrieval query that routes OpenBBAgent to quote, price history + fundamentals endpoints
+OPENBB_WARM_QUERY = "current price history valuation revenue balance sheet cash flow"
+
+
+def parse_quiet_hours(spec: Optional[str]) -> Optional[Tuple[int, int]]:
+    """Parse an "HH-HH" local-time window, e.g. "22-6"."""
+    if not spec:
+        return None
+    start, end = spec.split("-", 1)
+    return int(start) % 24, int(end) % 24
+
+
+class PrefetchScheduler:
+    """
+    Pre-ingests filings and refreshes market/macro data ahead of demand.
+    
+    Targets are the configured watchlist plus the most queried tickers in
+    recent history. Work is throttled to a fixed request rate and paused
+    during quiet hours. Runs as a task in the API process or standalone
+    (see scripts/prefetch.py).
+    """
+    
+    def __init__(
+        self,
+        watchlist: Optional[List[str]] = None,
+        sec_loader=None,
+        openbb_agent=None,
+        fred_agent=None,
+    ):
+        if watchlist is None:
+            watchlist = [t for t in settings.prefetch_watchlist.split(",") if t.strip()]
+        self.watchlist = [t.strip().upper() for t in watchlist]
+        self.quiet_hours = parse_quiet_hours(settings.prefetch_quiet_hours)
+        self.interval = settings.prefetch_interval_seconds
+        self._min_spacing = 60.0 / max(settings.prefetch_requests_per_minute, 1)
+        self._last_request = 0.0
+        
+        self._sec_loader = sec_loader
+        self._openbb_agent = openbb_agent
+        self._fred_agent = fred_agent
+        
+        self._history: Deque[str] = deque(maxlen=settings.prefetch_history_size)
+        self._warm: Dict[str, float] = {}
+        self._queried: Set[str] = set()
+        self._models_warm = False
+        self._task: Optional[asyncio.Task] = None
+        
+        self.stats = {
+            "cycles": 0,
+            "tickers_warmed": 0,
+            "errors": 0,
+            "skipped_quiet_hours": 0,
+            "cold_paths_avoided": 0,
+            "cold_paths_taken": 0,
+        }
+    
+    # Lazily built so importing the scheduler does not load models or clients
+    @property
+    def sec_loader(self):
+        if self._sec_loader is None:
+            from src.data.sec_loader import SECLoader
+            self._sec_loader = SECLoader()
+        return self._sec_loader
+    
+    @property
+    def openbb_agent(self):
+        if self._openbb_agent is None:
+            from src.agents.openbb_agent import OpenBBAgent
+            from src.models.router import AGENT_ANSWER, get_model_router
+            self._openbb_agent = OpenBBAgent(model=get_model_router().for_task(AGENT_ANSWER))
+        return self._openbb_agent
+    
+    @property
+    def fred_agent(self):
+        if self._fred_agent is None:
+            from src.agents.fred_agent import FREDAgent
+            from src.models.router import AGENT_ANSWER, get_model_router
+            self._fred_agent = FREDAgent(model=get_model_router().for_task(AGENT_ANSWER))
+        return self._fred_agent
+    
+    def record_query(self, ticker: Optional[str]):
+        """Record a user query and count whether its first hit found the ticker warm."""
+        if not ticker:
+            return
+        ticker = ticker.upper()
+        self._history.append(ticker)
+        if ticker in self._queried:
+            return
+        self._queried.add(ticker)
+        if ticker in self._warm:
+            self.stats["cold_paths_avoided"] += 1
+        else:
+            self.stats["cold_paths_taken"] += 1
+    
+    def targets(self) -> List[str]:
+        """Watchlist first, then the most frequently queried tickers."""
+        popular = [t for t, _ in Counter(self._history).most_common(settings.prefetch_history_top_n)]
+        seen = set()
+        ordered = []
+        for ticker in self.watchlist + popular:
+            if ticker not in seen:
+                seen.add(ticker)
+                ordered.append(ticker)
+        return ordered
+    
+    def in_quiet_hours(self, now: Optional[datetime] = None) -> bool:
+        if not self.quiet_hours:
+            return False
+        hour = (now or datetime.now()).hour
+        start, end = self.quiet_hours
+        if start <= end:
+            return start <= hour < end
+        return hour >= start or hour < end
+    
+    async def _throttle(self):
+        wait = self._last_request + self._min_spacing - time.monotonic()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        self._last_request = time.monotonic()
+    
+    async def warm_models(self):
+        """Load the embedding and routed local LLM weights once."""
+        if self._models_warm:
+            return
+        from src.data.embeddings import get_embedding_model
+        await asyncio.to_thread(get_embedding_model)
+        try:
+            from src.models.router import get_model_router
+            await get_model_router().load()
+        except ImportError:
+            logger.info("MLX not available, skipping local LLM warm-up")
+        self._models_warm = True
+    
+    async def warm_ticker(self, ticker: str):
+        """Ingest new filings and refresh quote/fundamentals for one ticker."""
+        with tracer.start_as_current_span("prefetch.warm_ticker") as span:
+            span.set_attribute("prefetch.ticker", ticker)
+            
+            await self._throttle()
+            result = await asyncio.to_thread(
+                self.sec_loader.ingest, ticker, settings.prefetch_sec_limit
+            )
+            span.set_attribute("prefetch.sec_new_filings", result.get("files", 0))
+            
+            await self._throttle()
+            contexts = await self.openbb_agent._retrieve(OPENBB_WARM_QUERY, {"ticker": ticker})
+            span.set_attribute("prefetch.openbb_contexts", len(contexts))
+            
+            self._warm[ticker] = time.time()
+            self.stats["tickers_warmed"] += 1
+    
+    async def warm_macro(self):
+        """Refresh the FRED series the macro agent serves into the local store."""
+        await self._throttle()
+        await self.fred_agent._retrieve(" ".join(FRED_SERIES), {"refresh": True})
+    
+    async def run_cycle(self):
+        """Run one prefetch pass over all targets."""
+        if self.in_quiet_hours():
+            self.stats["skipped_quiet_hours"] += 1
+            return
+        
+        with tracer.start_as_current_span("prefetch.cycle") as span:
+            targets = self.targets()
+            span.set_attribute("prefetch.target_count", len(targets))
+            
+            for step in [self.warm_models, self.warm_macro]:
+                try:
+                    await step()
+                except Exception as e:
+                    self.stats["errors"] += 1
+                    logger.error(f"Prefetch step {step.__name__} failed: {e}")
+            
+            for ticker in targets:
+                if self.in_quiet_hours():
+                    break
+                try:
+                    await self.warm_ticker(ticker)
+                except Exception as e:
+                    self.stats["errors"] += 1
+                    logger.error(f"Prefetch failed for {ticker}: {e}")
+            
+            self.stats["cycles"] += 1
+            logger.info(f"Prefetch cycle complete: {self.get_stats()}")
+    
+    async def run_forever(self):
+        while True:
+            await self.run_cycle()
+            await asyncio.sleep(self.interval)
+    
+    def start(self):
+        """Start the scheduler as a background task on the running loop."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run_forever())
+    
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+    
+    def get_stats(self) -> Dict[str, int]:
+        return {**self.stats, "warm_tickers": len(self._warm)}
+
+
+_scheduler = None
+
+
+def get_prefetch_scheduler() -> PrefetchScheduler:
+    """Get or create the process-wide scheduler."""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = PrefetchScheduler()
+    return _scheduler
@@ -1,15 +1,17 @@
 """
-Task executor with sequential execution.
-Executes tasks one by one, respecting dependencies.
+Task executor with wave execution.
+Executes every task whose dependencies are met together, wave by wave.
 """
+import asyncio
 from typing import List, Dict, Any
 from src.orchestration.decomposer import Task, TaskPlan
 from src.agents.sec_rag_agent import SECRAGAgent
 from src.agents.openbb_agent import OpenBBAgent
 from src.agents.fred_agent import FREDAgent
 from src.agents.synthesis_agent import SynthesisAgent
-from src.guardrails.schemas import AgentInput
-from src.models.mlx_model import get_mlx_model
+from src.agents.base_agent import BaseAgent
+from src.guardrails.schemas import AgentInput, AgentOutput
+from src.models.router import AGENT_ANSWER, SYNTHESIS, get_model_router
 from src.utils.logging import get_logger
 from src.utils.telemetry import get_tracer
 from opentelemetry import trace
@@ -23,7 +25,8 @@ class TaskExecutor:
     
     def __init__(self):
         """Initialize task executor."""
-        self.model = get_mlx_model()
+        self.router = get_model_router()
+        self.model = self.router.for_task(AGENT_ANSWER)
         self.logger = logger
         
         # Agent instances (reused across tasks)
@@ -39,7 +42,7 @@ class TaskExecutor:
             elif agent_type == "fred":
                 self._agents[agent_type] = FREDAgent(model=self.model)
             elif agent_type == "synthesis":
-                self._agents[agent_type] = SynthesisAgent(model=self.model)
+                self._agents[agent_type] = SynthesisAgent(model=self.router.for_task(SYNTHESIS))
             else:
                 raise ValueError(f"Unknown agent type: {agent_type}")
         
@@ -47,7 +50,10 @@ class TaskExecutor:
     
     async def execute_plan(self, plan: TaskPlan, original_query: str) -> Dict[str, Any]:
         """
-        Execute task plan sequentially (one task at a time).
+        Execute task plan in waves.
+        
+        Each wave is every task whose dependencies are complete; its agents
+        retrieve concurrently and their prompts share one batched generation.
         
         Args:
             plan: Task plan to execute
@@ -58,25 +64,24 @@ class TaskExecutor:
         """
         with tracer.start_as_current_span("task_executor.execute_plan") as span:
             span.set_attribute("task_count", len(plan.tasks))
-            span.set_attribute("execution_mode", "sequential")
+            span.set_attribute("execution_mode", "waves")
             
             self.logger.info(
-                f"Executing plan with {len(plan.tasks)} tasks sequentially"
+                f"Executing plan with {len(plan.tasks)} tasks in dependency waves"
             )
             
             task_results = {}
             completed = set()
+            waves = 0
             
-            # Execute tasks one by one, respecting dependencies
             while len(completed) < len(plan.tasks):
-                # Find next ready task (dependencies met)
-                ready_task = None
-                for task in plan.tasks:
-                    if task.id not in completed and all(dep in completed for dep in task.depends_on):
-                        ready_task = task
-                        break
+                # Every task whose dependencies are met
+                wave = [
+                    task for task in plan.tasks
+                    if task.id not in completed and all(dep in completed for dep in task.depends_on)
+                ]
                 
-                if not ready_task:
+                if not wave:
                     # Deadlock - shouldn't happen with optimized plan
                     self.logger.error(
                         f"No ready tasks. Completed: {completed}, "
@@ -84,35 +89,91 @@ class TaskExecutor:
                     )
                     break
                 
-                self.logger.info(f"Executing task {ready_task.id} ({ready_task.type})")
-                
-                # Execute single task
-                try:
-                    result = await self._execute_task(ready_task, task_results, original_query)
-                    task_results[ready_task.id] = result
-                except Exception as e:
-                    self.logger.error(f"Task {ready_task.id} failed: {e}")
-                    task_results[ready_task.id] = {
-                        "type": ready_task.type,
-                        "status": "failed",
-                        "error": str(e),
-                        "result": {
-                            "response_text": f"Error: {e}",
-                            "citations": [],
-                            "confidence_score": 0.0
-                        }
-                    }
+                waves += 1
+                self.logger.info(f"Executing wave {waves}: {[t.id for t in wave]}")
                 
-                completed.add(ready_task.id)
+                results = await self._execute_wave(wave, task_results, original_query)
+                for task, result in zip(wave, results):
+                    if isinstance(result, Exception):
+                        self.logger.error(f"Task {task.id} failed: {result}")
+                        result = self._failed_result(task, result)
+                    task_results[task.id] = result
+                    completed.add(task.id)
             
             span.set_attribute("completed_tasks", len(completed))
+            span.set_attribute("wave_count", waves)
             
             self.logger.info(
-                f"Plan execution complete. {len(completed)}/{len(plan.tasks)} tasks completed sequentially"
+                f"Plan execution complete. {len(completed)}/{len(plan.tasks)} tasks completed in {waves} waves"
             )
             
             return task_results
     
+    async def _execute_wave(
+        self,
+        wave: List[Task],
+        task_results: Dict[str, Any],
+        original_query: str
+    ) -> List[Any]:
+        """
+        Execute one wave; returns a result dict or exception per task, in order.
+        
+        Data tasks run through `BaseAgent.execute_many`; synthesis tasks
+        (which read earlier results) run alongside them on their own.
+        """
+        with tracer.start_as_current_span("task_executor.execute_wave") as span:
+            span.set_attribute("wave.task_ids", ",".join(task.id for task in wave))
+            
+            batched = [task for task in wave if task.type != "synthesis"]
+            single = [task for task in wave if task.type == "synthesis"]
+            span.set_attribute("wave.batched_tasks", len(batched))
+            
+            async def run_batched() -> List[Any]:
+                jobs = []
+                for task in batched:
+                    agent = self._get_agent(task.type)
+                    jobs.append((agent, AgentInput(
+                        query=task.query,
+                        filters={"ticker": task.ticker} if task.ticker else {}
+                    )))
+                return await BaseAgent.execute_many(jobs) if jobs else []
+            
+            outcomes = await asyncio.gather(
+                run_batched(),
+                *(self._execute_task(task, task_results, original_query) for task in single),
+                return_exceptions=True
+            )
+            
+            by_id = {}
+            batch_outcome = outcomes[0]
+            if isinstance(batch_outcome, Exception):
+                batch_outcome = [batch_outcome] * len(batched)
+            for task, output in zip(batched, batch_outcome):
+                by_id[task.id] = output if isinstance(output, Exception) else self._task_result(task, output)
+            for task, outcome in zip(single, outcomes[1:]):
+                by_id[task.id] = outcome
+            
+            return [by_id[task.id] for task in wave]
+    
+    def _task_result(self, task: Task, output: AgentOutput) -> Dict[str, Any]:
+        return {
+            "type": task.type,
+            "status": "success",
+            "result": output.model_dump()
+        }
+    
+    def _failed_result(self, task: Task, error: Exception) -> Dict[str, Any]:
+        return {
+            "type": task.type,
+            "status": "failed",
+            "error": str(error),
+            "result": {
+                "response_text": f"Error: {error}",
+                "citations": [],
+                "confidence_score": 0.0
+            }
+        }
+    
     async def _execute_task(
         self, 
         task: Task, 
@@ -142,40 +203,27 @@ class TaskExecutor:
                 # Get appropriate agent
                 agent = self._get_agent(task.type)
                 
-                # Prepare input
                 if task.type == "synthesis":
-                    # Synthesis needs results from dependent tasks
-                    dependent_results = {
-                        dep_id: task_results[dep_id]
+                    # Synthesis combines the outputs of the tasks it depends on
+                    dependent_outputs = [
+                        AgentOutput.model_validate(task_results[dep_id]["result"])
                         for dep_id in task.depends_on
-                        if dep_id in task_results
-                    }
-                    
-                    agent_input = AgentInput(
-                        query=task.query or original_query,
-                        filters={"ticker": task.ticker} if task.ticker else {},
-                        metadata={"task_results": dependent_results}
-                    )
+                        if task_results.get(dep_id, {}).get("status") == "success"
+                    ]
+                    result = await agent.synthesize(task.query or original_query, dependent_outputs)
                 else:
-                    # Regular agent
                     agent_input = AgentInput(
                         query=task.query,
                         filters={"ticker": task.ticker} if task.ticker else {}
                     )
-                
-                # Execute agent
-                result = await agent.execute(agent_input)
+                    result = await agent.execute(agent_input)
                 
                 span.set_attribute("task.status", "success")
                 span.set_attribute("task.confidence", result.confidence_score)
                 span.set_attribute("task.citation_count", len(result.citations))
                 
-                return {
-                    "type": task.type,
-                    "status": "success",
-                    "result": result.model_dump()
-                }
-                
+                return self._task_result(task, result)
+            
             except Exception as e:
                 self.logger.error(f"Task {task.id} execution failed: {e}")
                 span.set_attribute("task.status", "failed")
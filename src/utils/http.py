@@ -0,0 +1,67 @@
+"""Shared HTTP retry for the data clients (EDGAR, FRED) and Retry-After parsing."""
+
+import asyncio
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+import httpx
+
+from src.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+RETRY_ATTEMPTS = 3
+
+
+def is_retryable(response: httpx.Response) -> bool:
+    return response.status_code == 429 or response.status_code >= 500
+
+
+def retry_after(response: httpx.Response) -> Optional[float]:
+    """Seconds the Retry-After header asks for (delta-seconds or HTTP-date); None when absent or unreadable."""
+    header = response.headers.get("Retry-After")
+    if not header:
+        return None
+    try:
+        return max(0.0, float(header))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def retry_delay(response: httpx.Response, attempt: int) -> float:
+    """Seconds to wait before the next attempt: Retry-After, else exponential backoff."""
+    delay = retry_after(response)
+    return delay if delay is not None else float(2 ** attempt)
+
+
+async def get_with_retry(
+    client: httpx.AsyncClient,
+    url: str,
+    limiter=None,
+    source: str = "HTTP",
+    attempts: int = RETRY_ATTEMPTS,
+    **kwargs
+) -> httpx.Response:
+    """
+    GET through `limiter` (anything with an async `acquire`), retrying
+    429/5xx responses; the last response is returned as is, without a
+    final wait, for the caller to check.
+    """
+    for attempt in range(attempts):
+        if limiter is not None:
+            await limiter.acquire()
+        response = await client.get(url, **kwargs)
+        if not is_retryable(response) or attempt == attempts - 1:
+            return response
+        delay = retry_delay(response, attempt)
+        logger.warning(f"{source} {response.status_code} for {url}, retrying in {delay:.1f}s")
+        await asyncio.sleep(delay)
+    return response
@@ -0,0 +1,110 @@
+import pytest
+
+from src.config.settings import settings
+from src.models.base import BaseModelInterface, ModelResponse
+
+
+class StubModel(BaseModelInterface):
+    """Model that answers every prompt with a fixed reply and records batched prompts."""
+    
+    def __init__(self, content: str = "", model_name: str = "stub"):
+        self.content = content
+        self.model_name = model_name
+        self.batches = []
+    
+    async def _generate(self, prompt, system_prompt=None, temperature=0.7, max_tokens=1024, priority=0, stop=None):
+        return ModelResponse(content=self.content, model=self.model_name)
+    
+    async def generate_batch(self, prompts, **kwargs):
+        self.batches.append(list(prompts))
+        return await super().generate_batch(prompts, **kwargs)
+
+
+@pytest.fixture(scope="session")
+def tiny_model_dir(tmp_path_factory):
+    """Build a small random BERT sentence-transformer so no download is needed."""
+    from transformers import BertConfig, BertModel, BertTokenizerFast
+    from sentence_transformers import SentenceTransformer, models
+    
+    root = tmp_path_factory.mktemp("tiny-bert")
+    words = [
+        "apple", "reported", "revenue", "growth", "risk", "factors", "include",
+        "supply", "chain", "the", "company", "repurchased", "shares",
+    ]
+    vocab = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"] + words
+    (root / "vocab.txt").write_text("\n".join(vocab))
+    
+    BertTokenizerFast(vocab_file=str(root / "vocab.txt")).save_pretrained(root / "hf")
+    BertModel(BertConfig(
+        vocab_size=len(vocab), hidden_size=32, num_hidden_layers=2,
+        num_attention_heads=2, intermediate_size=64, max_position_embeddings=64,
+    )).save_pretrained(root / "hf")
+    
+    transformer = models.Transformer(str(root / "hf"), max_seq_length=32)
+    pooling = models.Pooling(transformer.get_word_embedding_dimension(), pooling_mode="cls")
+    SentenceTransformer(modules=[transformer, pooling]).save(str(root / "st"))
+    return str(root / "st")
+
+
+# Settings holding on-disk store locations, and where each goes under tmp_path
+DATA_PATHS = {
+    "llm_cache_path": "llm_cache.db",
+    "fred_store_path": "fred.db",
+    "sec_cache_dir": "edgar_cache",
+    "price_store_dir": "prices",
+    "filing_archive_dir": "filings",
+    "local_index_dir": "local_index",
+    "chroma_persist_dir": "vectordb",
+    "docstore_path": "docstore.db",
+}
+
+
+@pytest.fixture(autouse=True)
+def data_dir(tmp_path, monkeypatch):
+    """Point every store's default location at tmp_path and drop cached singletons, so tests never write to ./data."""
+    from src.data import docstore, filing_archive, fred_catalog, fred_store, price_store
+    from src.models import cache
+    
+    root = tmp_path / "data"
+    for name, path in DATA_PATHS.items():
+        monkeypatch.setattr(settings, name, str(root / path))
+    for module, name in [
+        (docstore, "_docstore"),
+        (filing_archive, "_archive"),
+        (fred_store, "_fred_store"),
+        (fred_catalog, "_fred_catalog"),
+        (price_store, "_price_store"),
+        (price_store, "_price_refresher"),
+        (cache, "_cache"),
+    ]:
+        monkeypatch.setattr(module, name, None)
+    return root
+
+
+@pytest.fixture(autouse=True)
+def fundamentals_store(tmp_path, monkeypatch):
+    """Give each test its own fundamentals table, so agents never write to ./data."""
+    from src.data import fundamentals_store as module
+    
+    store = module.FundamentalsStore(str(tmp_path / "fundamentals.db"))
+    monkeypatch.setattr(module, "_fundamentals_store", store)
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def null_model():
+    """Model replying with an empty answer, for agents whose retrieval is under test."""
+    return StubModel(model_name="null")
+
+
+@pytest.fixture
+def echo_model():
+    """Model replying "ok" to every prompt."""
+    return StubModel(content="ok", model_name="echo")
+
+
+@pytest.fixture
+def no_llm_cache(monkeypatch):
+    """Keep stub replies out of (and away from) the on-disk completion cache."""
+    monkeypatch.setattr(settings, "llm_cache_enabled", False)
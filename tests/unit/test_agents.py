@@ -3,6 +3,7 @@ from unittest.mock import AsyncMock, MagicMock, patch
 from src.agents.sec_rag_agent import SECRAGAgent
 from src.agents.openbb_agent import OpenBBAgent
 from src.agents.fred_agent import FREDAgent
+from src.config.settings import Settings
 from src.guardrails.schemas import AgentInput, RetrievedContext
 
 
@@ -18,6 +19,7 @@ def mock_vector_store():
             metadata={"ticker": "AAPL"}
         ), 0.9)
     ]
+    store.expand_windows.side_effect = lambda results, **kwargs: results
     return store
 
 
@@ -140,3 +142,48 @@ async def test_agent_confidence_calculation():
     
     assert 0 <= confidence <= 1
     assert confidence > 0.5  # Should have decent confidence with good relevance
+
+
+def test_sec_agent_extracts_filing_scope(mock_model):
+    """Test recency phrases map to latest-N filing scopes."""
+    with patch("src.agents.sec_rag_agent.get_vector_store"), patch("src.agents.sec_rag_agent.SECLoader"):
+        agent = SECRAGAgent(model=mock_model)
+    
+    assert agent._extract_filing_scope("AAPL margins over the last 4 quarters") == {"latest_n": 4, "filing_type": "10-Q"}
+    assert agent._extract_filing_scope("Risk factors in the latest 10-K") == {"latest_n": 1, "filing_type": "10-K"}
+    assert agent._extract_filing_scope("past two years of annual reports") == {"latest_n": 2, "filing_type": "10-K"}
+    assert agent._extract_filing_scope("AAPL over the last ten quarters") == {"latest_n": 10, "filing_type": "10-Q"}
+    assert agent._extract_filing_scope("past nine 10-Qs") == {"latest_n": 9, "filing_type": "10-Q"}
+    assert agent._extract_filing_scope("What are Apple's risk factors?") == {}
+
+
+def test_sec_agent_mmr_is_opt_in(mock_model):
+    """Test MMR re-ranking is off by default and can be requested per call."""
+    with patch("src.agents.sec_rag_agent.get_vector_store"), patch("src.agents.sec_rag_agent.SECLoader"):
+        agent = SECRAGAgent(model=mock_model)
+    
+    assert Settings.model_fields["retrieval_mmr"].default is False
+    assert agent._mmr_options({"mmr": False}) == {}
+    assert agent._mmr_options({"mmr": True, "mmr_lambda": 0.5})["mmr_lambda"] == 0.5
+
+
+@pytest.mark.asyncio
+async def test_agent_defaults_build_prompt_and_cite_sources(mock_model):
+    """Test an agent without prompt overrides answers from its template and cites its source type."""
+    from src.agents.base_agent import BaseAgent
+    
+    class MacroAgent(BaseAgent):
+        citation_source_type = "macro_data"
+        
+        @property
+        def system_prompt(self):
+            return ""
+        
+        async def _retrieve(self, query, filters):
+            return [RetrievedContext(source_id="UNRATE", text="Unemployment was 3.9%.", relevance_score=0.9)]
+    
+    result = await MacroAgent(name="macro", model=mock_model).execute(AgentInput(query="Jobs?"))
+    
+    prompt = mock_model.generate.call_args.kwargs["prompt"]
+    assert prompt.startswith("Question: Jobs?") and "Unemployment was 3.9%." in prompt
+    assert [(c.source_type, c.source_id) for c in result.citations] == [("macro_data", "UNRATE")]
@@ -0,0 +1,120 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.agents.synthesis_agent import SynthesisAgent
+from src.data import analytics
+from src.guardrails.schemas import AgentOutput, RetrievedContext
+from src.models.base import BaseModelInterface, ModelResponse
+
+
+class PromptModel(BaseModelInterface):
+    def __init__(self):
+        self.model_name = "prompt"
+        self.prompts = []
+    
+    async def _generate(self, prompt, system_prompt=None, temperature=0.7, max_tokens=1024, priority=0, stop=None):
+        self.prompts.append(prompt)
+        return ModelResponse(content="Synthesized [Source 1].", model=self.model_name)
+
+
+def monthly(values, start="2022-01-01"):
+    return pd.Series(values, index=pd.date_range(start, periods=len(values), freq="MS"), dtype=float)
+
+
+def test_summary_of_monthly_series():
+    series = monthly([100 + i for i in range(25)])
+    
+    summary = analytics.summarize(series, "CPIAUCSL")
+    
+    assert summary.frequency == "monthly"
+    assert summary.latest == 124 and summary.previous == 123
+    assert summary.change_yoy == pytest.approx((124 / 112 - 1) * 100)
+    assert summary.average_1y == pytest.approx(np.mean(range(113, 125)))
+    assert summary.trend == "rising"
+    text = summary.to_text()
+    assert "Latest Value: 124.00" in text and "Previous: 123.00" in text
+    assert "Date: 2024-01-01" in text and "Change vs previous month: +0.81%" in text
+
+
+def test_drawdown_and_volatility():
+    prices = pd.Series(
+        [100.0, 120.0, 90.0, 110.0, 60.0, 80.0],
+        index=pd.bdate_range("2024-01-01", periods=6)
+    )
+    
+    depth, peak, trough = analytics.max_drawdown(prices)
+    
+    assert depth == pytest.approx(-50.0)
+    assert (peak, trough) == (prices.index[1], prices.index[4])
+    expected = np.diff(np.log(prices.to_numpy())).std(ddof=1) * np.sqrt(252) * 100
+    assert analytics.volatility(prices) == pytest.approx(expected)
+    assert analytics.volatility(monthly([1.0, 2.0])) is None
+
+
+def test_correlation_aligns_mixed_frequencies():
+    rng = np.random.default_rng(7)
+    moves = rng.normal(0, 0.02, 24)
+    macro = monthly(100 * np.cumprod(1 + moves))
+    # Daily prices whose month-end values track the macro series exactly, plus an unrelated series
+    days = pd.bdate_range("2022-01-01", "2023-12-31")
+    prices = macro.resample("ME").last().reindex(days, method="bfill").ffill()
+    prices.index = days
+    noise = monthly(100 * np.cumprod(1 + rng.normal(0, 0.02, 24)))
+    
+    pairs = analytics.correlations({"INDPRO": macro, "SPY": prices, "NOISE": noise})
+    
+    a, b, corr, periods = pairs[0]
+    assert {a, b} == {"INDPRO", "SPY"}
+    assert corr > 0.9 and periods >= analytics.MIN_OVERLAP
+    assert analytics.correlations({"INDPRO": macro, "SHORT": macro.iloc[:4]}) == []
+
+
+def test_align_of_empty_series_is_empty():
+    empty = analytics.to_series([], "UNKNOWN")
+    
+    aligned = analytics.align({"UNKNOWN": empty, "UNLOADED": analytics.to_series([], "UNLOADED")})
+    
+    assert aligned.empty and isinstance(aligned.index, pd.DatetimeIndex)
+    assert analytics.align({}).empty
+    assert analytics.correlations({"UNKNOWN": empty, "INDPRO": monthly([1.0, 2.0, 3.0])}) == []
+
+
+def test_compact_round_trip():
+    series = monthly([1.5, 2.5, 3.5])
+    
+    restored = analytics.from_compact(analytics.compact(series))
+    
+    assert restored.tolist() == [1.5, 2.5, 3.5]
+    assert restored.index[-1] == pd.Timestamp("2022-03-31")
+
+
+@pytest.mark.asyncio
+async def test_synthesis_adds_computed_correlations():
+    rng = np.random.default_rng(3)
+    base = monthly(100 * np.cumprod(1 + rng.normal(0, 0.03, 24)))
+    outputs = [
+        AgentOutput(
+            agent_name=name,
+            response_text="",
+            retrieved_contexts=[RetrievedContext(
+                source_id=source_id,
+                text=source_id,
+                relevance_score=0.8,
+                metadata={**metadata, "series": analytics.compact(series)}
+            )],
+            confidence_score=0.8,
+            processing_time_ms=1
+        )
+        for name, source_id, metadata, series in [
+            ("fred", "FRED-INDPRO", {"series_id": "INDPRO"}, base),
+            ("openbb", "openbb-historical-SPY", {"type": "historical", "ticker": "SPY"}, base * 2),
+        ]
+    ]
+    model = PromptModel()
+    
+    result = await SynthesisAgent(model=model).synthesize("Does SPY track industrial production?", outputs)
+    
+    assert result.retrieved_contexts[0].source_id == "computed-correlations"
+    assert "INDPRO vs SPY: +1.00" in model.prompts[0]
+    assert [c.source_type for c in result.citations] == ["financial_data", "macro_data", "financial_data"]
@@ -0,0 +1,81 @@
+import pytest
+
+from src.config.settings import settings
+from src.models import cache as cache_module
+from src.models.base import BaseModelInterface, ModelResponse
+from src.models.cache import CompletionCache, cache_key
+
+
+class CountingModel(BaseModelInterface):
+    model_name = "stub"
+    
+    def __init__(self):
+        self.calls = 0
+    
+    async def _generate(self, prompt, system_prompt=None, temperature=0.7, max_tokens=1024, priority=0, stop=None):
+        self.calls += 1
+        return ModelResponse(content=f"answer {self.calls}", model=self.model_name)
+
+
+@pytest.fixture
+def completion_cache(tmp_path, monkeypatch):
+    cache = CompletionCache(path=str(tmp_path / "llm_cache.db"), memory_size=2)
+    monkeypatch.setattr(cache_module, "_cache", cache)
+    monkeypatch.setattr(settings, "llm_cache_enabled", True)
+    yield cache
+    cache.close()
+
+
+@pytest.mark.asyncio
+async def test_repeat_prompt_skips_model(completion_cache):
+    """Test an identical low-temperature call is served from cache."""
+    model = CountingModel()
+    
+    first = await model.generate("classify: AAPL revenue", temperature=0.1)
+    second = await model.generate("classify: AAPL revenue", temperature=0.1)
+    
+    assert model.calls == 1
+    assert second.content == first.content and second.cached
+    assert completion_cache.get_stats()["memory_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_key_covers_all_generation_inputs(completion_cache):
+    """Test prompt, system prompt, temperature and max_tokens all split the key."""
+    model = CountingModel()
+    await model.generate("q", temperature=0.1)
+    await model.generate("q", system_prompt="s", temperature=0.1)
+    await model.generate("q", temperature=0.2)
+    await model.generate("q", temperature=0.1, max_tokens=64)
+    assert model.calls == 4
+
+
+@pytest.mark.asyncio
+async def test_per_call_opt_in_and_out(completion_cache):
+    """Test high temperatures bypass by default unless a call opts in."""
+    model = CountingModel()
+    await model.generate("draft", temperature=0.7)
+    await model.generate("draft", temperature=0.7)
+    assert model.calls == 2
+    
+    await model.generate("draft", temperature=0.7, cache=True)
+    await model.generate("draft", temperature=0.7, cache=True)
+    assert model.calls == 3
+    
+    await model.generate("classify", temperature=0.1, cache=False)
+    await model.generate("classify", temperature=0.1, cache=False)
+    assert model.calls == 5
+
+
+def test_disk_tier_survives_restart_and_ttl(tmp_path):
+    """Test entries persist across instances and expire after the TTL."""
+    path = str(tmp_path / "llm_cache.db")
+    key = cache_key("stub", None, "q", 0.1, 1024)
+    
+    CompletionCache(path=path).put(key, "stub", "cached answer", "stub")
+    reopened = CompletionCache(path=path)
+    assert reopened.get(key) == ("cached answer", "stub")
+    assert reopened.get_stats()["disk_hits"] == 1
+    
+    expired = CompletionCache(path=path, ttl_seconds=-1)
+    assert expired.get(key) is None
@@ -0,0 +1,91 @@
+import json
+
+import pytest
+
+from src.config.settings import settings
+from src.models.base import BaseModelInterface, ModelResponse
+from src.models.structured import strict_json_schema
+from src.orchestration.decomposer import CompactTaskPlan, QueryDecomposer
+
+
+class PlanModel(BaseModelInterface):
+    """Returns canned output and records what it was asked for."""
+    
+    def __init__(self, content, supports_json_schema=True):
+        self.model_name = "plan-model"
+        self.content = content
+        self.supports_json_schema = supports_json_schema
+        self.calls = []
+    
+    async def _generate(self, prompt, system_prompt=None, temperature=0.7, max_tokens=1024, priority=0, stop=None, json_schema=None):
+        self.calls.append({"prompt": prompt, "json_schema": json_schema})
+        return ModelResponse(content=self.content, model=self.model_name)
+
+
+COMPACT = {
+    "t": [
+        {"a": "openbb", "q": "Get AAPL P/E ratio", "k": "aapl", "d": []},
+        {"a": "fred", "q": "Get GDP growth", "k": None, "d": []},
+        {"a": "synthesis", "q": "Compare P/E to GDP growth", "k": None, "d": [1, 2, 3]},
+    ],
+    "r": "P/E and GDP, then compare",
+}
+
+
+@pytest.fixture(autouse=True)
+def no_cache(monkeypatch):
+    monkeypatch.setattr(settings, "llm_cache_enabled", False)
+
+
+def test_compact_plan_expands_to_task_plan():
+    plan = CompactTaskPlan.model_validate(COMPACT).to_task_plan()
+    
+    assert [t.id for t in plan.tasks] == ["t1", "t2", "t3"]
+    assert plan.tasks[0].ticker == "AAPL"
+    assert plan.tasks[2].depends_on == ["t1", "t2", "t3"]
+    assert plan.can_parallelize
+
+
+def test_strict_schema_closes_every_object():
+    schema = strict_json_schema(CompactTaskPlan)
+    task = schema["$defs"]["CompactTask"]
+    
+    assert schema["additionalProperties"] is False
+    assert task["additionalProperties"] is False
+    assert set(task["required"]) == {"a", "q", "k", "d"}
+    assert task["properties"]["a"]["enum"] == ["openbb", "sec", "fred", "synthesis"]
+
+
+@pytest.mark.asyncio
+async def test_decompose_constrains_output_to_schema():
+    model = PlanModel(json.dumps(COMPACT))
+    
+    plan = await QueryDecomposer(model).decompose("Compare AAPL P/E to GDP growth")
+    
+    assert model.calls[0]["json_schema"] == strict_json_schema(CompactTaskPlan)
+    # Self-dependency dropped by plan optimization
+    assert plan.tasks[2].depends_on == ["t1", "t2"]
+
+
+@pytest.mark.asyncio
+async def test_prompt_guided_backends_get_schema_and_fenced_output_parses():
+    model = PlanModel(f"```json\n{json.dumps(COMPACT)}\n```", supports_json_schema=False)
+    
+    plan = await QueryDecomposer(model).decompose("Compare AAPL P/E to GDP growth")
+    
+    assert model.calls[0]["json_schema"] is None
+    assert '"additionalProperties":false' in model.calls[0]["prompt"]
+    assert len(plan.tasks) == 3
+
+
+@pytest.mark.asyncio
+async def test_invalid_output_falls_back_to_keyword_plan():
+    model = PlanModel('{"tasks": "not a plan"')
+    
+    plan = await QueryDecomposer(model).decompose("How does inflation affect MSFT and AAPL valuations?")
+    
+    types = [(t.type, t.ticker) for t in plan.tasks]
+    assert ("openbb", "MSFT") in types and ("openbb", "AAPL") in types
+    assert ("fred", None) in types
+    assert plan.tasks[-1].type == "synthesis"
+    assert set(plan.tasks[-1].depends_on) == {t.id for t in plan.tasks[:-1]}
@@ -0,0 +1,85 @@
+import chromadb
+import numpy as np
+import pytest
+
+from src.data import vector_store as vector_store_module
+from src.data.chunking import Chunk
+from src.data.docstore import DocStore
+from src.data.vector_store import VectorStore
+
+
+class FakeEmbeddingModel:
+    model_name = "fake"
+    
+    def _vector(self, text):
+        rng = np.random.default_rng(abs(hash(text.split()[0])) % (2 ** 32))
+        v = rng.normal(size=8).astype(np.float32)
+        return v / np.linalg.norm(v)
+    
+    def embed_documents(self, texts):
+        return np.vstack([self._vector(t) for t in texts])
+    
+    def embed_query(self, query):
+        return self._vector(query)
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(vector_store_module, "get_embedding_model", FakeEmbeddingModel)
+    monkeypatch.setattr(chromadb, "PersistentClient", lambda path: chromadb.EphemeralClient())
+    store = VectorStore(docstore=DocStore(str(tmp_path / "docstore.db")))
+    chroma = store.backend
+    chroma.client.delete_collection(chroma.collection.name)
+    chroma.collection = chroma.client.create_collection(chroma.collection.name)
+    return store
+
+
+def make_chunks():
+    return [
+        Chunk(text=f"{word} appears in this filing section " * 20, chunk_id=f"AAPL-10-K-1_chunk_{i}",
+              document_id="AAPL-10-K-1", metadata={"ticker": "AAPL"})
+        for i, word in enumerate(["revenue", "risk", "dividends"])
+    ]
+
+
+def test_docstore_round_trip(tmp_path):
+    """Test texts are compressed on disk and read back by id."""
+    docstore = DocStore(str(tmp_path / "docstore.db"))
+    chunks = make_chunks()
+    docstore.put_many(chunks)
+    
+    texts = docstore.get_many([c.chunk_id for c in chunks] + ["missing"])
+    assert texts == {c.chunk_id: c.text for c in chunks}
+    assert docstore.count() == 3
+    
+    docstore.delete_document("AAPL-10-K-1")
+    assert docstore.get(chunks[0].chunk_id) is None
+
+
+def test_search_returns_ids_first_and_hydrates_lazily(store):
+    """Test the index holds no text and hydration fills only kept results."""
+    chunks = make_chunks()
+    store.add_documents(chunks)
+    
+    assert store.backend.collection.get(ids=[chunks[0].chunk_id], include=["documents"])["documents"] == [None]
+    
+    results = store.search("risk factors", top_k=3, hydrate=False)
+    assert results[0][0].chunk_id == chunks[1].chunk_id
+    assert all(chunk.text == "" for chunk, _ in results)
+    
+    store.hydrate(results[:1])
+    assert results[0][0].text == chunks[1].text
+    assert results[1][0].text == ""
+    
+    hydrated = store.search("risk factors", top_k=1)
+    assert hydrated[0][0].text == chunks[1].text
+
+
+def test_hydrate_falls_back_to_legacy_chroma_documents(store):
+    """Test collections written before the docstore still return text."""
+    store.backend.collection.add(
+        ids=["legacy_chunk_0"], embeddings=[FakeEmbeddingModel()._vector("legacy").tolist()],
+        documents=["legacy text"], metadatas=[{"document_id": "legacy"}]
+    )
+    results = store.search("legacy filing", top_k=1)
+    assert results[0][0].text == "legacy text"
@@ -0,0 +1,110 @@
+import pytest
+import httpx
+from src.data.edgar_client import EdgarClient
+from src.utils.http import retry_delay
+
+
+SUBMISSIONS = {
+    "filings": {
+        "recent": {
+            "form": ["10-Q", "8-K", "10-K", "10-Q", "10-K"],
+            "accessionNumber": ["0001-24-1", "0001-24-2", "0001-23-3", "0001-23-4", "0001-22-5"],
+            "filingDate": ["2024-08-02", "2024-07-01", "2023-11-03", "2023-08-04", "2022-10-28"],
+            "reportDate": ["2024-06-29", "2024-07-01", "2023-09-30", "2023-07-01", "2022-09-24"],
+            "primaryDocument": ["q3.htm", "8k.htm", "k23.htm", "q3-23.htm", "k22.htm"],
+        }
+    }
+}
+
+
+def make_client(tmp_path, requests):
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        url = str(request.url)
+        if url.endswith("company_tickers.json"):
+            return httpx.Response(200, json={"0": {"cik_str": 320193, "ticker": "AAPL"}})
+        if "submissions" in url:
+            if request.headers.get("If-None-Match") == '"v1"':
+                return httpx.Response(304)
+            return httpx.Response(200, json=SUBMISSIONS, headers={"ETag": '"v1"'})
+        return httpx.Response(200, content=b"<html>" + url.encode() + b"</html>")
+    
+    return EdgarClient(
+        user_agent="Test test@example.com",
+        requests_per_second=1000,
+        cache_dir=str(tmp_path),
+        transport=httpx.MockTransport(handler),
+    )
+
+
+@pytest.mark.asyncio
+async def test_list_filings_limits_per_form(tmp_path):
+    """Test only the latest N filings of each requested form are listed."""
+    requests = []
+    async with make_client(tmp_path, requests) as client:
+        filings = await client.list_filings("aapl", ["10-K"], limit=1)
+    
+    assert len(filings) == 1
+    assert filings[0].accession_number == "0001-23-3"
+    assert filings[0].report_date == "2023-09-30"
+    assert filings[0].url.endswith("/320193/0001233/k23.htm")
+    assert all(r.headers["User-Agent"] == "Test test@example.com" for r in requests)
+
+
+@pytest.mark.asyncio
+async def test_fetch_new_filings_skips_known_accessions(tmp_path):
+    """Test only primary documents of unseen filings are downloaded."""
+    requests = []
+    async with make_client(tmp_path, requests) as client:
+        fetched = await client.fetch_new_filings(
+            "AAPL", ["10-K", "10-Q"], limit=2, known_accessions={"0001-23-3"}
+        )
+    
+    accessions = sorted(f.accession_number for f, _ in fetched)
+    assert accessions == ["0001-22-5", "0001-23-4", "0001-24-1"]
+    archive_requests = [r for r in requests if "Archives" in str(r.url)]
+    assert len(archive_requests) == 3
+
+
+@pytest.mark.asyncio
+async def test_submissions_revalidated_with_etag(tmp_path):
+    """Test a second listing sends If-None-Match and reuses the cached index on 304."""
+    requests = []
+    async with make_client(tmp_path, requests) as client:
+        await client.list_filings("AAPL", ["10-K"], limit=1)
+    async with make_client(tmp_path, requests) as client:
+        filings = await client.list_filings("AAPL", ["10-K"], limit=1)
+    
+    submissions = [r for r in requests if "submissions" in str(r.url)]
+    assert submissions[-1].headers.get("If-None-Match") == '"v1"'
+    assert filings[0].accession_number == "0001-23-3"
+
+
+@pytest.mark.asyncio
+async def test_retry_after_http_date_is_honored(tmp_path):
+    """Test a 503 with an HTTP-date Retry-After is retried instead of raising."""
+    responses = [
+        httpx.Response(503, headers={"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"}),
+        httpx.Response(200, json={"0": {"cik_str": 320193, "ticker": "AAPL"}}),
+    ]
+    requests = []
+    
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return responses.pop(0)
+    
+    async with EdgarClient(
+        user_agent="Test test@example.com",
+        requests_per_second=1000,
+        cache_dir=str(tmp_path),
+        transport=httpx.MockTransport(handler),
+    ) as client:
+        assert await client.get_cik("AAPL") == "0000320193"
+    assert len(requests) == 2
+
+
+def test_retry_delay_parses_seconds_and_dates():
+    """Test Retry-After is read in both forms and falls back to backoff."""
+    assert retry_delay(httpx.Response(429, headers={"Retry-After": "3"}), 0) == 3.0
+    assert retry_delay(httpx.Response(429, headers={"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"}), 0) == 0.0
+    assert retry_delay(httpx.Response(503, headers={"Retry-After": "soon"}), 2) == 4.0
@@ -0,0 +1,21 @@
+import numpy as np
+
+from src.data.embedding_pool import EmbeddingPool
+from src.data.embeddings import EmbeddingModel
+
+
+def test_pool_matches_in_process_embeddings_in_order(tiny_model_dir):
+    """Test sharded, length-sorted pool output comes back in input order."""
+    words = "apple reported revenue growth risk factors include supply chain".split()
+    texts = [" ".join(words[: 1 + (i * 7) % len(words)]) for i in range(40)]
+    
+    expected = EmbeddingModel(tiny_model_dir, backend="torch").embed_documents(texts)
+    
+    with EmbeddingPool(workers=2, model_name=tiny_model_dir, backend="torch", shard_size=4) as pool:
+        blocks = list(pool.iter_embed(texts, block_size=16))
+        embedded = pool.embed(texts)
+    
+    assert [start for start, _ in blocks] == [0, 16, 32]
+    assert [len(b) for _, b in blocks] == [16, 16, 8]
+    np.testing.assert_allclose(embedded, expected, atol=1e-5)
+    np.testing.assert_allclose(np.vstack([b for _, b in blocks]), expected, atol=1e-5)
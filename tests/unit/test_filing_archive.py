@@ -0,0 +1,95 @@
+from types import SimpleNamespace
+
+import pytest
+from src.data import sec_loader
+from src.data.filing_archive import FilingArchive
+
+
+@pytest.fixture
+def archive(tmp_path):
+    archive = FilingArchive(root=str(tmp_path))
+    yield archive
+    archive.close()
+
+
+def test_put_and_read_roundtrip(archive):
+    """Test raw and cleaned text read back exactly from the archive."""
+    raw = b"<html><body>Revenue was $383 billion.</body></html>" * 100
+    record = archive.put(
+        ticker="aapl", form="10-K", accession_number="0000320193-23-000106",
+        raw=raw, clean="Revenue was $383 billion.",
+        filing_date="2023-11-03", period="2023-09-30", primary_document="aapl-20230930.htm"
+    )
+    
+    assert record.ticker == "AAPL"
+    assert record.document_id == "AAPL-10-K-0000320193-23-000106"
+    assert archive.read_raw(record.accession_number) == raw
+    assert archive.read_clean(record.accession_number) == "Revenue was $383 billion."
+    assert archive.stats()["stored_bytes"] < len(raw)
+
+
+def test_identical_content_stored_once(archive):
+    """Test blobs are content-addressed and deduplicated."""
+    archive.put("AAPL", "10-Q", "a-1", raw=b"same", clean="same")
+    archive.put("AAPL", "10-Q", "a-2", raw=b"same", clean="same")
+    
+    stats = archive.stats()
+    assert stats["filings"] == 2
+    assert stats["blobs"] == 1
+
+
+def test_list_filings_newest_first_with_filters(archive):
+    """Test catalog queries by ticker and form, ordered by filing date."""
+    archive.put("AAPL", "10-K", "k-22", raw=b"k22", clean="k22", filing_date="2022-10-28")
+    archive.put("AAPL", "10-K", "k-23", raw=b"k23", clean="k23", filing_date="2023-11-03")
+    archive.put("AAPL", "10-Q", "q-24", raw=b"q24", clean="q24", filing_date="2024-08-02")
+    archive.put("MSFT", "10-K", "m-24", raw=b"m24", clean="m24", filing_date="2024-07-30")
+    
+    records = archive.list_filings(ticker="aapl", forms=["10-K"])
+    assert [r.accession_number for r in records] == ["k-23", "k-22"]
+    assert archive.accessions("AAPL") == {"k-22", "k-23", "q-24"}
+    assert len(archive.list_filings(limit=2)) == 2
+    
+    in_range = archive.list_filings(ticker="AAPL", start_date="2023-01-01", end_date="2024-12-31")
+    assert [r.accession_number for r in in_range] == ["q-24", "k-23"]
+
+
+def test_reads_span_multiple_segments(tmp_path):
+    """Test random-access reads after segments roll over."""
+    archive = FilingArchive(root=str(tmp_path))
+    archive.segment_bytes = 1
+    for i in range(3):
+        archive.put("AAPL", "10-Q", f"q-{i}", raw=f"raw {i}".encode(), clean=f"clean {i}")
+    
+    assert len(list((tmp_path / "segments").iterdir())) > 1
+    assert archive.read_clean("q-1") == "clean 1"
+    assert archive.read_raw("q-2") == b"raw 2"
+    archive.close()
+
+
+@pytest.mark.asyncio
+async def test_loader_downloads_from_a_running_event_loop(tmp_path, monkeypatch):
+    """Test the async download archives filings where asyncio.run would fail."""
+    filing = SimpleNamespace(
+        ticker="AAPL", form="10-K", accession_number="0000320193-24-000123",
+        filing_date="2024-11-01", report_date="2024-09-28", primary_document="aapl-10k.htm"
+    )
+    
+    class StubEdgar:
+        async def __aenter__(self):
+            return self
+        
+        async def __aexit__(self, *exc):
+            pass
+        
+        async def fetch_new_filings(self, ticker, forms, limit, known_accessions=()):
+            return [(filing, b"<p>Revenue &amp; margins</p>")]
+    
+    monkeypatch.setattr(sec_loader, "EdgarClient", StubEdgar)
+    monkeypatch.setattr(sec_loader, "get_vector_store", lambda: None)
+    loader = sec_loader.SECLoader(archive=FilingArchive(root=str(tmp_path / "archive")))
+    
+    records = await loader.adownload_filings("aapl", limit=1)
+    
+    assert [r.accession_number for r in records] == ["0000320193-24-000123"]
+    assert loader.archive.read_clean("0000320193-24-000123").strip() == "Revenue & margins"
@@ -0,0 +1,94 @@
+import time
+import zlib
+
+import numpy as np
+import pytest
+
+from src.agents.fred_agent import FREDAgent
+from src.data.fred_catalog import BM25Index, FREDCatalog, SeriesInfo, tokenize
+from src.data.fred_store import FREDStore
+
+
+class HashEmbedder:
+    """Bag-of-words hashing embedder: shared words mean similar vectors."""
+    
+    def __init__(self, model_name="hash-64"):
+        self.model_name = model_name
+        self.documents = 0
+    
+    def _embed(self, text):
+        vector = np.zeros(64, dtype=np.float32)
+        for token in tokenize(text):
+            vector[zlib.crc32(token.encode()) % 64] += 1.0
+        return vector / max(np.linalg.norm(vector), 1e-6)
+    
+    def embed_documents(self, texts):
+        self.documents += len(texts)
+        return np.stack([self._embed(t) for t in texts])
+    
+    def embed_query(self, query):
+        return self._embed(query)
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    catalog = FREDCatalog(path=str(tmp_path / "fred.db"), embedder=HashEmbedder())
+    yield catalog
+    catalog.close()
+
+
+def test_bm25_prefers_rarer_terms():
+    index = BM25Index([tokenize("mortgage rate"), tokenize("unemployment rate"), tokenize("saving rate")])
+    
+    scores = index.scores(tokenize("30 year mortgage rate"))
+    
+    assert int(np.argmax(scores)) == 0
+    assert scores[1] == scores[2] > 0
+
+
+def test_empty_catalog_is_seeded_with_core_series(catalog):
+    results = catalog.search("What is the 30-year mortgage rate?", top_k=3)
+    
+    assert results[0][0].series_id == "MORTGAGE30US"
+    assert len(catalog) > 20
+
+
+def test_search_finds_series_beyond_keywords_without_api_calls(catalog):
+    catalog.add([SeriesInfo("JTSJOL", "Job Openings: Total Nonfarm", "Level in Thousands", "Monthly", 70)])
+    
+    start = time.perf_counter()
+    results = catalog.search("how many job openings are there?", top_k=2)
+    elapsed = time.perf_counter() - start
+    
+    assert results[0][0].series_id == "JTSJOL"
+    assert elapsed < 0.05
+
+
+def test_unrelated_question_matches_nothing(catalog):
+    assert catalog.search("zebra xylophone") == []
+
+
+def test_changed_embedding_model_reembeds_once(tmp_path):
+    path = str(tmp_path / "fred.db")
+    FREDCatalog(path=path, embedder=HashEmbedder("old")).load()
+    embedder = HashEmbedder("new")
+    catalog = FREDCatalog(path=path, embedder=embedder)
+    
+    catalog.load()
+    seeded = embedder.documents
+    FREDCatalog(path=path, embedder=embedder).load()
+    
+    assert seeded == len(catalog)
+    assert embedder.documents == seeded
+
+
+@pytest.mark.asyncio
+async def test_agent_adds_catalog_series_to_keyword_matches(catalog, tmp_path, null_model):
+    store = FREDStore(path=str(tmp_path / "fred.db"))
+    store.upsert("MORTGAGE30US", [("2024-05-02", 7.22), ("2024-05-09", 7.09)])
+    agent = FREDAgent(model=null_model, store=store, refresher=None, catalog=catalog)
+    
+    contexts = await agent._retrieve("Where are 30-year mortgage rates now?", {})
+    
+    assert contexts[0].source_id == "FRED-MORTGAGE30US"
+    assert "Title: 30-Year Fixed Rate Mortgage Average" in contexts[0].text
@@ -0,0 +1,102 @@
+import asyncio
+
+import httpx
+import pytest
+
+from src.agents.fred_agent import FREDAgent
+from src.data.fred_client import FREDClient, FREDRefresher
+from src.data.fred_store import FREDStore
+
+
+class NoCatalog:
+    def search(self, query):
+        return []
+
+
+OBSERVATIONS = [
+    {"date": "2024-01-01", "value": "3.7"},
+    {"date": "2024-02-01", "value": "3.9"},
+    {"date": "2024-03-01", "value": "."},
+]
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = FREDStore(path=str(tmp_path / "fred.db"))
+    yield store
+    store.close()
+
+
+def make_refresher(store, requests, observations=OBSERVATIONS, delay=0.0):
+    async def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        await asyncio.sleep(delay)
+        start = request.url.params.get("observation_start", "")
+        return httpx.Response(200, json={"observations": [o for o in observations if o["date"] >= start]})
+    
+    client = FREDClient("test-key", requests_per_second=1000, transport=httpx.MockTransport(handler))
+    return FREDRefresher(client, store=store)
+
+
+@pytest.mark.asyncio
+async def test_refresh_is_incremental_from_last_stored_date(store):
+    """Test the first refresh loads history and later ones start at the last stored date."""
+    requests = []
+    refresher = make_refresher(store, requests)
+    
+    assert await refresher.refresh(["UNRATE"]) == {"UNRATE": 2}
+    assert store.last_date("UNRATE") == "2024-02-01"
+    
+    await refresher.refresh(["UNRATE"])
+    
+    assert requests[0].url.params["observation_start"] == "2020-01-01"
+    assert requests[1].url.params["observation_start"] == "2024-02-01"
+    assert store.get_series("UNRATE") == [("2024-01-01", 3.7), ("2024-02-01", 3.9)]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_refreshes_share_one_request(store):
+    """Test overlapping refreshes of a series issue a single FRED request."""
+    requests = []
+    refresher = make_refresher(store, requests, delay=0.05)
+    
+    await asyncio.gather(refresher.refresh(["GDP"]), refresher.refresh(["GDP", "UNRATE"]))
+    
+    assert sorted(r.url.params["series_id"] for r in requests) == ["GDP", "UNRATE"]
+
+
+@pytest.mark.asyncio
+async def test_agent_answers_from_store_and_loads_missing_series(store, null_model):
+    """Test stored series answer without a request and missing ones load once."""
+    store.upsert("UNRATE", [("2024-01-01", 3.7), ("2024-02-01", 3.9)])
+    requests = []
+    agent = FREDAgent(model=null_model, store=store, refresher=make_refresher(store, requests), catalog=NoCatalog())
+    
+    contexts = await agent._retrieve("unemployment and gdp", {})
+    
+    assert [r.url.params["series_id"] for r in requests] == ["GDP"]
+    unrate = next(c for c in contexts if c.source_id == "FRED-UNRATE")
+    assert "Latest Value: 3.90" in unrate.text and "Previous: 3.70" in unrate.text
+    assert "Date: 2024-02-01" in unrate.text
+    assert len(contexts) == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_refresh_is_not_retried_within_the_interval(store, null_model):
+    """Test a FRED failure counts as a check, so the next question answers without a request."""
+    store.upsert("UNRATE", [("2024-01-01", 3.7)])
+    calls = []
+    
+    class DownClient:
+        async def observations(self, series_id, start=None):
+            calls.append(series_id)
+            raise httpx.ConnectError("FRED unavailable")
+    
+    agent = FREDAgent(model=null_model, store=store, refresher=FREDRefresher(DownClient(), store=store), catalog=NoCatalog())
+    
+    await agent._retrieve("gdp", {})
+    contexts = await agent._retrieve("gdp and unemployment", {})
+    
+    assert calls == ["GDP"]
+    assert store.last_date("GDP") is None and not store.is_stale("GDP", 60)
+    assert [c.source_id for c in contexts] == ["FRED-UNRATE"]
@@ -0,0 +1,147 @@
+import asyncio
+
+import pytest
+
+from src.agents.base_agent import BaseAgent
+from src.agents.critic_agent import CriticAgent
+from src.config.settings import settings
+from src.guardrails.schemas import AgentInput, Citation, RetrievedContext
+from src.models import router as router_module
+from src.models.base import BaseModelInterface, ModelResponse
+from src.models.router import AGENT_ANSWER, ModelRouter
+
+
+class EchoModel(BaseModelInterface):
+    """Answers each prompt with itself; tracks how many calls overlap."""
+    
+    def __init__(self, delay=0.0):
+        self.model_name = "echo"
+        self.delay = delay
+        self.calls = []
+        self.batches = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+    
+    async def _generate(self, prompt, system_prompt=None, temperature=0.7, max_tokens=1024, priority=0, stop=None):
+        self.calls.append({"prompt": prompt, "system_prompt": system_prompt, "max_tokens": max_tokens})
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(self.delay)
+        self.in_flight -= 1
+        return ModelResponse(content=f"re: {prompt}", model=self.model_name)
+    
+    async def generate_batch(self, prompts, **kwargs):
+        self.batches.append(list(prompts))
+        return await super().generate_batch(prompts, **kwargs)
+
+
+class ListAgent(BaseAgent):
+    def __init__(self, name, contexts, **kwargs):
+        super().__init__(name=name, **kwargs)
+        self.contexts = contexts
+    
+    @property
+    def system_prompt(self):
+        return f"You are {self.name}."
+    
+    async def _retrieve(self, query, filters):
+        if isinstance(self.contexts, Exception):
+            raise self.contexts
+        return self.contexts
+    
+    def _build_prompt(self, query, contexts):
+        return self._assemble_prompt("{question}\n{sources}", query, contexts)
+    
+    def _parse_response(self, content, assembled):
+        citations = [
+            Citation(source_type="sec_filing", source_id=ctx.source_id, text_excerpt=ctx.text, relevance_score=ctx.relevance_score)
+            for ctx in assembled.contexts
+        ]
+        return content, citations
+
+
+def _contexts(source_id):
+    return [RetrievedContext(source_id=source_id, text=f"{source_id} revenue rose 5%.", relevance_score=0.8)]
+
+
+@pytest.fixture(autouse=True)
+def no_cache(monkeypatch):
+    monkeypatch.setattr(settings, "llm_cache_enabled", False)
+
+
+@pytest.mark.asyncio
+async def test_batch_keeps_order_and_bounds_concurrency(monkeypatch):
+    monkeypatch.setattr(settings, "llm_batch_concurrency", 2)
+    model = EchoModel(delay=0.02)
+    
+    responses = await model.generate_batch(["a", "b", "c", "d", "e"], system_prompt=["s1", None, "s3", None, None])
+    
+    assert [r.content for r in responses] == ["re: a", "re: b", "re: c", "re: d", "re: e"]
+    assert model.max_in_flight == 2
+    assert [c["system_prompt"] for c in model.calls] == ["s1", None, "s3", None, None]
+
+
+@pytest.mark.asyncio
+async def test_batch_only_generates_cache_misses(monkeypatch, tmp_path):
+    from src.models import cache as cache_module
+    
+    monkeypatch.setattr(settings, "llm_cache_enabled", True)
+    monkeypatch.setattr(cache_module, "_cache", cache_module.CompletionCache(path=str(tmp_path / "cache.db")))
+    model = EchoModel()
+    
+    await model.generate_batch(["a", "b"], temperature=0.0)
+    responses = await model.generate_batch(["a", "b", "c"], temperature=0.0)
+    
+    assert [c["prompt"] for c in model.calls] == ["a", "b", "c"]
+    assert [r.cached for r in responses] == [True, True, False]
+
+
+@pytest.mark.asyncio
+async def test_routed_batch_applies_profile(monkeypatch):
+    backend = EchoModel()
+    monkeypatch.setattr(router_module, "create_backend", lambda spec: backend)
+    model = ModelRouter(tiers={"small": "stub:small", "large": "stub:large"}, routes={}).for_task(AGENT_ANSWER)
+    
+    responses = await model.generate_batch(["a", "b"])
+    
+    assert len(responses) == 2
+    assert backend.batches == [["a", "b"]]
+    assert {c["max_tokens"] for c in backend.calls} == {AGENT_ANSWER.max_tokens}
+
+
+@pytest.mark.asyncio
+async def test_execute_many_batches_prompts_and_isolates_failures():
+    model = EchoModel()
+    jobs = [
+        (ListAgent("sec", _contexts("s1"), model=model), AgentInput(query="q1")),
+        (ListAgent("fred", _contexts("f1"), model=model), AgentInput(query="q2")),
+        (ListAgent("broken", RuntimeError("feed down"), model=model), AgentInput(query="q3")),
+        (ListAgent("empty", [], model=model), AgentInput(query="q4")),
+    ]
+    
+    results = await BaseAgent.execute_many(jobs)
+    
+    assert len(model.batches) == 1 and len(model.batches[0]) == 2
+    assert [c["system_prompt"] for c in model.calls] == ["You are sec.", "You are fred."]
+    assert results[0].response_text.startswith("re: q1") and results[0].citations[0].source_id == "s1"
+    assert [c.source_id for c in results[0].prompt_contexts] == ["s1"]
+    assert results[1].agent_name == "fred"
+    assert isinstance(results[2], RuntimeError)
+    assert results[3].response_text == BaseAgent.no_context_response
+
+
+@pytest.mark.asyncio
+async def test_critic_validates_many_in_one_batch():
+    model = EchoModel()
+    critic = CriticAgent(model=model)
+    
+    results = await critic.validate_many([
+        ("Revenue rose 5% [Source 1].", _contexts("s1"), []),
+        ("No sources here.", [], []),
+        ("GDP grew [Source 1].", _contexts("f1"), []),
+    ])
+    
+    assert len(model.batches) == 1 and len(model.batches[0]) == 2
+    assert results[1].passed is False
+    assert results[1].unsupported_claims == ["No sources provided"]
+    assert len(results) == 3
@@ -0,0 +1,103 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.models.inference_worker import InferenceQueueFull, InferenceWorker, Priority
+
+
+@pytest.fixture
+def worker():
+    worker = InferenceWorker("stub", max_pending=8)
+    yield worker
+    worker.shutdown()
+
+
+def blocking_job(gate: threading.Event, log: list, name: str):
+    def run(cancel_event):
+        gate.wait(timeout=5)
+        log.append(name)
+        return name
+    return run
+
+
+@pytest.mark.asyncio
+async def test_event_loop_stays_responsive(worker):
+    """Test a slow generation does not block other coroutines."""
+    ticks = 0
+    
+    async def heartbeat():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.01)
+    
+    beat = asyncio.create_task(heartbeat())
+    result = await worker.submit(lambda cancel: time.sleep(0.3) or "done")
+    beat.cancel()
+    
+    assert result == "done"
+    assert ticks >= 10
+
+
+@pytest.mark.asyncio
+async def test_priority_then_fifo_order(worker):
+    """Test queued jobs run by priority, then arrival order."""
+    gate, log = threading.Event(), []
+    first = asyncio.create_task(worker.submit(blocking_job(gate, log, "running")))
+    await asyncio.sleep(0.05)
+    
+    tasks = [
+        asyncio.create_task(worker.submit(blocking_job(gate, log, "bg"), priority=Priority.BACKGROUND)),
+        asyncio.create_task(worker.submit(blocking_job(gate, log, "user-1"), priority=Priority.INTERACTIVE)),
+        asyncio.create_task(worker.submit(blocking_job(gate, log, "user-2"), priority=Priority.INTERACTIVE)),
+    ]
+    await asyncio.sleep(0.05)
+    gate.set()
+    await asyncio.gather(first, *tasks)
+    
+    assert log == ["running", "user-1", "user-2", "bg"]
+
+
+@pytest.mark.asyncio
+async def test_admission_limit(worker):
+    """Test submissions beyond max_pending are rejected, not queued."""
+    worker.max_pending = 2
+    gate, log = threading.Event(), []
+    tasks = [asyncio.create_task(worker.submit(blocking_job(gate, log, str(i)))) for i in range(2)]
+    await asyncio.sleep(0.05)
+    
+    with pytest.raises(InferenceQueueFull):
+        await worker.submit(blocking_job(gate, log, "rejected"))
+    
+    gate.set()
+    await asyncio.gather(*tasks)
+    assert worker.get_stats()["rejected"] == 1
+
+
+@pytest.mark.asyncio
+async def test_cancellation_skips_queued_and_signals_running(worker):
+    """Test cancelled callers free their slot and stop in-flight work."""
+    started, stopped, log = threading.Event(), threading.Event(), []
+    
+    def generation(cancel_event):
+        started.set()
+        while not cancel_event.wait(0.01):
+            pass
+        stopped.set()
+    
+    running = asyncio.create_task(worker.submit(generation))
+    queued = asyncio.create_task(worker.submit(blocking_job(threading.Event(), log, "never")))
+    await asyncio.to_thread(started.wait, 5)
+    
+    queued.cancel()
+    running.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await running
+    
+    assert await asyncio.to_thread(stopped.wait, 5)
+    await asyncio.sleep(0.05)
+    assert log == []
+    assert worker.get_stats()["cancelled"] == 1
+    assert worker.get_stats()["pending"] == 0
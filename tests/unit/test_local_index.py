@@ -0,0 +1,101 @@
+import numpy as np
+import pytest
+
+from src.data.local_index import IVF_MIN_ROWS, LocalIndexBackend
+
+
+def unit_vectors(n, dim=16, seed=0):
+    v = np.random.default_rng(seed).normal(size=(n, dim)).astype(np.float32)
+    return v / np.linalg.norm(v, axis=1, keepdims=True)
+
+
+@pytest.fixture
+def corpus():
+    vectors = unit_vectors(300)
+    metadatas = [
+        {
+            "document_id": f"doc-{i // 10}",
+            "ticker": ["AAPL", "MSFT", "NVDA"][i % 3],
+            "filing_type": "10-K" if i % 2 else "10-Q",
+            "filing_date": 20200101 + (i % 5) * 10000,
+        }
+        for i in range(300)
+    ]
+    return [f"chunk_{i}" for i in range(300)], vectors, metadatas
+
+
+def test_flat_search_is_exact(tmp_path, corpus):
+    """Test flat search returns the brute-force top-k."""
+    ids, vectors, metadatas = corpus
+    index = LocalIndexBackend(str(tmp_path), index_type="flat")
+    index.add(ids, vectors, metadatas)
+    
+    query = vectors[7]
+    hits = index.query(query, top_k=5)
+    expected = np.argsort(-(vectors @ query))[:5]
+    
+    assert [h[0] for h in hits] == [ids[i] for i in expected]
+    assert hits[0][1] == pytest.approx(1.0, abs=1e-5)
+    assert index.count() == 300
+
+
+def test_metadata_prefilter(tmp_path, corpus):
+    """Test equality, $in, numeric range, $and and $or filters."""
+    ids, vectors, metadatas = corpus
+    index = LocalIndexBackend(str(tmp_path), index_type="flat")
+    index.add(ids, vectors, metadatas)
+    query = vectors[0]
+    
+    hits = index.query(query, top_k=300, where={"ticker": "MSFT"})
+    assert len(hits) == 100 and all(m["ticker"] == "MSFT" for _, _, m in hits)
+    
+    hits = index.query(query, top_k=300, where={
+        "$and": [{"ticker": {"$in": ["AAPL", "NVDA"]}}, {"filing_date": {"$gte": 20230101}}]
+    })
+    assert hits and all(m["ticker"] != "MSFT" and m["filing_date"] >= 20230101 for _, _, m in hits)
+    assert len(hits) == sum(
+        1 for m in metadatas if m["ticker"] != "MSFT" and m["filing_date"] >= 20230101
+    )
+    
+    hits = index.query(query, top_k=300, where={"$or": [{"ticker": "AAPL"}, {"filing_type": "10-K"}]})
+    assert len(hits) == sum(1 for m in metadatas if m["ticker"] == "AAPL" or m["filing_type"] == "10-K")
+    
+    assert index.query(query, top_k=5, where={"ticker": "TSLA"}) == []
+
+
+def test_reopen_and_upsert(tmp_path, corpus):
+    """Test the index persists and a re-added id replaces its earlier row."""
+    ids, vectors, metadatas = corpus
+    LocalIndexBackend(str(tmp_path)).add(ids, vectors, metadatas)
+    
+    index = LocalIndexBackend(str(tmp_path))
+    assert index.count() == 300
+    
+    index.add([ids[0]], vectors[1:2], [{**metadatas[0], "ticker": "TSLA"}])
+    reopened = LocalIndexBackend(str(tmp_path))
+    assert reopened.count() == 300
+    hits = reopened.query(vectors[1], top_k=2)
+    assert {h[0] for h in hits} == {ids[0], ids[1]}
+    assert reopened.query(vectors[0], top_k=5, where={"ticker": "TSLA"})[0][0] == ids[0]
+
+
+def test_ivf_recall(tmp_path):
+    """Test IVF keeps high recall against exact search on clustered data."""
+    rng = np.random.default_rng(1)
+    centers = unit_vectors(32, dim=32, seed=2)
+    n = IVF_MIN_ROWS + 1000
+    vectors = centers[rng.integers(0, 32, n)] + 0.1 * rng.normal(size=(n, 32)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    ids = [f"chunk_{i}" for i in range(n)]
+    
+    index = LocalIndexBackend(str(tmp_path), index_type="ivf", nprobe=8)
+    index.add(ids, vectors, [{"ticker": "AAPL"}] * n)
+    assert index._centroids is not None
+    
+    recalls = []
+    for q in range(20):
+        query = vectors[q * 7]
+        exact = {ids[i] for i in np.argsort(-(vectors @ query))[:10]}
+        found = {h[0] for h in index.query(query, top_k=10)}
+        recalls.append(len(exact & found) / 10)
+    assert np.mean(recalls) >= 0.9
@@ -0,0 +1,36 @@
+import numpy as np
+
+from src.data.mmr import mmr_select
+
+
+def unit(v):
+    v = np.asarray(v, dtype=np.float32)
+    return v / np.linalg.norm(v, axis=-1, keepdims=True)
+
+
+def test_pure_relevance_matches_top_k():
+    """Test lambda=1 reduces to ranking by query similarity."""
+    rng = np.random.default_rng(0)
+    candidates = unit(rng.normal(size=(50, 16)))
+    query = unit(rng.normal(size=16))
+    
+    selected = mmr_select(query, candidates, 10, lambda_mult=1.0)
+    assert selected == list(np.argsort(-(candidates @ query))[:10])
+
+
+def test_near_duplicates_are_skipped():
+    """Test a cluster of near-identical paragraphs yields one pick, not all."""
+    query = unit([1.0, 0.2, 0.0])
+    duplicates = unit([[1.0, 0.1, 0.0], [1.0, 0.1, 0.001], [1.0, 0.1, 0.002]])
+    distinct = unit([[0.5, 0.86, 0.0]])
+    candidates = np.vstack([duplicates, distinct])
+    
+    selected = mmr_select(query, candidates, 2, lambda_mult=0.5)
+    assert selected[0] in (0, 1, 2)
+    assert selected[1] == 3
+
+
+def test_k_larger_than_candidates():
+    candidates = unit(np.eye(3))
+    assert sorted(mmr_select(unit([1, 1, 1]), candidates, 10)) == [0, 1, 2]
+    assert mmr_select(unit([1, 1, 1]), candidates[:0], 5) == []
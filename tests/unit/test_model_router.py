@@ -0,0 +1,61 @@
+import pytest
+
+from src.agents.synthesis_agent import SynthesisAgent
+from src.config.settings import settings
+from src.guardrails.schemas import RetrievedContext
+from src.models import router as router_module
+from src.models.base import BaseModelInterface, ModelResponse
+from src.models.router import CLASSIFY, CRITIC, SYNTHESIS, ModelRouter, TaskProfile, parse_routes
+
+
+class StubModel(BaseModelInterface):
+    def __init__(self, model_name, content="SEC_FILING\nbecause the query mentions a 10-K"):
+        self.model_name = model_name
+        self.content = content
+        self.calls = []
+    
+    async def _generate(self, prompt, system_prompt=None, temperature=0.7, max_tokens=1024, priority=0, stop=None):
+        self.calls.append({"max_tokens": max_tokens, "stop": stop, "priority": priority})
+        return ModelResponse(content=self.content, model=self.model_name)
+
+
+@pytest.fixture
+def router(monkeypatch):
+    monkeypatch.setattr(settings, "llm_cache_enabled", False)
+    monkeypatch.setattr(router_module, "create_backend", lambda spec: StubModel(spec))
+    return ModelRouter(
+        tiers={"small": "stub:small", "large": "stub:large"},
+        routes=parse_routes("critic=large, synthesis=openai:gpt-4o")
+    )
+
+
+def test_profiles_route_to_tiers_and_overrides(router):
+    assert router.route(CLASSIFY) == ("small", "stub:small")
+    assert router.route(CRITIC) == ("large", "stub:large")
+    assert router.route(SYNTHESIS) == ("custom", "openai:gpt-4o")
+    # Backends are shared by every task routed to them
+    assert router.resolve(CRITIC) is router.resolve(TaskProfile("other", max_tokens=1))
+
+
+@pytest.mark.asyncio
+async def test_routed_call_applies_profile(router):
+    model = router.for_task(CLASSIFY)
+    
+    response = await model.generate("Classify this", temperature=0.1)
+    
+    backend = router.resolve(CLASSIFY)
+    assert response.content == "SEC_FILING"
+    assert backend.calls == [{"max_tokens": CLASSIFY.max_tokens, "stop": ["\n"], "priority": CLASSIFY.priority}]
+    stats = router.get_stats()["classify"]
+    assert stats["calls"] == 1 and stats["model"] == "stub:small"
+
+
+@pytest.mark.asyncio
+async def test_agent_prompt_budget_uses_profile_max_tokens(router, monkeypatch):
+    monkeypatch.setattr(settings, "prompt_max_tokens", 10**6)
+    agent = SynthesisAgent(model=router.for_task(SYNTHESIS))
+    contexts = [RetrievedContext(source_id="s1", text="GDP grew 2%.", relevance_score=0.9)]
+    
+    assembled = agent._assemble_prompt("{question}\n{sources}", "q", contexts)
+    
+    assert assembled.budget_tokens == BaseModelInterface.context_window - SYNTHESIS.max_tokens
@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("onnxruntime")
+pytest.importorskip("onnx")
+
+from src.data.embeddings import EmbeddingModel
+
+
+TEXTS = [
+    "apple reported revenue growth",
+    "risk factors include supply chain",
+    "the company repurchased shares",
+    "revenue",
+]
+
+
+@pytest.fixture
+def onnx_dir(tmp_path, monkeypatch):
+    from src.config.settings import settings
+    monkeypatch.setattr(settings, "embedding_onnx_dir", str(tmp_path))
+    return tmp_path
+
+
+def test_onnx_matches_torch_embeddings(tiny_model_dir, onnx_dir):
+    """Test the fp32 ONNX path reproduces torch embeddings and normalization."""
+    torch_model = EmbeddingModel(tiny_model_dir, backend="torch")
+    onnx_model = EmbeddingModel(tiny_model_dir, backend="onnx", quantize=False)
+    
+    expected = torch_model.embed_documents(TEXTS)
+    actual = onnx_model.embed_documents(TEXTS)
+    
+    assert actual.shape == expected.shape
+    np.testing.assert_allclose(np.linalg.norm(actual, axis=1), 1.0, atol=1e-5)
+    assert np.min(np.sum(actual * expected, axis=1)) > 0.999
+    
+    query = onnx_model.embed_query("revenue growth")
+    assert query.ndim == 1
+    assert np.dot(query, torch_model.embed_query("revenue growth")) > 0.999
+
+
+def test_int8_model_stays_close_to_torch(tiny_model_dir, onnx_dir):
+    """Test dynamically quantized embeddings keep high cosine agreement."""
+    torch_model = EmbeddingModel(tiny_model_dir, backend="torch")
+    int8_model = EmbeddingModel(tiny_model_dir, backend="onnx", quantize=True)
+    
+    cosine = np.sum(
+        int8_model.embed_documents(TEXTS) * torch_model.embed_documents(TEXTS), axis=1
+    )
+    assert (onnx_dir / tiny_model_dir.strip("/").replace("/", "__") / "model.int8.onnx").exists()
+    assert np.min(cosine) > 0.95
@@ -0,0 +1,175 @@
+import asyncio
+import json
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import openai
+import pytest
+
+from src.models.openai_model import OpenAIClientPool, OpenAIDeadlineExceeded, OpenAIModel, _retry_after
+
+
+class StubServer:
+    """OpenAI-compatible /chat/completions stub; `script` holds (status, delay_s) per request."""
+    
+    def __init__(self):
+        self.script = []
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+        stub = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+            
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                with stub.lock:
+                    stub.requests += 1
+                    stub.in_flight += 1
+                    stub.max_in_flight = max(stub.max_in_flight, stub.in_flight)
+                    status, delay = stub.script.pop(0) if stub.script else (200, 0.0)
+                time.sleep(delay)
+                if status == 200:
+                    body = {
+                        "id": f"cmpl-{stub.requests}",
+                        "object": "chat.completion",
+                        "created": 0,
+                        "model": "stub-model",
+                        "choices": [{
+                            "index": 0,
+                            "message": {"role": "assistant", "content": "ok"},
+                            "finish_reason": "stop",
+                        }],
+                    }
+                else:
+                    body = {"error": {"message": "stub error", "type": "stub"}}
+                payload = json.dumps(body).encode()
+                try:
+                    self.send_response(status)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(payload)))
+                    if status == 429:
+                        self.send_header("Retry-After", "0")
+                    self.end_headers()
+                    self.wfile.write(payload)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # Client gave up (deadline or losing hedge)
+                finally:
+                    with stub.lock:
+                        stub.in_flight -= 1
+        
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self.httpd.server_address[1]}/v1"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+    
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def stub():
+    server = StubServer()
+    yield server
+    server.close()
+
+
+def _pool(stub, **kwargs):
+    options = dict(api_key="test", base_url=stub.base_url, backoff_base=0.01, backoff_max=0.05)
+    options.update(kwargs)
+    return OpenAIClientPool(**options)
+
+
+async def _call(pool, **kwargs):
+    return await pool.create(model="stub-model", messages=[{"role": "user", "content": "hi"}], **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_retries_rate_limits_and_server_errors(stub):
+    stub.script = [(429, 0.0), (503, 0.0)]
+    pool = _pool(stub)
+    
+    response = await _call(pool)
+    
+    assert response.choices[0].message.content == "ok"
+    assert stub.requests == 3
+    assert pool.get_stats()["retries"] == 2
+
+
+@pytest.mark.asyncio
+async def test_client_errors_are_not_retried(stub):
+    stub.script = [(400, 0.0)]
+    pool = _pool(stub)
+    
+    with pytest.raises(Exception):
+        await _call(pool)
+    assert stub.requests == 1
+
+
+@pytest.mark.asyncio
+async def test_deadline_covers_all_attempts(stub):
+    stub.script = [(200, 2.0)]
+    pool = _pool(stub, attempt_timeout=5.0)
+    
+    start = time.monotonic()
+    with pytest.raises(OpenAIDeadlineExceeded):
+        await _call(pool, deadline=0.3)
+    assert time.monotonic() - start < 1.5
+
+
+@pytest.mark.asyncio
+async def test_semaphore_caps_in_flight_requests(stub):
+    stub.script = [(200, 0.2)] * 6
+    pool = _pool(stub, max_concurrency=2)
+    
+    await asyncio.gather(*[_call(pool) for _ in range(6)])
+    
+    assert stub.max_in_flight <= 2
+
+
+@pytest.mark.asyncio
+async def test_hedge_cuts_tail_latency(stub):
+    pool = _pool(stub, hedge=True, hedge_min_samples=5)
+    for _ in range(5):
+        await _call(pool)
+    
+    # The next request stalls; its hedge (after ~p95) answers immediately
+    stub.script = [(200, 2.0)]
+    start = time.monotonic()
+    response = await _call(pool)
+    
+    assert time.monotonic() - start < 1.5
+    assert response.choices[0].message.content == "ok"
+    stats = pool.get_stats()
+    assert stats["hedges"] == 1 and stats["hedge_wins"] == 1
+
+
+@pytest.mark.asyncio
+async def test_model_generates_through_pool(stub):
+    model = OpenAIModel("stub-model", pool=_pool(stub))
+    
+    response = await model.generate("hi", cache=False)
+    
+    assert response.content == "ok"
+    assert response.model == "stub-model"
+
+
+def test_retry_after_reads_http_dates():
+    """Test an HTTP-date Retry-After is honored rather than dropped."""
+    def rate_limited(header):
+        response = httpx.Response(
+            429,
+            headers={"Retry-After": header},
+            request=httpx.Request("POST", "http://stub/chat/completions")
+        )
+        return openai.RateLimitError("rate limited", response=response, body=None)
+    
+    assert _retry_after(rate_limited("2")) == 2.0
+    assert 25 < _retry_after(rate_limited(formatdate(time.time() + 30, usegmt=True))) <= 30
+    assert _retry_after(rate_limited("soon")) == 0.0
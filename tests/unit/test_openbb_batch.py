@@ -0,0 +1,126 @@
+import asyncio
+import threading
+from datetime import date
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.agents import openbb_agent as openbb_agent_module
+from src.agents.base_agent import BaseAgent
+from src.agents.openbb_agent import OpenBBAgent
+from src.data.openbb_cache import OpenBBCache
+from src.data.price_store import PriceRefresher, PriceStore
+from src.guardrails.schemas import AgentInput
+
+pytestmark = pytest.mark.usefixtures("no_llm_cache")
+
+
+class SymbolProvider:
+    """Provider stub accepting "T1,T2,..." symbol lists; unknown symbols are dropped."""
+    
+    def __init__(self, field, known=("AAPL", "MSFT", "GOOGL")):
+        self.field = field
+        self.known = known
+        self.requests = []
+    
+    def __call__(self, symbols, **params):
+        self.requests.append(symbols)
+        return SimpleNamespace(results=[
+            {"symbol": symbol, self.field: float(len(symbol))}
+            for symbol in symbols.split(",")
+            if symbol in self.known
+        ])
+
+
+@pytest.mark.asyncio
+async def test_fetch_many_splits_by_symbol_and_fills_per_ticker_entries():
+    cache = OpenBBCache()
+    provider = SymbolProvider("last_price")
+    await cache.fetch("quote", "GOOGL", provider)
+    
+    results = await cache.fetch_many("quote", ["AAPL", "MSFT", "GOOGL", "ZZZZ"], provider)
+    
+    assert provider.requests == ["GOOGL", "AAPL,MSFT,ZZZZ"]
+    assert sorted(results) == ["AAPL", "GOOGL", "MSFT"]
+    assert results["MSFT"][0].last_price == 4.0
+    assert (await cache.fetch("quote", "AAPL", provider))[0].symbol == "AAPL"
+    assert len(provider.requests) == 2
+
+
+@pytest.mark.asyncio
+async def test_fetch_during_a_batched_load_waits_for_it():
+    cache = OpenBBCache()
+    release = threading.Event()
+    provider = SymbolProvider("last_price")
+    
+    def slow(symbols, **params):
+        release.wait(5)
+        return provider(symbols, **params)
+    
+    batch = asyncio.create_task(cache.fetch_many("quote", ["AAPL", "MSFT"], slow))
+    while not cache._in_flight:
+        await asyncio.sleep(0.001)
+    single = asyncio.create_task(cache.fetch("quote", "MSFT", slow))
+    await asyncio.sleep(0.01)
+    release.set()
+    
+    results, records = await asyncio.gather(batch, single)
+    
+    assert provider.requests == ["AAPL,MSFT"]
+    assert records[0].symbol == "MSFT" and sorted(results) == ["AAPL", "MSFT"]
+    assert not cache._in_flight
+
+
+@pytest.mark.asyncio
+async def test_comparison_wave_makes_one_call_per_endpoint(monkeypatch, tmp_path, echo_model):
+    quote, metrics = SymbolProvider("last_price"), SymbolProvider("pe_ratio")
+    monkeypatch.setattr(openbb_agent_module, "obb", SimpleNamespace(equity=SimpleNamespace(
+        price=SimpleNamespace(quote=quote),
+        fundamental=SimpleNamespace(metrics=metrics),
+        calendar=SimpleNamespace(earnings=lambda **params: SimpleNamespace(results=[])),
+    )))
+    model = echo_model
+    agent = OpenBBAgent(
+        model=model,
+        cache=OpenBBCache(),
+        prices=PriceRefresher(PriceStore(str(tmp_path)), fetch=lambda symbols, start: pd.DataFrame())
+    )
+    jobs = [
+        (agent, AgentInput(query=f"{ticker} stock price and valuation", filters={"ticker": ticker}))
+        for ticker in ["AAPL", "MSFT", "GOOGL"]
+    ]
+    
+    results = await BaseAgent.execute_many(jobs)
+    
+    assert quote.requests == ["AAPL,MSFT,GOOGL"]
+    assert metrics.requests == ["AAPL,MSFT,GOOGL"]
+    for (_, input), output in zip(jobs, results):
+        ticker = input.filters["ticker"]
+        assert [c.source_id for c in output.retrieved_contexts] == [f"openbb-quote-{ticker}", f"openbb-metrics-{ticker}"]
+    assert len(model.batches) == 1
+
+
+@pytest.mark.asyncio
+async def test_price_refresh_fetches_due_tickers_together(tmp_path):
+    store = PriceStore(str(tmp_path))
+    requests = []
+    
+    def fetch(symbols, start):
+        requests.append((symbols, start))
+        index = pd.bdate_range("2024-01-01", periods=5, name="date")
+        return pd.concat([
+            pd.DataFrame({"symbol": symbol, "close": np.arange(5.0) + offset, "volume": 1.0}, index=index)
+            for offset, symbol in enumerate(symbols.split(","))
+        ])
+    
+    refresher = PriceRefresher(store, fetch=fetch)
+    store.append("MSFT", pd.DataFrame({"close": [1.0]}, index=pd.DatetimeIndex(["2024-01-04"], name="date")))
+    
+    counts = await refresher.refresh(["AAPL", "MSFT"])
+    
+    assert len(requests) == 1 and requests[0][0] == "AAPL,MSFT"
+    assert counts == {"AAPL": 5, "MSFT": 1}
+    assert store.history("MSFT")["close"].tolist() == [4.0, 5.0]  # last stored day revised
+    assert store.last_date("AAPL") == date(2024, 1, 5)
@@ -0,0 +1,169 @@
+import asyncio
+import time
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from src.agents import openbb_agent as openbb_agent_module
+from src.agents.openbb_agent import OpenBBAgent
+from src.config.settings import settings
+from src.data.openbb_cache import OpenBBCache
+
+
+class Provider:
+    """Blocking provider stub that counts calls and answers with an incrementing value."""
+    
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = 0
+    
+    def __call__(self, ticker, **params):
+        self.calls += 1
+        time.sleep(self.delay)
+        return SimpleNamespace(results=[{"symbol": ticker, "value": self.calls, **params}])
+
+
+class DictTier:
+    def __init__(self):
+        self.data = {}
+    
+    async def get(self, key):
+        return self.data.get(key)
+    
+    async def put(self, key, entry):
+        self.data[key] = entry
+
+
+class FailingTier:
+    async def get(self, key):
+        raise ConnectionError("redis down")
+    
+    async def put(self, key, entry):
+        raise ConnectionError("redis down")
+
+
+@pytest.mark.asyncio
+async def test_fresh_entries_are_served_from_memory():
+    cache = OpenBBCache()
+    provider = Provider()
+    
+    first = await cache.fetch("quote", "AAPL", provider)
+    second = await cache.fetch("quote", "AAPL", provider)
+    other = await cache.fetch("quote", "AAPL", provider, limit=2)
+    
+    assert provider.calls == 2
+    assert first[0].value == second[0].value == 1 and other[0].limit == 2
+    assert cache.stats["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_call():
+    cache = OpenBBCache()
+    provider = Provider(delay=0.05)
+    
+    results = await asyncio.gather(*(cache.fetch("metrics", "MSFT", provider) for _ in range(5)))
+    
+    assert provider.calls == 1
+    assert {r[0].value for r in results} == {1}
+
+
+@pytest.mark.asyncio
+async def test_stale_entry_served_while_slow_provider_refreshes(monkeypatch):
+    monkeypatch.setattr(settings, "openbb_stale_wait_seconds", 0.01)
+    cache = OpenBBCache()
+    provider = Provider()
+    await cache.fetch("quote", "AAPL", provider)
+    cache._memory[cache.key("quote", "AAPL", {})].expires_at = time.time() - 1
+    provider.delay = 0.1
+    
+    stale = await cache.fetch("quote", "AAPL", provider)
+    
+    assert stale[0].value == 1 and cache.stats["stale_served"] == 1
+    await asyncio.gather(*cache._in_flight.values())
+    assert (await cache.fetch("quote", "AAPL", provider))[0].value == 2
+
+
+@pytest.mark.asyncio
+async def test_earnings_release_bounds_expiry_and_staleness():
+    cache = OpenBBCache()
+    release = time.time() + 60
+    lookups = []
+    
+    async def next_release(ticker):
+        lookups.append(ticker)
+        return release
+    
+    provider = Provider()
+    for _ in range(2):
+        await cache.fetch("income", "AAPL", provider, expires_by=next_release)
+    
+    entry = cache._memory[cache.key("income", "AAPL", {})]
+    assert entry.expires_at == entry.stale_until == release
+    assert lookups == ["AAPL"]  # resolved on store only, not on the cache hit
+
+
+@pytest.mark.asyncio
+async def test_shared_tier_serves_other_processes_and_failures_fall_back():
+    tier = DictTier()
+    provider = Provider()
+    await OpenBBCache(shared=tier).fetch("balance", "NVDA", provider)
+    
+    rows = await OpenBBCache(shared=tier).fetch("balance", "NVDA", provider)
+    
+    assert provider.calls == 1 and rows[0].value == 1
+    
+    cache = OpenBBCache(shared=FailingTier())
+    assert (await cache.fetch("balance", "NVDA", provider))[0].value == 2
+    assert cache.stats["shared_errors"] == 1
+
+
+@pytest.mark.asyncio
+async def test_agent_reuses_cached_fundamentals(monkeypatch, echo_model):
+    release = (date.today() + timedelta(days=1)).isoformat()
+    quote, metrics = Provider(), Provider()
+    calendar_calls = []
+    
+    def earnings(**params):
+        calendar_calls.append(params)
+        return SimpleNamespace(results=[{"symbol": "AAPL", "report_date": release}])
+    
+    obb = SimpleNamespace(equity=SimpleNamespace(
+        price=SimpleNamespace(quote=quote),
+        fundamental=SimpleNamespace(metrics=metrics),
+        calendar=SimpleNamespace(earnings=earnings),
+    ))
+    monkeypatch.setattr(openbb_agent_module, "obb", obb)
+    cache = OpenBBCache()
+    agent = OpenBBAgent(model=echo_model, cache=cache)
+    
+    for _ in range(2):
+        contexts = await agent._retrieve("AAPL stock price and valuation", {"ticker": "AAPL"})
+    
+    assert [c.metadata["type"] for c in contexts] == ["quote", "metrics"]
+    assert (quote.calls, metrics.calls, len(calendar_calls)) == (1, 1, 1)
+    entry = cache._memory[cache.key("metrics", "AAPL", {})]
+    assert entry.stale_until == pytest.approx(
+        time.mktime((date.today() + timedelta(days=2)).timetuple())
+    )
+
+
+@pytest.mark.asyncio
+async def test_failing_calendar_is_not_retried_on_every_fetch(monkeypatch, echo_model):
+    calendar_calls = []
+    
+    def earnings(**params):
+        calendar_calls.append(params)
+        raise ConnectionError("calendar down")
+    
+    metrics = Provider()
+    monkeypatch.setattr(openbb_agent_module, "obb", SimpleNamespace(equity=SimpleNamespace(
+        calendar=SimpleNamespace(earnings=earnings),
+    )))
+    agent = OpenBBAgent(model=echo_model, cache=OpenBBCache())
+    
+    for ticker in ["AAPL", "AAPL", "MSFT", "NVDA"]:
+        await agent._fetch("metrics", ticker, metrics)
+    
+    assert metrics.calls == 3
+    assert len(calendar_calls) == 1
@@ -0,0 +1,138 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from src.agents import openbb_agent as openbb_agent_module
+from src.agents.openbb_agent import OpenBBAgent
+from src.agents.synthesis_agent import SynthesisAgent
+from src.data import peers
+from src.data.openbb_cache import OpenBBCache
+from src.guardrails.schemas import AgentOutput, RetrievedContext
+
+pytestmark = pytest.mark.usefixtures("no_llm_cache")
+
+FIGURES = {
+    "AAPL": {"revenue": 400.0, "revenue_prior": 380.0, "gross_profit": 180.0, "pe_ratio": 30.0},
+    "MSFT": {"revenue": 240.0, "revenue_prior": 200.0, "gross_profit": 168.0, "pe_ratio": 35.0},
+    "GOOGL": {"revenue": 300.0, "revenue_prior": 280.0, "gross_profit": 174.0, "pe_ratio": 25.0},
+}
+
+
+def test_store_frame_reads_tickers_in_order_and_drops_old_figures(fundamentals_store):
+    for ticker, values in FIGURES.items():
+        fundamentals_store.upsert(ticker, values)
+    fundamentals_store.upsert("msft", {"pe_ratio": 36.0})
+    
+    frame = fundamentals_store.frame(["googl", "MSFT", "NONE"])
+    
+    assert list(frame.index) == ["GOOGL", "MSFT"]
+    assert frame.loc["MSFT", "pe_ratio"] == 36.0
+    time.sleep(0.01)
+    assert fundamentals_store.frame(["AAPL"], max_age_seconds=0.005).empty
+
+
+def test_compare_ranks_margins_growth_and_valuation_together(fundamentals_store):
+    for ticker, values in FIGURES.items():
+        fundamentals_store.upsert(ticker, values)
+    
+    result = peers.compare(fundamentals_store.frame(FIGURES))
+    
+    values, rank = result["values"], result["rank"]
+    assert values.loc["MSFT", "gross_margin"] == pytest.approx(70.0)
+    assert values.loc["MSFT", "revenue_growth"] == pytest.approx(20.0)
+    assert rank["gross_margin"].to_dict() == {"AAPL": 3, "MSFT": 1, "GOOGL": 2}
+    assert rank["pe_ratio"].to_dict() == {"AAPL": 2, "MSFT": 3, "GOOGL": 1}  # lower P/E ranks first
+    assert result["delta"].loc["AAPL", "gross_margin"] == pytest.approx(45.0 - 58.0)
+    assert result["percentile"].loc["GOOGL", "pe_ratio"] == 100.0
+    
+    text = peers.comparison_text(fundamentals_store.frame(FIGURES))
+    assert "Metric | AAPL | MSFT | GOOGL | Median" in text
+    assert "Gross Margin | 45.0% #3 (-13.0pp) | 70.0% #1 (+12.0pp) | 58.0% #2 (+0.0pp) | 58.0%" in text
+
+
+@pytest.mark.asyncio
+async def test_agent_compares_named_tickers_with_batched_calls(monkeypatch, echo_model):
+    quote_requests, metrics_requests, income_requests = [], [], []
+    
+    def quote(symbols, **params):
+        quote_requests.append(symbols)
+        return SimpleNamespace(results=[{"symbol": s} for s in symbols.split(",") if s in FIGURES])
+    
+    def metrics(symbols, **params):
+        metrics_requests.append(symbols)
+        return SimpleNamespace(results=[
+            {"symbol": s, "pe_ratio": FIGURES[s]["pe_ratio"]} for s in symbols.split(",")
+        ])
+    
+    def income(symbol, **params):
+        income_requests.append(symbol)
+        figures = FIGURES[symbol]
+        return SimpleNamespace(results=[
+            {"revenue": figures["revenue"], "gross_profit": figures["gross_profit"]},
+            {"revenue": figures["revenue_prior"]},
+        ])
+    
+    monkeypatch.setattr(openbb_agent_module, "obb", SimpleNamespace(equity=SimpleNamespace(
+        price=SimpleNamespace(quote=quote),
+        fundamental=SimpleNamespace(metrics=metrics, income=income),
+        calendar=SimpleNamespace(earnings=lambda **params: SimpleNamespace(results=[])),
+    )))
+    agent = OpenBBAgent(model=echo_model, cache=OpenBBCache())
+    
+    contexts = await agent._retrieve("Compare AAPL, MSFT and GOOGL valuation and margins", {})
+    
+    assert quote_requests == ["AAPL,MSFT,GOOGL"]
+    assert metrics_requests == ["AAPL,MSFT,GOOGL"]
+    assert sorted(income_requests) == ["AAPL", "GOOGL", "MSFT"]
+    assert contexts[0].source_id == "computed-peer-comparison"
+    assert "Revenue Growth | 5.3% #3" in contexts[0].text
+    assert len(contexts) == 7
+
+
+@pytest.mark.asyncio
+async def test_only_a_cued_comparison_of_quoted_symbols_spans_tickers(monkeypatch, echo_model):
+    quote_requests = []
+    
+    def quote(symbols, **params):
+        quote_requests.append(symbols)
+        return SimpleNamespace(results=[{"symbol": s} for s in symbols.split(",") if s in FIGURES])
+    
+    monkeypatch.setattr(openbb_agent_module, "obb", SimpleNamespace(equity=SimpleNamespace(
+        price=SimpleNamespace(quote=quote),
+    )))
+    agent = OpenBBAgent(model=echo_model, cache=OpenBBCache())
+    
+    assert await agent._tickers("How much does AAPL spend on R&D in USD?", {}) == ["AAPL"]
+    assert quote_requests == []
+    assert await agent._tickers("AAPL vs CAGR of the sector", {}) == ["AAPL"]
+    assert await agent._tickers("AAPL versus MSFT on R&D", {}) == ["AAPL", "MSFT"]
+    assert quote_requests == ["AAPL,CAGR", "MSFT,R,D"]
+    assert await agent._tickers("margins", {"tickers": ["msft", "googl"]}) == ["MSFT", "GOOGL"]
+
+
+@pytest.mark.asyncio
+async def test_synthesis_adds_peer_table_across_subtask_tickers(fundamentals_store, echo_model):
+    for ticker, values in FIGURES.items():
+        fundamentals_store.upsert(ticker, values)
+    outputs = [
+        AgentOutput(
+            agent_name="openbb",
+            response_text=f"{ticker} figures",
+            retrieved_contexts=[RetrievedContext(
+                source_id=f"openbb-income-{ticker}",
+                text=f"{ticker} income",
+                relevance_score=0.88,
+                metadata={"type": "income", "ticker": ticker}
+            )],
+            confidence_score=0.9,
+            processing_time_ms=1
+        )
+        for ticker in ["AAPL", "MSFT"]
+    ]
+    
+    result = await SynthesisAgent(model=echo_model).synthesize("Which has better margins?", outputs)
+    
+    assert result.retrieved_contexts[0].source_id == "computed-peer-comparison"
+    assert result.retrieved_contexts[0].metadata["tickers"] == ["AAPL", "MSFT"]
+    assert result.citations[0].source_type == "financial_data"
@@ -0,0 +1,77 @@
+import pytest
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock
+from src.orchestration import prefetch as prefetch_module
+from src.orchestration.prefetch import PrefetchScheduler
+
+
+@pytest.fixture
+def scheduler():
+    sec_loader = MagicMock()
+    sec_loader.ingest.return_value = {"ticker": "AAPL", "files": 1, "chunks": 10}
+    openbb_agent = MagicMock()
+    openbb_agent._retrieve = AsyncMock(return_value=[])
+    fred_agent = MagicMock()
+    fred_agent._retrieve = AsyncMock(return_value=[])
+    
+    scheduler = PrefetchScheduler(
+        watchlist=["aapl", "msft"],
+        sec_loader=sec_loader,
+        openbb_agent=openbb_agent,
+        fred_agent=fred_agent,
+    )
+    scheduler._models_warm = True
+    scheduler._min_spacing = 0
+    scheduler.quiet_hours = None
+    return scheduler
+
+
+def test_targets_merge_watchlist_and_history(scheduler):
+    """Test watchlist comes first, followed by popular queried tickers."""
+    for ticker in ["TSLA", "TSLA", "NVDA", "AAPL"]:
+        scheduler.record_query(ticker)
+    
+    assert scheduler.targets() == ["AAPL", "MSFT", "TSLA", "NVDA"]
+
+
+@pytest.mark.asyncio
+async def test_cycle_warms_targets_and_counts_avoided_cold_paths(scheduler):
+    """Test first hits on warmed tickers are counted as avoided cold paths."""
+    await scheduler.run_cycle()
+    
+    assert scheduler.sec_loader.ingest.call_count == 2
+    assert scheduler.fred_agent._retrieve.await_count == 1
+    
+    scheduler.record_query("AAPL")
+    scheduler.record_query("AAPL")
+    scheduler.record_query("GOOGL")
+    
+    stats = scheduler.get_stats()
+    assert stats["cold_paths_avoided"] == 1
+    assert stats["cold_paths_taken"] == 1
+    assert stats["warm_tickers"] == 2
+
+
+@pytest.mark.asyncio
+async def test_quiet_hours_skip_cycle(scheduler, monkeypatch):
+    """Test no work is done inside the quiet-hours window."""
+    scheduler.quiet_hours = (22, 6)
+    assert scheduler.in_quiet_hours(datetime(2024, 1, 1, 23))
+    assert scheduler.in_quiet_hours(datetime(2024, 1, 1, 3))
+    assert not scheduler.in_quiet_hours(datetime(2024, 1, 1, 12))
+    
+    class LateEvening(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return datetime(2024, 1, 1, 23)
+    
+    monkeypatch.setattr(prefetch_module, "datetime", LateEvening)
+    scheduler._models_warm = False
+    await scheduler.run_cycle()
+    
+    assert scheduler.sec_loader.ingest.call_count == 0
+    assert scheduler.openbb_agent._retrieve.await_count == 0
+    assert scheduler.fred_agent._retrieve.await_count == 0
+    assert scheduler._models_warm is False
+    assert scheduler.stats["skipped_quiet_hours"] == 1
+    assert scheduler.stats["cycles"] == 0
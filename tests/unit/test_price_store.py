@@ -0,0 +1,111 @@
+import asyncio
+import time
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.agents.openbb_agent import OpenBBAgent
+from src.data.openbb_cache import OpenBBCache
+from src.data.price_store import PriceRefresher, PriceStore
+
+
+def bars(start, periods, base=100.0):
+    index = pd.bdate_range(start, periods=periods, name="date")
+    close = base + np.arange(periods, dtype=float)
+    return pd.DataFrame(
+        {"open": close, "high": close + 1, "low": close - 1, "close": close, "volume": 1000.0},
+        index=index
+    )
+
+
+class History:
+    """Blocking bar source that returns bars from `start` and records the requests."""
+    
+    def __init__(self, frame, delay=0.0):
+        self.frame = frame
+        self.delay = delay
+        self.requests = []
+    
+    def __call__(self, ticker, start):
+        self.requests.append((ticker, start))
+        time.sleep(self.delay)
+        return self.frame[self.frame.index >= pd.Timestamp(start)]
+
+
+@pytest.fixture
+def store(tmp_path):
+    return PriceStore(str(tmp_path / "prices"))
+
+
+def test_append_revises_last_day_and_counts_new_dates(store):
+    assert store.append("aapl", bars("2024-01-01", 5)) == 5
+    
+    revised = bars("2024-01-05", 3, base=200.0)
+    assert store.append("AAPL", revised) == 2
+    
+    history = store.history("AAPL")
+    assert len(history) == 7
+    assert history.loc["2024-01-05", "close"] == 200.0
+    assert store.last_date("AAPL") == date(2024, 1, 9)
+    assert list(store.history("AAPL", date(2024, 1, 8)).index.day) == [8, 9]
+
+
+def test_summary_covers_tickers_in_one_pass(store):
+    store.append("AAPL", bars("2024-01-01", 10))
+    store.append("MSFT", bars("2024-01-03", 8, base=50.0))
+    
+    summary = store.summary(["AAPL", "MSFT", "NONE"], date(2024, 1, 3))
+    
+    assert list(summary.index) == ["AAPL", "MSFT"]
+    assert summary.loc["AAPL", "return_pct"] == pytest.approx((109 / 102 - 1) * 100)
+    assert summary.loc["MSFT", "high"] == 58.0
+    assert summary.loc["MSFT", "start"] == pd.Timestamp("2024-01-03")
+
+
+@pytest.mark.asyncio
+async def test_refresher_fetches_only_missing_days_once(store):
+    source = History(bars("2024-01-01", 10), delay=0.05)
+    store.append("AAPL", bars("2024-01-01", 4))
+    refresher = PriceRefresher(store, fetch=source)
+    
+    results = await asyncio.gather(refresher.refresh(["AAPL"]), refresher.refresh(["aapl"]))
+    
+    assert source.requests == [("AAPL", "2024-01-04")]
+    assert results[0] == {"AAPL": 6}
+    assert await refresher.refresh(["AAPL"]) == {}
+
+
+@pytest.mark.asyncio
+async def test_failed_refresh_is_not_retried_until_the_interval_passes(store):
+    calls = []
+    
+    def failing(ticker, start):
+        calls.append(ticker)
+        raise ConnectionError("provider down")
+    
+    refresher = PriceRefresher(store, fetch=failing)
+    
+    assert await refresher.refresh(["AAPL"]) == {"AAPL": 0}
+    assert await refresher.refresh(["AAPL"]) == {}
+    assert calls == ["AAPL"] and refresher.stats["errors"] == 1
+    assert not refresher.is_due("AAPL")
+
+
+@pytest.mark.asyncio
+async def test_agent_answers_history_from_local_store(store, echo_model):
+    source = History(bars("2023-01-02", 300))
+    agent = OpenBBAgent(
+        model=echo_model,
+        cache=OpenBBCache(),
+        prices=PriceRefresher(store, fetch=source)
+    )
+    
+    contexts = await agent._retrieve("AAPL 6 month history", {"ticker": "AAPL"})
+    
+    historical = next(c for c in contexts if c.metadata["type"] == "historical")
+    assert "Historical Performance (6 Months)" in historical.text
+    assert "50-Day Average" in historical.text and "200-Day Average" in historical.text
+    assert len(source.requests) == 1
+    assert historical.metadata["series"]["values"][-1] == 399.0
@@ -0,0 +1,111 @@
+import pytest
+from unittest.mock import AsyncMock
+
+from src.agents.prompt_builder import PromptBuilder, NO_SOURCES
+from src.agents.critic_agent import CriticAgent
+from src.config.settings import settings
+from src.guardrails.schemas import RetrievedContext
+from src.models.base import BaseModelInterface, ModelResponse
+
+
+class WordModel(BaseModelInterface):
+    """One token per word keeps budgets easy to reason about."""
+    
+    model_name = "word-model"
+    context_window = 4000
+    
+    def count_tokens(self, text: str) -> int:
+        return len(text.split())
+    
+    async def _generate(self, prompt, system_prompt=None, temperature=0.7, max_tokens=1024, priority=0, stop=None):
+        return ModelResponse(content="FAITHFULNESS: 0.9\nPASSED: true", model=self.model_name)
+
+
+TEMPLATE = "Question: {question}\n\nSources:\n{sources}"
+
+
+def _ctx(source_id, words, score):
+    text = " ".join(f"{source_id}w{i}." for i in range(words))
+    return RetrievedContext(source_id=source_id, text=text, relevance_score=score)
+
+
+class TestPromptBuilder:
+    def test_everything_fits_in_relevance_order(self):
+        builder = PromptBuilder(WordModel(), max_prompt_tokens=500)
+        contexts = [_ctx("a", 10, 0.5), _ctx("b", 10, 0.9)]
+        
+        assembled = builder.build(TEMPLATE, "what happened?", contexts)
+        
+        assert [c.source_id for c in assembled.contexts] == ["b", "a"]
+        assert "[Source 1] (b)" in assembled.prompt
+        assert "[Source 2] (a)" in assembled.prompt
+        assert assembled.dropped == 0 and assembled.truncated == 0
+        assert assembled.prompt_tokens <= assembled.budget_tokens
+    
+    def test_budget_reserves_output_tokens(self):
+        builder = PromptBuilder(WordModel(), max_prompt_tokens=5000)
+        assert builder.budget(max_tokens=200) == 3800
+    
+    def test_duplicates_and_contained_texts_are_dropped(self):
+        builder = PromptBuilder(WordModel(), max_prompt_tokens=500)
+        window = RetrievedContext(source_id="win", text="Revenue grew 10%. Margins fell.", relevance_score=0.8)
+        hit = RetrievedContext(source_id="hit", text="revenue grew   10%.", relevance_score=0.7)
+        copy = RetrievedContext(source_id="copy", text="Revenue grew 10%. Margins fell.", relevance_score=0.6)
+        
+        assembled = builder.build(TEMPLATE, "q", [hit, copy, window])
+        
+        assert [c.source_id for c in assembled.contexts] == ["win"]
+        assert assembled.duplicates == 2
+    
+    def test_over_budget_sources_are_truncated_then_dropped(self):
+        builder = PromptBuilder(WordModel(), max_prompt_tokens=100, min_source_tokens=10)
+        contexts = [_ctx("a", 60, 0.9), _ctx("b", 60, 0.8), _ctx("c", 60, 0.7)]
+        
+        assembled = builder.build(TEMPLATE, "q", contexts, system_prompt="be brief")
+        
+        assert [c.source_id for c in assembled.contexts] == ["a", "b"]
+        assert assembled.truncated == 1
+        assert assembled.dropped == 1
+        assert assembled.contexts[1].text.endswith(" ...")
+        assert assembled.prompt_tokens <= 100
+        # The caller's contexts are left untouched
+        assert not contexts[1].text.endswith(" ...")
+    
+    def test_no_sources(self):
+        builder = PromptBuilder(WordModel())
+        assembled = builder.build(TEMPLATE, "q", [])
+        assert NO_SOURCES in assembled.prompt
+        assert assembled.contexts == []
+
+
+@pytest.mark.asyncio
+async def test_critic_prompt_fits_budget(monkeypatch):
+    model = WordModel()
+    model._generate = AsyncMock(return_value=ModelResponse(content="PASSED: true", model="word-model"))
+    monkeypatch.setattr(settings, "prompt_max_tokens", 200)
+    monkeypatch.setattr(settings, "llm_cache_enabled", False)
+    critic = CriticAgent(model=model)
+    contexts = [_ctx(f"s{i}", 100, 1.0 - i / 10) for i in range(5)]
+    
+    await critic.validate("The answer [Source 1].", contexts, [])
+    
+    prompt = model._generate.call_args.args[0]
+    assert model.count_tokens(critic.system_prompt) + model.count_tokens(prompt) <= 200
+    assert "[Source 1]: s0w0." in prompt
+
+
+@pytest.mark.asyncio
+async def test_critic_keeps_the_answers_source_numbers(monkeypatch):
+    model = WordModel()
+    model._generate = AsyncMock(return_value=ModelResponse(content="PASSED: true", model="word-model"))
+    monkeypatch.setattr(settings, "llm_cache_enabled", False)
+    critic = CriticAgent(model=model)
+    # As numbered in the answer's prompt; not in relevance order, and "c" repeats "a"
+    contexts = [_ctx("a", 5, 0.2), _ctx("b", 5, 0.9), _ctx("a", 5, 0.2).model_copy(update={"source_id": "c"})]
+    
+    await critic.validate("B says so [Source 2].", contexts, [])
+    
+    prompt = model._generate.call_args.args[0]
+    assert "[Source 1]: aw0." in prompt
+    assert "[Source 2]: bw0." in prompt
+    assert "[Source 3]: aw0." in prompt
@@ -0,0 +1,126 @@
+import numpy as np
+import pytest
+
+from src.data.chunking import Chunk
+from src.data.docstore import DocStore
+from src.data.filing_archive import FilingArchive
+from src.data.local_index import LocalIndexBackend
+from src.data.vector_store import VectorStore
+
+FILINGS = [
+    ("10-K", "k-22", "2022-10-28"),
+    ("10-Q", "q-23a", "2023-02-03"),
+    ("10-Q", "q-23b", "2023-05-05"),
+    ("10-K", "k-23", "2023-11-03"),
+    ("10-Q", "q-24a", "2024-02-02"),
+]
+
+
+@pytest.fixture
+def store(tmp_path):
+    archive = FilingArchive(root=str(tmp_path / "archive"))
+    store = VectorStore(
+        docstore=DocStore(str(tmp_path / "docstore.db")),
+        backend=LocalIndexBackend(str(tmp_path / "index")),
+        filing_index=archive
+    )
+    
+    chunks = []
+    for form, accession, filing_date in FILINGS:
+        record = archive.put("AAPL", form, accession, raw=b"x", clean=accession, filing_date=filing_date)
+        for i in range(3):
+            chunks.append(Chunk(
+                text=f"{accession} section {i}",
+                chunk_id=f"{record.document_id}_chunk_{i}",
+                document_id=record.document_id,
+                metadata={"ticker": "AAPL", "filing_type": form,
+                          "filing_date": int(filing_date.replace("-", ""))}
+            ))
+    embeddings = np.tile(np.eye(1, 8, dtype=np.float32), (len(chunks), 1))
+    store.add_documents(chunks, embeddings=embeddings)
+    yield store
+    archive.close()
+
+
+def search(store, **kwargs):
+    results = store.search("", top_k=50, query_embedding=np.eye(1, 8, dtype=np.float32)[0], **kwargs)
+    return {chunk.text.split()[0] for chunk, _ in results}
+
+
+def test_latest_n_filings_resolved_through_filing_index(store):
+    """Test latest-N scopes the vector query to the newest filings of a form."""
+    assert search(store, filters={"ticker": "AAPL"}, latest_n=2) == {"q-24a", "k-23"}
+    assert search(store, filters={"ticker": "AAPL", "filing_type": "10-K"}, latest_n=1) == {"k-23"}
+    assert search(store, filters={"ticker": "AAPL", "filing_type": "10-Q"}, latest_n=3) == {"q-24a", "q-23b", "q-23a"}
+
+
+def test_filing_date_range(store):
+    """Test date ranges with and without a ticker."""
+    expected = {"q-23a", "q-23b", "k-23"}
+    assert search(store, filters={"ticker": "AAPL"}, start_date="2023-01-01", end_date="2023-12-31") == expected
+    assert search(store, start_date="2023-01-01", end_date="2023-12-31") == expected
+    assert search(store, filters={"ticker": "MSFT"}, latest_n=1) == set()
+
+
+@pytest.fixture
+def chunked_store(tmp_path):
+    from src.data.chunking import DocumentChunker
+    
+    store = VectorStore(
+        docstore=DocStore(str(tmp_path / "docstore.db")),
+        backend=LocalIndexBackend(str(tmp_path / "index")),
+        filing_index=FilingArchive(root=str(tmp_path / "archive"))
+    )
+    text = " ".join(f"w{i:03d}" for i in range(400))
+    chunks = DocumentChunker(chunk_size=25, overlap=5).chunk_document(text, "AAPL-10-K-1", {"ticker": "AAPL"})
+    store.add_documents(chunks, embeddings=np.eye(len(chunks), 64, dtype=np.float32))
+    return store, chunks, text
+
+
+def test_expand_windows_merges_neighbors_without_overlap(chunked_store):
+    """Test adjacent hits merge into one de-overlapped window with neighbors."""
+    store, chunks, text = chunked_store
+    hits = [(chunks[5], 0.9), (chunks[6], 0.8), (chunks[12], 0.7)]
+    
+    windows = store.expand_windows(hits, token_budget=10_000, radius=1)
+    
+    assert len(windows) == 2
+    first, score = windows[0]
+    assert score == 0.9
+    assert (first.metadata["window_start"], first.metadata["window_end"]) == (4, 7)
+    start = chunks[4].metadata["char_start"]
+    end = chunks[7].metadata["char_start"] + len(chunks[7].text)
+    assert first.text == text[start:end]
+    assert (windows[1][0].metadata["window_start"], windows[1][0].metadata["window_end"]) == (11, 13)
+
+
+def test_expand_windows_respects_token_budget(chunked_store):
+    """Test windows shrink to their hits, then drop, once the budget is spent."""
+    store, chunks, _ = chunked_store
+    hits = [(chunks[5], 0.9), (chunks[12], 0.7)]
+    chunk_tokens = len(chunks[5].text) // 4
+    
+    windows = store.expand_windows(hits, token_budget=chunk_tokens + 1, radius=2)
+    
+    assert len(windows) == 1
+    assert windows[0][0].text == chunks[5].text
+
+
+def test_search_with_mmr_diversifies_results(tmp_path):
+    """Test MMR search returns the distinct section ahead of duplicates."""
+    store = VectorStore(
+        docstore=DocStore(str(tmp_path / "docstore.db")),
+        backend=LocalIndexBackend(str(tmp_path / "index")),
+        filing_index=FilingArchive(root=str(tmp_path / "archive"))
+    )
+    vectors = np.array([[1.0, 0.1, 0.0], [1.0, 0.1, 0.001], [1.0, 0.1, 0.002], [0.5, 0.86, 0.0]], dtype=np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    chunks = [Chunk(text=f"para {i}", chunk_id=f"d_chunk_{i}", document_id="d", metadata={}) for i in range(4)]
+    store.add_documents(chunks, embeddings=vectors)
+    
+    query = np.array([1.0, 0.2, 0.0], dtype=np.float32) / np.linalg.norm([1.0, 0.2, 0.0])
+    plain = store.search("", top_k=2, query_embedding=query)
+    diverse = store.search("", top_k=2, query_embedding=query, mmr=True, fetch_k=4, mmr_lambda=0.5)
+    
+    assert "para 3" not in [c.text for c, _ in plain]
+    assert diverse[1][0].text == "para 3"